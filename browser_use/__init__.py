@@ -47,6 +47,7 @@ base_subprocess.BaseSubprocessTransport.__del__ = _patched_del
 if TYPE_CHECKING:
 	from browser_use.agent.prompts import SystemPrompt
 	from browser_use.agent.service import Agent
+	from browser_use.agent.swarm import AgentSwarm, SwarmTask
 	from browser_use.agent.views import ActionModel, ActionResult, AgentHistoryList
 	from browser_use.browser import BrowserProfile, BrowserSession
 	from browser_use.browser import BrowserSession as Browser
@@ -65,6 +66,9 @@ if TYPE_CHECKING:
 _LAZY_IMPORTS = {
 	# Agent service (heavy due to dependencies)
 	'Agent': ('browser_use.agent.service', 'Agent'),
+	# Running many agents across worker processes
+	'AgentSwarm': ('browser_use.agent.swarm', 'AgentSwarm'),
+	'SwarmTask': ('browser_use.agent.swarm', 'SwarmTask'),
 	# System prompt (moderate weight due to agent.views imports)
 	'SystemPrompt': ('browser_use.agent.prompts', 'SystemPrompt'),
 	# Agent views (very heavy - over 1 second!)
@@ -115,6 +119,8 @@ def __getattr__(name: str):
 
 __all__ = [
 	'Agent',
+	'AgentSwarm',
+	'SwarmTask',
 	'BrowserSession',
 	'Browser',  # Alias for BrowserSession
 	'BrowserProfile',
@@ -2,9 +2,11 @@ from __future__ import annotations
 
 import base64
 import io
+import itertools
 import logging
 import os
 import platform
+from collections.abc import Iterator
 from typing import TYPE_CHECKING
 
 from browser_use.agent.views import AgentHistoryList
@@ -32,6 +34,18 @@ def decode_unicode_escapes_to_utf8(text: str) -> str:
 		return text
 
 
+VIDEO_CODECS = {
+	'.mp4': 'libx264',
+	'.webm': 'libvpx-vp9',
+}
+
+_PLACEHOLDER_4PX_SCREENSHOT_BYTES = base64.b64decode(PLACEHOLDER_4PX_SCREENSHOT)
+
+
+def _is_real_screenshot(screenshot: bytes | None) -> bool:
+	return bool(screenshot) and screenshot != _PLACEHOLDER_4PX_SCREENSHOT_BYTES
+
+
 def create_history_gif(
 	task: str,
 	history: AgentHistoryList,
@@ -47,34 +61,23 @@ def create_history_gif(
 	margin: int = 40,
 	line_spacing: float = 1.5,
 ) -> None:
-	"""Create a GIF from the agent's history with overlaid task and goal text."""
-	if not history.history:
-		logger.warning('No history to create GIF from')
-		return
-
-	from PIL import Image, ImageFont
-
-	images = []
+	"""Create a GIF (or an MP4/WebM video, based on the output_path extension) from the agent's history with overlaid task and goal text.
 
-	# if history is empty, we can't create a gif
+	Screenshots are read lazily from their files on disk and frames are streamed into the encoder one at a time.
+	This is blocking, CPU-heavy work: from async code run it in a worker thread (see Agent.run).
+	"""
 	if not history.history:
 		logger.warning('No history to create GIF from')
 		return
 
-	# Get all screenshots from history (including None placeholders)
-	screenshots = history.screenshots(return_none_if_not_screenshot=True)
-
-	if not screenshots:
-		logger.warning('No screenshots found in history')
-		return
+	from PIL import Image, ImageFont
 
-	# Find the first non-placeholder screenshot
-	# A screenshot is considered a placeholder if:
-	# 1. It's the exact 4px placeholder for about:blank pages, OR
-	# 2. It comes from a new tab page (chrome://newtab/, about:blank, etc.)
+	# Find the first non-placeholder screenshot, only reading as many files from disk as needed
+	# A screenshot is considered a placeholder if it's the exact 4px placeholder for about:blank pages
 	first_real_screenshot = None
-	for screenshot in screenshots:
-		if screenshot and screenshot != PLACEHOLDER_4PX_SCREENSHOT:
+	for item in history.history:
+		screenshot = item.state.get_screenshot_bytes()
+		if _is_real_screenshot(screenshot):
 			first_real_screenshot = screenshot
 			break
 
@@ -136,82 +139,110 @@ def create_history_gif(
 		except Exception as e:
 			logger.warning(f'Could not load logo: {e}')
 
-	# Create task frame if requested
-	if show_task and task:
-		# Find the first non-placeholder screenshot for the task frame
-		first_real_screenshot = None
-		for item in history.history:
-			screenshot_b64 = item.state.get_screenshot()
-			if screenshot_b64 and screenshot_b64 != PLACEHOLDER_4PX_SCREENSHOT:
-				first_real_screenshot = screenshot_b64
-				break
-
-		if first_real_screenshot:
-			task_frame = _create_task_frame(
+	def iter_frames() -> Iterator[Image.Image]:
+		# Create task frame if requested
+		if show_task and task:
+			yield _create_task_frame(
 				task,
-				first_real_screenshot,
+				Image.open(io.BytesIO(first_real_screenshot)),
 				title_font,  # type: ignore
 				regular_font,  # type: ignore
 				logo,
 				line_spacing,
 			)
-			images.append(task_frame)
-		else:
-			logger.warning('No real screenshots found for task frame, skipping task frame')
-
-	# Process each history item with its corresponding screenshot
-	for i, (item, screenshot) in enumerate(zip(history.history, screenshots), 1):
-		if not screenshot:
-			continue
-
-		# Skip placeholder screenshots from about:blank pages
-		# These are 4x4 white PNGs encoded as a specific base64 string
-		if screenshot == PLACEHOLDER_4PX_SCREENSHOT:
-			logger.debug(f'Skipping placeholder screenshot from about:blank page at step {i}')
-			continue
-
-		# Skip screenshots from new tab pages
+
+		# Process each history item with its corresponding screenshot, one at a time
 		from browser_use.utils import is_new_tab_page
 
-		if is_new_tab_page(item.state.url):
-			logger.debug(f'Skipping screenshot from new tab page ({item.state.url}) at step {i}')
-			continue
-
-		# Convert base64 screenshot to PIL Image
-		img_data = base64.b64decode(screenshot)
-		image = Image.open(io.BytesIO(img_data))
-
-		if show_goals and item.model_output:
-			image = _add_overlay_to_image(
-				image=image,
-				step_number=i,
-				goal_text=item.model_output.current_state.next_goal,
-				regular_font=regular_font,  # type: ignore
-				title_font=title_font,  # type: ignore
-				margin=margin,
-				logo=logo,
-			)
+		for i, item in enumerate(history.history, 1):
+			screenshot = item.state.get_screenshot_bytes()
+			if not screenshot:
+				continue
 
-		images.append(image)
-
-	if images:
-		# Save the GIF
-		images[0].save(
-			output_path,
-			save_all=True,
-			append_images=images[1:],
-			duration=duration,
-			loop=0,
-			optimize=False,
-		)
-		logger.info(f'Created GIF at {output_path}')
-	else:
+			# Skip placeholder screenshots from about:blank pages
+			# These are 4x4 white PNGs encoded as a specific base64 string
+			if screenshot == _PLACEHOLDER_4PX_SCREENSHOT_BYTES:
+				logger.debug(f'Skipping placeholder screenshot from about:blank page at step {i}')
+				continue
+
+			# Skip screenshots from new tab pages
+			if is_new_tab_page(item.state.url):
+				logger.debug(f'Skipping screenshot from new tab page ({item.state.url}) at step {i}')
+				continue
+
+			image = Image.open(io.BytesIO(screenshot))
+
+			if show_goals and item.model_output:
+				image = _add_overlay_to_image(
+					image=image,
+					step_number=i,
+					goal_text=item.model_output.current_state.next_goal,
+					regular_font=regular_font,  # type: ignore
+					title_font=title_font,  # type: ignore
+					margin=margin,
+					logo=logo,
+				)
+
+			yield image
+
+	frames = iter_frames()
+	first_frame = next(frames, None)
+	if first_frame is None:
 		logger.warning('No images found in history to create GIF')
+		return
+
+	extension = os.path.splitext(output_path)[1].lower()
+	if extension in VIDEO_CODECS:
+		_write_video(first_frame, frames, output_path, duration, codec=VIDEO_CODECS[extension])
+		return
+
+	# Save the GIF, Pillow pulls the remaining frames from the generator as it encodes
+	first_frame.save(
+		output_path,
+		save_all=True,
+		append_images=frames,
+		duration=duration,
+		loop=0,
+		optimize=False,
+	)
+	logger.info(f'Created GIF at {output_path}')
+
+
+def _write_video(first_frame: Image.Image, frames: Iterator[Image.Image], output_path: str, duration: int, codec: str) -> None:
+	"""Stream frames into an MP4/WebM file with imageio-ffmpeg, each frame shown for `duration` ms."""
+	from PIL import Image
+
+	try:
+		import imageio.v2 as iio  # type: ignore[import-not-found]
+		import numpy as np  # type: ignore[import-not-found]
+	except ImportError:
+		logger.error(
+			'MP4/WebM history rendering requires optional dependencies. Please install them with: pip install "browser-use[video]"'
+		)
+		return
+
+	# Encode at 1 fps and repeat frames, duplicate frames cost almost nothing in a video codec
+	repeats = max(1, round(duration / 1000))
+	# yuv420p needs even dimensions, every frame is scaled to the (evened) size of the first one
+	size = (first_frame.width - first_frame.width % 2, first_frame.height - first_frame.height % 2)
+
+	writer = iio.get_writer(output_path, fps=1, codec=codec, pixelformat='yuv420p', macro_block_size=None)
+	try:
+		for frame in itertools.chain([first_frame], frames):
+			frame = frame.convert('RGB')
+			if frame.size != size:
+				frame = frame.resize(size, Image.Resampling.LANCZOS)
+			frame_array = np.asarray(frame)
+			for _ in range(repeats):
+				writer.append_data(frame_array)
+	finally:
+		writer.close()
+	logger.info(f'Created video at {output_path}')
 
 
 def _create_task_frame(
 	task: str,
-	first_screenshot: str,
+	template: Image.Image,
 	title_font: ImageFont.FreeTypeFont,
 	regular_font: ImageFont.FreeTypeFont,
 	logo: Image.Image | None = None,
@@ -220,8 +251,6 @@ def _create_task_frame(
 	"""Create initial frame showing the task."""
 	from PIL import Image, ImageDraw, ImageFont
 
-	img_data = base64.b64decode(first_screenshot)
-	template = Image.open(io.BytesIO(img_data))
 	image = Image.new('RGB', template.size, (0, 0, 0))
 	draw = ImageDraw.Draw(image)
 
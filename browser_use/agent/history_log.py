@@ -0,0 +1,231 @@
+"""Append-only JSONL persistence of agent history.
+
+`AgentHistoryWriter` appends one line per `AgentHistory` item while the agent runs, so a crashed run keeps every
+step that was finalized before the crash. The last line of each write also carries a snapshot of the `AgentState`
+needed to continue the run, together with the message manager history items added since the previous write (those
+are append-only, so the full list is rebuilt by concatenating them instead of being re-serialized every step). The
+file system state holds the content of every file the agent wrote, so it's only written when it changed, and the
+latest one is restored.
+
+`AgentHistoryLog` reads such a file back: it can stream the items, index them by line offset to read single items
+without parsing the rest of the file, or load a `HistoryCheckpoint` to resume an agent from the last persisted step.
+
+Line format:
+	{"history": <AgentHistory.model_dump()>, "state": <AgentState snapshot> | null, "agent_history_items": [...],
+	 "file_system_state": <FileSystemState> | null}
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+from collections.abc import Hashable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from browser_use.agent.message_manager.views import HistoryItem
+from browser_use.agent.views import AgentHistory, AgentHistoryList, AgentOutput, AgentState
+from browser_use.filesystem.file_system import FileSystemState
+
+logger = logging.getLogger(__name__)
+
+# AgentState fields that are not part of the snapshot: the last model output and result are the model output and
+# result of the last history item, and the message manager and file system states are stored separately (see _dump_state)
+_STATE_SNAPSHOT_EXCLUDE = {'last_model_output', 'last_result', 'message_manager_state', 'file_system_state'}
+
+
+def _dump_state(state: AgentState, agent_history_items_written: int) -> tuple[dict[str, Any], list[dict[str, Any]]]:
+	"""Snapshot the resumable part of the agent state, returning it with the history items added since the last write."""
+	message_manager_state = state.message_manager_state
+	snapshot = state.model_dump(mode='json', exclude=_STATE_SNAPSHOT_EXCLUDE)
+	# the message history is rebuilt from scratch every step, so only the counters are kept
+	snapshot['message_manager_state'] = message_manager_state.model_dump(mode='json', exclude={'history', 'agent_history_items'})
+	new_items = [item.model_dump(mode='json') for item in message_manager_state.agent_history_items[agent_history_items_written:]]
+	return snapshot, new_items
+
+
+@dataclass
+class HistoryCheckpoint:
+	"""Everything needed to resume an agent from the last step persisted in a history log."""
+
+	history: AgentHistoryList
+	state: AgentState | None
+
+
+class AgentHistoryWriter:
+	"""Appends agent history items to a JSONL file as they are produced."""
+
+	def __init__(
+		self,
+		filepath: str | Path,
+		sensitive_data: dict[str, str | dict[str, str]] | None = None,
+		encoding: str = 'utf-8',
+	):
+		self.filepath = Path(filepath)
+		self.sensitive_data = sensitive_data
+		self.encoding = encoding
+		self.items_written = 0
+		self.agent_history_items_written = 0
+		# `FileSystem.version` of the last file system state written, the state is only written again once it changes
+		self._file_system_version: Hashable | None = None
+		self._file_system_state: FileSystemState | None = None
+		# the first write truncates the file unless the writer was pointed at an existing log with continue_log()
+		self._append = False
+
+	def continue_log(
+		self, items_written: int, agent_history_items_written: int, file_system_version: Hashable | None = None
+	) -> None:
+		"""Keep appending to the existing log (after resuming from it) instead of starting a new one."""
+		self.items_written = items_written
+		self.agent_history_items_written = agent_history_items_written
+		self._file_system_version = file_system_version
+		self._append = True
+		_truncate_incomplete_last_line(self.filepath)
+
+	async def write(self, items: list[AgentHistory], state: AgentState, file_system_version: Hashable | None = None) -> None:
+		"""Append one line per history item, attaching the state snapshot to the last one.
+
+		`file_system_version` is the `FileSystem.version` the state's file system state was taken at. The file system
+		state is only written when it changed; without a version, whenever it is a different snapshot object.
+		"""
+		if not items:
+			return
+
+		# the state is dumped on the event loop, so it can't change while the file is written
+		snapshot, new_agent_history_items = _dump_state(state, self.agent_history_items_written)
+		version = file_system_version if file_system_version is not None else id(state.file_system_state)
+		file_system_state = None
+		if state.file_system_state is not None and version != self._file_system_version:
+			file_system_state = state.file_system_state.model_dump(mode='json')
+		records = [
+			{
+				'history': item.model_dump(sensitive_data=self.sensitive_data),
+				'state': snapshot if i == len(items) - 1 else None,
+				'agent_history_items': new_agent_history_items if i == len(items) - 1 else [],
+				'file_system_state': file_system_state if i == len(items) - 1 else None,
+			}
+			for i, item in enumerate(items)
+		]
+
+		await asyncio.to_thread(self._write_records, records)
+		self._append = True
+		self.items_written += len(items)
+		self.agent_history_items_written += len(new_agent_history_items)
+		self._file_system_version = version
+		# keeps the snapshot alive, so its id can't be reused by another one when no version is given
+		self._file_system_state = state.file_system_state
+
+	def _write_records(self, records: list[dict[str, Any]]) -> None:
+		lines = [json.dumps(record, ensure_ascii=False) + '\n' for record in records]
+		self.filepath.parent.mkdir(parents=True, exist_ok=True)
+		with open(self.filepath, 'a' if self._append else 'w', encoding=self.encoding) as f:
+			f.writelines(lines)
+
+
+class AgentHistoryLog:
+	"""Lazy reader for a JSONL history log written by `AgentHistoryWriter`.
+
+	A trailing line without a newline (a write interrupted by a crash) is ignored.
+	"""
+
+	def __init__(self, filepath: str | Path, output_model: type[AgentOutput], encoding: str = 'utf-8'):
+		self.filepath = Path(filepath)
+		self.output_model = output_model
+		self.encoding = encoding
+		self._offsets: list[int] | None = None
+
+	def _line_offsets(self) -> list[int]:
+		"""Byte offsets of every complete line, found without parsing any JSON."""
+		if self._offsets is None:
+			offsets = []
+			position = 0
+			with open(self.filepath, 'rb') as f:
+				for line in f:
+					if line.endswith(b'\n') and line.strip():
+						offsets.append(position)
+					position += len(line)
+			self._offsets = offsets
+		return self._offsets
+
+	def __len__(self) -> int:
+		return len(self._line_offsets())
+
+	def __getitem__(self, index: int) -> AgentHistory:
+		offset = self._line_offsets()[index]
+		with open(self.filepath, 'rb') as f:
+			f.seek(offset)
+			record = json.loads(f.readline().decode(self.encoding))
+		return AgentHistory.load_from_dict(record['history'], self.output_model)
+
+	def _records(self) -> Iterator[dict[str, Any]]:
+		with open(self.filepath, encoding=self.encoding) as f:
+			for line in f:
+				if not line.endswith('\n'):
+					logger.warning(f'Ignoring incomplete last line of history log {self.filepath}')
+					break
+				if line.strip():
+					yield json.loads(line)
+
+	def __iter__(self) -> Iterator[AgentHistory]:
+		"""Stream the history items one line at a time."""
+		for record in self._records():
+			yield AgentHistory.load_from_dict(record['history'], self.output_model)
+
+	def to_history_list(self) -> AgentHistoryList:
+		return AgentHistoryList(history=list(self))
+
+	def load_checkpoint(self) -> HistoryCheckpoint:
+		"""Read the whole log once, returning the history and the agent state as of the last persisted step."""
+		history: list[AgentHistory] = []
+		agent_history_items: list[HistoryItem] = []
+		snapshot: dict[str, Any] | None = None
+		snapshot_item: AgentHistory | None = None
+		file_system_state: dict[str, Any] | None = None
+		for record in self._records():
+			item = AgentHistory.load_from_dict(record['history'], self.output_model)
+			history.append(item)
+			agent_history_items.extend(HistoryItem.model_validate(entry) for entry in record['agent_history_items'])
+			if record['state'] is not None:
+				snapshot, snapshot_item = record['state'], item
+			if record.get('file_system_state') is not None:
+				file_system_state = record['file_system_state']
+
+		state = None
+		if snapshot is not None and snapshot_item is not None:
+			state = AgentState.model_validate(snapshot)
+			state.message_manager_state.agent_history_items = agent_history_items
+			state.last_model_output = snapshot_item.model_output
+			state.last_result = snapshot_item.result
+			if file_system_state is not None:
+				state.file_system_state = FileSystemState.model_validate(file_system_state)
+		return HistoryCheckpoint(history=AgentHistoryList(history=history), state=state)
+
+
+def _truncate_incomplete_last_line(filepath: Path) -> None:
+	"""Drop a trailing partial line left behind by a write that was interrupted, so appends start on a new line."""
+	if not filepath.exists():
+		return
+	with open(filepath, 'rb+') as f:
+		f.seek(0, os.SEEK_END)
+		size = f.tell()
+		if size == 0:
+			return
+		# scan backwards for the last newline
+		position = size
+		while position > 0:
+			chunk_start = max(0, position - 4096)
+			f.seek(chunk_start)
+			chunk = f.read(position - chunk_start)
+			newline = chunk.rfind(b'\n')
+			if newline != -1:
+				end = chunk_start + newline + 1
+				break
+			position = chunk_start
+		else:
+			end = 0
+		if end != size:
+			logger.warning(f'Dropping incomplete last line of history log {filepath}')
+			f.truncate(end)
@@ -1,11 +1,13 @@
 from __future__ import annotations
 
+import asyncio
 import logging
 from typing import Literal
 
 from browser_use.agent.message_manager.views import (
 	HistoryItem,
 )
+from browser_use.agent.message_manager.vision import PreparedScreenshot, ScreenshotOptimizer
 from browser_use.agent.prompts import AgentMessagePrompt
 from browser_use.agent.views import (
 	ActionResult,
@@ -20,6 +22,7 @@ from browser_use.llm.messages import (
 	ContentPartImageParam,
 	ContentPartTextParam,
 	SystemMessage,
+	UserMessage,
 )
 from browser_use.observability import observe_debug
 from browser_use.utils import match_url_with_domain_pattern, time_execution_sync
@@ -110,6 +113,9 @@ class MessageManager:
 		include_tool_call_examples: bool = False,
 		include_recent_events: bool = False,
 		sample_images: list[ContentPartTextParam | ContentPartImageParam] | None = None,
+		screenshot_optimizer: ScreenshotOptimizer | None = None,
+		message_layout: Literal['default', 'cache_friendly'] = 'default',
+		viewport_first_elements: bool = False,
 	):
 		self.task = task
 		self.state = state
@@ -122,6 +128,10 @@ class MessageManager:
 		self.include_tool_call_examples = include_tool_call_examples
 		self.include_recent_events = include_recent_events
 		self.sample_images = sample_images
+		self.screenshot_optimizer = screenshot_optimizer
+		self._prepared_screenshot: tuple[str, PreparedScreenshot] | None = None
+		self.message_layout = message_layout
+		self.viewport_first_elements = viewport_first_elements
 
 		assert max_history_items is None or max_history_items > 5, 'max_history_items must be None or greater than 5'
 
@@ -136,31 +146,42 @@ class MessageManager:
 	@property
 	def agent_history_description(self) -> str:
 		"""Build agent history description from list of items, respecting max_history_items limit"""
-		if self.max_history_items is None:
-			# Include all items
-			return '\n'.join(item.to_string() for item in self.state.agent_history_items)
+		return '\n'.join(self._agent_history_entries())
 
-		total_items = len(self.state.agent_history_items)
+	def _agent_history_entries(self) -> list[str]:
+		"""Agent history items as strings, with the omitted-steps marker if max_history_items drops some"""
+		items = self.state.agent_history_items
+		total_items = len(items)
 
-		# If we have fewer items than the limit, just return all items
-		if total_items <= self.max_history_items:
-			return '\n'.join(item.to_string() for item in self.state.agent_history_items)
+		# If we have no limit or fewer items than the limit, just return all items
+		if self.max_history_items is None or total_items <= self.max_history_items:
+			return [item.to_string() for item in items]
 
 		# We have more items than the limit, so we need to omit some
 		omitted_count = total_items - self.max_history_items
+		if self.message_layout == 'cache_friendly':
+			# Omit in chunks of half the limit, so the cached history prefix only changes every few steps
+			# instead of shifting by one item every step
+			chunk = self.max_history_items // 2
+			omitted_count = -(-omitted_count // chunk) * chunk
 
-		# Show first item + omitted message + most recent (max_history_items - 1) items
+		# Show first item + omitted message + most recent items
 		# The omitted message doesn't count against the limit, only real history items do
-		recent_items_count = self.max_history_items - 1  # -1 for first item
-
-		items_to_include = [
-			self.state.agent_history_items[0].to_string(),  # Keep first item (initialization)
+		return [
+			items[0].to_string(),  # Keep first item (initialization)
 			f'<sys>[... {omitted_count} previous steps omitted...]</sys>',
+			*(item.to_string() for item in items[1 + omitted_count :]),
 		]
-		# Add most recent items
-		items_to_include.extend([item.to_string() for item in self.state.agent_history_items[-recent_items_count:]])
 
-		return '\n'.join(items_to_include)
+	def _create_history_message(self) -> UserMessage:
+		"""Agent history as one text part per item, for the cache-friendly layout.
+
+		Items are only ever appended, so the message is a byte-stable prefix of the next step's one. It ends with the
+		last item (the closing tag starts the state message) so its cache breakpoint is still a prefix next step.
+		"""
+		entries = self._agent_history_entries()
+		entries[0] = '<agent_history>\n' + entries[0]
+		return UserMessage(content=[ContentPartTextParam(text=entry + '\n') for entry in entries], cache=True)
 
 	def add_new_task(self, new_task: str) -> None:
 		new_task = '<follow_up_user_request> ' + new_task.strip() + ' </follow_up_user_request>'
@@ -291,17 +312,40 @@ class MessageManager:
 			self.sensitive_data = effective_sensitive_data
 			self.sensitive_data_description = self._get_sensitive_data_description(browser_state_summary.url)
 
-		# Use only the current screenshot
+		# Use only the current screenshot, downscaled and re-encoded for the provider
 		screenshots = []
+		screenshot_media_type = 'image/png'
+		screenshot_unchanged = False
 		if browser_state_summary.screenshot:
-			screenshots.append(browser_state_summary.screenshot)
+			if self.screenshot_optimizer is None:
+				screenshots.append(browser_state_summary.screenshot)
+			elif not use_vision:
+				self.screenshot_optimizer.reset()
+			else:
+				if self._prepared_screenshot is not None and self._prepared_screenshot[0] is browser_state_summary.screenshot:
+					prepared = self._prepared_screenshot[1]
+				else:
+					prepared = self.screenshot_optimizer.prepare(browser_state_summary.screenshot)
+				self._prepared_screenshot = None
+				screenshot_media_type = prepared.media_type
+				if prepared.unchanged:
+					screenshot_unchanged = True
+				else:
+					screenshots.append(prepared.data)
+
+		# In the cache-friendly layout the history gets its own message in front of the volatile state
+		history_in_prefix = self.message_layout == 'cache_friendly'
+		if history_in_prefix:
+			self._set_message_with_type(self._create_history_message(), 'history')
 
 		# Create single state message with all content
 		assert browser_state_summary
 		state_message = AgentMessagePrompt(
 			browser_state_summary=browser_state_summary,
 			file_system=self.file_system,
-			agent_history_description=self.agent_history_description,
+			agent_history_description=None if history_in_prefix else self.agent_history_description,
+			history_in_prefix=history_in_prefix,
+			viewport_first_elements=self.viewport_first_elements,
 			read_state_description=self.state.read_state_description,
 			task=self.task,
 			include_attributes=self.include_attributes,
@@ -311,13 +355,21 @@ class MessageManager:
 			available_file_paths=available_file_paths,
 			screenshots=screenshots,
 			vision_detail_level=self.vision_detail_level,
+			screenshot_media_type=screenshot_media_type,
+			screenshot_unchanged=screenshot_unchanged,
 			include_recent_events=self.include_recent_events,
 			sample_images=self.sample_images,
 		).get_user_message(use_vision)
 
-		# Set the state message with caching enabled
 		self._set_message_with_type(state_message, 'state')
 
+	async def prepare_screenshot(self, screenshot: str | None) -> None:
+		"""Downscale and re-encode the next state message's screenshot in a worker thread, off the event loop"""
+		if self.screenshot_optimizer is None or not screenshot:
+			return
+		prepared = await asyncio.to_thread(self.screenshot_optimizer.prepare, screenshot)
+		self._prepared_screenshot = (screenshot, prepared)
+
 	def _log_history_lines(self) -> str:
 		"""Generate a formatted log string of message history for debugging / printing to terminal"""
 		# TODO: fix logging
@@ -364,11 +416,13 @@ class MessageManager:
 		self.last_input_messages = self.state.history.get_messages()
 		return self.last_input_messages
 
-	def _set_message_with_type(self, message: BaseMessage, message_type: Literal['system', 'state']) -> None:
+	def _set_message_with_type(self, message: BaseMessage, message_type: Literal['system', 'history', 'state']) -> None:
 		"""Replace a specific state message slot with a new message"""
 		# Don't filter system and state messages - they should contain placeholder tags or normal conversation
 		if message_type == 'system':
 			self.state.history.system_message = message
+		elif message_type == 'history':
+			self.state.history.history_message = message
 		elif message_type == 'state':
 			self.state.history.state_message = message
 		else:
@@ -69,15 +69,18 @@ class MessageHistory(BaseModel):
 	"""History of messages"""
 
 	system_message: BaseMessage | None = None
+	history_message: BaseMessage | None = None  # Append-only agent history, only set by the cache-friendly layout
 	state_message: BaseMessage | None = None
 	context_messages: list[BaseMessage] = Field(default_factory=list)
 	model_config = ConfigDict(arbitrary_types_allowed=True)
 
 	def get_messages(self) -> list[BaseMessage]:
-		"""Get all messages in the correct order: system -> state -> contextual"""
+		"""Get all messages in the correct order: system -> history -> state -> contextual"""
 		messages = []
 		if self.system_message:
 			messages.append(self.system_message)
+		if self.history_message:
+			messages.append(self.history_message)
 		if self.state_message:
 			messages.append(self.state_message)
 		messages.extend(self.context_messages)
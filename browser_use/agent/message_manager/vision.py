@@ -0,0 +1,168 @@
+"""
+Screenshot preparation for the state message sent to the LLM.
+
+Providers downscale images to a fixed effective resolution before the model sees them, so sending the full-resolution
+PNG only costs request size and (de)serialization time. `ScreenshotOptimizer` downscales to that resolution for the
+configured detail level, re-encodes it as JPEG, and can detect screenshots that are perceptually unchanged since the
+previous step.
+"""
+
+from __future__ import annotations
+
+import base64
+import io
+import logging
+from dataclasses import dataclass, replace
+from typing import TYPE_CHECKING, Literal
+
+if TYPE_CHECKING:
+	from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+VisionImageFormat = Literal['auto', 'png', 'jpeg', 'webp']
+DetailLevel = Literal['auto', 'low', 'high']
+
+# Width of the difference hash, the hash has (_HASH_SIZE - 1) ** 2 bits. It is finer than the usual 8x8 so that small
+# visible changes are less likely to hash the same
+_HASH_SIZE = 17
+
+
+@dataclass(frozen=True)
+class VisionProfile:
+	"""How a provider resizes images before the model sees them"""
+
+	max_long_edge: int | None = None
+	max_short_edge: int | None = None
+	max_pixels: int | None = None
+	low_detail_max_edge: int | None = None  # both edges, for providers with a fixed-size low detail mode
+
+
+_OPENAI_PROFILE = VisionProfile(max_long_edge=2048, max_short_edge=768, low_detail_max_edge=512)
+_ANTHROPIC_PROFILE = VisionProfile(max_long_edge=1568, max_pixels=1_150_000)
+
+# Effective input resolution per provider (the `provider` of the chat model), from the providers' vision docs. All of
+# them accept JPEG; providers not listed here get the screenshot as is
+PROVIDER_VISION_PROFILES: dict[str, VisionProfile] = {
+	'openai': _OPENAI_PROFILE,
+	'azure': _OPENAI_PROFILE,
+	'anthropic': _ANTHROPIC_PROFILE,
+	'anthropic_bedrock': _ANTHROPIC_PROFILE,
+	# the Bedrock Converse API serves models of several vendors with different limits, so it's only re-encoded
+	'aws_bedrock': VisionProfile(),
+	'google': VisionProfile(max_long_edge=3072),
+	'groq': VisionProfile(),
+	'openrouter': VisionProfile(),
+	'ollama': VisionProfile(),
+}
+
+
+@dataclass(frozen=True)
+class PreparedScreenshot:
+	data: str  # base64
+	media_type: Literal['image/png', 'image/jpeg', 'image/webp']
+	unchanged: bool = False  # perceptually identical to the previous step's screenshot
+
+
+def _target_size(width: int, height: int, profile: VisionProfile, detail_level: DetailLevel) -> tuple[int, int]:
+	scale = 1.0
+	if detail_level == 'low' and profile.low_detail_max_edge:
+		scale = min(scale, profile.low_detail_max_edge / max(width, height))
+	if profile.max_long_edge:
+		scale = min(scale, profile.max_long_edge / max(width, height))
+	if profile.max_short_edge:
+		scale = min(scale, profile.max_short_edge / min(width, height))
+	if profile.max_pixels:
+		scale = min(scale, (profile.max_pixels / (width * height)) ** 0.5)
+	return max(1, int(width * scale)), max(1, int(height * scale))
+
+
+def _difference_hash(image: Image.Image) -> int:
+	"""Perceptual hash: one bit per horizontally adjacent pixel pair of a small grayscale thumbnail."""
+	from PIL import Image
+
+	# one byte per pixel, row by row
+	pixels = image.convert('L').resize((_HASH_SIZE, _HASH_SIZE - 1), Image.Resampling.BILINEAR).tobytes()
+	bits = 0
+	for row in range(_HASH_SIZE - 1):
+		offset = row * _HASH_SIZE
+		for col in range(_HASH_SIZE - 1):
+			bits = (bits << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+	return bits
+
+
+class ScreenshotOptimizer:
+	"""Prepares each step's screenshot for the state message, remembering the previous one to detect unchanged pages"""
+
+	def __init__(
+		self,
+		provider: str | None = None,
+		detail_level: DetailLevel = 'auto',
+		image_format: VisionImageFormat = 'auto',
+		quality: int = 85,
+		detect_unchanged: bool = False,
+	):
+		self.profile = PROVIDER_VISION_PROFILES.get(provider or '')
+		self.detail_level: DetailLevel = detail_level
+		if image_format == 'auto':
+			image_format = 'jpeg' if self.profile is not None else 'png'
+		self.image_format: Literal['png', 'jpeg', 'webp'] = image_format
+		self.quality = quality
+		self.detect_unchanged = detect_unchanged
+		self._previous_hash: int | None = None
+		self._previous_input: str | None = None
+		self._previous_output: PreparedScreenshot | None = None
+
+	def prepare(self, screenshot_b64: str) -> PreparedScreenshot:
+		"""Downscale and re-encode a base64 PNG screenshot. Falls back to the original if it can't be decoded."""
+		from PIL import Image
+
+		if self.profile is None and self.image_format == 'png' and not self.detect_unchanged:
+			return PreparedScreenshot(data=screenshot_b64, media_type='image/png')
+
+		if screenshot_b64 == self._previous_input and self._previous_output is not None:
+			# byte-identical to the previous step, reuse its encoding
+			return replace(self._previous_output, unchanged=self.detect_unchanged)
+
+		try:
+			image = Image.open(io.BytesIO(base64.b64decode(screenshot_b64)))
+			image.load()
+		except Exception as e:
+			logger.debug(f'Could not decode screenshot for optimization, sending it as is: {type(e).__name__}: {e}')
+			self.reset()
+			return PreparedScreenshot(data=screenshot_b64, media_type='image/png')
+
+		with image:
+			unchanged = False
+			if self.detect_unchanged:
+				image_hash = _difference_hash(image)
+				unchanged = image_hash == self._previous_hash
+				self._previous_hash = image_hash
+
+			size = image.size
+			if self.profile is not None:
+				size = _target_size(image.width, image.height, self.profile, self.detail_level)
+			if size == image.size and self.image_format == 'png':
+				# nothing to do, avoid a lossless re-encode
+				prepared = PreparedScreenshot(data=screenshot_b64, media_type='image/png', unchanged=unchanged)
+			else:
+				if size != image.size:
+					image = image.resize(size, Image.Resampling.BICUBIC, reducing_gap=2.0)
+				if self.image_format == 'jpeg' and image.mode != 'RGB':
+					image = image.convert('RGB')
+				output = io.BytesIO()
+				image.save(output, format=self.image_format.upper(), quality=self.quality)
+				prepared = PreparedScreenshot(
+					data=base64.b64encode(output.getvalue()).decode('ascii'),
+					media_type=f'image/{self.image_format}',  # type: ignore[arg-type]
+					unchanged=unchanged,
+				)
+
+		self._previous_input, self._previous_output = screenshot_b64, prepared
+		return prepared
+
+	def reset(self) -> None:
+		"""Forget the previous screenshot, so the next one is never reported as unchanged"""
+		self._previous_hash = None
+		self._previous_input = None
+		self._previous_output = None
@@ -3,7 +3,14 @@ from datetime import datetime
 from typing import TYPE_CHECKING, Literal, Optional
 
 from browser_use.dom.views import NodeType, SimplifiedNode
-from browser_use.llm.messages import ContentPartImageParam, ContentPartTextParam, ImageURL, SystemMessage, UserMessage
+from browser_use.llm.messages import (
+	ContentPartImageParam,
+	ContentPartTextParam,
+	ImageURL,
+	SupportedImageMediaType,
+	SystemMessage,
+	UserMessage,
+)
 from browser_use.observability import observe_debug
 from browser_use.utils import is_new_tab_page
 
@@ -93,8 +100,12 @@ class AgentMessagePrompt:
 		available_file_paths: list[str] | None = None,
 		screenshots: list[str] | None = None,
 		vision_detail_level: Literal['auto', 'low', 'high'] = 'auto',
+		screenshot_media_type: SupportedImageMediaType = 'image/png',
+		screenshot_unchanged: bool = False,
 		include_recent_events: bool = False,
 		sample_images: list[ContentPartTextParam | ContentPartImageParam] | None = None,
+		history_in_prefix: bool = False,
+		viewport_first_elements: bool = False,
 	):
 		self.browser_state: 'BrowserStateSummary' = browser_state_summary
 		self.file_system: 'FileSystem | None' = file_system
@@ -109,8 +120,14 @@ class AgentMessagePrompt:
 		self.available_file_paths: list[str] | None = available_file_paths
 		self.screenshots = screenshots or []
 		self.vision_detail_level = vision_detail_level
+		self.screenshot_media_type: SupportedImageMediaType = screenshot_media_type
+		self.screenshot_unchanged = screenshot_unchanged
 		self.include_recent_events = include_recent_events
 		self.sample_images = sample_images or []
+		# The agent history was sent in a preceding cached message, which this one only closes
+		self.history_in_prefix = history_in_prefix
+		# If the elements don't fit in max_clickable_elements_length, list the ones in the viewport first
+		self.viewport_first_elements = viewport_first_elements
 		assert self.browser_state
 
 	def _extract_page_statistics(self) -> dict[str, int]:
@@ -200,11 +217,19 @@ class AgentMessagePrompt:
 		stats_text += f', {page_stats["total_elements"]} total elements'
 		stats_text += '</page_stats>\n\n'
 
-		elements_text = self.browser_state.dom_state.llm_representation(include_attributes=self.include_attributes)
+		viewport = None
+		if self.viewport_first_elements and self.browser_state.page_info:
+			pi = self.browser_state.page_info
+			viewport = (pi.scroll_y, pi.scroll_y + pi.viewport_height)
+		# Serialization stops at the budget instead of building the whole page and truncating it
+		budgeted = self.browser_state.dom_state.llm_representation_with_budget(
+			self.max_clickable_elements_length, include_attributes=self.include_attributes, viewport=viewport
+		)
+		elements_text = budgeted.text
 
-		if len(elements_text) > self.max_clickable_elements_length:
-			elements_text = elements_text[: self.max_clickable_elements_length]
-			truncated_text = f' (truncated to {self.max_clickable_elements_length} characters)'
+		if budgeted.truncated:
+			truncated_text = f' (truncated to {self.max_clickable_elements_length} characters, {budgeted.omitted_elements} more interactive elements omitted'
+			truncated_text += ', elements in the viewport listed first)' if budgeted.viewport_first else ')'
 		else:
 			truncated_text = ''
 
@@ -316,7 +341,7 @@ Available tabs:
 
 	@observe_debug(ignore_input=True, ignore_output=True, name='get_user_message')
 	def get_user_message(self, use_vision: bool = True) -> UserMessage:
-		"""Get complete state as a single cached message"""
+		"""Get complete state as a single message, cached unless it follows a cached history message"""
 		# Don't pass screenshot to model if page is a new tab page, step is 0, and there's only one tab
 		if (
 			is_new_tab_page(self.browser_state.url)
@@ -327,11 +352,14 @@ Available tabs:
 			use_vision = False
 
 		# Build complete state description
-		state_description = (
-			'<agent_history>\n'
-			+ (self.agent_history_description.strip('\n') if self.agent_history_description else '')
-			+ '\n</agent_history>\n\n'
-		)
+		if self.history_in_prefix:
+			state_description = '</agent_history>\n\n'
+		else:
+			state_description = (
+				'<agent_history>\n'
+				+ (self.agent_history_description.strip('\n') if self.agent_history_description else '')
+				+ '\n</agent_history>\n\n'
+			)
 		state_description += '<agent_state>\n' + self._get_agent_state_description().strip('\n') + '\n</agent_state>\n'
 		state_description += '<browser_state>\n' + self._get_browser_state_description().strip('\n') + '\n</browser_state>\n'
 		# Only add read_state if it has content
@@ -344,6 +372,9 @@ Available tabs:
 			state_description += self.page_filtered_actions + '\n'
 			state_description += '</page_specific_actions>\n'
 
+		if use_vision is True and self.screenshot_unchanged:
+			state_description += '<screenshot>Unchanged since the previous step, no new screenshot attached.</screenshot>\n'
+
 		if use_vision is True and self.screenshots:
 			# Start with text description
 			content_parts: list[ContentPartTextParam | ContentPartImageParam] = [ContentPartTextParam(text=state_description)]
@@ -366,13 +397,13 @@ Available tabs:
 				content_parts.append(
 					ContentPartImageParam(
 						image_url=ImageURL(
-							url=f'data:image/png;base64,{screenshot}',
-							media_type='image/png',
+							url=f'data:{self.screenshot_media_type};base64,{screenshot}',
+							media_type=self.screenshot_media_type,
 							detail=self.vision_detail_level,
 						),
 					)
 				)
 
-			return UserMessage(content=content_parts, cache=True)
+			return UserMessage(content=content_parts, cache=not self.history_in_prefix)
 
-		return UserMessage(content=state_description, cache=True)
+		return UserMessage(content=state_description, cache=not self.history_in_prefix)
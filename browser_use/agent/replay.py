@@ -0,0 +1,307 @@
+"""
+Fast replay of recorded agent histories (`Agent.rerun_history(history, fast=True)`).
+
+The default replay captures the full browser state (DOM snapshot, AX tree, serialization) before every step, only to look
+up the recorded elements by hash. Here each recorded element is resolved with a single targeted query instead: the page
+is searched for elements with the recorded tag, and the ones that share the recorded xpath or static attributes are
+matched against the recorded `element_hash` in Python. Fixed delays between actions are replaced by waiting until the
+page is loaded and its DOM stopped changing.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, cast
+
+from browser_use.browser import BrowserSession
+from browser_use.dom.views import (
+	STATIC_ATTRIBUTES,
+	DOMInteractedElement,
+	DOMRect,
+	EnhancedDOMTreeNode,
+	NodeType,
+	compute_element_hash,
+)
+from browser_use.tools.registry.views import ActionModel
+
+logger = logging.getLogger(__name__)
+
+STABILITY_TIMEOUT = 10.0
+"""Longest wait for the page to become stable after an action, in seconds"""
+
+MAX_CANDIDATES = 50
+"""Most candidate elements returned by the page for one recorded element"""
+
+# Resolves once the document is loaded and no DOM mutation happened for `quietMs`, or after `timeoutMs`.
+# Returns whether the page became stable before the timeout.
+_WAIT_FOR_STABILITY_JS = """
+(({quietMs, timeoutMs}) => new Promise(resolve => {
+	const start = performance.now();
+	let lastMutation = start;
+	const observer = new MutationObserver(() => { lastMutation = performance.now(); });
+	observer.observe(document, {subtree: true, childList: true, attributes: true, characterData: true});
+	const check = () => {
+		const now = performance.now();
+		const stable = document.readyState === 'complete' && now - lastMutation >= quietMs;
+		if (stable || now - start >= timeoutMs) {
+			observer.disconnect();
+			resolve(stable);
+		} else {
+			setTimeout(check, 50);
+		}
+	};
+	check();
+}))
+"""
+
+# Collects the elements with the recorded tag, in the document and its open shadow roots, that have the recorded
+# xpath or the recorded static attributes. Returns their description, or the element at `pick` if given.
+# The xpath and parent branch are computed like EnhancedDOMTreeNode.xpath and _get_parent_branch_path.
+_FIND_CANDIDATES_JS = """
+(({tagName, xpath, staticAttributes, staticAttributeNames, maxCandidates, pick}) => {
+	const staticNames = new Set(staticAttributeNames);
+	const attributesOf = (el) => Object.fromEntries(Array.from(el.attributes, a => [a.name, a.value]));
+	const staticKey = (attributes) => JSON.stringify(
+		Object.entries(attributes).filter(([name]) => staticNames.has(name)).sort(([a], [b]) => (a < b ? -1 : a > b ? 1 : 0))
+	);
+	const expectedStaticKey = staticKey(staticAttributes);
+
+	const xpathOf = (el) => {
+		const segments = [];
+		let node = el;
+		while (node && (node.nodeType === 1 || node.nodeType === 11)) {
+			if (node.nodeType === 11) {
+				node = node.host || null;
+				continue;
+			}
+			const parent = node.parentNode;
+			const siblings = parent ? Array.from(parent.children).filter(c => c.tagName === node.tagName) : [];
+			const tag = node.tagName.toLowerCase();
+			segments.unshift(siblings.length > 1 ? `${tag}[${siblings.indexOf(node) + 1}]` : tag);
+			node = parent;
+		}
+		return segments.join('/');
+	};
+	const branchOf = (el) => {
+		const branch = [];
+		for (let node = el; node; node = node.nodeType === 11 ? node.host : node.parentNode) {
+			if (node.nodeType === 1) branch.unshift(node.tagName.toLowerCase());
+		}
+		return branch;
+	};
+
+	const matches = [];
+	const walk = (root) => {
+		for (const el of root.querySelectorAll('*')) {
+			if (matches.length < maxCandidates && el.tagName.toLowerCase() === tagName) {
+				const attributes = attributesOf(el);
+				const xpathMatch = xpathOf(el) === xpath;
+				if (xpathMatch || staticKey(attributes) === expectedStaticKey) {
+					matches.push({el, attributes, xpathMatch});
+				}
+			}
+			if (el.shadowRoot) walk(el.shadowRoot);
+		}
+	};
+	walk(document);
+
+	if (pick !== null) return matches[pick] ? matches[pick].el : null;
+
+	return matches.map(({el, attributes, xpathMatch}) => {
+		const rect = el.getBoundingClientRect();
+		const style = getComputedStyle(el);
+		return {
+			branch: branchOf(el),
+			attributes,
+			xpathMatch,
+			visible: rect.width > 0 && rect.height > 0 && style.visibility !== 'hidden' && style.display !== 'none',
+			rect: {x: rect.x + window.scrollX, y: rect.y + window.scrollY, width: rect.width, height: rect.height},
+			text: (el.innerText || el.value || '').slice(0, 1000),
+		};
+	});
+})
+"""
+
+
+@dataclass
+class ReplayCandidate:
+	"""An element of the page that may be a recorded element, as described by `_FIND_CANDIDATES_JS`"""
+
+	branch: list[str]
+	attributes: dict[str, str]
+	xpath_match: bool
+	visible: bool
+	rect: DOMRect
+	text: str = ''
+	element_hash: int = field(init=False)
+
+	def __post_init__(self):
+		# hash() reduces the value of `EnhancedDOMTreeNode.__hash__` like an int hash when it doesn't fit in a signed 64 bit int
+		element_hash = compute_element_hash(self.branch, self.attributes)
+		self.element_hash = element_hash if element_hash < 2**63 else hash(element_hash)
+
+	@classmethod
+	def from_page(cls, data: dict) -> 'ReplayCandidate':
+		return cls(
+			branch=data['branch'],
+			attributes=data['attributes'],
+			xpath_match=data['xpathMatch'],
+			visible=data['visible'],
+			rect=DOMRect(**data['rect']),
+			text=data.get('text') or '',
+		)
+
+
+def pick_candidate(candidates: list[ReplayCandidate], element: DOMInteractedElement) -> int | None:
+	"""Position of the candidate that is the recorded element, or None if none of them has its hash.
+
+	Like the full replay, an element only matches with the same `element_hash`. Between several matches the one at the
+	recorded xpath wins, then visible ones, then the first in document order.
+	"""
+	matches = [i for i, candidate in enumerate(candidates) if candidate.element_hash == element.element_hash]
+	for preferred in (
+		lambda c: c.xpath_match and c.visible,
+		lambda c: c.xpath_match,
+		lambda c: c.visible,
+	):
+		for i in matches:
+			if preferred(candidates[i]):
+				return i
+	return matches[0] if matches else None
+
+
+def element_index_of(action: ActionModel) -> int | None:
+	"""Index of the element the action targets, if any (index 0 targets the page, not an element)"""
+	index = action.get_index()
+	if index is None:
+		params = next(iter(action.model_dump(exclude_unset=True).values()), None) or {}
+		index = params.get('frame_element_index')
+	return index or None
+
+
+async def wait_for_page_stability(
+	browser_session: BrowserSession,
+	timeout: float = STABILITY_TIMEOUT,
+) -> bool:
+	"""Wait until the focused page is loaded and its DOM stopped changing for `minimum_wait_page_load_time`.
+
+	Returns whether the page became stable before the timeout. Navigations while waiting restart the wait on the new page.
+	"""
+	quiet = browser_session.browser_profile.minimum_wait_page_load_time
+	deadline = time.monotonic() + timeout
+	while (remaining := deadline - time.monotonic()) > 0:
+		try:
+			cdp_session = await browser_session.get_or_create_cdp_session()
+			result = await cdp_session.cdp_client.send.Runtime.evaluate(
+				params={
+					'expression': f'{_WAIT_FOR_STABILITY_JS}({json.dumps({"quietMs": quiet * 1000, "timeoutMs": remaining * 1000})})',
+					'awaitPromise': True,
+					'returnByValue': True,
+				},
+				session_id=cdp_session.session_id,
+			)
+			return bool(result.get('result', {}).get('value'))
+		except Exception as e:
+			# The execution context is destroyed when the page navigates while waiting
+			logger.debug(f'Waiting for page stability was interrupted, retrying: {type(e).__name__}: {e}')
+			await asyncio.sleep(0.1)
+	return False
+
+
+async def resolve_historical_element(
+	browser_session: BrowserSession,
+	element: DOMInteractedElement,
+	element_index: int,
+) -> EnhancedDOMTreeNode | None:
+	"""Find a recorded element in the focused page without building the DOM tree.
+
+	Returns a node with just what actions need (backend node id, tag, attributes, position, text), numbered
+	`element_index`, or None if the element is not in the main document (e.g. it's in an iframe) or wasn't found.
+	"""
+	cdp_session = await browser_session.get_or_create_cdp_session()
+	args = {
+		'tagName': element.node_name.lower(),
+		'xpath': element.x_path,
+		'staticAttributes': {k: v for k, v in (element.attributes or {}).items() if k in STATIC_ATTRIBUTES},
+		'staticAttributeNames': sorted(STATIC_ATTRIBUTES),
+		'maxCandidates': MAX_CANDIDATES,
+		'pick': None,
+	}
+
+	result = await cdp_session.cdp_client.send.Runtime.evaluate(
+		params={'expression': f'{_FIND_CANDIDATES_JS}({json.dumps(args)})', 'returnByValue': True},
+		session_id=cdp_session.session_id,
+	)
+	if 'exceptionDetails' in result:
+		logger.debug(f'Looking up the recorded element failed: {result["exceptionDetails"]}')
+		return None
+	found = cast(list[dict[str, Any]], result.get('result', {}).get('value') or [])
+	candidates = [ReplayCandidate.from_page(data) for data in found]
+	picked = pick_candidate(candidates, element)
+	if picked is None:
+		return None
+
+	# Run the same query again for a reference to the picked element, the page can't change in between
+	# unless a script runs, which would also move the element in a full DOM capture
+	result = await cdp_session.cdp_client.send.Runtime.evaluate(
+		params={'expression': f'{_FIND_CANDIDATES_JS}({json.dumps({**args, "pick": picked})})'},
+		session_id=cdp_session.session_id,
+	)
+	object_id = result.get('result', {}).get('objectId')
+	if not object_id:
+		return None
+	described = await cdp_session.cdp_client.send.DOM.describeNode(
+		params={'objectId': object_id}, session_id=cdp_session.session_id
+	)
+	await cdp_session.cdp_client.send.Runtime.releaseObject(params={'objectId': object_id}, session_id=cdp_session.session_id)
+
+	candidate = candidates[picked]
+	node = EnhancedDOMTreeNode(
+		node_id=described['node'].get('nodeId', 0),
+		backend_node_id=described['node']['backendNodeId'],
+		node_type=NodeType.ELEMENT_NODE,
+		node_name=element.node_name,
+		node_value='',
+		attributes=candidate.attributes,
+		is_scrollable=None,
+		is_visible=candidate.visible,
+		absolute_position=candidate.rect,
+		target_id=cdp_session.target_id,
+		frame_id=None,
+		session_id=cdp_session.session_id,
+		content_document=None,
+		shadow_root_type=None,
+		shadow_roots=None,
+		parent_node=None,
+		children_nodes=[],
+		ax_node=None,
+		snapshot_node=None,
+		element_index=element_index,
+	)
+	if candidate.text:
+		# get_all_children_text() reads text nodes, one stands in for the element's rendered text
+		text_node = EnhancedDOMTreeNode(
+			node_id=0,
+			backend_node_id=0,
+			node_type=NodeType.TEXT_NODE,
+			node_name='#text',
+			node_value=candidate.text,
+			attributes={},
+			is_scrollable=None,
+			is_visible=candidate.visible,
+			absolute_position=None,
+			target_id=cdp_session.target_id,
+			frame_id=None,
+			session_id=cdp_session.session_id,
+			content_document=None,
+			shadow_root_type=None,
+			shadow_roots=None,
+			parent_node=node,
+			children_nodes=None,
+			ax_node=None,
+			snapshot_node=None,
+		)
+		node.children_nodes = [text_node]
+	return node
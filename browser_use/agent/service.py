@@ -7,6 +7,7 @@ import re
 import tempfile
 import time
 from collections.abc import Awaitable, Callable
+from contextlib import nullcontext
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Generic, Literal, TypeVar
@@ -37,10 +38,13 @@ from browser_use import Browser, BrowserProfile, BrowserSession
 
 # Lazy import for gif to avoid heavy agent.views import at startup
 # from browser_use.agent.gif import create_history_gif
+from browser_use.agent.history_log import AgentHistoryLog, AgentHistoryWriter
 from browser_use.agent.message_manager.service import (
 	MessageManager,
 )
+from browser_use.agent.message_manager.vision import ScreenshotOptimizer
 from browser_use.agent.prompts import SystemPrompt
+from browser_use.agent.replay import element_index_of, resolve_historical_element, wait_for_page_stability
 from browser_use.agent.views import (
 	ActionResult,
 	AgentError,
@@ -57,9 +61,10 @@ from browser_use.agent.views import (
 from browser_use.browser.session import DEFAULT_BROWSER_PROFILE
 from browser_use.browser.views import BrowserStateSummary
 from browser_use.config import CONFIG
-from browser_use.dom.views import DOMInteractedElement
+from browser_use.dom.views import DOMInteractedElement, ElementIdentityIndex
 from browser_use.filesystem.file_system import FileSystem
 from browser_use.observability import observe, observe_debug
+from browser_use.profiling import ProfileSpan, profile_span, profile_step
 from browser_use.sync import CloudSync
 from browser_use.telemetry.service import ProductTelemetry
 from browser_use.telemetry.views import AgentTelemetryEvent
@@ -156,6 +161,7 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 		use_vision: bool = True,
 		save_conversation_path: str | Path | None = None,
 		save_conversation_path_encoding: str | None = 'utf-8',
+		save_history_path: str | Path | None = None,
 		max_failures: int = 3,
 		override_system_message: str | None = None,
 		extend_system_message: str | None = None,
@@ -166,6 +172,8 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 		use_thinking: bool = True,
 		flash_mode: bool = False,
 		max_history_items: int | None = None,
+		message_layout: Literal['default', 'cache_friendly'] = 'default',
+		viewport_first_elements: bool = False,
 		page_extraction_llm: BaseChatModel | None = None,
 		injected_agent_state: AgentState | None = None,
 		source: str | None = None,
@@ -176,12 +184,17 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 		display_files_in_done_text: bool = True,
 		include_tool_call_examples: bool = False,
 		vision_detail_level: Literal['auto', 'low', 'high'] = 'auto',
+		vision_image_format: Literal['auto', 'png', 'jpeg', 'webp'] = 'auto',
+		skip_unchanged_screenshots: bool = False,
+		screenshot_format: Literal['png', 'webp', 'jpeg'] = 'png',
+		max_stored_screenshots: int | None = None,
 		llm_timeout: int | None = None,
 		step_timeout: int = 120,
 		directly_open_url: bool = True,
 		include_recent_events: bool = False,
 		sample_images: list[ContentPartTextParam | ContentPartImageParam] | None = None,
 		final_response_after_failure: bool = True,
+		profile_steps: bool = False,
 		_url_shortening_limit: int = 25,
 		**kwargs,
 	):
@@ -266,8 +279,13 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 		self.settings = AgentSettings(
 			use_vision=use_vision,
 			vision_detail_level=vision_detail_level,
+			vision_image_format=vision_image_format,
+			skip_unchanged_screenshots=skip_unchanged_screenshots,
+			screenshot_format=screenshot_format,
+			max_stored_screenshots=max_stored_screenshots,
 			save_conversation_path=save_conversation_path,
 			save_conversation_path_encoding=save_conversation_path_encoding,
+			save_history_path=save_history_path,
 			max_failures=max_failures,
 			override_system_message=override_system_message,
 			extend_system_message=extend_system_message,
@@ -277,12 +295,15 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 			use_thinking=use_thinking,
 			flash_mode=flash_mode,
 			max_history_items=max_history_items,
+			message_layout=message_layout,
+			viewport_first_elements=viewport_first_elements,
 			page_extraction_llm=page_extraction_llm,
 			calculate_cost=calculate_cost,
 			include_tool_call_examples=include_tool_call_examples,
 			llm_timeout=llm_timeout,
 			step_timeout=step_timeout,
 			final_response_after_failure=final_response_after_failure,
+			profile_steps=profile_steps,
 		)
 
 		# Token cost service
@@ -370,6 +391,14 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 			include_tool_call_examples=self.settings.include_tool_call_examples,
 			include_recent_events=self.include_recent_events,
 			sample_images=self.sample_images,
+			screenshot_optimizer=ScreenshotOptimizer(
+				provider=self.llm.provider,
+				detail_level=self.settings.vision_detail_level,
+				image_format=self.settings.vision_image_format,
+				detect_unchanged=self.settings.skip_unchanged_screenshots,
+			),
+			message_layout=self.settings.message_layout,
+			viewport_first_elements=self.settings.viewport_first_elements,
 		)
 
 		if self.sensitive_data:
@@ -447,6 +476,16 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 			self.settings.save_conversation_path = Path(self.settings.save_conversation_path).expanduser().resolve()
 			self.logger.info(f'💬 Saving conversation to {_log_pretty_path(self.settings.save_conversation_path)}')
 
+		# Append-only history log, written as each step finishes (see resume_from_history)
+		self._history_writer: AgentHistoryWriter | None = None
+		if self.settings.save_history_path:
+			self.settings.save_history_path = Path(self.settings.save_history_path).expanduser().resolve()
+			self._history_writer = AgentHistoryWriter(self.settings.save_history_path, sensitive_data=self.sensitive_data)
+			self.logger.info(f'📜 Saving history to {_log_pretty_path(self.settings.save_history_path)}')
+
+		# Span tree of the step in progress, attached to its history item (see browser_use.profiling)
+		self._step_profile: ProfileSpan | None = None
+
 		# Initialize download tracking
 		assert self.browser_session is not None, 'BrowserSession is not set up'
 		self.has_downloads_path = self.browser_session.browser_profile.downloads_path is not None
@@ -556,7 +595,11 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 		try:
 			from browser_use.screenshots.service import ScreenshotService
 
-			self.screenshot_service = ScreenshotService(self.agent_directory)
+			self.screenshot_service = ScreenshotService(
+				self.agent_directory,
+				image_format=self.settings.screenshot_format,
+				max_screenshots=self.settings.max_stored_screenshots,
+			)
 			logger.debug(f'📸 Screenshot service initialized in: {self.agent_directory}/screenshots')
 		except Exception as e:
 			logger.error(f'📸 Failed to initialize screenshot service: {e}.')
@@ -651,23 +694,31 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 
 		browser_state_summary = None
 
-		try:
-			# Phase 1: Prepare context and timing
-			browser_state_summary = await self._prepare_context(step_info)
+		step_profile = profile_step('step', step=self.state.n_steps) if self.settings.profile_steps else nullcontext()
+		with step_profile as self._step_profile:
+			try:
+				# Phase 1: Prepare context and timing
+				browser_state_summary = await self._prepare_context(step_info)
 
-			# Phase 2: Get model output and execute actions
-			await self._get_next_action(browser_state_summary)
-			await self._execute_actions()
+				# Phase 2: Get model output and execute actions
+				await self._get_next_action(browser_state_summary)
+				with profile_span('actions'):
+					await self._execute_actions()
 
-			# Phase 3: Post-processing
-			await self._post_process()
+				# Phase 3: Post-processing
+				with profile_span('post_process'):
+					await self._post_process()
 
-		except Exception as e:
-			# Handle ALL exceptions in one place
-			await self._handle_step_error(e)
+			except Exception as e:
+				# Handle ALL exceptions in one place
+				await self._handle_step_error(e)
 
-		finally:
-			await self._finalize(browser_state_summary)
+			finally:
+				with profile_span('finalize'):
+					await self._finalize(browser_state_summary)
+
+		# Written once the step's profile is complete
+		await self._write_history_log()
 
 	async def _prepare_context(self, step_info: AgentStepInfo | None = None) -> BrowserStateSummary:
 		"""Prepare the context for the step: browser state, action models, page actions"""
@@ -678,10 +729,11 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 		self.logger.debug(f'🌐 Step {self.state.n_steps}: Getting browser state...')
 		# Always take screenshots for all steps
 		self.logger.debug('📸 Requesting browser state with include_screenshot=True')
-		browser_state_summary = await self.browser_session.get_browser_state_summary(
-			include_screenshot=True,  # always capture even if use_vision=False so that cloud sync is useful (it's fast now anyway)
-			include_recent_events=self.include_recent_events,
-		)
+		with profile_span('browser_state'):
+			browser_state_summary = await self.browser_session.get_browser_state_summary(
+				include_screenshot=True,  # always capture even if use_vision=False so that cloud sync is useful (it's fast now anyway)
+				include_recent_events=self.include_recent_events,
+			)
 		if browser_state_summary.screenshot:
 			self.logger.debug(f'📸 Got browser state WITH screenshot, length: {len(browser_state_summary.screenshot)}')
 		else:
@@ -702,16 +754,19 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 
 		# Page-specific actions will be included directly in the browser_state message
 		self.logger.debug(f'💬 Step {self.state.n_steps}: Creating state messages for context...')
-		self._message_manager.create_state_messages(
-			browser_state_summary=browser_state_summary,
-			model_output=self.state.last_model_output,
-			result=self.state.last_result,
-			step_info=step_info,
-			use_vision=self.settings.use_vision,
-			page_filtered_actions=page_filtered_actions if page_filtered_actions else None,
-			sensitive_data=self.sensitive_data,
-			available_file_paths=self.available_file_paths,  # Always pass current available_file_paths
-		)
+		with profile_span('build_prompt'):
+			if self.settings.use_vision:
+				await self._message_manager.prepare_screenshot(browser_state_summary.screenshot)
+			self._message_manager.create_state_messages(
+				browser_state_summary=browser_state_summary,
+				model_output=self.state.last_model_output,
+				result=self.state.last_result,
+				step_info=step_info,
+				use_vision=self.settings.use_vision,
+				page_filtered_actions=page_filtered_actions if page_filtered_actions else None,
+				sensitive_data=self.sensitive_data,
+				available_file_paths=self.available_file_paths,  # Always pass current available_file_paths
+			)
 
 		await self._force_done_after_last_step(step_info)
 		await self._force_done_after_failure()
@@ -726,9 +781,10 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 		)
 
 		try:
-			model_output = await asyncio.wait_for(
-				self._get_model_output_with_retry(input_messages), timeout=self.settings.llm_timeout
-			)
+			with profile_span('llm', model=self.llm.model):
+				model_output = await asyncio.wait_for(
+					self._get_model_output_with_retry(input_messages), timeout=self.settings.llm_timeout
+				)
 		except TimeoutError:
 
 			@observe(name='_llm_call_timed_out_with_input')
@@ -832,6 +888,7 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 				step_number=self.state.n_steps,
 				step_start_time=self.step_start_time,
 				step_end_time=step_end_time,
+				profile=self._step_profile,
 			)
 
 			# Use _make_history_item like main branch
@@ -840,7 +897,9 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 		# Log step completion summary
 		self._log_step_completion_summary(self.step_start_time, self.state.last_result)
 
-		# Save file system state after step completion
+		# Write out deferred file renders (e.g. PDFs) and save file system state after step completion
+		if self.file_system:
+			await self.file_system.flush()
 		self.save_file_system_state()
 
 		# Emit both step created and executed events
@@ -866,6 +925,34 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 		# Increment step counter after step is fully completed
 		self.state.n_steps += 1
 
+	def _log_profile_summary(self) -> None:
+		"""Log p50/p95 latency of the top level step phases, slowest first"""
+		summary = self.history.profile_summary()
+		if 'step' not in summary:
+			return
+		phases = sorted(
+			((path.removeprefix('step/'), timing) for path, timing in summary.items() if path.count('/') == 1),
+			key=lambda item: item[1].total_seconds,
+			reverse=True,
+		)
+		step = summary['step']
+		self.logger.info(
+			f'⏱️ {step.count} profiled steps, p50 {step.p50_seconds:.2f}s p95 {step.p95_seconds:.2f}s: '
+			+ ', '.join(f'{name} {timing.p50_seconds:.2f}s/{timing.p95_seconds:.2f}s' for name, timing in phases)
+		)
+
+	async def _write_history_log(self) -> None:
+		"""Append history items that haven't been persisted yet to the history log, with the current agent state"""
+		if self._history_writer is None:
+			return
+		new_items = self.history.history[self._history_writer.items_written :]
+		try:
+			await self._history_writer.write(
+				new_items, self.state, file_system_version=self.file_system.version if self.file_system else None
+			)
+		except Exception as e:
+			self.logger.error(f'📜 Failed to write history log {_log_pretty_path(self._history_writer.filepath)}: {e}')
+
 	async def _force_done_after_last_step(self, step_info: AgentStepInfo | None = None) -> None:
 		"""Handle special processing for the last step"""
 		if step_info and step_info.is_last_step():
@@ -1536,6 +1623,7 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 					)
 				)
 
+				await self._write_history_log()
 				self.logger.info(f'❌ {agent_run_error}')
 
 			self.logger.debug('📊 Collecting usage summary...')
@@ -1565,6 +1653,8 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 		finally:
 			# Log token usage summary
 			await self.token_cost_service.log_usage_summary()
+			if self.settings.profile_steps:
+				self._log_profile_summary()
 
 			# Unregister signal handlers before cleanup
 			signal_handler.unregister()
@@ -1595,7 +1685,8 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 				# Lazy import gif module to avoid heavy startup cost
 				from browser_use.agent.gif import create_history_gif
 
-				create_history_gif(task=self.task, history=self.history, output_path=output_path)
+				# Rendering is CPU-heavy, run it in a worker thread so other agents on this loop keep running
+				await asyncio.to_thread(create_history_gif, task=self.task, history=self.history, output_path=output_path)
 
 				# Only emit output file event if GIF was actually created
 				if Path(output_path).exists():
@@ -1637,15 +1728,12 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 				self.browser_session._cached_browser_state_summary is not None
 				and self.browser_session._cached_browser_state_summary.dom_state is not None
 			):
-				cached_selector_map = dict(self.browser_session._cached_browser_state_summary.dom_state.selector_map)
-				cached_element_hashes = {e.parent_branch_hash() for e in cached_selector_map.values()}
+				cached_identity_index = self.browser_session._cached_browser_state_summary.dom_state.identity_index
 			else:
-				cached_selector_map = {}
-				cached_element_hashes = set()
+				cached_identity_index = ElementIdentityIndex({})
 		except Exception as e:
 			self.logger.error(f'Error getting cached selector map: {e}')
-			cached_selector_map = {}
-			cached_element_hashes = set()
+			cached_identity_index = ElementIdentityIndex({})
 
 		for i, action in enumerate(actions):
 			if i > 0:
@@ -1661,14 +1749,11 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 				new_browser_state_summary = await self.browser_session.get_browser_state_summary(
 					include_screenshot=False,
 				)
-				new_selector_map = new_browser_state_summary.dom_state.selector_map
+				new_identity_index = new_browser_state_summary.dom_state.identity_index
 
 				# Detect index change after previous action
-				orig_target = cached_selector_map.get(action.get_index())
-				orig_target_hash = orig_target.parent_branch_hash() if orig_target else None
-
-				new_target = new_selector_map.get(action.get_index())  # type: ignore
-				new_target_hash = new_target.parent_branch_hash() if new_target else None
+				orig_target_hash = cached_identity_index.branch_hash_by_index.get(action.get_index())  # type: ignore
+				new_target_hash = new_identity_index.branch_hash_by_index.get(action.get_index())  # type: ignore
 
 				def get_remaining_actions_str(actions: list[ActionModel], index: int) -> str:
 					remaining_actions = []
@@ -1693,11 +1778,12 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 					break
 
 				# Check for new elements that appeared
-				new_element_hashes = {e.parent_branch_hash() for e in new_selector_map.values()}
-				if check_for_new_elements and not new_element_hashes.issubset(cached_element_hashes):
+				if check_for_new_elements and new_identity_index.has_new_elements_since(cached_identity_index):
 					# next action requires index but there are new elements on the page
 					# log difference in len debug
-					self.logger.debug(f'New elements: {abs(len(new_element_hashes) - len(cached_element_hashes))}')
+					self.logger.debug(
+						f'New elements: {abs(len(new_identity_index.branch_hashes) - len(cached_identity_index.branch_hashes))}'
+					)
 					remaining_actions_str = get_remaining_actions_str(actions, i)
 					msg = f'Something new appeared after action {i} / {total_actions}: actions {remaining_actions_str} were not executed'
 					logger.info(msg)
@@ -1734,14 +1820,15 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 				time_start = time.time()
 				self.logger.info(f'  🦾 {blue}[ACTION {i + 1}/{total_actions}]{reset} {action_params}')
 
-				result = await self.tools.act(
-					action=action,
-					browser_session=self.browser_session,
-					file_system=self.file_system,
-					page_extraction_llm=self.settings.page_extraction_llm,
-					sensitive_data=self.sensitive_data,
-					available_file_paths=self.available_file_paths,
-				)
+				with profile_span(f'action:{action_name}'):
+					result = await self.tools.act(
+						action=action,
+						browser_session=self.browser_session,
+						file_system=self.file_system,
+						page_extraction_llm=self.settings.page_extraction_llm,
+						sensitive_data=self.sensitive_data,
+						available_file_paths=self.available_file_paths,
+					)
 
 				time_end = time.time()
 				time_elapsed = time_end - time_start
@@ -1778,6 +1865,8 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 		max_retries: int = 3,
 		skip_failures: bool = True,
 		delay_between_actions: float = 2.0,
+		fast: bool = False,
+		verify: bool = False,
 	) -> list[ActionResult]:
 		"""
 		Rerun a saved history of actions with error handling and retry logic.
@@ -1787,6 +1876,11 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 		                max_retries: Maximum number of retries per action
 		                skip_failures: Whether to skip failed actions or stop execution
 		                delay_between_actions: Delay between actions in seconds
+		                fast: Resolve recorded elements with targeted page queries instead of capturing the full browser
+		                        state, wait for the page to become stable instead of `delay_between_actions`, and reuse
+		                        the recorded results of actions that need the page extraction LLM
+		                verify: With `fast`, capture the browser state with a screenshot after each step and check
+		                        that the page is at the recorded URL
 
 		Returns:
 		                List of action results
@@ -1817,7 +1911,10 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 			retry_count = 0
 			while retry_count < max_retries:
 				try:
-					result = await self._execute_history_step(history_item, delay_between_actions)
+					if fast:
+						result = await self._execute_history_step_fast(history_item, verify)
+					else:
+						result = await self._execute_history_step(history_item, delay_between_actions)
 					results.extend(result)
 					break
 
@@ -1831,7 +1928,10 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 							raise RuntimeError(error_msg)
 					else:
 						self.logger.warning(f'{step_name} failed (attempt {retry_count}/{max_retries}), retrying...')
-						await asyncio.sleep(delay_between_actions)
+						if fast:
+							await wait_for_page_stability(self.browser_session)
+						else:
+							await asyncio.sleep(delay_between_actions)
 
 		await self.close()
 		return results
@@ -1904,6 +2004,78 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 		await asyncio.sleep(delay)
 		return result
 
+	async def _execute_history_step_fast(self, history_item: AgentHistory, verify: bool) -> list[ActionResult]:
+		"""Execute a single step from history without capturing the browser state, see browser_use/agent/replay.py"""
+		assert self.browser_session is not None, 'BrowserSession is not set up'
+		if not history_item.model_output:
+			raise ValueError('Invalid model output')
+
+		results: list[ActionResult] = []
+		for i, action in enumerate(history_item.model_output.action):
+			await self._raise_if_stopped_or_paused()
+			action_name = next(iter(action.model_dump(exclude_unset=True).keys()), 'unknown')
+			historical_element = (
+				history_item.state.interacted_element[i] if i < len(history_item.state.interacted_element) else None
+			)
+			element_index = element_index_of(action)
+
+			if historical_element is not None and element_index is not None:
+				node = None
+				# upload_file_to_element searches the tree around the element for the file input
+				if action_name != 'upload_file_to_element':
+					node = await resolve_historical_element(self.browser_session, historical_element, element_index)
+				if node is not None:
+					self.browser_session.update_cached_selector_map({element_index: node})
+				else:
+					self.logger.debug(f'Recorded element {i} not resolved directly, capturing the browser state')
+					state = await self.browser_session.get_browser_state_summary(include_screenshot=False)
+					if await self._update_action_indices(historical_element, action, state) is None:
+						raise ValueError(f'Could not find matching element {i} in current page')
+
+			registered_action = self.tools.registry.registry.actions.get(action_name)
+			if (
+				registered_action is not None
+				and 'page_extraction_llm' in inspect.signature(registered_action.function).parameters
+				and i < len(history_item.result)
+			):
+				self.logger.info(f'  🦾 [ACTION {i + 1}] {action_name}: reusing the recorded result')
+				result = history_item.result[i]
+			else:
+				self.logger.info(f'  🦾 [ACTION {i + 1}] {action_name}')
+				result = await self.tools.act(
+					action=action,
+					browser_session=self.browser_session,
+					file_system=self.file_system,
+					page_extraction_llm=self.settings.page_extraction_llm,
+					sensitive_data=self.sensitive_data,
+					available_file_paths=self.available_file_paths,
+				)
+			results.append(result)
+
+			await wait_for_page_stability(self.browser_session)
+			if result.is_done or result.error:
+				break
+
+		if verify:
+			results.append(await self._verify_history_step(history_item))
+		return results
+
+	async def _verify_history_step(self, history_item: AgentHistory) -> ActionResult:
+		"""Capture the browser state with a screenshot and check that the page is at the recorded URL"""
+		assert self.browser_session is not None, 'BrowserSession is not set up'
+		state = await self.browser_session.get_browser_state_summary(include_screenshot=True)
+		step_number = history_item.metadata.step_number if history_item.metadata else self.state.n_steps
+		screenshot_path = (
+			await self.screenshot_service.store_screenshot(state.screenshot, step_number) if state.screenshot else None
+		)
+		metadata = {'url': state.url, 'expected_url': history_item.state.url, 'screenshot_path': screenshot_path}
+
+		if history_item.state.url and state.url != history_item.state.url:
+			msg = f'Verification failed: page is at {state.url}, recorded at {history_item.state.url}'
+			self.logger.warning(msg)
+			return ActionResult(error=msg, metadata=metadata)
+		return ActionResult(extracted_content=f'Verified page at {state.url}', metadata=metadata)
+
 	async def _update_action_indices(
 		self,
 		historical_element: DOMInteractedElement | None,
@@ -1917,18 +2089,10 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 		if not historical_element or not browser_state_summary.dom_state.selector_map:
 			return action
 
-		# selector_hash_map = {hash(e): e for e in browser_state_summary.dom_state.selector_map.values()}
-
-		highlight_index, current_element = next(
-			(
-				(highlight_index, element)
-				for highlight_index, element in browser_state_summary.dom_state.selector_map.items()
-				if element.element_hash == historical_element.element_hash
-			),
-			(None, None),
+		highlight_index = browser_state_summary.dom_state.identity_index.index_by_element_hash.get(
+			historical_element.element_hash
 		)
-
-		if not current_element or highlight_index is None:
+		if highlight_index is None:
 			return None
 
 		old_index = action.get_index()
@@ -1951,6 +2115,53 @@ class Agent(Generic[Context, AgentStructuredOutput]):
 		history = AgentHistoryList.load_from_file(history_file, self.AgentOutput)
 		return await self.rerun_history(history, **kwargs)
 
+	def resume_from_history(self, history_path: str | Path | None = None) -> None:
+		"""
+		Restore history and state from a JSONL history log so the next run() continues after the last persisted step.
+
+		Call before run(). The browser is not restored; the first action of the resumed run navigates back to the
+		last visited page. If the log is also this agent's save_history_path, new steps are appended to it.
+
+		Args:
+		                history_path: Path to the history log, defaults to save_history_path
+		"""
+		history_path = history_path or self.settings.save_history_path
+		if not history_path:
+			raise ValueError('resume_from_history() needs a history_path or an Agent created with save_history_path')
+		history_path = Path(history_path).expanduser().resolve()
+
+		checkpoint = AgentHistoryLog(history_path, self.AgentOutput).load_checkpoint()
+		if checkpoint.state is None:
+			raise ValueError(f'No resumable step found in history log {_log_pretty_path(history_path)}')
+
+		# Update state in place, the message manager holds a reference to message_manager_state
+		for field_name in type(checkpoint.state).model_fields:
+			if field_name != 'message_manager_state':
+				setattr(self.state, field_name, getattr(checkpoint.state, field_name))
+		for field_name in ('tool_id', 'agent_history_items', 'read_state_description'):
+			setattr(self.state.message_manager_state, field_name, getattr(checkpoint.state.message_manager_state, field_name))
+		self.history = checkpoint.history
+
+		if self.state.file_system_state:
+			self.file_system = FileSystem.from_state(self.state.file_system_state)
+			self.file_system_path = str(self.file_system.base_dir)
+			self._message_manager.file_system = self.file_system
+
+		if self._history_writer is not None and self._history_writer.filepath == history_path:
+			self._history_writer.continue_log(
+				items_written=len(self.history.history),
+				agent_history_items_written=len(self.state.message_manager_state.agent_history_items),
+				file_system_version=self.file_system.version if self.file_system else None,
+			)
+
+		# Re-open the last visited page in the fresh browser
+		last_url = next((h.state.url for h in reversed(self.history.history) if h.state.url), None)
+		self.initial_url = None
+		self.initial_actions = (
+			self._convert_initial_actions([{'go_to_url': {'url': last_url, 'new_tab': False}}]) if last_url else None
+		)
+		self.logger.info(f'📜 Resumed from {_log_pretty_path(history_path)} after {len(self.history.history)} history items')
+
 	def save_history(self, file_path: str | Path | None = None) -> None:
 		"""Save the history to a file with sensitive data filtering"""
 		if not file_path:
@@ -0,0 +1,561 @@
+"""
+Running many agents at once.
+
+`AgentSwarm` takes a queue of tasks and runs them as agents across worker processes. Each worker process runs up to
+`agents_per_worker` agents concurrently on its own event loop, all sharing one browser it launches, with a tab per
+agent. DOM processing is CPU-bound and serialized on an event loop, so spreading agents over processes is what lets a
+swarm use more than one core.
+
+The parent process does the scheduling: it limits how many agents use each LLM provider at once, enforces per-task
+timeouts, retries tasks that failed with an error, and aggregates token usage and histories.
+
+LLMs and agents are created inside the workers, so the swarm is configured with picklable callables (module-level
+functions or classes) instead of objects:
+
+	def make_llm():
+		return ChatOpenAI(model='gpt-4.1-mini')
+
+	swarm = AgentSwarm(make_llm, workers=4, agents_per_worker=3, provider_limits={'openai': 8})
+	result = await swarm.run(['Find the weather in Tokyo', 'Look up the Bitcoin price on Coinbase'])
+	result.save('./swarm_results')
+"""
+
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from pydantic import BaseModel, ConfigDict, Field
+from uuid_extensions import uuid7str
+
+from browser_use.browser import BrowserProfile, BrowserSession
+from browser_use.llm.base import BaseChatModel
+from browser_use.tokens.service import TokenCost
+from browser_use.tokens.views import ResponseCacheLookup, TokenUsageEntry, UsageSummary
+
+if TYPE_CHECKING:
+	from browser_use.agent.service import Agent
+	from browser_use.agent.views import AgentHistoryList, AgentOutput
+
+logger = logging.getLogger(__name__)
+
+LLMFactory = Callable[[], BaseChatModel]
+AgentFactory = Callable[['SwarmTask', BaseChatModel, BrowserSession], 'Agent']
+
+# How often the scheduler checks for crashed workers and overdue tasks
+_POLL_INTERVAL = 1.0  # seconds
+# Extra time a worker gets to report a timed out task before it's considered stuck and restarted
+_TIMEOUT_GRACE = 30.0  # seconds
+
+
+class SwarmTask(BaseModel):
+	"""A task for one agent of the swarm"""
+
+	model_config = ConfigDict(arbitrary_types_allowed=True)
+
+	task: str
+	task_id: str = Field(default_factory=uuid7str)
+	max_steps: int = 100
+	timeout: float | None = None  # Seconds, overrides AgentSwarm(task_timeout=...)
+	llm_factory: LLMFactory | None = None  # Overrides AgentSwarm(llm_factory=...), must be picklable
+	agent_kwargs: dict[str, Any] = Field(default_factory=dict)  # Passed to Agent(), must be picklable
+
+
+class SwarmTaskResult(BaseModel):
+	"""Outcome of a swarm task, from its last attempt"""
+
+	task_id: str
+	task: str
+	attempts: int = 0
+	error: str | None = None  # Why the last attempt failed without a history
+	is_done: bool = False
+	is_successful: bool | None = None
+	final_result: str | None = None
+	n_steps: int = 0
+	duration_seconds: float = 0.0
+	history: dict[str, Any] | None = None  # AgentHistoryList.model_dump(), see load_history()
+
+	def load_history(self, output_model: 'type[AgentOutput] | None' = None) -> 'AgentHistoryList | None':
+		"""Rebuild the agent's history. Actions are validated with `output_model`, by default the default Tools' actions."""
+		if self.history is None:
+			return None
+		from browser_use.agent.views import AgentHistory, AgentHistoryList, AgentOutput
+
+		if output_model is None:
+			from browser_use.tools.service import Tools
+
+			output_model = AgentOutput.type_with_custom_actions(Tools().registry.create_action_model())
+		data = json.loads(json.dumps(self.history))  # load_from_dict validates in place
+		data['history'] = [AgentHistory.load_from_dict(item, output_model) for item in data['history']]
+		return AgentHistoryList.model_validate(data)
+
+
+class SwarmResult(BaseModel):
+	"""Results of all tasks of a swarm run, in the order the tasks were given, with their combined token usage"""
+
+	results: list[SwarmTaskResult]
+	usage: UsageSummary
+	duration_seconds: float
+
+	@property
+	def succeeded(self) -> list[SwarmTaskResult]:
+		return [result for result in self.results if result.is_successful]
+
+	@property
+	def failed(self) -> list[SwarmTaskResult]:
+		return [result for result in self.results if not result.is_successful]
+
+	def save(self, directory: str | Path) -> None:
+		"""Write each task's history to `<task_id>.json` and the overview of the run to `swarm.json`"""
+		directory = Path(directory)
+		directory.mkdir(parents=True, exist_ok=True)
+		for result in self.results:
+			if result.history is not None:
+				(directory / f'{result.task_id}.json').write_text(json.dumps(result.history, indent=2), encoding='utf-8')
+		overview = self.model_dump(mode='json', exclude={'results': {'__all__': {'history'}}})
+		(directory / 'swarm.json').write_text(json.dumps(overview, indent=2), encoding='utf-8')
+
+
+# region - worker side
+
+
+def _default_agent_factory(task: SwarmTask, llm: BaseChatModel, browser_session: BrowserSession) -> 'Agent':
+	from browser_use.agent.service import Agent
+
+	return Agent(task=task.task, llm=llm, browser_session=browser_session, **task.agent_kwargs)
+
+
+@dataclass
+class _WorkerConfig:
+	"""Everything a worker needs to run agents, sent to worker processes once when they start"""
+
+	llm_factory: LLMFactory
+	agent_factory: AgentFactory
+	browser_profile: BrowserProfile | None
+	shared_browser: bool
+
+
+class _WorkerBrowser:
+	"""The browser of a worker: one shared browser with a tab per agent, or a separate browser per agent"""
+
+	def __init__(self, browser_profile: BrowserProfile | None, shared: bool):
+		self.browser_profile = browser_profile or BrowserProfile()
+		self.shared = shared
+		self._host: BrowserSession | None = None
+		self._lock = asyncio.Lock()
+
+	async def acquire(self) -> BrowserSession:
+		if not self.shared:
+			# Started by the agent, and killed by it when it's done
+			return BrowserSession(browser_profile=self.browser_profile)
+
+		from browser_use.browser.events import NavigateToUrlEvent
+
+		async with self._lock:
+			if self._host is None:
+				host = BrowserSession(browser_profile=self.browser_profile, keep_alive=True)
+				await host.start()
+				self._host = host
+		session = BrowserSession(browser_profile=self.browser_profile, cdp_url=self._host.cdp_url, is_local=True, keep_alive=True)
+		await session.start()
+		# Give the agent a tab of its own instead of the one all connections start on
+		await session.event_bus.dispatch(NavigateToUrlEvent(url='about:blank', new_tab=True))
+		return session
+
+	async def release(self, session: BrowserSession) -> None:
+		if not self.shared:
+			return
+
+		from browser_use.browser.events import CloseTabEvent
+
+		try:
+			if session.agent_focus is not None:
+				await session.event_bus.dispatch(CloseTabEvent(target_id=session.agent_focus.target_id))
+			await session.stop()
+		except Exception as e:
+			logger.debug(f'Failed to clean up agent browser session: {type(e).__name__}: {e}')
+
+	async def close(self) -> None:
+		if self._host is not None:
+			await self._host.kill()
+			self._host = None
+
+
+async def _execute_task(task: SwarmTask, timeout: float | None, config: _WorkerConfig, browser: _WorkerBrowser) -> dict[str, Any]:
+	"""Run one attempt of a task, returning a picklable report. Never raises, except when cancelled."""
+	start = time.time()
+	report: dict[str, Any] = {'error': None, 'history': None, 'usage': [], 'response_cache': []}
+	agent = None
+	session = None
+	try:
+		llm = (task.llm_factory or config.llm_factory)()
+		session = await browser.acquire()
+		agent = config.agent_factory(task, llm, session)
+		history = await asyncio.wait_for(agent.run(max_steps=task.max_steps), timeout)
+		report.update(
+			history=history.model_dump(),
+			is_done=history.is_done(),
+			is_successful=history.is_successful(),
+			final_result=history.final_result(),
+			n_steps=history.number_of_steps(),
+		)
+	except TimeoutError:
+		report['error'] = f'Timed out after {timeout} seconds'
+	except Exception as e:
+		report['error'] = f'{type(e).__name__}: {e}'
+	finally:
+		if agent is not None:
+			# Sent as plain dicts, the parent adds them to its TokenCost
+			report['usage'] = [entry.model_dump() for entry in agent.token_cost_service.usage_history]
+			report['response_cache'] = [lookup.model_dump() for lookup in agent.token_cost_service.response_cache_history]
+		if session is not None:
+			await browser.release(session)
+	report['duration_seconds'] = time.time() - start
+	return report
+
+
+def _worker_main(worker_id: int, config: _WorkerConfig, inbox: Any, outbox: Any) -> None:
+	"""Entry point of a worker process"""
+	asyncio.run(_worker_loop(worker_id, config, inbox, outbox))
+
+
+async def _worker_loop(worker_id: int, config: _WorkerConfig, inbox: Any, outbox: Any) -> None:
+	loop = asyncio.get_running_loop()
+	browser = _WorkerBrowser(config.browser_profile, config.shared_browser)
+	running: set[asyncio.Task] = set()
+
+	async def run_attempt(attempt_id: str, task: SwarmTask, timeout: float | None) -> None:
+		report = await _execute_task(task, timeout, config, browser)
+		outbox.put((worker_id, attempt_id, report))
+
+	try:
+		while True:
+			message = await loop.run_in_executor(None, inbox.get)
+			if message is None:
+				break
+			attempt = asyncio.create_task(run_attempt(*message))
+			running.add(attempt)
+			attempt.add_done_callback(running.discard)
+	finally:
+		for attempt in running:
+			attempt.cancel()
+		await asyncio.gather(*running, return_exceptions=True)
+		await browser.close()
+
+
+# endregion
+# region - parent side
+
+
+@dataclass(eq=False)
+class _Attempt:
+	task: SwarmTask
+	provider: str
+	timeout: float | None
+	number: int = 1
+	attempt_id: str = field(default_factory=uuid7str)
+	deadline: float | None = None  # time.monotonic() after which the worker is considered stuck
+
+
+class _LocalWorker:
+	"""Runs agents on the scheduler's own event loop, for workers=0"""
+
+	def __init__(self, worker_id: int, config: _WorkerConfig, capacity: int, reports: asyncio.Queue):
+		self.worker_id = worker_id
+		self.capacity = capacity
+		self.in_flight: dict[str, _Attempt] = {}
+		self._config = config
+		self._reports = reports
+		self._browser = _WorkerBrowser(config.browser_profile, config.shared_browser)
+		self._tasks: dict[str, asyncio.Task] = {}
+
+	def start(self) -> None:
+		pass
+
+	def is_alive(self) -> bool:
+		return True
+
+	def submit(self, attempt: _Attempt) -> None:
+		self.in_flight[attempt.attempt_id] = attempt
+
+		async def run() -> None:
+			report = await _execute_task(attempt.task, attempt.timeout, self._config, self._browser)
+			self._reports.put_nowait((self.worker_id, attempt.attempt_id, report))
+
+		task = asyncio.create_task(run())
+		self._tasks[attempt.attempt_id] = task
+		task.add_done_callback(lambda _: self._tasks.pop(attempt.attempt_id, None))
+
+	async def stop(self, force: bool = False) -> None:
+		for task in self._tasks.values():
+			task.cancel()
+		await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+		await self._browser.close()
+
+
+class _ProcessWorker:
+	"""Runs agents in a separate process, reporting back through the swarm's shared outbox"""
+
+	def __init__(self, worker_id: int, config: _WorkerConfig, capacity: int, outbox: Any, context: Any):
+		self.worker_id = worker_id
+		self.capacity = capacity
+		self.in_flight: dict[str, _Attempt] = {}
+		self._config = config
+		self._outbox = outbox
+		self._context = context
+		self._inbox: Any = None
+		self._process: Any = None
+
+	def start(self) -> None:
+		self._inbox = self._context.Queue()
+		self._process = self._context.Process(
+			target=_worker_main,
+			args=(self.worker_id, self._config, self._inbox, self._outbox),
+			name=f'browser-use-swarm-worker-{self.worker_id}',
+			daemon=True,
+		)
+		self._process.start()
+
+	def is_alive(self) -> bool:
+		return self._process is not None and self._process.is_alive()
+
+	def submit(self, attempt: _Attempt) -> None:
+		self.in_flight[attempt.attempt_id] = attempt
+		self._inbox.put((attempt.attempt_id, attempt.task, attempt.timeout))
+
+	async def stop(self, force: bool = False) -> None:
+		if self._process is None:
+			return
+		if not force and self._process.is_alive():
+			self._inbox.put(None)
+			await asyncio.to_thread(self._process.join, 10)
+		if self._process.is_alive():
+			self._process.terminate()
+			await asyncio.to_thread(self._process.join, 5)
+		self._process = None
+
+
+class AgentSwarm:
+	"""Runs a queue of tasks as agents across worker processes, see the module docstring"""
+
+	def __init__(
+		self,
+		llm_factory: LLMFactory,
+		workers: int | None = None,
+		agents_per_worker: int = 4,
+		provider_limits: dict[str, int] | None = None,
+		task_timeout: float | None = None,
+		max_retries: int = 1,
+		browser_profile: BrowserProfile | None = None,
+		shared_browser: bool = True,
+		agent_factory: AgentFactory | None = None,
+		calculate_cost: bool = False,
+	):
+		"""
+		Args:
+			llm_factory: Picklable callable that creates the LLM for an agent, e.g. a module-level function
+			workers: Number of worker processes, by default one per CPU core up to 4. 0 runs the agents in this process.
+			agents_per_worker: Agents each worker runs at the same time
+			provider_limits: Maximum agents running at once per LLM provider (e.g. {'openai': 8}), across all workers
+			task_timeout: Seconds a task may run before it's stopped and counted as failed
+			max_retries: How often a task that failed with an error (exception, timeout, crashed worker) is retried
+			browser_profile: Profile of the browsers the workers launch
+			shared_browser: Share one browser per worker with a tab per agent, instead of a browser per agent
+			agent_factory: Picklable callable (task, llm, browser_session) -> Agent, for agents with custom tools or settings
+			calculate_cost: Calculate the cost of the combined token usage
+		"""
+		if agents_per_worker < 1:
+			raise ValueError(f'AgentSwarm agents_per_worker must be >= 1, got {agents_per_worker}')
+		self.workers = min(4, os.cpu_count() or 1) if workers is None else workers
+		if self.workers < 0:
+			raise ValueError(f'AgentSwarm workers must be >= 0, got {self.workers}')
+		self.agents_per_worker = agents_per_worker
+		self.provider_limits = provider_limits or {}
+		self.task_timeout = task_timeout
+		self.max_retries = max_retries
+		self._config = _WorkerConfig(
+			llm_factory=llm_factory,
+			agent_factory=agent_factory or _default_agent_factory,
+			browser_profile=browser_profile,
+			shared_browser=shared_browser,
+		)
+		self.calculate_cost = calculate_cost
+		self._providers: dict[LLMFactory, str] = {}
+
+	def _provider(self, task: SwarmTask) -> str:
+		"""The LLM provider a task uses, found by creating its LLM once per factory"""
+		factory = task.llm_factory or self._config.llm_factory
+		if factory not in self._providers:
+			try:
+				self._providers[factory] = factory().provider
+			except Exception as e:
+				logger.warning(f'Could not determine the LLM provider of {factory}, not limiting it: {type(e).__name__}: {e}')
+				self._providers[factory] = 'unknown'
+		return self._providers[factory]
+
+	async def run(self, tasks: Iterable[SwarmTask | str]) -> SwarmResult:
+		"""Run all tasks, returning once each of them finished or ran out of retries"""
+		swarm_tasks = [task if isinstance(task, SwarmTask) else SwarmTask(task=task) for task in tasks]
+		start = time.time()
+		pending = deque(
+			_Attempt(task=task, provider=self._provider(task), timeout=task.timeout or self.task_timeout) for task in swarm_tasks
+		)
+		results: dict[str, SwarmTaskResult] = {}
+		token_cost = TokenCost(include_cost=self.calculate_cost)
+
+		reports: asyncio.Queue = asyncio.Queue()
+		workers, close_channel = self._start_workers(reports)
+		logger.info(
+			f'🐝 Running {len(swarm_tasks)} tasks on {max(self.workers, 1)} {"worker processes" if self.workers else "in-process worker"} '
+			f'with up to {self.agents_per_worker} agents each'
+		)
+
+		try:
+			while pending or any(worker.in_flight for worker in workers):
+				self._dispatch(pending, workers)
+				try:
+					worker_id, attempt_id, report = await asyncio.wait_for(reports.get(), _POLL_INTERVAL)
+				except TimeoutError:
+					pass
+				else:
+					attempt = workers[worker_id].in_flight.pop(attempt_id, None)
+					if attempt is not None:
+						for entry in report['usage']:
+							entry = TokenUsageEntry.model_validate(entry)
+							token_cost.add_usage(entry.model, entry.usage)
+						for lookup in report.get('response_cache', []):
+							lookup = ResponseCacheLookup.model_validate(lookup)
+							token_cost.add_response_cache_lookup(lookup.model, lookup.hit, lookup.saved_usage)
+						self._finish_attempt(attempt, report, pending, results)
+				await self._restart_unhealthy_workers(workers, pending, results)
+		finally:
+			await asyncio.gather(*(worker.stop() for worker in workers), return_exceptions=True)
+			close_channel()
+
+		await token_cost.initialize()  # loads pricing data if calculating cost
+		result = SwarmResult(
+			results=[results[task.task_id] for task in swarm_tasks],
+			usage=await token_cost.get_usage_summary(),
+			duration_seconds=time.time() - start,
+		)
+		logger.info(
+			f'🐝 Swarm finished {len(swarm_tasks)} tasks in {result.duration_seconds:.1f}s: '
+			f'{len(result.succeeded)} succeeded, {len(result.failed)} failed'
+		)
+		return result
+
+	def _start_workers(self, reports: asyncio.Queue) -> tuple[list['_LocalWorker | _ProcessWorker'], Callable[[], None]]:
+		if self.workers == 0:
+			worker = _LocalWorker(0, self._config, self.agents_per_worker, reports)
+			return [worker], lambda: None
+
+		# spawn instead of fork: forking a process with a running event loop and threads isn't safe
+		context = multiprocessing.get_context('spawn')
+		outbox = context.Queue()
+		loop = asyncio.get_running_loop()
+
+		def forward_reports() -> None:
+			while (message := outbox.get()) is not None:
+				loop.call_soon_threadsafe(reports.put_nowait, message)
+
+		reader = threading.Thread(target=forward_reports, name='browser-use-swarm-reports', daemon=True)
+		reader.start()
+
+		workers: list[_LocalWorker | _ProcessWorker] = []
+		for worker_id in range(self.workers):
+			worker = _ProcessWorker(worker_id, self._config, self.agents_per_worker, outbox, context)
+			worker.start()
+			workers.append(worker)
+
+		def close_channel() -> None:
+			outbox.put(None)
+			reader.join(timeout=5)
+
+		return workers, close_channel
+
+	def _dispatch(self, pending: deque[_Attempt], workers: list['_LocalWorker | _ProcessWorker']) -> None:
+		"""Hand pending attempts to the least busy workers, within the provider limits"""
+		running_per_provider: dict[str, int] = {}
+		for worker in workers:
+			for attempt in worker.in_flight.values():
+				running_per_provider[attempt.provider] = running_per_provider.get(attempt.provider, 0) + 1
+
+		waiting: deque[_Attempt] = deque()
+		while pending:
+			attempt = pending.popleft()
+			limit = self.provider_limits.get(attempt.provider)
+			if limit is not None and running_per_provider.get(attempt.provider, 0) >= limit:
+				waiting.append(attempt)
+				continue
+			worker = min(workers, key=lambda worker: len(worker.in_flight))
+			if len(worker.in_flight) >= worker.capacity:
+				waiting.append(attempt)
+				break
+			if attempt.timeout is not None:
+				attempt.deadline = time.monotonic() + attempt.timeout + _TIMEOUT_GRACE
+			worker.submit(attempt)
+			running_per_provider[attempt.provider] = running_per_provider.get(attempt.provider, 0) + 1
+		# keep the original order, attempts that had to wait go first next time
+		waiting.extend(pending)
+		pending.clear()
+		pending.extend(waiting)
+
+	def _finish_attempt(
+		self, attempt: _Attempt, report: dict[str, Any], pending: deque[_Attempt], results: dict[str, SwarmTaskResult]
+	) -> None:
+		task = attempt.task
+		if report['error'] is not None and attempt.number <= self.max_retries:
+			logger.warning(f'🔁 Task {task.task_id} failed (attempt {attempt.number}), retrying: {report["error"]}')
+			pending.append(_Attempt(task=task, provider=attempt.provider, timeout=attempt.timeout, number=attempt.number + 1))
+			return
+
+		results[task.task_id] = SwarmTaskResult(
+			task_id=task.task_id,
+			task=task.task,
+			attempts=attempt.number,
+			error=report['error'],
+			is_done=report.get('is_done', False),
+			is_successful=report.get('is_successful'),
+			final_result=report.get('final_result'),
+			n_steps=report.get('n_steps', 0),
+			duration_seconds=report.get('duration_seconds', 0.0),
+			history=report['history'],
+		)
+		if report['error'] is not None:
+			logger.error(f'❌ Task {task.task_id} failed after {attempt.number} attempts: {report["error"]}')
+
+	async def _restart_unhealthy_workers(
+		self, workers: list['_LocalWorker | _ProcessWorker'], pending: deque[_Attempt], results: dict[str, SwarmTaskResult]
+	) -> None:
+		"""Restart workers that crashed or are stuck on a task past its timeout, failing their running attempts"""
+		now = time.monotonic()
+		for worker in workers:
+			if not worker.in_flight:
+				continue
+			if worker.is_alive():
+				overdue = [a for a in worker.in_flight.values() if a.deadline is not None and now > a.deadline]
+				if not overdue:
+					continue
+				reason = f'Worker {worker.worker_id} did not stop the task after its {overdue[0].timeout}s timeout'
+			else:
+				reason = f'Worker {worker.worker_id} crashed'
+			logger.warning(f'⚠️ {reason}, restarting it')
+
+			attempts = list(worker.in_flight.values())
+			worker.in_flight.clear()
+			await worker.stop(force=True)
+			worker.start()
+			for attempt in attempts:
+				report = {'error': reason, 'history': None, 'usage': []}
+				self._finish_attempt(attempt, report, pending, results)
+
+
+# endregion
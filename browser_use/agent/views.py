@@ -3,6 +3,7 @@ from __future__ import annotations
 import json
 import logging
 import traceback
+from collections.abc import Iterator
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Generic, Literal
@@ -24,6 +25,7 @@ from browser_use.dom.views import DEFAULT_INCLUDE_ATTRIBUTES, DOMInteractedEleme
 # from browser_use.dom.views import SelectorMap
 from browser_use.filesystem.file_system import FileSystemState
 from browser_use.llm.base import BaseChatModel
+from browser_use.profiling import PhaseTiming, ProfileSpan, summarize_spans
 from browser_use.tokens.views import UsageSummary
 from browser_use.tools.registry.views import ActionModel
 
@@ -35,8 +37,13 @@ class AgentSettings(BaseModel):
 
 	use_vision: bool = True
 	vision_detail_level: Literal['auto', 'low', 'high'] = 'auto'
+	vision_image_format: Literal['auto', 'png', 'jpeg', 'webp'] = 'auto'  # 'auto': JPEG for providers known to accept it
+	skip_unchanged_screenshots: bool = False  # Send a short marker instead of a screenshot identical to the previous step's
+	screenshot_format: Literal['png', 'webp', 'jpeg'] = 'png'  # Format step screenshots are stored in on disk
+	max_stored_screenshots: int | None = None  # Keep screenshots of only this many most recent steps on disk
 	save_conversation_path: str | Path | None = None
 	save_conversation_path_encoding: str | None = 'utf-8'
+	save_history_path: str | Path | None = None  # JSONL file each step's history item is appended to as it finishes
 	max_failures: int = 3
 	generate_gif: bool | str = False
 	override_system_message: str | None = None
@@ -46,6 +53,10 @@ class AgentSettings(BaseModel):
 	use_thinking: bool = True
 	flash_mode: bool = False  # If enabled, disables evaluation_previous_goal and next_goal, and sets use_thinking = False
 	max_history_items: int | None = None
+	# 'cache_friendly': send the agent history in its own message ahead of the volatile browser state, so providers can
+	# cache it as part of the prompt prefix
+	message_layout: Literal['default', 'cache_friendly'] = 'default'
+	viewport_first_elements: bool = False  # When the page's elements don't fit in the prompt, list the ones in the viewport first
 
 	page_extraction_llm: BaseChatModel | None = None
 	calculate_cost: bool = False
@@ -53,6 +64,7 @@ class AgentSettings(BaseModel):
 	llm_timeout: int = 60  # Timeout in seconds for LLM calls (auto-detected: 30s for gemini, 90s for o3, 60s default)
 	step_timeout: int = 180  # Timeout in seconds for each step
 	final_response_after_failure: bool = True  # If True, attempt one final recovery call after max_failures
+	profile_steps: bool = False  # Record a span tree of each step's phases in AgentHistory.metadata.profile
 
 
 class AgentState(BaseModel):
@@ -132,6 +144,7 @@ class StepMetadata(BaseModel):
 	step_start_time: float
 	step_end_time: float
 	step_number: int
+	profile: ProfileSpan | None = None  # Timing of the step's phases, if the agent was run with profile_steps=True
 
 	@property
 	def duration_seconds(self) -> float:
@@ -323,6 +336,18 @@ class AgentHistory(BaseModel):
 				filtered_data[key] = value
 		return filtered_data
 
+	@classmethod
+	def load_from_dict(cls, data: dict[str, Any], output_model: type[AgentOutput]) -> AgentHistory:
+		"""Load a history item from its model_dump, validating actions with output_model to enrich with custom actions"""
+		if data['model_output']:
+			if isinstance(data['model_output'], dict):
+				data['model_output'] = output_model.model_validate(data['model_output'])
+			else:
+				data['model_output'] = None
+		if 'interacted_element' not in data['state']:
+			data['state']['interacted_element'] = None
+		return cls.model_validate(data)
+
 	def model_dump(self, sensitive_data: dict[str, str | dict[str, str]] | None = None, **kwargs) -> dict[str, Any]:
 		"""Custom serialization handling circular references and filtering sensitive data"""
 
@@ -381,6 +406,14 @@ class AgentHistoryList(BaseModel, Generic[AgentStructuredOutput]):
 				total += h.metadata.duration_seconds
 		return total
 
+	def step_profiles(self) -> list[ProfileSpan]:
+		"""Get the span trees of all profiled steps"""
+		return [h.metadata.profile for h in self.history if h.metadata and h.metadata.profile]
+
+	def profile_summary(self) -> dict[str, PhaseTiming]:
+		"""Get p50/p95 latency per step phase across all profiled steps, see `browser_use.profiling.summarize_spans`"""
+		return summarize_spans(self.step_profiles())
+
 	def __len__(self) -> int:
 		"""Return the number of history items"""
 		return len(self.history)
@@ -447,18 +480,16 @@ class AgentHistoryList(BaseModel, Generic[AgentStructuredOutput]):
 
 	@classmethod
 	def load_from_file(cls, filepath: str | Path, output_model: type[AgentOutput]) -> AgentHistoryList:
-		"""Load history from JSON file"""
+		"""Load history from a JSON file, or from a JSONL history log written during Agent.run(save_history_path=...)"""
+		if Path(filepath).suffix == '.jsonl':
+			from browser_use.agent.history_log import AgentHistoryLog
+
+			return AgentHistoryLog(filepath, output_model).to_history_list()
+
 		with open(filepath, encoding='utf-8') as f:
 			data = json.load(f)
 		# loop through history and validate output_model actions to enrich with custom actions
-		for h in data['history']:
-			if h['model_output']:
-				if isinstance(h['model_output'], dict):
-					h['model_output'] = output_model.model_validate(h['model_output'])
-				else:
-					h['model_output'] = None
-			if 'interacted_element' not in h['state']:
-				h['state']['interacted_element'] = None
+		data['history'] = [AgentHistory.load_from_dict(h, output_model) for h in data['history']]
 		history = cls.model_validate(data)
 		return history
 
@@ -522,6 +553,19 @@ class AgentHistoryList(BaseModel, Generic[AgentStructuredOutput]):
 			else:
 				return [h.state.screenshot_path for h in self.history[-n_last:] if h.state.screenshot_path is not None]
 
+	def iter_screenshot_bytes(
+		self, n_last: int | None = None, return_none_if_not_screenshot: bool = True
+	) -> Iterator[bytes | None]:
+		"""Lazily read screenshots from disk as raw bytes, one step at a time (no base64 encoding)"""
+		if n_last == 0:
+			return
+
+		history_items = self.history if n_last is None else self.history[-n_last:]
+		for item in history_items:
+			screenshot = item.state.get_screenshot_bytes()
+			if screenshot or return_none_if_not_screenshot:
+				yield screenshot or None
+
 	def screenshots(self, n_last: int | None = None, return_none_if_not_screenshot: bool = True) -> list[str | None]:
 		"""Get all screenshots from history as base64 strings"""
 		if n_last == 0:
@@ -0,0 +1,131 @@
+"""Bounded, indexed history of events dispatched on a browser session's EventBus."""
+
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, TypeVar
+
+from bubus import BaseEvent, EventBus
+from uuid_extensions import uuid7str
+
+T_Event = TypeVar('T_Event', bound=BaseEvent[Any])
+
+DEFAULT_EVENT_HISTORY_SIZE = 50
+"""Same bound as the bubus EventBus keeps for its own event_history"""
+
+RECORDED_EVENT_FIELDS = ('url', 'error_message', 'target_id')
+"""Event fields copied into an EventRecord, when the event has them"""
+
+
+@dataclass(slots=True)
+class EventRecord:
+	"""Lightweight summary of a dispatched event.
+
+	Only the event's identity and a few small fields are kept, not the event itself: events hold their
+	handler results (e.g. a BrowserStateSummary with its screenshot), which must not outlive the bus history.
+	"""
+
+	event_id: str
+	event_type: str
+	timestamp: datetime
+	fields: dict[str, Any] = field(default_factory=dict)
+
+	@classmethod
+	def from_event(cls, event: BaseEvent[Any]) -> 'EventRecord':
+		return cls(
+			event_id=event.event_id,
+			event_type=event.event_type,
+			timestamp=event.event_created_at,
+			fields={name: getattr(event, name) for name in RECORDED_EVENT_FIELDS if hasattr(event, name)},
+		)
+
+	def to_dict(self) -> dict[str, Any]:
+		"""JSON-serializable form, as shown in the browser state's recent_events"""
+		return {'event_type': self.event_type, 'timestamp': self.timestamp.isoformat(), **self.fields}
+
+
+class EventHistoryBuffer:
+	"""Ring buffer of records of the most recently dispatched events, with a per-event-type index.
+
+	Records are kept in dispatch order. Once `max_size` is reached the oldest record is evicted
+	from both the main buffer and its type index, so memory stays bounded for long-running sessions
+	and reading the last N events is O(N) instead of a sort over the whole history.
+	"""
+
+	def __init__(self, max_size: int = DEFAULT_EVENT_HISTORY_SIZE):
+		if max_size < 1:
+			raise ValueError(f'EventHistoryBuffer max_size must be >= 1, got {max_size}')
+		self.max_size = max_size
+		self._events: deque[EventRecord] = deque()
+		self._events_by_type: dict[str, deque[EventRecord]] = {}
+
+	def __len__(self) -> int:
+		return len(self._events)
+
+	def append(self, event: BaseEvent[Any] | EventRecord) -> None:
+		"""Record a newly dispatched event, evicting the oldest record if the buffer is full."""
+		if not isinstance(event, EventRecord):
+			event = EventRecord.from_event(event)
+
+		if len(self._events) >= self.max_size:
+			evicted = self._events.popleft()
+			# events are appended in the same order to both deques, so the evicted event is always the oldest of its type
+			type_events = self._events_by_type[evicted.event_type]
+			type_events.popleft()
+			if not type_events:
+				del self._events_by_type[evicted.event_type]
+
+		self._events.append(event)
+		self._events_by_type.setdefault(event.event_type, deque()).append(event)
+
+	def recent(self, limit: int | None = None, event_type: str | None = None) -> list[EventRecord]:
+		"""Get the records of the most recent events, newest first, optionally filtered to a single event type."""
+		events = self._events if event_type is None else self._events_by_type.get(event_type, ())
+		if limit is None:
+			return list(reversed(events))
+
+		recent_events = []
+		for event in reversed(events):
+			if len(recent_events) >= limit:
+				break
+			recent_events.append(event)
+		return recent_events
+
+	def last(self, event_type: str) -> EventRecord | None:
+		"""Get the record of the most recent event of the given type, if any."""
+		type_events = self._events_by_type.get(event_type)
+		return type_events[-1] if type_events else None
+
+	def count(self, event_type: str) -> int:
+		"""Number of retained records of the given type."""
+		return len(self._events_by_type.get(event_type, ()))
+
+	def clear(self) -> None:
+		self._events.clear()
+		self._events_by_type.clear()
+
+
+class BrowserEventBus(EventBus):
+	"""EventBus that also records a summary of every dispatched event into a bounded EventHistoryBuffer.
+
+	`event_history_size` bounds both the buffer and the bus's own `event_history` (bubus `max_history_size`).
+	"""
+
+	def __init__(self, name: str | None = None, event_history_size: int = DEFAULT_EVENT_HISTORY_SIZE, **kwargs: Any):
+		# the bus keeps its own history of full events (with their results), bounded by the same setting
+		kwargs.setdefault('max_history_size', event_history_size)
+		super().__init__(name=name or f'EventBus_{uuid7str()[-8:]}', **kwargs)
+		self.recent_events = EventHistoryBuffer(max_size=event_history_size)
+
+	async def stop(self, timeout: float | None = None, clear: bool = False) -> None:
+		await super().stop(timeout=timeout, clear=clear)
+		if clear:
+			self.recent_events.clear()
+
+	def dispatch(self, event: T_Event) -> T_Event:  # type: ignore[override]
+		# events forwarded back onto this bus are already recorded
+		already_recorded = event.event_id in self.event_history
+		event = super().dispatch(event)
+		if not already_recorded:
+			self.recent_events.append(event)
+		return event
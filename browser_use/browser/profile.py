@@ -626,6 +626,18 @@ class BrowserProfile(BrowserConnectArgs, BrowserLaunchPersistentContextArgs, Bro
 		default=True, description='Only show element IDs in highlights if llm_representation is less than 10 characters.'
 	)
 	paint_order_filtering: bool = Field(default=True, description='Enable paint order filtering. Slightly experimental.')
+	dom_process_pool_size: int = Field(
+		default=0,
+		ge=0,
+		description='Build and serialize the DOM in a pool of this many worker processes instead of on the event loop (0 = disabled). The pool is shared by all browser sessions of the process, for hosts running many agents at once.',
+	)
+
+	# --- Event history ---
+	event_history_size: int = Field(
+		default=50,
+		ge=1,
+		description='Number of recent browser events retained by the event bus, and summarized in recent_events of the browser state.',
+	)
 
 	# --- Downloads ---
 	auto_download_pdfs: bool = Field(default=True, description='Automatically download PDFs when navigating to PDF viewer pages.')
@@ -19,6 +19,7 @@ from browser_use.browser.cloud import CloudBrowserAuthError, CloudBrowserError,
 
 # CDP logging is now handled by setup_logging() in logging_config.py
 # It automatically sets CDP logs to the same level as browser_use logs
+from browser_use.browser.event_history import BrowserEventBus
 from browser_use.browser.events import (
 	AgentFocusChangedEvent,
 	BrowserConnectedEvent,
@@ -42,6 +43,7 @@ from browser_use.browser.profile import BrowserProfile, ProxySettings
 from browser_use.browser.views import BrowserStateSummary, TabInfo
 from browser_use.dom.views import EnhancedDOMTreeNode, TargetInfo
 from browser_use.observability import observe_debug
+from browser_use.profiling import link_span
 from browser_use.utils import _log_pretty_url, is_new_tab_page
 
 if TYPE_CHECKING:
@@ -277,9 +279,12 @@ class BrowserSession(BaseModel):
 		cross_origin_iframes: bool | None = None,
 		highlight_elements: bool | None = None,
 		paint_order_filtering: bool | None = None,
+		dom_process_pool_size: int | None = None,
 		# Iframe processing limits
 		max_iframes: int | None = None,
 		max_iframe_depth: int | None = None,
+		# Event history retention
+		event_history_size: int | None = None,
 	):
 		# Following the same pattern as AgentSettings in service.py
 		# Only pass non-None values to avoid validation errors
@@ -335,7 +340,9 @@ class BrowserSession(BaseModel):
 		return self.browser_profile.use_cloud
 
 	# Main shared event bus for all browser session + all watchdogs
-	event_bus: EventBus = Field(default_factory=EventBus)
+	event_bus: EventBus = Field(
+		default_factory=lambda data: BrowserEventBus(event_history_size=data['browser_profile'].event_history_size)
+	)
 
 	# Mutable public state
 	agent_focus: CDPSession | None = None
@@ -476,7 +483,7 @@ class BrowserSession(BaseModel):
 		# Reset all state
 		await self.reset()
 		# Create fresh event bus
-		self.event_bus = EventBus()
+		self.event_bus = BrowserEventBus(event_history_size=self.browser_profile.event_history_size)
 
 	async def stop(self) -> None:
 		"""Stop the browser session without killing the browser process.
@@ -498,7 +505,7 @@ class BrowserSession(BaseModel):
 		# Reset all state
 		await self.reset()
 		# Create fresh event bus
-		self.event_bus = EventBus()
+		self.event_bus = BrowserEventBus(event_history_size=self.browser_profile.event_history_size)
 
 	@observe_debug(ignore_input=True, ignore_output=True, name='browser_start_event_handler')
 	async def on_BrowserStartEvent(self, event: BrowserStartEvent) -> dict[str, str]:
@@ -1065,16 +1072,14 @@ class BrowserSession(BaseModel):
 				# Fall through to fetch fresh state
 
 		# Dispatch the event and wait for result
-		event: BrowserStateRequestEvent = cast(
-			BrowserStateRequestEvent,
-			self.event_bus.dispatch(
-				BrowserStateRequestEvent(
-					include_dom=True,
-					include_screenshot=include_screenshot,
-					include_recent_events=include_recent_events,
-				)
-			),
+		event = BrowserStateRequestEvent(
+			include_dom=True,
+			include_screenshot=include_screenshot,
+			include_recent_events=include_recent_events,
 		)
+		# Let the handler record its phases in the caller's profile, handlers don't run in the caller's context
+		link_span(event.event_id)
+		event = cast(BrowserStateRequestEvent, self.event_bus.dispatch(event))
 
 		# The handler returns the BrowserStateSummary directly
 		result = await event.event_result(raise_if_none=True, raise_if_any=True)
@@ -96,25 +96,27 @@ class BrowserStateHistory:
 	interacted_element: list[DOMInteractedElement | None] | list[None]
 	screenshot_path: str | None = None
 
-	def get_screenshot(self) -> str | None:
-		"""Load screenshot from disk and return as base64 string"""
+	def get_screenshot_bytes(self) -> bytes | None:
+		"""Load screenshot bytes from disk, or None if there is no screenshot (or it was removed by retention)"""
 		if not self.screenshot_path:
 			return None
 
-		import base64
-		from pathlib import Path
-
-		path_obj = Path(self.screenshot_path)
-		if not path_obj.exists():
+		try:
+			with open(self.screenshot_path, 'rb') as f:
+				return f.read()
+		except OSError:
 			return None
 
-		try:
-			with open(path_obj, 'rb') as f:
-				screenshot_data = f.read()
-			return base64.b64encode(screenshot_data).decode('utf-8')
-		except Exception:
+	def get_screenshot(self) -> str | None:
+		"""Load screenshot from disk and return as base64 string"""
+		screenshot_data = self.get_screenshot_bytes()
+		if screenshot_data is None:
 			return None
 
+		import base64
+
+		return base64.b64encode(screenshot_data).decode('utf-8')
+
 	def to_dict(self) -> dict[str, Any]:
 		data = {}
 		data['tabs'] = [tab.model_dump() for tab in self.tabs]
@@ -2,8 +2,10 @@
 
 import asyncio
 import time
+from itertools import islice
 from typing import TYPE_CHECKING
 
+from browser_use.browser.event_history import BrowserEventBus, EventRecord
 from browser_use.browser.events import (
 	BrowserErrorEvent,
 	BrowserStateRequestEvent,
@@ -17,6 +19,7 @@ from browser_use.dom.views import (
 	SerializedDOMState,
 )
 from browser_use.observability import observe_debug
+from browser_use.profiling import linked_span, profile_span
 from browser_use.utils import time_execution_async
 
 if TYPE_CHECKING:
@@ -58,26 +61,18 @@ class DOMWatchdog(BaseWatchdog):
 		import json
 
 		try:
-			# Get all events from history, sorted by creation time (most recent first)
-			all_events = sorted(
-				self.browser_session.event_bus.event_history.values(), key=lambda e: e.event_created_at.timestamp(), reverse=True
-			)
+			event_bus = self.browser_session.event_bus
+			if isinstance(event_bus, BrowserEventBus):
+				# Bounded ring buffer, already in dispatch order (most recent first)
+				recent_events = event_bus.recent_events.recent(limit)
+			else:
+				# Plain EventBus passed in by the user: history dict is in dispatch order, walk it from the end
+				recent_events = [
+					EventRecord.from_event(event) for event in islice(reversed(event_bus.event_history.values()), limit)
+				]
 
-			# Take the most recent events and create JSON-serializable data
-			recent_events_data = []
-			for event in all_events[:limit]:
-				event_data = {
-					'event_type': event.event_type,
-					'timestamp': event.event_created_at.isoformat(),
-				}
-				# Add specific fields for certain event types
-				if hasattr(event, 'url'):
-					event_data['url'] = getattr(event, 'url')
-				if hasattr(event, 'error_message'):
-					event_data['error_message'] = getattr(event, 'error_message')
-				if hasattr(event, 'target_id'):
-					event_data['target_id'] = getattr(event, 'target_id')
-				recent_events_data.append(event_data)
+			# Create JSON-serializable data for the most recent events
+			recent_events_data = [record.to_dict() for record in recent_events]
 
 			return json.dumps(recent_events_data)  # Return empty array if no events
 		except Exception as e:
@@ -97,6 +92,12 @@ class DOMWatchdog(BaseWatchdog):
 		Returns:
 			Complete BrowserStateSummary with DOM, screenshot, and target info
 		"""
+		# Record the phases below in the profile of the agent step that requested the state, if any
+		with linked_span(event.event_id, 'handle_browser_state_request'):
+			return await self._get_browser_state(event)
+
+	async def _get_browser_state(self, event: BrowserStateRequestEvent) -> 'BrowserStateSummary':
+		"""Build the BrowserStateSummary for a browser state request, see on_BrowserStateRequestEvent"""
 		from browser_use.browser.views import BrowserStateSummary, PageInfo
 
 		self.logger.debug('🔍 DOMWatchdog.on_BrowserStateRequestEvent: STARTING browser state request')
@@ -116,7 +117,8 @@ class DOMWatchdog(BaseWatchdog):
 		if not not_a_meaningful_website:
 			self.logger.debug('🔍 DOMWatchdog.on_BrowserStateRequestEvent: ⏳ Waiting for page stability...')
 			try:
-				await self._wait_for_stable_network()
+				with profile_span('wait_for_stable_network'):
+					await self._wait_for_stable_network()
 				self.logger.debug('🔍 DOMWatchdog.on_BrowserStateRequestEvent: ✅ Page stability complete')
 			except Exception as e:
 				self.logger.warning(
@@ -364,6 +366,7 @@ class DOMWatchdog(BaseWatchdog):
 					paint_order_filtering=self.browser_session.browser_profile.paint_order_filtering,
 					max_iframes=self.browser_session.browser_profile.max_iframes,
 					max_iframe_depth=self.browser_session.browser_profile.max_iframe_depth,
+					process_pool_size=self.browser_session.browser_profile.dom_process_pool_size,
 				)
 
 			# Get serialized DOM tree using the service
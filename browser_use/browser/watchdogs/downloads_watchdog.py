@@ -4,6 +4,7 @@ import asyncio
 import json
 import os
 import tempfile
+import time
 from pathlib import Path
 from typing import TYPE_CHECKING, Any, ClassVar
 from urllib.parse import urlparse
@@ -24,10 +25,14 @@ from browser_use.browser.events import (
 	TabCreatedEvent,
 )
 from browser_use.browser.watchdog_base import BaseWatchdog
+from browser_use.filesystem.directory_watcher import DirectoryWatcher
 
 if TYPE_CHECKING:
 	pass
 
+# Give up on a native download after this many seconds without the browser reporting progress or the file appearing
+_DOWNLOAD_STALL_TIMEOUT = 20.0
+
 
 class DownloadsWatchdog(BaseWatchdog):
 	"""Monitors downloads and handles file download events."""
@@ -55,6 +60,8 @@ class DownloadsWatchdog(BaseWatchdog):
 	_download_cdp_session: Any = PrivateAttr(default=None)  # Store CDP session reference
 	_cdp_event_tasks: set[asyncio.Task] = PrivateAttr(default_factory=set)  # Track CDP event handler tasks
 	_cdp_downloads_info: dict[str, dict[str, Any]] = PrivateAttr(default_factory=dict)  # Map guid -> info
+	# Map guid -> future resolved with the reported file path (or None) when the browser reports the download completed
+	_download_completions: dict[str, asyncio.Future[str | None]] = PrivateAttr(default_factory=dict)
 	_use_js_fetch_for_local: bool = PrivateAttr(default=False)  # Guard JS fetch path for local regular downloads
 
 	async def on_BrowserLaunchEvent(self, event: BrowserLaunchEvent) -> None:
@@ -122,6 +129,7 @@ class DownloadsWatchdog(BaseWatchdog):
 		# Clear other state
 		self._sessions_with_listeners.clear()
 		self._active_downloads.clear()
+		self._download_completions.clear()
 		self._pdf_viewer_cache.clear()
 
 	async def on_NavigationCompleteEvent(self, event: NavigationCompleteEvent) -> None:
@@ -156,70 +164,11 @@ class DownloadsWatchdog(BaseWatchdog):
 	async def attach_to_target(self, target_id: TargetID) -> None:
 		"""Set up download monitoring for a specific target."""
 
-		# Define CDP event handlers outside of try to avoid indentation/scope issues
 		async def download_will_begin_handler(event: DownloadWillBeginEvent, session_id: SessionID | None):
-			self.logger.debug(f'[DownloadsWatchdog] Download will begin: {event}')
-			# Cache info for later completion event handling (esp. remote browsers)
-			guid = event.get('guid', '')
-			try:
-				suggested_filename = event.get('suggestedFilename')
-				assert suggested_filename, 'CDP DownloadWillBegin missing suggestedFilename'
-				self._cdp_downloads_info[guid] = {
-					'url': event.get('url', ''),
-					'suggested_filename': suggested_filename,
-					'handled': False,
-				}
-			except (AssertionError, KeyError):
-				pass
-			# Create and track the task
-			task = asyncio.create_task(self._handle_cdp_download(event, target_id, session_id))
-			self._cdp_event_tasks.add(task)
-			# Remove from set when done
-			task.add_done_callback(lambda t: self._cdp_event_tasks.discard(t))
+			self._on_download_will_begin(event, target_id, session_id)
 
 		async def download_progress_handler(event: DownloadProgressEvent, session_id: SessionID | None):
-			# Check if download is complete
-			if event.get('state') == 'completed':
-				file_path = event.get('filePath')
-				guid = event.get('guid', '')
-				if self.browser_session.is_local:
-					if file_path:
-						self.logger.debug(f'[DownloadsWatchdog] Download completed: {file_path}')
-						# Track the download
-						self._track_download(file_path)
-						# Mark as handled to prevent fallback duplicate dispatch
-						try:
-							if guid in self._cdp_downloads_info:
-								self._cdp_downloads_info[guid]['handled'] = True
-						except (KeyError, AttributeError):
-							pass
-					else:
-						# No local file path provided, local polling in _handle_cdp_download will handle it
-						self.logger.debug(
-							'[DownloadsWatchdog] No filePath in progress event (local); polling will handle detection'
-						)
-				else:
-					# Remote browser: do not touch local filesystem. Fallback to downloadPath+suggestedFilename
-					info = self._cdp_downloads_info.get(guid, {})
-					try:
-						suggested_filename = info.get('suggested_filename') or (Path(file_path).name if file_path else 'download')
-						downloads_path = str(self.browser_session.browser_profile.downloads_path or '')
-						effective_path = file_path or str(Path(downloads_path) / suggested_filename)
-						file_name = Path(effective_path).name
-						file_ext = Path(file_name).suffix.lower().lstrip('.')
-						self.event_bus.dispatch(
-							FileDownloadedEvent(
-								url=info.get('url', ''),
-								path=str(effective_path),
-								file_name=file_name,
-								file_size=0,
-								file_type=file_ext if file_ext else None,
-							)
-						)
-						self.logger.debug(f'[DownloadsWatchdog] ✅ (remote) Download completed: {effective_path}')
-					finally:
-						if guid in self._cdp_downloads_info:
-							del self._cdp_downloads_info[guid]
+			self._on_download_progress(event)
 
 		try:
 			downloads_path_raw = self.browser_session.browser_profile.downloads_path
@@ -270,6 +219,86 @@ class DownloadsWatchdog(BaseWatchdog):
 		except Exception as e:
 			self.logger.warning(f'[DownloadsWatchdog] Failed to set up CDP download listener for target {target_id}: {e}')
 
+	def _on_download_will_begin(self, event: DownloadWillBeginEvent, target_id: TargetID, session_id: SessionID | None) -> None:
+		self.logger.debug(f'[DownloadsWatchdog] Download will begin: {event}')
+		# Cache info for later completion event handling (esp. remote browsers)
+		guid = event.get('guid', '')
+		try:
+			suggested_filename = event.get('suggestedFilename')
+			assert suggested_filename, 'CDP DownloadWillBegin missing suggestedFilename'
+			self._cdp_downloads_info[guid] = {
+				'url': event.get('url', ''),
+				'suggested_filename': suggested_filename,
+				'handled': False,
+				'started_at': time.time(),
+				'received_bytes': 0,
+				'total_bytes': 0,
+			}
+		except (AssertionError, KeyError):
+			pass
+		# Resolved by the progress handler once the browser reports the download finished
+		self._download_completions[guid] = asyncio.get_running_loop().create_future()
+		# Create and track the task
+		task = asyncio.create_task(self._handle_cdp_download(event, target_id, session_id))
+		self._cdp_event_tasks.add(task)
+		# Remove from set when done
+		task.add_done_callback(lambda t: self._cdp_event_tasks.discard(t))
+
+	def _on_download_progress(self, event: DownloadProgressEvent) -> None:
+		guid = event.get('guid', '')
+		state = event.get('state')
+		info = self._cdp_downloads_info.get(guid)
+		if info is not None:
+			info['received_bytes'] = event.get('receivedBytes', 0)
+			info['total_bytes'] = event.get('totalBytes', 0)
+
+		if state == 'canceled':
+			completion = self._download_completions.pop(guid, None)
+			if completion is not None:
+				completion.cancel()
+			self._cdp_downloads_info.pop(guid, None)
+			return
+
+		# Check if download is complete
+		if state != 'completed':
+			return
+		file_path = event.get('filePath')
+		if self.browser_session.is_local:
+			completion = self._download_completions.pop(guid, None)
+			if completion is not None:
+				# _handle_cdp_download confirms the file on disk and dispatches the event
+				if not completion.done():
+					completion.set_result(file_path)
+			elif file_path:
+				self.logger.debug(f'[DownloadsWatchdog] Download completed: {file_path}')
+				# Track the download
+				self._track_download(file_path)
+				# Mark as handled to prevent fallback duplicate dispatch
+				if info is not None:
+					info['handled'] = True
+		else:
+			# Remote browser: do not touch local filesystem. Fallback to downloadPath+suggestedFilename
+			info = info or {}
+			try:
+				suggested_filename = info.get('suggested_filename') or (Path(file_path).name if file_path else 'download')
+				downloads_path = str(self.browser_session.browser_profile.downloads_path or '')
+				effective_path = file_path or str(Path(downloads_path) / suggested_filename)
+				file_name = Path(effective_path).name
+				file_ext = Path(file_name).suffix.lower().lstrip('.')
+				self.event_bus.dispatch(
+					FileDownloadedEvent(
+						url=info.get('url', ''),
+						path=str(effective_path),
+						file_name=file_name,
+						file_size=0,
+						file_type=file_ext if file_ext else None,
+					)
+				)
+				self.logger.debug(f'[DownloadsWatchdog] ✅ (remote) Download completed: {effective_path}')
+			finally:
+				self._download_completions.pop(guid, None)
+				self._cdp_downloads_info.pop(guid, None)
+
 	def _track_download(self, file_path: str) -> None:
 		"""Track a completed download and dispatch the appropriate event.
 
@@ -329,12 +358,6 @@ class DownloadsWatchdog(BaseWatchdog):
 			# We just need to wait for it to appear in the downloads directory
 			expected_path = downloads_dir / suggested_filename
 
-			# Debug: List current directory contents
-			self.logger.debug(f'[DownloadsWatchdog] Downloads directory: {downloads_dir}')
-			if downloads_dir.exists():
-				files_before = list(downloads_dir.iterdir())
-				self.logger.debug(f'[DownloadsWatchdog] Files before download: {[f.name for f in files_before]}')
-
 			# Try manual JavaScript fetch as a fallback for local browsers (disabled for regular local downloads)
 			if self.browser_session.is_local and self._use_js_fetch_for_local:
 				self.logger.debug(f'[DownloadsWatchdog] Attempting JS fetch fallback for {download_url}')
@@ -435,66 +458,114 @@ class DownloadsWatchdog(BaseWatchdog):
 		except Exception as e:
 			self.logger.error(f'[DownloadsWatchdog] ❌ Error handling CDP download: {type(e).__name__} {e}')
 
-		# If we reach here, the fetch method failed, so wait for native download
-		# Poll the downloads directory for new files
-		self.logger.debug(f'[DownloadsWatchdog] Checking if browser auto-download saved the file for us: {suggested_filename}')
-
-		# Get initial list of files in downloads directory
-		initial_files = set()
-		if Path(downloads_dir).exists():
-			for f in Path(downloads_dir).iterdir():
-				if f.is_file() and not f.name.startswith('.'):
-					initial_files.add(f.name)
-
-		# Poll for new files
-		max_wait = 20  # seconds
-		start_time = asyncio.get_event_loop().time()
-
-		while asyncio.get_event_loop().time() - start_time < max_wait:
-			await asyncio.sleep(5.0)  # Check every 5 seconds
-
-			if Path(downloads_dir).exists():
-				for file_path in Path(downloads_dir).iterdir():
-					# Skip hidden files and files that were already there
-					if file_path.is_file() and not file_path.name.startswith('.') and file_path.name not in initial_files:
-						# Check if file has content (> 4 bytes)
-						try:
-							file_size = file_path.stat().st_size
-							if file_size > 4:
-								# Found a new download!
-								self.logger.debug(
-									f'[DownloadsWatchdog] ✅ Found downloaded file: {file_path} ({file_size} bytes)'
-								)
-
-								# Determine file type from extension
-								file_ext = file_path.suffix.lower().lstrip('.')
-								file_type = file_ext if file_ext else None
-
-								# Dispatch download event
-								# Skip if already handled by progress/JS fetch
-								info = self._cdp_downloads_info.get(guid, {})
-								if info.get('handled'):
-									return
-								self.event_bus.dispatch(
-									FileDownloadedEvent(
-										url=download_url,
-										path=str(file_path),
-										file_name=file_path.name,
-										file_size=file_size,
-										file_type=file_type,
-									)
-								)
-								# Mark as handled after dispatch
-								try:
-									if guid in self._cdp_downloads_info:
-										self._cdp_downloads_info[guid]['handled'] = True
-								except (KeyError, AttributeError):
-									pass
-								return
-						except Exception as e:
-							self.logger.debug(f'[DownloadsWatchdog] Error checking file {file_path}: {e}')
-
-		self.logger.warning(f'[DownloadsWatchdog] Download did not complete within {max_wait} seconds')
+		# If we reach here, the fetch method failed, so wait for the browser's native download to land
+		await self._wait_for_native_download(downloads_dir, guid, download_url, suggested_filename)
+
+	async def _wait_for_native_download(self, downloads_dir: Path, guid: str, download_url: str, suggested_filename: str) -> None:
+		"""Dispatch FileDownloadedEvent as soon as the browser reports the download completed and the file is on disk.
+
+		Completion comes from Browser.downloadProgress, correlated by GUID. The file itself is confirmed by watching the
+		downloads directory, which also finds the download if the browser never reports progress.
+		"""
+		completion = self._download_completions.get(guid)
+		info = self._cdp_downloads_info.get(guid, {})
+		started_at = info.get('started_at', time.time())
+		reported_path: str | None = None
+		loop = asyncio.get_running_loop()
+		last_received_bytes = -1
+		deadline = loop.time() + _DOWNLOAD_STALL_TIMEOUT
+
+		try:
+			async with DirectoryWatcher(downloads_dir) as watcher:
+				while True:
+					if completion is not None and completion.done():
+						reported_path = completion.result()  # raises CancelledError if the download was canceled
+					file_path = self._find_completed_download(downloads_dir, suggested_filename, started_at, reported_path)
+					if file_path is not None:
+						break
+
+					# A download that is still receiving bytes isn't stalled
+					received_bytes = info.get('received_bytes', 0)
+					if received_bytes != last_received_bytes:
+						last_received_bytes = received_bytes
+						deadline = loop.time() + _DOWNLOAD_STALL_TIMEOUT
+					remaining = deadline - loop.time()
+					if remaining <= 0:
+						self.logger.warning(
+							f'[DownloadsWatchdog] Download of {suggested_filename} did not complete, no progress for {_DOWNLOAD_STALL_TIMEOUT} seconds'
+						)
+						return
+
+					# Wake up on directory changes or completion; re-check at least every second as a safety net
+					waiters: list[asyncio.Future[Any]] = [asyncio.ensure_future(watcher.wait_for_change(min(remaining, 1.0)))]
+					if completion is not None and not completion.done():
+						waiters.append(asyncio.ensure_future(asyncio.shield(completion)))
+					try:
+						await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+					finally:
+						for waiter in waiters:
+							waiter.cancel()
+		except asyncio.CancelledError:
+			if completion is not None and completion.cancelled():
+				self.logger.debug(f'[DownloadsWatchdog] Download of {suggested_filename} was canceled')
+				return
+			raise
+		finally:
+			self._download_completions.pop(guid, None)
+
+		# Skip if already handled by progress/JS fetch
+		if self._cdp_downloads_info.get(guid, {}).get('handled'):
+			return
+		file_size = file_path.stat().st_size
+		self.logger.debug(f'[DownloadsWatchdog] ✅ Found downloaded file: {file_path} ({file_size} bytes)')
+		# Determine file type from extension
+		file_ext = file_path.suffix.lower().lstrip('.')
+		self.event_bus.dispatch(
+			FileDownloadedEvent(
+				url=download_url,
+				path=str(file_path),
+				file_name=file_path.name,
+				file_size=file_size,
+				file_type=file_ext if file_ext else None,
+			)
+		)
+		# Mark as handled after dispatch
+		if guid in self._cdp_downloads_info:
+			self._cdp_downloads_info[guid]['handled'] = True
+
+	def _find_completed_download(
+		self, downloads_dir: Path, suggested_filename: str, started_at: float, reported_path: str | None
+	) -> Path | None:
+		"""The finished file of a download, if it is on disk yet.
+
+		Uses the path reported by the browser if there is one. Otherwise looks for the suggested filename or its
+		deduplicated variant (`name (1).ext`) written since the download started. Partial `.crdownload` files never match.
+		"""
+		if reported_path:
+			path = Path(reported_path)
+			return path if path.is_file() else None
+
+		stem, ext = os.path.splitext(suggested_filename)
+		already_tracked = set(self.browser_session.downloaded_files)
+		newest: tuple[float, Path] | None = None
+		try:
+			entries = list(os.scandir(downloads_dir))
+		except FileNotFoundError:
+			return None
+		for entry in entries:
+			name = entry.name
+			if name != suggested_filename and not (name.startswith(f'{stem} (') and name.endswith(f'){ext}')):
+				continue
+			try:
+				stat = entry.stat()
+			except FileNotFoundError:
+				continue
+			# mtime has a coarse resolution on some filesystems, allow a little slack
+			if not entry.is_file() or stat.st_size == 0 or stat.st_mtime < started_at - 2 or entry.path in already_tracked:
+				continue
+			if newest is None or stat.st_mtime > newest[0]:
+				newest = (stat.st_mtime, Path(entry.path))
+		return newest[1] if newest else None
 
 	async def _handle_download(self, download: Any) -> None:
 		"""Handle a download event."""
@@ -3,6 +3,7 @@
 import json
 import logging
 import os
+import time
 from datetime import datetime
 from functools import cache
 from pathlib import Path
@@ -341,36 +342,100 @@ def load_and_migrate_config(config_path: Path) -> DBStyleConfigJSON:
 		return new_config
 
 
+# Every env var either config source can read; used to detect when the environment changed under a snapshot
+_ENV_KEYS: tuple[str, ...] = tuple(
+	sorted({name for name, value in vars(OldConfig).items() if isinstance(value, property)} | set(FlatEnvConfig.model_fields))
+)
+
+
+# Minimum number of seconds between two automatic checks of the environment for changes
+_RECHECK_INTERVAL = 1.0
+
+
+def _env_fingerprint() -> tuple:
+	"""Fingerprint of everything a ConfigSnapshot depends on (relevant env vars + the cwd .env file)."""
+	try:
+		dotenv_stat = os.stat('.env')
+		dotenv_key = (os.getcwd(), dotenv_stat.st_mtime_ns, dotenv_stat.st_size)
+	except OSError:
+		dotenv_key = None
+	environ = os.environ
+	return (dotenv_key, *(environ.get(key) for key in _ENV_KEYS))
+
+
+class ConfigSnapshot:
+	"""Immutable view of the configuration at one point in time.
+
+	Values are resolved on first access and memoized for the lifetime of the snapshot,
+	so OldConfig/FlatEnvConfig parsing happens at most once per snapshot instead of once per attribute access.
+	"""
+
+	__slots__ = ('fingerprint', '_old_config', '_env_config', '_values')
+
+	def __init__(self, fingerprint: tuple | None = None):
+		object.__setattr__(self, 'fingerprint', fingerprint if fingerprint is not None else _env_fingerprint())
+		object.__setattr__(self, '_old_config', OldConfig())
+		object.__setattr__(self, '_env_config', None)
+		object.__setattr__(self, '_values', {})
+
+	def __setattr__(self, name: str, value: Any) -> None:
+		raise AttributeError(f"'{self.__class__.__name__}' is immutable, use CONFIG.reload() to pick up new values")
+
+	@property
+	def env_config(self) -> FlatEnvConfig:
+		"""The parsed FlatEnvConfig for this snapshot (constructed once, on first use)."""
+		if self._env_config is None:
+			object.__setattr__(self, '_env_config', FlatEnvConfig())
+		return self._env_config  # type: ignore[return-value]
+
+	def get(self, name: str) -> Any:
+		"""Resolve a config value, raising AttributeError if neither config source defines it."""
+		try:
+			return self._values[name]
+		except KeyError:
+			pass
+
+		# Always prefer old config (it handles env vars with proper transformations)
+		if hasattr(OldConfig, name):
+			value = getattr(self._old_config, name)
+		elif name in FlatEnvConfig.model_fields:
+			# For new MCP-specific attributes not in old config
+			value = getattr(self.env_config, name)
+		else:
+			env_config = self.env_config
+			if not hasattr(env_config, name):
+				raise AttributeError(name)
+			value = getattr(env_config, name)
+
+		self._values[name] = value
+		return value
+
+
 class Config:
 	"""Backward-compatible configuration class that merges all config sources.
 
-	Re-reads environment variables on every access to maintain compatibility.
+	Attribute access is served from a cached ConfigSnapshot. The snapshot is rebuilt explicitly via reload(),
+	or automatically when a relevant env var or the .env file changed, which is checked at most once per
+	_RECHECK_INTERVAL seconds. Code that changes os.environ and reads CONFIG right after should call reload().
 	"""
 
 	def __init__(self):
-		# Cache for directory creation tracking only
-		self._dirs_created = False
+		self._snapshot: ConfigSnapshot | None = None
+		self._next_check_at = 0.0
+		# config.json cache keyed by (path, mtime_ns, size)
+		self._db_config_key: tuple | None = None
+		self._db_config: DBStyleConfigJSON | None = None
 
 	def __getattr__(self, name: str) -> Any:
-		"""Dynamically proxy all attributes to fresh instances.
-
-		This ensures env vars are re-read on every access.
-		"""
+		"""Proxy all attributes to the current config snapshot."""
 		# Special handling for internal attributes
 		if name.startswith('_'):
 			raise AttributeError(f"'{self.__class__.__name__}' object has no attribute '{name}'")
 
-		# Create fresh instances on every access
-		old_config = OldConfig()
-
-		# Always use old config for all attributes (it handles env vars with proper transformations)
-		if hasattr(old_config, name):
-			return getattr(old_config, name)
-
-		# For new MCP-specific attributes not in old config
-		env_config = FlatEnvConfig()
-		if hasattr(env_config, name):
-			return getattr(env_config, name)
+		try:
+			return self.snapshot().get(name)
+		except AttributeError:
+			pass
 
 		# Handle special methods
 		if name == 'get_default_profile':
@@ -381,14 +446,37 @@ class Config:
 			return lambda: self._get_default_agent()
 		elif name == 'load_config':
 			return lambda: self._load_config()
-		elif name == '_ensure_dirs':
-			return lambda: old_config._ensure_dirs()
 
 		raise AttributeError(f"'{self.__class__.__name__}' object has no attribute '{name}'")
 
+	def snapshot(self) -> ConfigSnapshot:
+		"""Return the current config snapshot, rebuilding it if a (throttled) check finds the environment changed."""
+		snapshot = self._snapshot
+		now = time.monotonic()
+		if snapshot is not None and now < self._next_check_at:
+			return snapshot
+
+		self._next_check_at = now + _RECHECK_INTERVAL
+		fingerprint = _env_fingerprint()
+		if snapshot is None or snapshot.fingerprint != fingerprint:
+			snapshot = ConfigSnapshot(fingerprint)
+			self._snapshot = snapshot
+		return snapshot
+
+	def reload(self) -> ConfigSnapshot:
+		"""Drop all cached config state and take a fresh snapshot."""
+		self._snapshot = None
+		self._db_config_key = None
+		self._db_config = None
+		return self.snapshot()
+
+	def _ensure_dirs(self) -> None:
+		"""Create the config, profiles and extensions directories if they don't exist."""
+		self.snapshot()._old_config._ensure_dirs()
+
 	def _get_config_path(self) -> Path:
-		"""Get config path from fresh env config."""
-		env_config = FlatEnvConfig()
+		"""Get config path from the current env config snapshot."""
+		env_config = self.snapshot().env_config
 		if env_config.BROWSER_USE_CONFIG_PATH:
 			return Path(env_config.BROWSER_USE_CONFIG_PATH).expanduser()
 		elif env_config.BROWSER_USE_CONFIG_DIR:
@@ -397,10 +485,26 @@ class Config:
 			xdg_config = Path(env_config.XDG_CONFIG_HOME).expanduser()
 			return xdg_config / 'browseruse' / 'config.json'
 
+	@staticmethod
+	def _db_config_cache_key(config_path: Path) -> tuple | None:
+		try:
+			stat = config_path.stat()
+		except OSError:
+			return None
+		return (str(config_path), stat.st_mtime_ns, stat.st_size)
+
 	def _get_db_config(self) -> DBStyleConfigJSON:
-		"""Load and migrate config.json."""
+		"""Load and migrate config.json, re-reading it from disk only when the file changed."""
 		config_path = self._get_config_path()
-		return load_and_migrate_config(config_path)
+		cache_key = self._db_config_cache_key(config_path)
+		if cache_key is not None and cache_key == self._db_config_key and self._db_config is not None:
+			return self._db_config.model_copy(deep=True)
+
+		db_config = load_and_migrate_config(config_path)
+		# stat again: load_and_migrate_config may have (re)written the file
+		self._db_config_key = self._db_config_cache_key(config_path)
+		self._db_config = db_config
+		return db_config.model_copy(deep=True)
 
 	def _get_default_profile(self) -> dict[str, Any]:
 		"""Get the default browser profile configuration."""
@@ -449,8 +553,7 @@ class Config:
 			'agent': self._get_default_agent(),
 		}
 
-		# Fresh env config for overrides
-		env_config = FlatEnvConfig()
+		env_config = self.snapshot().env_config
 
 		# Apply MCP-specific env var overrides
 		if env_config.BROWSER_USE_HEADLESS is not None:
@@ -17,9 +17,9 @@ from browser_use.dom.views import DOMRect, EnhancedSnapshotNode
 # Only the ESSENTIAL computed styles for interactivity and visibility detection
 REQUIRED_COMPUTED_STYLES = [
 	# Only styles actually accessed in the codebase (prevents Chrome crashes on heavy sites)
-	'display',  # Used in service.py visibility detection
-	'visibility',  # Used in service.py visibility detection
-	'opacity',  # Used in service.py visibility detection
+	'display',  # Used in views.py visibility detection
+	'visibility',  # Used in views.py visibility detection
+	'opacity',  # Used in views.py visibility detection
 	'overflow',  # Used in views.py scrollability detection
 	'overflow-x',  # Used in views.py scrollability detection
 	'overflow-y',  # Used in views.py scrollability detection
@@ -56,6 +56,10 @@ def build_snapshot_lookup(
 
 	strings = snapshot['strings']
 
+	# Elements share a handful of distinct style combinations, so each combination is parsed (and checked for whether
+	# it hides the element) once per snapshot, and nodes with the same styles share one computed_styles dict
+	parsed_styles: dict[tuple[int, ...], tuple[dict[str, str], bool]] = {}
+
 	for document in snapshot['documents']:
 		nodes: NodeTreeSnapshot = document['nodes']
 		layout: LayoutTreeSnapshot = document['layout']
@@ -85,6 +89,7 @@ def build_snapshot_lookup(
 			is_visible = None
 			bounding_box = None
 			computed_styles = {}
+			is_hidden_by_styles = False
 
 			# Look for layout tree node that corresponds to this snapshot node
 			paint_order = None
@@ -112,7 +117,13 @@ def build_snapshot_lookup(
 					# Parse computed styles for this layout node
 					if layout_idx < len(layout.get('styles', [])):
 						style_indices = layout['styles'][layout_idx]
-						computed_styles = _parse_computed_styles(strings, style_indices)
+						style_key = tuple(style_indices)
+						parsed = parsed_styles.get(style_key)
+						if parsed is None:
+							styles = _parse_computed_styles(strings, style_indices)
+							parsed = (styles, EnhancedSnapshotNode.styles_hide_element(styles))
+							parsed_styles[style_key] = parsed
+						computed_styles, is_hidden_by_styles = parsed
 						cursor_style = computed_styles.get('cursor')
 
 					# Extract paint order if available
@@ -156,6 +167,7 @@ def build_snapshot_lookup(
 				computed_styles=computed_styles if computed_styles else None,
 				paint_order=paint_order,
 				stacking_contexts=stacking_contexts,
+				is_hidden_by_styles=is_hidden_by_styles,
 			)
 
 	return snapshot_lookup
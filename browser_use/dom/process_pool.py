@@ -0,0 +1,259 @@
+"""
+Building and serializing the DOM in worker processes.
+
+Building the enhanced DOM tree and serializing it are pure-Python CPU work on the CDP payloads. On the event loop they
+hold up CDP I/O and every other agent of the process, so hosts that run many agents can hand them to a pool of worker
+processes instead (`BrowserProfile(dom_process_pool_size=...)`). The pool is shared by all browser sessions of the
+process.
+
+Workers return the result as a flat table of nodes that refer to each other by index (`PackedDOMState`). Pickling the
+linked tree directly would recurse through every parent/child pointer, and the table is rebuilt into the same objects in
+a single pass.
+"""
+
+import asyncio
+import functools
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, fields
+from typing import Any
+
+from cdp_use.cdp.target.types import SessionID, TargetID
+
+from browser_use.dom.views import (
+	EnhancedDOMTreeNode,
+	SerializedDOMState,
+	SimplifiedNode,
+	TargetAllTrees,
+)
+from browser_use.profiling import profile_span, record_span
+
+logger = logging.getLogger(__name__)
+
+_NO_NODE = -1
+
+# Fields that link nodes to each other, stored as indices into the node table
+_TREE_LINK_FIELDS = ('parent_node', 'content_document', 'shadow_roots', 'children_nodes')
+_NODE_VALUE_FIELDS = tuple(f.name for f in fields(EnhancedDOMTreeNode) if f.name not in _TREE_LINK_FIELDS)
+_SIMPLIFIED_VALUE_FIELDS = tuple(f.name for f in fields(SimplifiedNode) if f.name not in ('original_node', 'children'))
+
+
+@dataclass
+class PackedDOMState:
+	"""A `SerializedDOMState` and its enhanced DOM tree as flat tables, see the module docstring"""
+
+	nodes: list[tuple[Any, ...]]
+	"""Values of each `EnhancedDOMTreeNode`, in `_NODE_VALUE_FIELDS` order"""
+	node_links: list[tuple[int, int, list[int] | None, list[int] | None]]
+	"""(parent_node, content_document, shadow_roots, children_nodes) of each node, as node indices"""
+	root: int
+	simplified_nodes: list[tuple[int, list[int], tuple[Any, ...]]]
+	"""(original_node, children, values in `_SIMPLIFIED_VALUE_FIELDS` order) of each `SimplifiedNode`"""
+	simplified_root: int
+	selector_map: dict[int, int]
+	"""Highlight index -> node index"""
+
+
+def pack_dom_state(state: SerializedDOMState, root: EnhancedDOMTreeNode) -> PackedDOMState:
+	"""Flatten a serialized DOM state and its enhanced DOM tree into a `PackedDOMState`"""
+	index_by_id: dict[int, int] = {}
+	node_list: list[EnhancedDOMTreeNode] = []
+
+	def node_index(node: EnhancedDOMTreeNode | None) -> int:
+		if node is None:
+			return _NO_NODE
+		index = index_by_id.get(id(node))
+		if index is None:
+			index = index_by_id[id(node)] = len(node_list)
+			node_list.append(node)
+		return index
+
+	packed_root = node_index(root)
+
+	simplified_nodes: list[tuple[int, list[int], tuple[Any, ...]]] = []
+	if state._root is not None:
+		# Children are numbered when their parent is written, so the table can be rebuilt front to back
+		simplified_list = [state._root]
+		for simplified in simplified_list:
+			first_child = len(simplified_list)
+			simplified_list.extend(simplified.children)
+			simplified_nodes.append(
+				(
+					node_index(simplified.original_node),
+					list(range(first_child, len(simplified_list))),
+					tuple(getattr(simplified, name) for name in _SIMPLIFIED_VALUE_FIELDS),
+				)
+			)
+
+	selector_map = {highlight_index: node_index(node) for highlight_index, node in state.selector_map.items()}
+
+	# Nodes are numbered as they're first referenced, so this also numbers and links every node reachable from the ones above
+	node_links: list[tuple[int, int, list[int] | None, list[int] | None]] = []
+	for node in node_list:
+		node_links.append(
+			(
+				node_index(node.parent_node),
+				node_index(node.content_document),
+				[node_index(shadow_root) for shadow_root in node.shadow_roots] if node.shadow_roots is not None else None,
+				[node_index(child) for child in node.children_nodes] if node.children_nodes is not None else None,
+			)
+		)
+
+	return PackedDOMState(
+		nodes=[tuple(getattr(node, name) for name in _NODE_VALUE_FIELDS) for node in node_list],
+		node_links=node_links,
+		root=packed_root,
+		simplified_nodes=simplified_nodes,
+		simplified_root=0 if simplified_nodes else _NO_NODE,
+		selector_map=selector_map,
+	)
+
+
+def unpack_dom_state(packed: PackedDOMState) -> tuple[SerializedDOMState, EnhancedDOMTreeNode]:
+	"""Rebuild the serialized DOM state and enhanced DOM tree of a `PackedDOMState`"""
+	nodes = [
+		EnhancedDOMTreeNode(
+			**dict(zip(_NODE_VALUE_FIELDS, values)),
+			parent_node=None,
+			content_document=None,
+			shadow_roots=None,
+			children_nodes=None,
+		)
+		for values in packed.nodes
+	]
+	for node, (parent, content_document, shadow_roots, children) in zip(nodes, packed.node_links):
+		if parent != _NO_NODE:
+			node.parent_node = nodes[parent]
+		if content_document != _NO_NODE:
+			node.content_document = nodes[content_document]
+		if shadow_roots is not None:
+			node.shadow_roots = [nodes[index] for index in shadow_roots]
+		if children is not None:
+			node.children_nodes = [nodes[index] for index in children]
+
+	simplified_nodes = [
+		SimplifiedNode(original_node=nodes[original_node], children=[], **dict(zip(_SIMPLIFIED_VALUE_FIELDS, values)))
+		for original_node, _, values in packed.simplified_nodes
+	]
+	for simplified, (_, children, _) in zip(simplified_nodes, packed.simplified_nodes):
+		simplified.children = [simplified_nodes[index] for index in children]
+
+	state = SerializedDOMState(
+		_root=simplified_nodes[packed.simplified_root] if packed.simplified_root != _NO_NODE else None,
+		selector_map={highlight_index: nodes[index] for highlight_index, index in packed.selector_map.items()},
+	)
+	return state, nodes[packed.root]
+
+
+@dataclass
+class _WorkerResult:
+	packed: PackedDOMState
+	timing: dict[str, float]
+	build_span: tuple[float, float]
+	serialize_span: tuple[float, float]
+
+
+def _build_and_serialize(
+	trees: TargetAllTrees,
+	target_id: TargetID,
+	session_id: SessionID | None,
+	previous_backend_node_ids: frozenset[int] | None,
+	paint_order_filtering: bool,
+	load_cross_origin_iframes: bool,
+) -> _WorkerResult | None:
+	"""Runs in a worker process. Returns None if the page has cross-origin iframes to load, which needs the browser."""
+	from browser_use.dom.serializer.serializer import DOMTreeSerializer
+	from browser_use.dom.tree_builder import build_enhanced_dom_tree, should_load_cross_origin_iframe
+
+	build_start = time.time()
+	root, cross_origin_iframes = build_enhanced_dom_tree(
+		trees, target_id, session_id, collect_cross_origin_iframes=load_cross_origin_iframes, logger=logger
+	)
+	if any(should_load_cross_origin_iframe(iframe_node, logger) for iframe_node, _ in cross_origin_iframes):
+		return None
+	build_end = time.time()
+
+	state, timing = DOMTreeSerializer(
+		root, paint_order_filtering=paint_order_filtering, previous_backend_node_ids=previous_backend_node_ids
+	).serialize_accessible_elements()
+	serialize_end = time.time()
+	timing['serialize_dom_tree_total'] = serialize_end - build_end
+
+	return _WorkerResult(
+		packed=pack_dom_state(state, root),
+		timing=timing,
+		build_span=(build_start, build_end),
+		serialize_span=(build_end, serialize_end),
+	)
+
+
+_pools: dict[int, ProcessPoolExecutor] = {}
+
+
+def get_dom_process_pool(size: int) -> ProcessPoolExecutor:
+	"""The shared pool of `size` worker processes, started on first use"""
+	pool = _pools.get(size)
+	if pool is None:
+		# spawn instead of fork: forking a process with a running event loop and threads isn't safe
+		pool = _pools[size] = ProcessPoolExecutor(max_workers=size, mp_context=multiprocessing.get_context('spawn'))
+	return pool
+
+
+def shutdown_dom_process_pools() -> None:
+	"""Stop the worker processes of all DOM process pools"""
+	for pool in _pools.values():
+		pool.shutdown(wait=True, cancel_futures=True)
+	_pools.clear()
+
+
+async def build_and_serialize_in_process_pool(
+	pool_size: int,
+	trees: TargetAllTrees,
+	target_id: TargetID,
+	session_id: SessionID | None,
+	previous_cached_state: SerializedDOMState | None,
+	paint_order_filtering: bool,
+	load_cross_origin_iframes: bool,
+) -> tuple[SerializedDOMState, EnhancedDOMTreeNode, dict[str, float]] | None:
+	"""Build and serialize the DOM tree of the payloads in the shared process pool.
+
+	Returns None if it has to be built on the event loop instead: the page has visible cross-origin iframes, whose
+	content is loaded from the browser while building, or the pool broke (e.g. a worker was killed).
+	"""
+	previous_backend_node_ids = (
+		previous_cached_state.identity_index.backend_node_ids
+		if previous_cached_state and previous_cached_state.selector_map
+		else None
+	)
+	task = functools.partial(
+		_build_and_serialize,
+		trees,
+		target_id,
+		session_id,
+		previous_backend_node_ids,
+		paint_order_filtering,
+		load_cross_origin_iframes,
+	)
+
+	pool = get_dom_process_pool(pool_size)
+	try:
+		result = await asyncio.get_running_loop().run_in_executor(pool, task)
+	except BrokenProcessPool as e:
+		logger.warning(f'DOM process pool broke, building this DOM tree on the event loop: {type(e).__name__}: {e}')
+		if _pools.get(pool_size) is pool:
+			del _pools[pool_size]
+		return None
+	if result is None:
+		logger.debug('Page has cross-origin iframes to load, building its DOM tree on the event loop')
+		return None
+
+	record_span('build_tree', *result.build_span, process_pool=True)
+	record_span('serialize', *result.serialize_span, process_pool=True)
+	start = time.time()
+	with profile_span('unpack'):
+		state, root = unpack_dom_state(result.packed)
+	result.timing['unpack_dom_state'] = time.time() - start
+	return state, root, result.timing
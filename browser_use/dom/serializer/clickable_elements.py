@@ -1,4 +1,72 @@
-from browser_use.dom.views import EnhancedDOMTreeNode, NodeType
+import re
+
+from browser_use.dom.views import EnhancedAXProperty, EnhancedDOMTreeNode, NodeType
+
+# Lookup tables are built once at import time instead of on every call
+
+_NON_INTERACTIVE_TAGS = frozenset({'html', 'body'})
+_FRAME_TAGS = frozenset({'iframe', 'frame'})
+
+# Note: 'label' removed - labels are handled by other attribute checks below - other wise labels with "for" attribute can destroy the real clickable element on apartments.com
+_INTERACTIVE_TAGS = frozenset({'button', 'input', 'select', 'textarea', 'a', 'details', 'summary', 'option', 'optgroup'})
+
+_INTERACTIVE_ATTRIBUTES = frozenset({'onclick', 'onmousedown', 'onmouseup', 'onkeydown', 'onkeyup', 'tabindex'})
+
+_INTERACTIVE_ROLES = frozenset(
+	{
+		'button',
+		'link',
+		'menuitem',
+		'option',
+		'radio',
+		'checkbox',
+		'tab',
+		'textbox',
+		'combobox',
+		'slider',
+		'spinbutton',
+		'search',
+		'searchbox',
+	}
+)
+_INTERACTIVE_AX_ROLES = _INTERACTIVE_ROLES | {'listbox'}
+
+# Small elements with these attributes are likely interactive icons
+_ICON_ATTRIBUTES = frozenset({'class', 'role', 'onclick', 'data-action', 'aria-label'})
+
+# Search-related substrings in class names, ids and data-* values ('search-icon', 'search-btn', 'search-button' and
+# 'searchbox' are all covered by 'search')
+_SEARCH_INDICATORS_RE = re.compile('search|magnify|glass|lookup|find|query')
+
+# AX property name -> (only applies if the property value is truthy, is_interactive verdict)
+_AX_PROPERTY_VERDICTS: dict[str, tuple[bool, bool]] = {
+	# aria disabled / aria hidden
+	'disabled': (True, False),
+	'hidden': (True, False),
+	# Direct interactiveness indicators
+	'focusable': (True, True),
+	'editable': (True, True),
+	'settable': (True, True),
+	# Interactive state properties (presence indicates interactive widget, these only exist on interactive elements)
+	'checked': (False, True),
+	'expanded': (False, True),
+	'pressed': (False, True),
+	'selected': (False, True),
+	# Form-related interactiveness
+	'required': (True, True),
+	'autocomplete': (True, True),
+	# Elements with keyboard shortcuts are interactive
+	'keyshortcuts': (True, True),
+}
+
+
+def _ax_properties_verdict(properties: list[EnhancedAXProperty]) -> bool | None:
+	"""Verdict of the first decisive AX property, or None if no property decides."""
+	for prop in properties:
+		rule = _AX_PROPERTY_VERDICTS.get(prop.name)
+		if rule is not None and (prop.value or not rule[0]):
+			return rule[1]
+	return None
 
 
 class ClickableElementDetector:
@@ -14,100 +82,42 @@ class ClickableElementDetector:
 		# if node.ax_node and node.ax_node.ignored:
 		# 	return False
 
+		tag_name = node.tag_name
+		attributes = node.attributes
+		snapshot_node = node.snapshot_node
+		bounds = snapshot_node.bounds if snapshot_node else None
+
 		# remove html and body nodes
-		if node.tag_name in {'html', 'body'}:
+		if tag_name in _NON_INTERACTIVE_TAGS:
 			return False
 
 		# IFRAME elements should be interactive if they're large enough to potentially need scrolling
 		# Small iframes (< 100px width or height) are unlikely to have scrollable content
-		if node.tag_name and node.tag_name.upper() == 'IFRAME' or node.tag_name.upper() == 'FRAME':
-			if node.snapshot_node and node.snapshot_node.bounds:
-				width = node.snapshot_node.bounds.width
-				height = node.snapshot_node.bounds.height
-				# Only include iframes larger than 100x100px
-				if width > 100 and height > 100:
-					return True
+		if tag_name in _FRAME_TAGS and bounds and bounds.width > 100 and bounds.height > 100:
+			return True
 
 		# RELAXED SIZE CHECK: Allow all elements including size 0 (they might be interactive overlays, etc.)
 		# Note: Size 0 elements can still be interactive (e.g., invisible clickable overlays)
 		# Visibility is determined separately by CSS styles, not just bounding box size
 
-		# SEARCH ELEMENT DETECTION: Check for search-related classes and attributes
-		if node.attributes:
-			search_indicators = {
-				'search',
-				'magnify',
-				'glass',
-				'lookup',
-				'find',
-				'query',
-				'search-icon',
-				'search-btn',
-				'search-button',
-				'searchbox',
-			}
-
-			# Check class names for search indicators
-			class_list = node.attributes.get('class', '').lower().split()
-			if any(indicator in ' '.join(class_list) for indicator in search_indicators):
+		# SEARCH ELEMENT DETECTION: Check class names, id and data attributes for search indicators
+		if attributes:
+			search = _SEARCH_INDICATORS_RE.search
+			if search(attributes.get('class', '').lower()) or search(attributes.get('id', '').lower()):
 				return True
-
-			# Check id for search indicators
-			element_id = node.attributes.get('id', '').lower()
-			if any(indicator in element_id for indicator in search_indicators):
-				return True
-
-			# Check data attributes for search functionality
-			for attr_name, attr_value in node.attributes.items():
-				if attr_name.startswith('data-') and any(indicator in attr_value.lower() for indicator in search_indicators):
+			for attr_name, attr_value in attributes.items():
+				if attr_name.startswith('data-') and search(attr_value.lower()):
 					return True
 
 		# Enhanced accessibility property checks - direct clear indicators only
-		if node.ax_node and node.ax_node.properties:
-			for prop in node.ax_node.properties:
-				try:
-					# aria disabled
-					if prop.name == 'disabled' and prop.value:
-						return False
-
-					# aria hidden
-					if prop.name == 'hidden' and prop.value:
-						return False
-
-					# Direct interactiveness indicators
-					if prop.name in ['focusable', 'editable', 'settable'] and prop.value:
-						return True
-
-					# Interactive state properties (presence indicates interactive widget)
-					if prop.name in ['checked', 'expanded', 'pressed', 'selected']:
-						# These properties only exist on interactive elements
-						return True
-
-					# Form-related interactiveness
-					if prop.name in ['required', 'autocomplete'] and prop.value:
-						return True
-
-					# Elements with keyboard shortcuts are interactive
-					if prop.name == 'keyshortcuts' and prop.value:
-						return True
-				except (AttributeError, ValueError):
-					# Skip properties we can't process
-					continue
-
-				# ENHANCED TAG CHECK: Include truly interactive elements
-		# Note: 'label' removed - labels are handled by other attribute checks below - other wise labels with "for" attribute can destroy the real clickable element on apartments.com
-		interactive_tags = {
-			'button',
-			'input',
-			'select',
-			'textarea',
-			'a',
-			'details',
-			'summary',
-			'option',
-			'optgroup',
-		}
-		if node.tag_name in interactive_tags:
+		ax_node = node.ax_node
+		if ax_node and ax_node.properties:
+			verdict = _ax_properties_verdict(ax_node.properties)
+			if verdict is not None:
+				return verdict
+
+		# ENHANCED TAG CHECK: Include truly interactive elements
+		if tag_name in _INTERACTIVE_TAGS:
 			return True
 
 		# SVG elements need special handling - only interactive if they have explicit handlers
@@ -130,70 +140,29 @@ class ClickableElementDetector:
 		# 	# Otherwise, SVG elements are decorative
 		# 	return False
 
-		# Tertiary check: elements with interactive attributes
-		if node.attributes:
-			# Check for event handlers or interactive attributes
-			interactive_attributes = {'onclick', 'onmousedown', 'onmouseup', 'onkeydown', 'onkeyup', 'tabindex'}
-			if any(attr in node.attributes for attr in interactive_attributes):
+		# Tertiary check: elements with event handlers, interactive attributes or interactive ARIA roles
+		if attributes:
+			if not _INTERACTIVE_ATTRIBUTES.isdisjoint(attributes):
+				return True
+			if attributes.get('role') in _INTERACTIVE_ROLES:
 				return True
-
-			# Check for interactive ARIA roles
-			if 'role' in node.attributes:
-				interactive_roles = {
-					'button',
-					'link',
-					'menuitem',
-					'option',
-					'radio',
-					'checkbox',
-					'tab',
-					'textbox',
-					'combobox',
-					'slider',
-					'spinbutton',
-					'search',
-					'searchbox',
-				}
-				if node.attributes['role'] in interactive_roles:
-					return True
 
 		# Quaternary check: accessibility tree roles
-		if node.ax_node and node.ax_node.role:
-			interactive_ax_roles = {
-				'button',
-				'link',
-				'menuitem',
-				'option',
-				'radio',
-				'checkbox',
-				'tab',
-				'textbox',
-				'combobox',
-				'slider',
-				'spinbutton',
-				'listbox',
-				'search',
-				'searchbox',
-			}
-			if node.ax_node.role in interactive_ax_roles:
-				return True
+		if ax_node and ax_node.role in _INTERACTIVE_AX_ROLES:
+			return True
 
 		# ICON AND SMALL ELEMENT CHECK: Elements that might be icons
 		if (
-			node.snapshot_node
-			and node.snapshot_node.bounds
-			and 10 <= node.snapshot_node.bounds.width <= 50  # Icon-sized elements
-			and 10 <= node.snapshot_node.bounds.height <= 50
+			bounds
+			and attributes
+			and 10 <= bounds.width <= 50  # Icon-sized elements
+			and 10 <= bounds.height <= 50
+			and not _ICON_ATTRIBUTES.isdisjoint(attributes)
 		):
-			# Check if this small element has interactive properties
-			if node.attributes:
-				# Small elements with these attributes are likely interactive icons
-				icon_attributes = {'class', 'role', 'onclick', 'data-action', 'aria-label'}
-				if any(attr in node.attributes for attr in icon_attributes):
-					return True
+			return True
 
 		# Final fallback: cursor style indicates interactivity (for cases Chrome missed)
-		if node.snapshot_node and node.snapshot_node.cursor_style and node.snapshot_node.cursor_style == 'pointer':
+		if snapshot_node and snapshot_node.cursor_style == 'pointer':
 			return True
 
 		return False
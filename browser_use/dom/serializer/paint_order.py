@@ -133,24 +133,17 @@ class PaintOrderRemover:
 	Calculates which elements should be removed based on the paint order parameter.
 	"""
 
-	def __init__(self, root: SimplifiedNode):
+	def __init__(self, root: SimplifiedNode | None = None, nodes: list[SimplifiedNode] | None = None):
+		"""
+		Args:
+			root: Simplified tree to collect the nodes with paint order and bounds from.
+			nodes: Nodes with paint order and bounds, in tree pre-order, if the caller already collected them.
+		"""
 		self.root = root
+		self.nodes = nodes
 
 	def calculate_paint_order(self) -> None:
-		all_simplified_nodes_with_paint_order: list[SimplifiedNode] = []
-
-		def collect_paint_order(node: SimplifiedNode) -> None:
-			if (
-				node.original_node.snapshot_node
-				and node.original_node.snapshot_node.paint_order is not None
-				and node.original_node.snapshot_node.bounds is not None
-			):
-				all_simplified_nodes_with_paint_order.append(node)
-
-			for child in node.children:
-				collect_paint_order(child)
-
-		collect_paint_order(self.root)
+		all_simplified_nodes_with_paint_order = self.nodes if self.nodes is not None else self._collect_paint_order_nodes()
 
 		grouped_by_paint_order: defaultdict[int, list[SimplifiedNode]] = defaultdict(list)
 
@@ -195,3 +188,21 @@ class PaintOrderRemover:
 				rect_union.add(rect)
 
 		return None
+
+	def _collect_paint_order_nodes(self) -> list[SimplifiedNode]:
+		"""Collect the nodes that have paint order and bounds, in pre-order."""
+		all_simplified_nodes_with_paint_order: list[SimplifiedNode] = []
+		stack = [self.root] if self.root else []
+
+		while stack:
+			node = stack.pop()
+			if (
+				node.original_node.snapshot_node
+				and node.original_node.snapshot_node.paint_order is not None
+				and node.original_node.snapshot_node.bounds is not None
+			):
+				all_simplified_nodes_with_paint_order.append(node)
+
+			stack.extend(reversed(node.children))
+
+		return all_simplified_nodes_with_paint_order
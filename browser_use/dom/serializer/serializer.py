@@ -1,11 +1,16 @@
 # @file purpose: Serializes enhanced DOM trees to string format for LLM consumption
 
-from typing import Any
+import io
+import itertools
+from collections.abc import Iterator
+from dataclasses import dataclass
+from typing import Any, Literal
 
 from browser_use.dom.serializer.clickable_elements import ClickableElementDetector
 from browser_use.dom.serializer.paint_order import PaintOrderRemover
 from browser_use.dom.utils import cap_text_length
 from browser_use.dom.views import (
+	BudgetedDOMText,
 	DOMRect,
 	DOMSelectorMap,
 	EnhancedDOMTreeNode,
@@ -14,10 +19,37 @@ from browser_use.dom.views import (
 	SerializedDOMState,
 	SimplifiedNode,
 )
+from browser_use.profiling import record_span
 
 DISABLED_ELEMENTS = {'style', 'script', 'head', 'meta', 'link', 'title'}
 
 
+@dataclass(slots=True)
+class _SimplifyFrame:
+	"""A node on the explicit stack of the simplify/optimize pass, whose children are still being processed."""
+
+	node: EnhancedDOMTreeNode
+	children: list[EnhancedDOMTreeNode]
+	simplified: SimplifiedNode | None  # None for DOCUMENT nodes, which are replaced by their first meaningful child
+	paint_order_start: int  # length of the paint order candidate list when this node was entered
+	keep_if_childless: bool = False
+	next_child: int = 0
+	simplified_children_count: int = 0  # children kept by simplification, before optimization removes any
+
+
+@dataclass(slots=True)
+class _TreeLine:
+	"""A line of the serialized tree, formatted only once it is known to be part of the output."""
+
+	node: SimplifiedNode
+	depth: int
+	kind: Literal['element', 'text', 'shadow_start', 'shadow_end']
+
+
+def _has_paint_order(node: EnhancedDOMTreeNode) -> bool:
+	return bool(node.snapshot_node and node.snapshot_node.paint_order is not None and node.snapshot_node.bounds is not None)
+
+
 class DOMTreeSerializer:
 	"""Serializes enhanced DOM trees to string format."""
 
@@ -43,11 +75,16 @@ class DOMTreeSerializer:
 		enable_bbox_filtering: bool = True,
 		containment_threshold: float | None = None,
 		paint_order_filtering: bool = True,
+		previous_backend_node_ids: frozenset[int] | None = None,
 	):
 		self.root_node = root_node
 		self._interactive_counter = 1
 		self._selector_map: DOMSelectorMap = {}
-		self._previous_cached_selector_map = previous_cached_state.selector_map if previous_cached_state else None
+		# Computed once per cached state, so new element detection is a set lookup per element. Can be passed
+		# instead of the cached state where that isn't available (e.g. serializing in a worker process)
+		if previous_backend_node_ids is None and previous_cached_state and previous_cached_state.selector_map:
+			previous_backend_node_ids = previous_cached_state.identity_index.backend_node_ids
+		self._previous_backend_node_ids = previous_backend_node_ids
 		# Add timing tracking
 		self.timing_info: dict[str, float] = {}
 		# Cache for clickable element detection to avoid redundant calls
@@ -85,44 +122,33 @@ class DOMTreeSerializer:
 		self._semantic_groups = []
 		self._clickable_cache = {}  # Clear cache for new serialization
 
-		# Step 1: Create simplified tree (includes clickable element detection)
+		# Step 1: Create the simplified tree and optimize it (remove unnecessary parents) in a single post-order pass,
+		# collecting the nodes that take part in paint order filtering along the way
 		start_step1 = time.time()
-		simplified_tree = self._create_simplified_tree(self.root_node)
+		optimized_tree, paint_order_nodes = self._create_optimized_tree(self.root_node)
 		end_step1 = time.time()
 		self.timing_info['create_simplified_tree'] = end_step1 - start_step1
+		record_span('create_simplified_tree', start_step1, end_step1)
 
 		# Step 2: Remove elements based on paint order
-		start_step3 = time.time()
-		if self.paint_order_filtering and simplified_tree:
-			PaintOrderRemover(simplified_tree).calculate_paint_order()
-		end_step3 = time.time()
-		self.timing_info['calculate_paint_order'] = end_step3 - start_step3
-
-		# Step 3: Optimize tree (remove unnecessary parents)
 		start_step2 = time.time()
-		optimized_tree = self._optimize_tree(simplified_tree)
+		if self.paint_order_filtering and paint_order_nodes:
+			PaintOrderRemover(nodes=paint_order_nodes).calculate_paint_order()
 		end_step2 = time.time()
-		self.timing_info['optimize_tree'] = end_step2 - start_step2
-
-		# Step 3: Apply bounding box filtering (NEW)
-		if self.enable_bbox_filtering and optimized_tree:
-			start_step3 = time.time()
-			filtered_tree = self._apply_bounding_box_filtering(optimized_tree)
-			end_step3 = time.time()
-			self.timing_info['bbox_filtering'] = end_step3 - start_step3
-		else:
-			filtered_tree = optimized_tree
+		self.timing_info['calculate_paint_order'] = end_step2 - start_step2
+		record_span('calculate_paint_order', start_step2, end_step2)
 
-		# Step 4: Assign interactive indices to clickable elements
-		start_step4 = time.time()
-		self._assign_interactive_indices_and_mark_new_nodes(filtered_tree)
-		end_step4 = time.time()
-		self.timing_info['assign_interactive_indices'] = end_step4 - start_step4
+		# Step 3: Apply bounding box filtering and assign interactive indices to clickable elements in a single pre-order pass
+		start_step3 = time.time()
+		self._assign_interactive_indices_and_mark_new_nodes(optimized_tree)
+		end_step3 = time.time()
+		self.timing_info['assign_interactive_indices'] = end_step3 - start_step3
+		record_span('assign_interactive_indices', start_step3, end_step3)
 
 		end_total = time.time()
 		self.timing_info['serialize_accessible_elements_total'] = end_total - start_total
 
-		return SerializedDOMState(_root=filtered_tree, selector_map=self._selector_map), self.timing_info
+		return SerializedDOMState(_root=optimized_tree, selector_map=self._selector_map), self.timing_info
 
 	def _add_compound_components(self, simplified: SimplifiedNode, node: EnhancedDOMTreeNode) -> None:
 		"""Enhance compound controls with information from their child components."""
@@ -421,29 +447,87 @@ class DOMTreeSerializer:
 
 		return self._clickable_cache[node.node_id]
 
-	def _create_simplified_tree(self, node: EnhancedDOMTreeNode, depth: int = 0) -> SimplifiedNode | None:
-		"""Step 1: Create a simplified tree with enhanced element detection."""
+	def _create_optimized_tree(self, root: EnhancedDOMTreeNode) -> tuple[SimplifiedNode | None, list[SimplifiedNode]]:
+		"""
+		Steps 1+2: Create the simplified tree and optimize it in a single iterative post-order pass.
+
+		Uses an explicit stack instead of recursion so deeply nested pages can't hit the recursion limit.
+		Returns the optimized tree and the nodes of the (un-optimized) simplified tree that have paint order
+		and bounds, in pre-order, which is what PaintOrderRemover works on.
+		"""
+		paint_order_nodes: list[SimplifiedNode] = []
+		stack: list[_SimplifyFrame] = []
+		opened = self._open_simplify_frame(root, paint_order_nodes)
+
+		while True:
+			if isinstance(opened, _SimplifyFrame):
+				stack.append(opened)
+				child_result = None
+			else:
+				child_result = (opened, opened is not None and self._keep_after_optimization(opened))
+
+			# Close finished frames, handing each result to its parent
+			while stack:
+				frame = stack[-1]
+				if child_result is not None:
+					simplified_child, keep_optimized = child_result
+					child_result = None
+					if simplified_child is not None:
+						if frame.simplified is None:
+							# DOCUMENT nodes are represented by their first child that produces anything
+							stack.pop()
+							child_result = (simplified_child, keep_optimized)
+							continue
+						frame.simplified_children_count += 1
+						if keep_optimized:
+							frame.simplified.children.append(simplified_child)
+
+				if frame.next_child < len(frame.children):
+					break
+
+				stack.pop()
+				simplified = self._close_simplify_frame(frame)
+				if simplified is None:
+					# Drop the paint order candidates collected for this node and its subtree
+					del paint_order_nodes[frame.paint_order_start :]
+					child_result = (None, False)
+				else:
+					child_result = (simplified, self._keep_after_optimization(simplified))
+
+			if not stack:
+				break
+
+			frame = stack[-1]
+			child = frame.children[frame.next_child]
+			frame.next_child += 1
+			opened = self._open_simplify_frame(child, paint_order_nodes)
+
+		assert child_result is not None
+		simplified_root, keep_optimized = child_result
+		return (simplified_root if keep_optimized else None), paint_order_nodes
+
+	def _open_simplify_frame(
+		self, node: EnhancedDOMTreeNode, paint_order_nodes: list[SimplifiedNode]
+	) -> '_SimplifyFrame | SimplifiedNode | None':
+		"""Start simplifying a node: returns a frame whose children still need processing, a finished leaf, or None if dropped."""
 
 		if node.node_type == NodeType.DOCUMENT_NODE:
 			# for all cldren including shadow roots
-			for child in node.children_and_shadow_roots:
-				simplified_child = self._create_simplified_tree(child, depth + 1)
-				if simplified_child:
-					return simplified_child
-
-			return None
+			return _SimplifyFrame(
+				node=node,
+				children=node.children_and_shadow_roots,
+				simplified=None,
+				paint_order_start=len(paint_order_nodes),
+			)
 
 		if node.node_type == NodeType.DOCUMENT_FRAGMENT_NODE:
 			# ENHANCED shadow DOM processing - always include shadow content
 			simplified = SimplifiedNode(original_node=node, children=[])
-			for child in node.children_and_shadow_roots:
-				simplified_child = self._create_simplified_tree(child, depth + 1)
-				if simplified_child:
-					simplified.children.append(simplified_child)
-
 			# Always return shadow DOM fragments, even if children seem empty
 			# Shadow DOM often contains the actual interactive content in SPAs
-			return simplified if simplified.children else SimplifiedNode(original_node=node, children=[])
+			return self._new_simplify_frame(
+				node, node.children_and_shadow_roots, simplified, paint_order_nodes, keep_if_childless=True
+			)
 
 		elif node.node_type == NodeType.ELEMENT_NODE:
 			# Skip non-content elements
@@ -453,11 +537,9 @@ class DOMTreeSerializer:
 			if node.node_name == 'IFRAME' or node.node_name == 'FRAME':
 				if node.content_document:
 					simplified = SimplifiedNode(original_node=node, children=[])
-					for child in node.content_document.children_nodes or []:
-						simplified_child = self._create_simplified_tree(child, depth + 1)
-						if simplified_child is not None:
-							simplified.children.append(simplified_child)
-					return simplified
+					return self._new_simplify_frame(
+						node, node.content_document.children_nodes or [], simplified, paint_order_nodes, keep_if_childless=True
+					)
 
 			is_visible = node.is_visible
 			is_scrollable = node.is_actually_scrollable
@@ -476,132 +558,144 @@ class DOMTreeSerializer:
 			if is_visible or is_scrollable or has_shadow_content or is_shadow_host:
 				simplified = SimplifiedNode(original_node=node, children=[], is_shadow_host=is_shadow_host)
 
-				# Process ALL children including shadow roots with enhanced logging
-				for child in node.children_and_shadow_roots:
-					simplified_child = self._create_simplified_tree(child, depth + 1)
-					if simplified_child:
-						simplified.children.append(simplified_child)
-
-				# COMPOUND CONTROL PROCESSING: Add virtual components for compound controls
-				self._add_compound_components(simplified, node)
-
-				# SHADOW DOM SPECIAL CASE: Always include shadow hosts even if not visible
-				# Many SPA frameworks (React, Vue) render content in shadow DOM
-				if is_shadow_host and simplified.children:
-					return simplified
-
-				# Return if meaningful or has meaningful children
-				if is_visible or is_scrollable or simplified.children:
-					return simplified
+				# Process ALL children including shadow roots
+				return self._new_simplify_frame(
+					node,
+					node.children_and_shadow_roots,
+					simplified,
+					paint_order_nodes,
+					keep_if_childless=bool(is_visible or is_scrollable),
+				)
 
 		elif node.node_type == NodeType.TEXT_NODE:
 			# Include meaningful text nodes
 			is_visible = node.snapshot_node and node.is_visible
 			if is_visible and node.node_value and node.node_value.strip() and len(node.node_value.strip()) > 1:
-				return SimplifiedNode(original_node=node, children=[])
+				simplified = SimplifiedNode(original_node=node, children=[])
+				if _has_paint_order(node):
+					paint_order_nodes.append(simplified)
+				return simplified
 
 		return None
 
-	def _optimize_tree(self, node: SimplifiedNode | None) -> SimplifiedNode | None:
-		"""Step 2: Optimize tree structure."""
-		if not node:
+	@staticmethod
+	def _new_simplify_frame(
+		node: EnhancedDOMTreeNode,
+		children: list[EnhancedDOMTreeNode],
+		simplified: SimplifiedNode,
+		paint_order_nodes: list[SimplifiedNode],
+		keep_if_childless: bool,
+	) -> '_SimplifyFrame':
+		frame = _SimplifyFrame(
+			node=node,
+			children=children,
+			simplified=simplified,
+			paint_order_start=len(paint_order_nodes),
+			keep_if_childless=keep_if_childless,
+		)
+		# paint order candidates are collected in pre-order, so the node goes in before its descendants
+		if _has_paint_order(node):
+			paint_order_nodes.append(simplified)
+		return frame
+
+	def _close_simplify_frame(self, frame: '_SimplifyFrame') -> SimplifiedNode | None:
+		"""Finish simplifying a node once all of its children have been processed."""
+		simplified = frame.simplified
+		if simplified is None:
+			# DOCUMENT node where no child produced anything
 			return None
 
-		# Process children
-		optimized_children = []
-		for child in node.children:
-			optimized_child = self._optimize_tree(child)
-			if optimized_child:
-				optimized_children.append(optimized_child)
+		# COMPOUND CONTROL PROCESSING: Add virtual components for compound controls
+		if frame.node.node_type == NodeType.ELEMENT_NODE:
+			self._add_compound_components(simplified, frame.node)
+
+		# SHADOW DOM SPECIAL CASE: Always include shadow hosts even if not visible
+		# Many SPA frameworks (React, Vue) render content in shadow DOM
+		if simplified.is_shadow_host and frame.simplified_children_count:
+			return simplified
+
+		# Return if meaningful (shadow roots, iframe documents, visible or scrollable elements) or has meaningful children
+		if frame.keep_if_childless or frame.simplified_children_count:
+			return simplified
 
-		node.children = optimized_children
+		return None
 
+	@staticmethod
+	def _keep_after_optimization(node: SimplifiedNode) -> bool:
+		"""Whether a simplified node survives tree optimization, given its already optimized children."""
 		# Keep meaningful nodes
 		is_visible = node.original_node.snapshot_node and node.original_node.is_visible
 
-		if (
+		return bool(
 			is_visible  # Keep all visible nodes
 			or node.original_node.is_actually_scrollable
 			or node.original_node.node_type == NodeType.TEXT_NODE
 			or node.children
-		):
-			return node
-
-		return None
-
-	def _collect_interactive_elements(self, node: SimplifiedNode, elements: list[SimplifiedNode]) -> None:
-		"""Recursively collect interactive elements that are also visible."""
-		is_interactive = self._is_interactive_cached(node.original_node)
-		is_visible = node.original_node.snapshot_node and node.original_node.is_visible
-
-		# Only collect elements that are both interactive AND visible
-		if is_interactive and is_visible:
-			elements.append(node)
+		)
 
-		for child in node.children:
-			self._collect_interactive_elements(child, elements)
+	def _assign_interactive_indices_and_mark_new_nodes(self, root: SimplifiedNode | None) -> None:
+		"""
+		Step 3: Apply bounding box filtering and assign interactive indices to clickable elements that are also visible.
 
-	def _assign_interactive_indices_and_mark_new_nodes(self, node: SimplifiedNode | None) -> None:
-		"""Assign interactive indices to clickable elements that are also visible."""
-		if not node:
+		Both only depend on the path from the root, so they run together in one iterative pre-order pass.
+		Bounds propagate to ALL descendants until overridden.
+		"""
+		if not root:
 			return
 
-		# Skip assigning index to excluded nodes, or ignored by paint order
-		if not node.excluded_by_parent and not node.ignored_by_paint_order:
-			# Regular interactive element assignment (including enhanced compound controls)
-			is_interactive_assign = self._is_interactive_cached(node.original_node)
-			is_visible = node.original_node.snapshot_node and node.original_node.is_visible
-
-			# Only add to selector map if element is both interactive AND visible
-			if is_interactive_assign and is_visible:
-				node.interactive_index = self._interactive_counter
-				node.original_node.element_index = self._interactive_counter
-				self._selector_map[self._interactive_counter] = node.original_node
-				self._interactive_counter += 1
-
-				# Mark compound components as new for visibility
-				if node.is_compound_component:
-					node.is_new = True
-				elif self._previous_cached_selector_map:
-					# Check if node is new for regular elements
-					previous_backend_node_ids = {node.backend_node_id for node in self._previous_cached_selector_map.values()}
-					if node.original_node.backend_node_id not in previous_backend_node_ids:
+		excluded_count = 0
+		stack: list[tuple[SimplifiedNode, PropagatingBounds | None, int]] = [(root, None, 0)]
+
+		while stack:
+			node, active_bounds, depth = stack.pop()
+			propagate_bounds = active_bounds
+
+			if self.enable_bbox_filtering:
+				# Check if this node should be excluded by active bounds
+				if active_bounds and self._should_exclude_child(node, active_bounds):
+					node.excluded_by_parent = True
+					excluded_count += 1
+					# Important: Still check if this node starts NEW propagation
+
+				# Check if this node starts new propagation (even if excluded!)
+				new_bounds = self._get_propagating_bounds(node, depth)
+				# Use new_bounds if this node starts propagation, otherwise continue with active_bounds
+				if new_bounds:
+					propagate_bounds = new_bounds
+
+			# Skip assigning index to excluded nodes, or ignored by paint order
+			if not node.excluded_by_parent and not node.ignored_by_paint_order:
+				# Regular interactive element assignment (including enhanced compound controls)
+				is_interactive_assign = self._is_interactive_cached(node.original_node)
+				is_visible = node.original_node.snapshot_node and node.original_node.is_visible
+
+				# Only add to selector map if element is both interactive AND visible
+				if is_interactive_assign and is_visible:
+					node.interactive_index = self._interactive_counter
+					node.original_node.element_index = self._interactive_counter
+					self._selector_map[self._interactive_counter] = node.original_node
+					self._interactive_counter += 1
+
+					# Mark compound components as new for visibility
+					if node.is_compound_component:
 						node.is_new = True
+					elif self._previous_backend_node_ids:
+						# Check if node is new for regular elements
+						if node.original_node.backend_node_id not in self._previous_backend_node_ids:
+							node.is_new = True
 
-		# Process children
-		for child in node.children:
-			self._assign_interactive_indices_and_mark_new_nodes(child)
-
-	def _apply_bounding_box_filtering(self, node: SimplifiedNode | None) -> SimplifiedNode | None:
-		"""Filter children contained within propagating parent bounds."""
-		if not node:
-			return None
-
-		# Start with no active bounds
-		self._filter_tree_recursive(node, active_bounds=None, depth=0)
+			# Process children in document order
+			for child in reversed(node.children):
+				stack.append((child, propagate_bounds, depth + 1))
 
 		# Log statistics
-		excluded_count = self._count_excluded_nodes(node)
 		if excluded_count > 0:
 			import logging
 
 			logging.debug(f'BBox filtering excluded {excluded_count} nodes')
 
-		return node
-
-	def _filter_tree_recursive(self, node: SimplifiedNode, active_bounds: PropagatingBounds | None = None, depth: int = 0):
-		"""
-		Recursively filter tree with bounding box propagation.
-		Bounds propagate to ALL descendants until overridden.
-		"""
-
-		# Check if this node should be excluded by active bounds
-		if active_bounds and self._should_exclude_child(node, active_bounds):
-			node.excluded_by_parent = True
-			# Important: Still check if this node starts NEW propagation
-
-		# Check if this node starts new propagation (even if excluded!)
-		new_bounds = None
+	def _get_propagating_bounds(self, node: SimplifiedNode, depth: int) -> PropagatingBounds | None:
+		"""Get the bounds this node propagates to ALL its descendants, if it is a propagating element."""
 		tag = node.original_node.tag_name.lower()
 		role = node.original_node.attributes.get('role') if node.original_node.attributes else None
 		attributes = {
@@ -612,19 +706,13 @@ class DOMTreeSerializer:
 		if self._is_propagating_element(attributes):
 			# This node propagates bounds to ALL its descendants
 			if node.original_node.snapshot_node and node.original_node.snapshot_node.bounds:
-				new_bounds = PropagatingBounds(
+				return PropagatingBounds(
 					tag=tag,
 					bounds=node.original_node.snapshot_node.bounds,
 					node_id=node.original_node.node_id,
 					depth=depth,
 				)
-
-		# Propagate to ALL children
-		# Use new_bounds if this node starts propagation, otherwise continue with active_bounds
-		propagate_bounds = new_bounds if new_bounds else active_bounds
-
-		for child in node.children:
-			self._filter_tree_recursive(child, propagate_bounds, depth + 1)
+		return None
 
 	def _should_exclude_child(self, node: SimplifiedNode, active_bounds: PropagatingBounds) -> bool:
 		"""
@@ -703,14 +791,6 @@ class DOMTreeSerializer:
 		containment_ratio = intersection_area / child_area
 		return containment_ratio >= threshold
 
-	def _count_excluded_nodes(self, node: SimplifiedNode, count: int = 0) -> int:
-		"""Count how many nodes were excluded (for debugging)."""
-		if hasattr(node, 'excluded_by_parent') and node.excluded_by_parent:
-			count += 1
-		for child in node.children:
-			count = self._count_excluded_nodes(child, count)
-		return count
-
 	def _is_propagating_element(self, attributes: dict[str, str | None]) -> bool:
 		"""
 		Check if an element should propagate bounds based on attributes.
@@ -731,161 +811,228 @@ class DOMTreeSerializer:
 		if not node:
 			return ''
 
-		# Skip rendering excluded nodes, but process their children
-		if hasattr(node, 'excluded_by_parent') and node.excluded_by_parent:
-			formatted_text = []
-			for child in node.children:
-				child_text = DOMTreeSerializer.serialize_tree(child, include_attributes, depth)
-				if child_text:
-					formatted_text.append(child_text)
-			return '\n'.join(formatted_text)
-
-		formatted_text = []
-		depth_str = depth * '\t'
-		next_depth = depth
-
-		if node.original_node.node_type == NodeType.ELEMENT_NODE:
-			# Skip displaying nodes marked as should_display=False
-			if not node.should_display:
-				for child in node.children:
-					child_text = DOMTreeSerializer.serialize_tree(child, include_attributes, depth)
-					if child_text:
-						formatted_text.append(child_text)
-				return '\n'.join(formatted_text)
-
-			# Add element with interactive_index if clickable, scrollable, or iframe
-			is_any_scrollable = node.original_node.is_actually_scrollable or node.original_node.is_scrollable
-			should_show_scroll = node.original_node.should_show_scroll_info
-			if (
-				node.interactive_index is not None
-				or is_any_scrollable
-				or node.original_node.tag_name.upper() == 'IFRAME'
-				or node.original_node.tag_name.upper() == 'FRAME'
-			):
+		return '\n'.join(
+			DOMTreeSerializer._format_line(item, include_attributes) for item in DOMTreeSerializer._iter_lines(node, depth)
+		)
+
+	@staticmethod
+	def serialize_tree_with_budget(
+		node: SimplifiedNode | None,
+		include_attributes: list[str],
+		max_length: int,
+		viewport: tuple[float, float] | None = None,
+	) -> BudgetedDOMText:
+		"""Serialize the optimized tree into at most `max_length` characters, stopping at the first line that doesn't fit.
+
+		Lines are only formatted while they fit, the rest of the tree is walked just to count the interactive elements
+		that were left out. If the tree doesn't fit and a `viewport` (top, bottom) in page coordinates is given, elements
+		intersecting it are written first, followed by the rest of the page in document order.
+		"""
+		if not node:
+			return BudgetedDOMText(text='')
+
+		result = DOMTreeSerializer._write_lines(DOMTreeSerializer._iter_lines(node), include_attributes, max_length)
+		if result.truncated and viewport is not None:
+			# Written in two passes over the tree: elements inside the viewport, then the ones outside of it
+			lines = itertools.chain(
+				DOMTreeSerializer._iter_lines(node, viewport=viewport, in_viewport=True),
+				DOMTreeSerializer._iter_lines(node, viewport=viewport, in_viewport=False),
+			)
+			result = DOMTreeSerializer._write_lines(lines, include_attributes, max_length)
+			result.viewport_first = True
+		return result
+
+	@staticmethod
+	def _write_lines(lines: Iterator[_TreeLine], include_attributes: list[str], max_length: int) -> BudgetedDOMText:
+		"""Join formatted lines into a buffer until `max_length` is reached, then only count what is left out."""
+		buffer = io.StringIO()
+		length = 0
+		for item in lines:
+			line = DOMTreeSerializer._format_line(item, include_attributes)
+			needed = len(line) + (1 if length else 0)  # newline separator
+			if length + needed > max_length:
+				omitted_elements = sum(1 for rest in itertools.chain([item], lines) if rest.node.interactive_index is not None)
+				return BudgetedDOMText(text=buffer.getvalue(), truncated=True, omitted_elements=omitted_elements)
+			if length:
+				buffer.write('\n')
+			buffer.write(line)
+			length += needed
+		return BudgetedDOMText(text=buffer.getvalue())
+
+	@staticmethod
+	def _iter_lines(
+		node: SimplifiedNode,
+		depth: int = 0,
+		viewport: tuple[float, float] | None = None,
+		in_viewport: bool | None = None,
+	) -> Iterator[_TreeLine]:
+		"""Yield the lines of the serialized tree in document order, without formatting them.
+
+		With a `viewport` (top, bottom), only lines of nodes whose position is (`in_viewport`) or isn't inside it are
+		yielded. Nodes without a position count as inside the viewport if their parent does.
+		"""
+		# Explicit stack instead of recursion: (node, depth, node is in the viewport) to visit, or lines to yield once reached
+		stack: list[tuple[SimplifiedNode, int, bool] | _TreeLine] = [(node, depth, True)]
+
+		while stack:
+			item = stack.pop()
+			if isinstance(item, _TreeLine):
+				yield item
+				continue
+
+			node, depth, node_in_viewport = item
+			if viewport is not None:
+				position = node.original_node.absolute_position
+				if position is not None:
+					node_in_viewport = position.y < viewport[1] and position.y + position.height > viewport[0]
+			emit = in_viewport is None or node_in_viewport == in_viewport
+			next_depth = depth
+
+			if node.excluded_by_parent:
+				# Skip rendering excluded nodes, but process their children
+				pass
+
+			elif node.original_node.node_type == NodeType.ELEMENT_NODE:
+				# Skip displaying nodes marked as should_display=False, but process their children
+				if node.should_display:
+					# Add element with interactive_index if clickable, scrollable, or iframe
+					is_any_scrollable = node.original_node.is_actually_scrollable or node.original_node.is_scrollable
+					if (
+						node.interactive_index is not None
+						or is_any_scrollable
+						or node.original_node.tag_name.upper() == 'IFRAME'
+						or node.original_node.tag_name.upper() == 'FRAME'
+					):
+						next_depth += 1
+						if emit:
+							yield _TreeLine(node, depth, 'element')
+
+			elif node.original_node.node_type == NodeType.DOCUMENT_FRAGMENT_NODE:
+				# Shadow DOM representation - show clearly to LLM
+				if emit:
+					yield _TreeLine(node, depth, 'shadow_start')
+
 				next_depth += 1
 
-				# Build attributes string with compound component info
-				text_content = ''
-				attributes_html_str = DOMTreeSerializer._build_attributes_string(
-					node.original_node, include_attributes, text_content
-				)
+				# Close shadow DOM indicator after its children
+				if node.children and emit:  # Only show close if we had content
+					stack.append(_TreeLine(node, depth, 'shadow_end'))
+
+			elif node.original_node.node_type == NodeType.TEXT_NODE:
+				# Include visible text
+				is_visible = node.original_node.snapshot_node and node.original_node.is_visible
+				if (
+					emit
+					and is_visible
+					and node.original_node.node_value
+					and node.original_node.node_value.strip()
+					and len(node.original_node.node_value.strip()) > 1
+				):
+					yield _TreeLine(node, depth, 'text')
+
+			# Process children in document order
+			for child in reversed(node.children):
+				stack.append((child, next_depth, node_in_viewport))
 
-				# Add compound component information to attributes if present
-				if node.original_node._compound_children:
-					compound_info = []
-					for child_info in node.original_node._compound_children:
-						parts = []
-						if child_info['name']:
-							parts.append(f'name={child_info["name"]}')
-						if child_info['role']:
-							parts.append(f'role={child_info["role"]}')
-						if child_info['valuemin'] is not None:
-							parts.append(f'min={child_info["valuemin"]}')
-						if child_info['valuemax'] is not None:
-							parts.append(f'max={child_info["valuemax"]}')
-						if child_info['valuenow'] is not None:
-							parts.append(f'current={child_info["valuenow"]}')
-
-						# Add select-specific information
-						if 'options_count' in child_info and child_info['options_count'] is not None:
-							parts.append(f'count={child_info["options_count"]}')
-						if 'first_options' in child_info and child_info['first_options']:
-							options_str = '|'.join(child_info['first_options'][:4])  # Limit to 4 options
-							parts.append(f'options={options_str}')
-						if 'format_hint' in child_info and child_info['format_hint']:
-							parts.append(f'format={child_info["format_hint"]}')
-
-						if parts:
-							compound_info.append(f'({",".join(parts)})')
-
-					if compound_info:
-						compound_attr = f'compound_components={",".join(compound_info)}'
-						if attributes_html_str:
-							attributes_html_str += f' {compound_attr}'
-						else:
-							attributes_html_str = compound_attr
-
-				# Build the line with shadow host indicator
-				shadow_prefix = ''
-				if node.is_shadow_host:
-					# Check if any shadow children are closed
-					has_closed_shadow = any(
-						child.original_node.node_type == NodeType.DOCUMENT_FRAGMENT_NODE
-						and child.original_node.shadow_root_type
-						and child.original_node.shadow_root_type.lower() == 'closed'
-						for child in node.children
-					)
-					shadow_prefix = '|SHADOW(closed)|' if has_closed_shadow else '|SHADOW(open)|'
-
-				if should_show_scroll and node.interactive_index is None:
-					# Scrollable container but not clickable
-					line = f'{depth_str}{shadow_prefix}|SCROLL|<{node.original_node.tag_name}'
-				elif node.interactive_index is not None:
-					# Clickable (and possibly scrollable)
-					new_prefix = '*' if node.is_new else ''
-					scroll_prefix = '|SCROLL+' if should_show_scroll else '['
-					line = f'{depth_str}{shadow_prefix}{new_prefix}{scroll_prefix}{node.interactive_index}]<{node.original_node.tag_name}'
-				elif node.original_node.tag_name.upper() == 'IFRAME':
-					# Iframe element (not interactive)
-					line = f'{depth_str}{shadow_prefix}|IFRAME|<{node.original_node.tag_name}'
-				elif node.original_node.tag_name.upper() == 'FRAME':
-					# Frame element (not interactive)
-					line = f'{depth_str}{shadow_prefix}|FRAME|<{node.original_node.tag_name}'
-				else:
-					line = f'{depth_str}{shadow_prefix}<{node.original_node.tag_name}'
+	@staticmethod
+	def _format_line(item: _TreeLine, include_attributes: list[str]) -> str:
+		depth_str = item.depth * '\t'
+		original_node = item.node.original_node
+		if item.kind == 'element':
+			return DOMTreeSerializer._build_element_line(item.node, include_attributes, depth_str)
+		if item.kind == 'text':
+			return f'{depth_str}{original_node.node_value.strip()}'
+		if item.kind == 'shadow_end':
+			return f'{depth_str}▲ Shadow Content End'
+		if original_node.shadow_root_type and original_node.shadow_root_type.lower() == 'closed':
+			return f'{depth_str}▼ Shadow Content (Closed)'
+		return f'{depth_str}▼ Shadow Content (Open)'
 
+	@staticmethod
+	def _build_element_line(node: SimplifiedNode, include_attributes: list[str], depth_str: str) -> str:
+		"""Build the line for an element that is shown with its index, scroll state or iframe marker."""
+		should_show_scroll = node.original_node.should_show_scroll_info
+
+		# Build attributes string with compound component info
+		text_content = ''
+		attributes_html_str = DOMTreeSerializer._build_attributes_string(node.original_node, include_attributes, text_content)
+
+		# Add compound component information to attributes if present
+		if node.original_node._compound_children:
+			compound_info = []
+			for child_info in node.original_node._compound_children:
+				parts = []
+				if child_info['name']:
+					parts.append(f'name={child_info["name"]}')
+				if child_info['role']:
+					parts.append(f'role={child_info["role"]}')
+				if child_info['valuemin'] is not None:
+					parts.append(f'min={child_info["valuemin"]}')
+				if child_info['valuemax'] is not None:
+					parts.append(f'max={child_info["valuemax"]}')
+				if child_info['valuenow'] is not None:
+					parts.append(f'current={child_info["valuenow"]}')
+
+				# Add select-specific information
+				if 'options_count' in child_info and child_info['options_count'] is not None:
+					parts.append(f'count={child_info["options_count"]}')
+				if 'first_options' in child_info and child_info['first_options']:
+					options_str = '|'.join(child_info['first_options'][:4])  # Limit to 4 options
+					parts.append(f'options={options_str}')
+				if 'format_hint' in child_info and child_info['format_hint']:
+					parts.append(f'format={child_info["format_hint"]}')
+
+				if parts:
+					compound_info.append(f'({",".join(parts)})')
+
+			if compound_info:
+				compound_attr = f'compound_components={",".join(compound_info)}'
 				if attributes_html_str:
-					line += f' {attributes_html_str}'
+					attributes_html_str += f' {compound_attr}'
+				else:
+					attributes_html_str = compound_attr
+
+		# Build the line with shadow host indicator
+		shadow_prefix = ''
+		if node.is_shadow_host:
+			# Check if any shadow children are closed
+			has_closed_shadow = any(
+				child.original_node.node_type == NodeType.DOCUMENT_FRAGMENT_NODE
+				and child.original_node.shadow_root_type
+				and child.original_node.shadow_root_type.lower() == 'closed'
+				for child in node.children
+			)
+			shadow_prefix = '|SHADOW(closed)|' if has_closed_shadow else '|SHADOW(open)|'
+
+		if should_show_scroll and node.interactive_index is None:
+			# Scrollable container but not clickable
+			line = f'{depth_str}{shadow_prefix}|SCROLL|<{node.original_node.tag_name}'
+		elif node.interactive_index is not None:
+			# Clickable (and possibly scrollable)
+			new_prefix = '*' if node.is_new else ''
+			scroll_prefix = '|SCROLL+' if should_show_scroll else '['
+			line = f'{depth_str}{shadow_prefix}{new_prefix}{scroll_prefix}{node.interactive_index}]<{node.original_node.tag_name}'
+		elif node.original_node.tag_name.upper() == 'IFRAME':
+			# Iframe element (not interactive)
+			line = f'{depth_str}{shadow_prefix}|IFRAME|<{node.original_node.tag_name}'
+		elif node.original_node.tag_name.upper() == 'FRAME':
+			# Frame element (not interactive)
+			line = f'{depth_str}{shadow_prefix}|FRAME|<{node.original_node.tag_name}'
+		else:
+			line = f'{depth_str}{shadow_prefix}<{node.original_node.tag_name}'
 
-				line += ' />'
+		if attributes_html_str:
+			line += f' {attributes_html_str}'
 
-				# Add scroll information only when we should show it
-				if should_show_scroll:
-					scroll_info_text = node.original_node.get_scroll_info_text()
-					if scroll_info_text:
-						line += f' ({scroll_info_text})'
+		line += ' />'
 
-				formatted_text.append(line)
+		# Add scroll information only when we should show it
+		if should_show_scroll:
+			scroll_info_text = node.original_node.get_scroll_info_text()
+			if scroll_info_text:
+				line += f' ({scroll_info_text})'
 
-		elif node.original_node.node_type == NodeType.DOCUMENT_FRAGMENT_NODE:
-			# Shadow DOM representation - show clearly to LLM
-			if node.original_node.shadow_root_type and node.original_node.shadow_root_type.lower() == 'closed':
-				formatted_text.append(f'{depth_str}▼ Shadow Content (Closed)')
-			else:
-				formatted_text.append(f'{depth_str}▼ Shadow Content (Open)')
-
-			next_depth += 1
-
-			# Process shadow DOM children
-			for child in node.children:
-				child_text = DOMTreeSerializer.serialize_tree(child, include_attributes, next_depth)
-				if child_text:
-					formatted_text.append(child_text)
-
-			# Close shadow DOM indicator
-			if node.children:  # Only show close if we had content
-				formatted_text.append(f'{depth_str}▲ Shadow Content End')
-
-		elif node.original_node.node_type == NodeType.TEXT_NODE:
-			# Include visible text
-			is_visible = node.original_node.snapshot_node and node.original_node.is_visible
-			if (
-				is_visible
-				and node.original_node.node_value
-				and node.original_node.node_value.strip()
-				and len(node.original_node.node_value.strip()) > 1
-			):
-				clean_text = node.original_node.node_value.strip()
-				formatted_text.append(f'{depth_str}{clean_text}')
-
-		# Process children (for non-shadow elements)
-		if node.original_node.node_type != NodeType.DOCUMENT_FRAGMENT_NODE:
-			for child in node.children:
-				child_text = DOMTreeSerializer.serialize_tree(child, include_attributes, next_depth)
-				if child_text:
-					formatted_text.append(child_text)
-
-		return '\n'.join(formatted_text)
+		return line
 
 	@staticmethod
 	def _build_attributes_string(node: EnhancedDOMTreeNode, include_attributes: list[str], text: str) -> str:
@@ -5,25 +5,25 @@ from typing import TYPE_CHECKING
 
 from cdp_use.cdp.accessibility.commands import GetFullAXTreeReturns
 from cdp_use.cdp.accessibility.types import AXNode
-from cdp_use.cdp.dom.types import Node
 from cdp_use.cdp.target import TargetID
 
-from browser_use.dom.enhanced_snapshot import (
-	REQUIRED_COMPUTED_STYLES,
-	build_snapshot_lookup,
-)
+from browser_use.dom.enhanced_snapshot import REQUIRED_COMPUTED_STYLES
+from browser_use.dom.process_pool import build_and_serialize_in_process_pool
 from browser_use.dom.serializer.serializer import DOMTreeSerializer
+from browser_use.dom.tree_builder import (
+	build_enhanced_dom_tree,
+	is_element_visible_according_to_all_parents,
+	should_load_cross_origin_iframe,
+)
 from browser_use.dom.views import (
 	CurrentPageTargets,
 	DOMRect,
-	EnhancedAXNode,
-	EnhancedAXProperty,
 	EnhancedDOMTreeNode,
-	NodeType,
 	SerializedDOMState,
 	TargetAllTrees,
 )
 from browser_use.observability import observe_debug
+from browser_use.profiling import profile_span, record_span
 
 if TYPE_CHECKING:
 	from browser_use.browser.session import BrowserSession
@@ -50,6 +50,7 @@ class DomService:
 		paint_order_filtering: bool = True,
 		max_iframes: int = 100,
 		max_iframe_depth: int = 5,
+		process_pool_size: int = 0,
 	):
 		self.browser_session = browser_session
 		self.logger = logger or browser_session.logger
@@ -57,6 +58,8 @@ class DomService:
 		self.paint_order_filtering = paint_order_filtering
 		self.max_iframes = max_iframes
 		self.max_iframe_depth = max_iframe_depth
+		# Build and serialize the DOM in this many worker processes instead of on the event loop (0 = disabled)
+		self.process_pool_size = process_pool_size
 
 	async def __aenter__(self):
 		return self
@@ -107,34 +110,6 @@ class DomService:
 			iframe_sessions=iframe_targets,
 		)
 
-	def _build_enhanced_ax_node(self, ax_node: AXNode) -> EnhancedAXNode:
-		properties: list[EnhancedAXProperty] | None = None
-		if 'properties' in ax_node and ax_node['properties']:
-			properties = []
-			for property in ax_node['properties']:
-				try:
-					# test whether property name can go into the enum (sometimes Chrome returns some random properties)
-					properties.append(
-						EnhancedAXProperty(
-							name=property['name'],
-							value=property.get('value', {}).get('value', None),
-							# related_nodes=[],  # TODO: add related nodes
-						)
-					)
-				except ValueError:
-					pass
-
-		enhanced_ax_node = EnhancedAXNode(
-			ax_node_id=ax_node['nodeId'],
-			ignored=ax_node['ignored'],
-			role=ax_node.get('role', {}).get('value', None),
-			name=ax_node.get('name', {}).get('value', None),
-			description=ax_node.get('description', {}).get('value', None),
-			properties=properties,
-			child_ids=ax_node.get('childIds', []) if ax_node.get('childIds') else None,
-		)
-		return enhanced_ax_node
-
 	async def _get_viewport_ratio(self, target_id: TargetID) -> float:
 		"""Get viewport dimensions, device pixel ratio, and scroll position using CDP."""
 		cdp_session = await self.browser_session.get_or_create_cdp_session(target_id=target_id, focus=True)
@@ -169,87 +144,7 @@ class DomService:
 		cls, node: EnhancedDOMTreeNode, html_frames: list[EnhancedDOMTreeNode]
 	) -> bool:
 		"""Check if the element is visible according to all its parent HTML frames."""
-
-		if not node.snapshot_node:
-			return False
-
-		computed_styles = node.snapshot_node.computed_styles or {}
-
-		display = computed_styles.get('display', '').lower()
-		visibility = computed_styles.get('visibility', '').lower()
-		opacity = computed_styles.get('opacity', '1')
-
-		if display == 'none' or visibility == 'hidden':
-			return False
-
-		try:
-			if float(opacity) <= 0:
-				return False
-		except (ValueError, TypeError):
-			pass
-
-		# Start with the element's local bounds (in its own frame's coordinate system)
-		current_bounds = node.snapshot_node.bounds
-
-		if not current_bounds:
-			return False  # If there are no bounds, the element is not visible
-
-		"""
-		Reverse iterate through the html frames (that can be either iframe or document -> if it's a document frame compare if the current bounds interest with it (taking scroll into account) otherwise move the current bounds by the iframe offset)
-		"""
-		for frame in reversed(html_frames):
-			if (
-				frame.node_type == NodeType.ELEMENT_NODE
-				and (frame.node_name.upper() == 'IFRAME' or frame.node_name.upper() == 'FRAME')
-				and frame.snapshot_node
-				and frame.snapshot_node.bounds
-			):
-				iframe_bounds = frame.snapshot_node.bounds
-
-				# negate the values added in `_construct_enhanced_node`
-				current_bounds.x += iframe_bounds.x
-				current_bounds.y += iframe_bounds.y
-
-			if (
-				frame.node_type == NodeType.ELEMENT_NODE
-				and frame.node_name == 'HTML'
-				and frame.snapshot_node
-				and frame.snapshot_node.scrollRects
-				and frame.snapshot_node.clientRects
-			):
-				# For iframe content, we need to check visibility within the iframe's viewport
-				# The scrollRects represent the current scroll position
-				# The clientRects represent the viewport size
-				# Elements are visible if they fall within the viewport after accounting for scroll
-
-				# The viewport of the frame (what's actually visible)
-				viewport_left = 0  # Viewport always starts at 0 in frame coordinates
-				viewport_top = 0
-				viewport_right = frame.snapshot_node.clientRects.width
-				viewport_bottom = frame.snapshot_node.clientRects.height
-
-				# Adjust element bounds by the scroll offset to get position relative to viewport
-				# When scrolled down, scrollRects.y is positive, so we subtract it from element's y
-				adjusted_x = current_bounds.x - frame.snapshot_node.scrollRects.x
-				adjusted_y = current_bounds.y - frame.snapshot_node.scrollRects.y
-
-				frame_intersects = (
-					adjusted_x < viewport_right
-					and adjusted_x + current_bounds.width > viewport_left
-					and adjusted_y < viewport_bottom + 1000
-					and adjusted_y + current_bounds.height > viewport_top - 1000
-				)
-
-				if not frame_intersects:
-					return False
-
-				# Keep the original coordinate adjustment to maintain consistency
-				# This adjustment is needed for proper coordinate transformation
-				current_bounds.x -= frame.snapshot_node.scrollRects.x
-				current_bounds.y -= frame.snapshot_node.scrollRects.y
-
-		# If we reach here, element is visible in main viewport and all containing iframes
-		return True
+		return is_element_visible_according_to_all_parents(node, html_frames)
 
 	async def _get_ax_tree_for_all_frames(self, target_id: TargetID) -> GetFullAXTreeReturns:
 		"""Recursively collect all frames and merge their accessibility trees into a single array."""
@@ -419,6 +314,7 @@ class DomService:
 		device_pixel_ratio = results['device_pixel_ratio']
 		end = time.time()
 		cdp_timing = {'cdp_calls_total': end - start}
+		record_span('cdp_calls', start, end)
 
 		# DEBUG: Log snapshot info and limit documents to prevent explosion
 		if snapshot and 'documents' in snapshot:
@@ -465,253 +361,71 @@ class DomService:
 		"""
 
 		trees = await self._get_all_trees(target_id)
+		return await self._build_dom_tree(trees, target_id, initial_html_frames, initial_total_frame_offset, iframe_depth)
 
-		dom_tree = trees.dom_tree
-		ax_tree = trees.ax_tree
-		snapshot = trees.snapshot
-		device_pixel_ratio = trees.device_pixel_ratio
-
-		ax_tree_lookup: dict[int, AXNode] = {
-			ax_node['backendDOMNodeId']: ax_node for ax_node in ax_tree['nodes'] if 'backendDOMNodeId' in ax_node
-		}
-
-		enhanced_dom_tree_node_lookup: dict[int, EnhancedDOMTreeNode] = {}
-		""" NodeId (NOT backend node id) -> enhanced dom tree node"""  # way to get the parent/content node
-
-		# Parse snapshot data with everything calculated upfront
-		snapshot_lookup = build_snapshot_lookup(snapshot, device_pixel_ratio)
-
-		async def _construct_enhanced_node(
-			node: Node, html_frames: list[EnhancedDOMTreeNode] | None, total_frame_offset: DOMRect | None
-		) -> EnhancedDOMTreeNode:
-			"""
-			Recursively construct enhanced DOM tree nodes.
-
-			Args:
-				node: The DOM node to construct
-				html_frames: List of HTML frame nodes encountered so far
-				accumulated_iframe_offset: Accumulated coordinate translation from parent iframes (includes scroll corrections)
-			"""
-
-			# Initialize lists if not provided
-			if html_frames is None:
-				html_frames = []
+	async def _build_dom_tree(
+		self,
+		trees: TargetAllTrees,
+		target_id: TargetID,
+		initial_html_frames: list[EnhancedDOMTreeNode] | None = None,
+		initial_total_frame_offset: DOMRect | None = None,
+		iframe_depth: int = 0,
+	) -> EnhancedDOMTreeNode:
+		"""Build the DOM tree from the CDP payloads of a target, loading visible cross-origin iframes from their own targets"""
+		enhanced_dom_tree, cross_origin_iframes = build_enhanced_dom_tree(
+			trees,
+			target_id,
+			session_id=self.browser_session.agent_focus.session_id if self.browser_session.agent_focus else None,
+			initial_html_frames=initial_html_frames,
+			initial_total_frame_offset=initial_total_frame_offset,
+			# TODO: hacky way to disable cross origin iframes for now
+			collect_cross_origin_iframes=self.cross_origin_iframes,
+			logger=self.logger,
+		)
 
-			# to get rid of the pointer references
-			if total_frame_offset is None:
-				total_frame_offset = DOMRect(x=0.0, y=0.0, width=0.0, height=0.0)
-			else:
-				total_frame_offset = DOMRect(
-					total_frame_offset.x, total_frame_offset.y, total_frame_offset.width, total_frame_offset.height
+		# handle cross origin iframe (just recursively call the main function with the proper target if it exists in iframes)
+		# only do this if the iframe is visible (otherwise it's not worth it)
+		for iframe_node, total_frame_offset in cross_origin_iframes:
+			# Check iframe depth to prevent infinite recursion
+			if iframe_depth >= self.max_iframe_depth:
+				self.logger.debug(
+					f'Skipping iframe at depth {iframe_depth} to prevent infinite recursion (max depth: {self.max_iframe_depth})'
 				)
-
-			# memoize the mf (I don't know if some nodes are duplicated)
-			if node['nodeId'] in enhanced_dom_tree_node_lookup:
-				return enhanced_dom_tree_node_lookup[node['nodeId']]
-
-			ax_node = ax_tree_lookup.get(node['backendNodeId'])
-			if ax_node:
-				enhanced_ax_node = self._build_enhanced_ax_node(ax_node)
-			else:
-				enhanced_ax_node = None
-
-			# To make attributes more readable
-			attributes: dict[str, str] | None = None
-			if 'attributes' in node and node['attributes']:
-				attributes = {}
-				for i in range(0, len(node['attributes']), 2):
-					attributes[node['attributes'][i]] = node['attributes'][i + 1]
-
-			shadow_root_type = None
-			if 'shadowRootType' in node and node['shadowRootType']:
-				try:
-					shadow_root_type = node['shadowRootType']
-				except ValueError:
-					pass
-
-			# Get snapshot data and calculate absolute position
-			snapshot_data = snapshot_lookup.get(node['backendNodeId'], None)
-			absolute_position = None
-			if snapshot_data and snapshot_data.bounds:
-				absolute_position = DOMRect(
-					x=snapshot_data.bounds.x + total_frame_offset.x,
-					y=snapshot_data.bounds.y + total_frame_offset.y,
-					width=snapshot_data.bounds.width,
-					height=snapshot_data.bounds.height,
+			elif should_load_cross_origin_iframe(iframe_node, self.logger):
+				await self._load_cross_origin_iframe(iframe_node, total_frame_offset, iframe_depth)
+
+		return enhanced_dom_tree
+
+	async def _load_cross_origin_iframe(
+		self, iframe_node: EnhancedDOMTreeNode, total_frame_offset: DOMRect, iframe_depth: int
+	) -> None:
+		# Use get_all_frames to find the iframe's target
+		frame_id = iframe_node.frame_id
+		iframe_document_target = None
+		if frame_id:
+			all_frames, _ = await self.browser_session.get_all_frames()
+			frame_info = all_frames.get(frame_id)
+			if frame_info and frame_info.get('frameTargetId'):
+				# Get the target info for this iframe
+				targets = await self.browser_session.cdp_client.send.Target.getTargets()
+				iframe_document_target = next(
+					(t for t in targets['targetInfos'] if t['targetId'] == frame_info['frameTargetId']), None
 				)
 
-			dom_tree_node = EnhancedDOMTreeNode(
-				node_id=node['nodeId'],
-				backend_node_id=node['backendNodeId'],
-				node_type=NodeType(node['nodeType']),
-				node_name=node['nodeName'],
-				node_value=node['nodeValue'],
-				attributes=attributes or {},
-				is_scrollable=node.get('isScrollable', None),
-				frame_id=node.get('frameId', None),
-				session_id=self.browser_session.agent_focus.session_id if self.browser_session.agent_focus else None,
-				target_id=target_id,
-				content_document=None,
-				shadow_root_type=shadow_root_type,
-				shadow_roots=None,
-				parent_node=None,
-				children_nodes=None,
-				ax_node=enhanced_ax_node,
-				snapshot_node=snapshot_data,
-				is_visible=None,
-				absolute_position=absolute_position,
-				element_index=None,
+		# if target actually exists in one of the frames, just recursively build the dom tree for it
+		if iframe_document_target:
+			self.logger.debug(f'Getting content document for iframe {frame_id} at depth {iframe_depth + 1}')
+			content_document = await self.get_dom_tree(
+				target_id=iframe_document_target.get('targetId'),
+				# TODO: experiment with this values -> not sure whether the whole cross origin iframe should be ALWAYS included as soon as some part of it is visible or not.
+				# Current config: if the cross origin iframe is AT ALL visible, then just include everything inside of it!
+				# initial_html_frames=updated_html_frames,
+				initial_total_frame_offset=total_frame_offset,
+				iframe_depth=iframe_depth + 1,
 			)
 
-			enhanced_dom_tree_node_lookup[node['nodeId']] = dom_tree_node
-
-			if 'parentId' in node and node['parentId']:
-				dom_tree_node.parent_node = enhanced_dom_tree_node_lookup[
-					node['parentId']
-				]  # parents should always be in the lookup
-
-			# Check if this is an HTML frame node and add it to the list
-			updated_html_frames = html_frames.copy()
-			if node['nodeType'] == NodeType.ELEMENT_NODE.value and node['nodeName'] == 'HTML' and node.get('frameId') is not None:
-				updated_html_frames.append(dom_tree_node)
-
-				# and adjust the total frame offset by scroll
-				if snapshot_data and snapshot_data.scrollRects:
-					total_frame_offset.x -= snapshot_data.scrollRects.x
-					total_frame_offset.y -= snapshot_data.scrollRects.y
-					# DEBUG: Log iframe scroll information
-					self.logger.debug(
-						f'🔍 DEBUG: HTML frame scroll - scrollY={snapshot_data.scrollRects.y}, scrollX={snapshot_data.scrollRects.x}, frameId={node.get("frameId")}, nodeId={node["nodeId"]}'
-					)
-
-			# Calculate new iframe offset for content documents, accounting for iframe scroll
-			if (
-				(node['nodeName'].upper() == 'IFRAME' or node['nodeName'].upper() == 'FRAME')
-				and snapshot_data
-				and snapshot_data.bounds
-			):
-				if snapshot_data.bounds:
-					updated_html_frames.append(dom_tree_node)
-
-					total_frame_offset.x += snapshot_data.bounds.x
-					total_frame_offset.y += snapshot_data.bounds.y
-
-			if 'contentDocument' in node and node['contentDocument']:
-				dom_tree_node.content_document = await _construct_enhanced_node(
-					node['contentDocument'], updated_html_frames, total_frame_offset
-				)
-				dom_tree_node.content_document.parent_node = dom_tree_node
-				# forcefully set the parent node to the content document node (helps traverse the tree)
-
-			if 'shadowRoots' in node and node['shadowRoots']:
-				dom_tree_node.shadow_roots = []
-				for shadow_root in node['shadowRoots']:
-					shadow_root_node = await _construct_enhanced_node(shadow_root, updated_html_frames, total_frame_offset)
-					# forcefully set the parent node to the shadow root node (helps traverse the tree)
-					shadow_root_node.parent_node = dom_tree_node
-					dom_tree_node.shadow_roots.append(shadow_root_node)
-
-			if 'children' in node and node['children']:
-				dom_tree_node.children_nodes = []
-				for child in node['children']:
-					dom_tree_node.children_nodes.append(
-						await _construct_enhanced_node(child, updated_html_frames, total_frame_offset)
-					)
-
-			# Set visibility using the collected HTML frames
-			dom_tree_node.is_visible = self.is_element_visible_according_to_all_parents(dom_tree_node, updated_html_frames)
-
-			# DEBUG: Log visibility info for form elements in iframes
-			if dom_tree_node.tag_name and dom_tree_node.tag_name.upper() in ['INPUT', 'SELECT', 'TEXTAREA', 'LABEL']:
-				attrs = dom_tree_node.attributes or {}
-				elem_id = attrs.get('id', '')
-				elem_name = attrs.get('name', '')
-				if (
-					'city' in elem_id.lower()
-					or 'city' in elem_name.lower()
-					or 'state' in elem_id.lower()
-					or 'state' in elem_name.lower()
-					or 'zip' in elem_id.lower()
-					or 'zip' in elem_name.lower()
-				):
-					self.logger.debug(
-						f"🔍 DEBUG: Form element {dom_tree_node.tag_name} id='{elem_id}' name='{elem_name}' - visible={dom_tree_node.is_visible}, bounds={dom_tree_node.snapshot_node.bounds if dom_tree_node.snapshot_node else 'NO_SNAPSHOT'}"
-					)
-
-			# handle cross origin iframe (just recursively call the main function with the proper target if it exists in iframes)
-			# only do this if the iframe is visible (otherwise it's not worth it)
-
-			if (
-				# TODO: hacky way to disable cross origin iframes for now
-				self.cross_origin_iframes and node['nodeName'].upper() == 'IFRAME' and node.get('contentDocument', None) is None
-			):  # None meaning there is no content
-				# Check iframe depth to prevent infinite recursion
-				if iframe_depth >= self.max_iframe_depth:
-					self.logger.debug(
-						f'Skipping iframe at depth {iframe_depth} to prevent infinite recursion (max depth: {self.max_iframe_depth})'
-					)
-				else:
-					# Check if iframe is visible and large enough (>= 200px in both dimensions)
-					should_process_iframe = False
-
-					# First check if the iframe element itself is visible
-					if dom_tree_node.is_visible:
-						# Check iframe dimensions
-						if dom_tree_node.snapshot_node and dom_tree_node.snapshot_node.bounds:
-							bounds = dom_tree_node.snapshot_node.bounds
-							width = bounds.width
-							height = bounds.height
-
-							# Only process if iframe is at least 200px in both dimensions
-							if width >= 200 and height >= 200:
-								should_process_iframe = True
-								self.logger.debug(f'Processing cross-origin iframe: visible=True, width={width}, height={height}')
-							else:
-								self.logger.debug(
-									f'Skipping small cross-origin iframe: width={width}, height={height} (needs >= 200px)'
-								)
-						else:
-							self.logger.debug('Skipping cross-origin iframe: no bounds available')
-					else:
-						self.logger.debug('Skipping invisible cross-origin iframe')
-
-					if should_process_iframe:
-						# Use get_all_frames to find the iframe's target
-						frame_id = node.get('frameId', None)
-						if frame_id:
-							all_frames, _ = await self.browser_session.get_all_frames()
-							frame_info = all_frames.get(frame_id)
-							iframe_document_target = None
-							if frame_info and frame_info.get('frameTargetId'):
-								# Get the target info for this iframe
-								targets = await self.browser_session.cdp_client.send.Target.getTargets()
-								iframe_document_target = next(
-									(t for t in targets['targetInfos'] if t['targetId'] == frame_info['frameTargetId']), None
-								)
-						else:
-							iframe_document_target = None
-						# if target actually exists in one of the frames, just recursively build the dom tree for it
-						if iframe_document_target:
-							self.logger.debug(
-								f'Getting content document for iframe {node.get("frameId", None)} at depth {iframe_depth + 1}'
-							)
-							content_document = await self.get_dom_tree(
-								target_id=iframe_document_target.get('targetId'),
-								# TODO: experiment with this values -> not sure whether the whole cross origin iframe should be ALWAYS included as soon as some part of it is visible or not.
-								# Current config: if the cross origin iframe is AT ALL visible, then just include everything inside of it!
-								# initial_html_frames=updated_html_frames,
-								initial_total_frame_offset=total_frame_offset,
-								iframe_depth=iframe_depth + 1,
-							)
-
-							dom_tree_node.content_document = content_document
-							dom_tree_node.content_document.parent_node = dom_tree_node
-
-			return dom_tree_node
-
-		enhanced_dom_tree_node = await _construct_enhanced_node(dom_tree['root'], initial_html_frames, initial_total_frame_offset)
-
-		return enhanced_dom_tree_node
+			iframe_node.content_document = content_document
+			iframe_node.content_document.parent_node = iframe_node
 
 	@observe_debug(ignore_input=True, ignore_output=True, name='get_serialized_dom_tree')
 	async def get_serialized_dom_tree(
@@ -724,13 +438,34 @@ class DomService:
 		"""
 
 		# Use current target (None means use current)
-		assert self.browser_session.current_target_id is not None
-		enhanced_dom_tree = await self.get_dom_tree(target_id=self.browser_session.current_target_id)
+		target_id = self.browser_session.current_target_id
+		assert target_id is not None
+
+		if self.process_pool_size:
+			trees = await self._get_all_trees(target_id)
+			offloaded = await build_and_serialize_in_process_pool(
+				self.process_pool_size,
+				trees,
+				target_id,
+				session_id=self.browser_session.agent_focus.session_id if self.browser_session.agent_focus else None,
+				previous_cached_state=previous_cached_state,
+				paint_order_filtering=self.paint_order_filtering,
+				load_cross_origin_iframes=self.cross_origin_iframes and self.max_iframe_depth > 0,
+			)
+			if offloaded is not None:
+				return offloaded
+			# Loading cross-origin iframes needs the browser, so these pages are built here
+			with profile_span('build_tree'):
+				enhanced_dom_tree = await self._build_dom_tree(trees, target_id)
+		else:
+			with profile_span('build_tree'):
+				enhanced_dom_tree = await self.get_dom_tree(target_id=target_id)
 
 		start = time.time()
-		serialized_dom_state, serializer_timing = DOMTreeSerializer(
-			enhanced_dom_tree, previous_cached_state, paint_order_filtering=self.paint_order_filtering
-		).serialize_accessible_elements()
+		with profile_span('serialize'):
+			serialized_dom_state, serializer_timing = DOMTreeSerializer(
+				enhanced_dom_tree, previous_cached_state, paint_order_filtering=self.paint_order_filtering
+			).serialize_accessible_elements()
 
 		end = time.time()
 		serialize_total_timing = {'serialize_dom_tree_total': end - start}
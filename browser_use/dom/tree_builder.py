@@ -0,0 +1,348 @@
+"""
+Building the enhanced DOM tree of a target from its raw CDP payloads.
+
+Everything here is pure CPU work on the JSON returned by CDP and doesn't touch the browser, so it can run on the event
+loop (`DomService`) or in a worker process (`browser_use/dom/process_pool.py`). Cross-origin iframes need their own
+CDP calls, so the builder only collects them and leaves loading their content to the caller.
+"""
+
+import logging
+
+from cdp_use.cdp.accessibility.types import AXNode
+from cdp_use.cdp.dom.types import Node
+from cdp_use.cdp.target.types import SessionID, TargetID
+
+from browser_use.dom.enhanced_snapshot import build_snapshot_lookup
+from browser_use.dom.views import (
+	DOMRect,
+	EnhancedAXNode,
+	EnhancedAXProperty,
+	EnhancedDOMTreeNode,
+	NodeType,
+	TargetAllTrees,
+)
+
+logger = logging.getLogger(__name__)
+
+# Cross-origin iframes smaller than this (in both dimensions) aren't worth loading
+MIN_CROSS_ORIGIN_IFRAME_SIZE = 200
+
+# Elements up to this many CSS pixels above or below a frame's viewport still count as visible
+VIEWPORT_MARGIN = 1000
+
+
+def build_enhanced_ax_node(ax_node: AXNode) -> EnhancedAXNode:
+	properties: list[EnhancedAXProperty] | None = None
+	if 'properties' in ax_node and ax_node['properties']:
+		properties = []
+		for property in ax_node['properties']:
+			try:
+				# test whether property name can go into the enum (sometimes Chrome returns some random properties)
+				properties.append(
+					EnhancedAXProperty(
+						name=property['name'],
+						value=property.get('value', {}).get('value', None),
+						# related_nodes=[],  # TODO: add related nodes
+					)
+				)
+			except ValueError:
+				pass
+
+	enhanced_ax_node = EnhancedAXNode(
+		ax_node_id=ax_node['nodeId'],
+		ignored=ax_node['ignored'],
+		role=ax_node.get('role', {}).get('value', None),
+		name=ax_node.get('name', {}).get('value', None),
+		description=ax_node.get('description', {}).get('value', None),
+		properties=properties,
+		child_ids=ax_node.get('childIds', []) if ax_node.get('childIds') else None,
+	)
+	return enhanced_ax_node
+
+
+def build_enhanced_dom_tree(
+	trees: TargetAllTrees,
+	target_id: TargetID,
+	session_id: SessionID | None,
+	initial_html_frames: list[EnhancedDOMTreeNode] | None = None,
+	initial_total_frame_offset: DOMRect | None = None,
+	collect_cross_origin_iframes: bool = False,
+	logger: logging.Logger = logger,
+) -> tuple[EnhancedDOMTreeNode, list[tuple[EnhancedDOMTreeNode, DOMRect]]]:
+	"""Build the enhanced DOM tree of a target, with the visibility of all nodes computed.
+
+	Args:
+		trees: CDP payloads of the target
+		target_id: Target the payloads were captured from
+		session_id: CDP session to record on the nodes
+		initial_html_frames: List of HTML frame nodes encountered so far
+		initial_total_frame_offset: Accumulated coordinate offset
+		collect_cross_origin_iframes: Whether to collect iframes whose content wasn't part of the payloads
+
+	Returns:
+		Tuple of (root node, cross-origin iframes with the frame offset of their content)
+	"""
+	dom_tree = trees.dom_tree
+	ax_tree = trees.ax_tree
+	snapshot = trees.snapshot
+	device_pixel_ratio = trees.device_pixel_ratio
+
+	ax_tree_lookup: dict[int, AXNode] = {
+		ax_node['backendDOMNodeId']: ax_node for ax_node in ax_tree['nodes'] if 'backendDOMNodeId' in ax_node
+	}
+
+	enhanced_dom_tree_node_lookup: dict[int, EnhancedDOMTreeNode] = {}
+	""" NodeId (NOT backend node id) -> enhanced dom tree node"""  # way to get the parent/content node
+
+	# Parse snapshot data with everything calculated upfront
+	snapshot_lookup = build_snapshot_lookup(snapshot, device_pixel_ratio)
+
+	cross_origin_iframes: list[tuple[EnhancedDOMTreeNode, DOMRect]] = []
+
+	def _construct_enhanced_node(
+		node: Node, html_frames: list[EnhancedDOMTreeNode] | None, total_frame_offset: DOMRect | None
+	) -> EnhancedDOMTreeNode:
+		"""
+		Recursively construct enhanced DOM tree nodes.
+
+		Args:
+			node: The DOM node to construct
+			html_frames: List of HTML frame nodes encountered so far
+			accumulated_iframe_offset: Accumulated coordinate translation from parent iframes (includes scroll corrections)
+		"""
+
+		# Initialize lists if not provided
+		if html_frames is None:
+			html_frames = []
+
+		# to get rid of the pointer references
+		if total_frame_offset is None:
+			total_frame_offset = DOMRect(x=0.0, y=0.0, width=0.0, height=0.0)
+		else:
+			total_frame_offset = DOMRect(
+				total_frame_offset.x, total_frame_offset.y, total_frame_offset.width, total_frame_offset.height
+			)
+
+		# memoize the mf (I don't know if some nodes are duplicated)
+		if node['nodeId'] in enhanced_dom_tree_node_lookup:
+			return enhanced_dom_tree_node_lookup[node['nodeId']]
+
+		ax_node = ax_tree_lookup.get(node['backendNodeId'])
+		if ax_node:
+			enhanced_ax_node = build_enhanced_ax_node(ax_node)
+		else:
+			enhanced_ax_node = None
+
+		# To make attributes more readable
+		attributes: dict[str, str] | None = None
+		if 'attributes' in node and node['attributes']:
+			attributes = {}
+			for i in range(0, len(node['attributes']), 2):
+				attributes[node['attributes'][i]] = node['attributes'][i + 1]
+
+		shadow_root_type = None
+		if 'shadowRootType' in node and node['shadowRootType']:
+			try:
+				shadow_root_type = node['shadowRootType']
+			except ValueError:
+				pass
+
+		# Get snapshot data and calculate absolute position
+		snapshot_data = snapshot_lookup.get(node['backendNodeId'], None)
+		absolute_position = None
+		if snapshot_data and snapshot_data.bounds:
+			absolute_position = DOMRect(
+				x=snapshot_data.bounds.x + total_frame_offset.x,
+				y=snapshot_data.bounds.y + total_frame_offset.y,
+				width=snapshot_data.bounds.width,
+				height=snapshot_data.bounds.height,
+			)
+
+		dom_tree_node = EnhancedDOMTreeNode(
+			node_id=node['nodeId'],
+			backend_node_id=node['backendNodeId'],
+			node_type=NodeType(node['nodeType']),
+			node_name=node['nodeName'],
+			node_value=node['nodeValue'],
+			attributes=attributes or {},
+			is_scrollable=node.get('isScrollable', None),
+			frame_id=node.get('frameId', None),
+			session_id=session_id,
+			target_id=target_id,
+			content_document=None,
+			shadow_root_type=shadow_root_type,
+			shadow_roots=None,
+			parent_node=None,
+			children_nodes=None,
+			ax_node=enhanced_ax_node,
+			snapshot_node=snapshot_data,
+			is_visible=None,
+			absolute_position=absolute_position,
+			element_index=None,
+		)
+
+		enhanced_dom_tree_node_lookup[node['nodeId']] = dom_tree_node
+
+		if 'parentId' in node and node['parentId']:
+			dom_tree_node.parent_node = enhanced_dom_tree_node_lookup[node['parentId']]  # parents should always be in the lookup
+
+		# Check if this is an HTML frame node and add it to the list. The list is only copied when a frame is added
+		# (it is never mutated), so all nodes of a document share the same list object
+		updated_html_frames = html_frames
+		if node['nodeType'] == NodeType.ELEMENT_NODE.value and node['nodeName'] == 'HTML' and node.get('frameId') is not None:
+			updated_html_frames = html_frames + [dom_tree_node]
+
+			# and adjust the total frame offset by scroll
+			if snapshot_data and snapshot_data.scrollRects:
+				total_frame_offset.x -= snapshot_data.scrollRects.x
+				total_frame_offset.y -= snapshot_data.scrollRects.y
+				# DEBUG: Log iframe scroll information
+				logger.debug(
+					f'🔍 DEBUG: HTML frame scroll - scrollY={snapshot_data.scrollRects.y}, scrollX={snapshot_data.scrollRects.x}, frameId={node.get("frameId")}, nodeId={node["nodeId"]}'
+				)
+
+		# Calculate new iframe offset for content documents, accounting for iframe scroll
+		if (
+			(node['nodeName'].upper() == 'IFRAME' or node['nodeName'].upper() == 'FRAME')
+			and snapshot_data
+			and snapshot_data.bounds
+		):
+			if snapshot_data.bounds:
+				updated_html_frames = html_frames + [dom_tree_node]
+
+				total_frame_offset.x += snapshot_data.bounds.x
+				total_frame_offset.y += snapshot_data.bounds.y
+
+		if 'contentDocument' in node and node['contentDocument']:
+			dom_tree_node.content_document = _construct_enhanced_node(
+				node['contentDocument'], updated_html_frames, total_frame_offset
+			)
+			dom_tree_node.content_document.parent_node = dom_tree_node
+			# forcefully set the parent node to the content document node (helps traverse the tree)
+
+		if 'shadowRoots' in node and node['shadowRoots']:
+			dom_tree_node.shadow_roots = []
+			for shadow_root in node['shadowRoots']:
+				shadow_root_node = _construct_enhanced_node(shadow_root, updated_html_frames, total_frame_offset)
+				# forcefully set the parent node to the shadow root node (helps traverse the tree)
+				shadow_root_node.parent_node = dom_tree_node
+				dom_tree_node.shadow_roots.append(shadow_root_node)
+
+		if 'children' in node and node['children']:
+			dom_tree_node.children_nodes = []
+			for child in node['children']:
+				dom_tree_node.children_nodes.append(_construct_enhanced_node(child, updated_html_frames, total_frame_offset))
+
+		# Set visibility using the collected HTML frames
+		dom_tree_node.is_visible = is_element_visible_according_to_all_parents(dom_tree_node, updated_html_frames)
+
+		# Cross origin iframes (no content in this target's payloads) are loaded from their own target by the caller
+		if collect_cross_origin_iframes and node['nodeName'].upper() == 'IFRAME' and node.get('contentDocument', None) is None:
+			cross_origin_iframes.append((dom_tree_node, total_frame_offset))
+
+		return dom_tree_node
+
+	enhanced_dom_tree_node = _construct_enhanced_node(dom_tree['root'], initial_html_frames, initial_total_frame_offset)
+
+	if logger.isEnabledFor(logging.DEBUG):
+		for dom_tree_node in enhanced_dom_tree_node_lookup.values():
+			_log_form_element_visibility(dom_tree_node, logger)
+
+	return enhanced_dom_tree_node, cross_origin_iframes
+
+
+def is_element_visible_according_to_all_parents(node: EnhancedDOMTreeNode, html_frames: list[EnhancedDOMTreeNode]) -> bool:
+	"""Check if the element is visible according to all its parent HTML frames.
+
+	Like the rest of tree construction this translates the element's snapshot bounds in place: by the offset of each
+	iframe it is in and by the scroll position of each document, stopping at the first frame it doesn't intersect.
+	"""
+	snapshot_node = node.snapshot_node
+	if not snapshot_node or snapshot_node.is_hidden_by_styles:
+		return False
+
+	# Start with the element's local bounds (in its own frame's coordinate system)
+	current_bounds = snapshot_node.bounds
+
+	if not current_bounds:
+		return False  # If there are no bounds, the element is not visible
+
+	"""
+	Reverse iterate through the html frames (that can be either iframe or document -> if it's a document frame compare if the current bounds interest with it (taking scroll into account) otherwise move the current bounds by the iframe offset)
+	"""
+	for frame in reversed(html_frames):
+		frame_snapshot = frame.snapshot_node
+		if frame.node_type != NodeType.ELEMENT_NODE or not frame_snapshot:
+			continue
+
+		if frame.node_name == 'HTML':
+			scroll_rects = frame_snapshot.scrollRects
+			client_rects = frame_snapshot.clientRects
+			if not scroll_rects or not client_rects:
+				continue
+
+			# Elements are visible if they fall within the frame's viewport (clientRects, which always starts at 0 in
+			# frame coordinates) after accounting for its scroll position (scrollRects)
+			adjusted_x = current_bounds.x - scroll_rects.x
+			adjusted_y = current_bounds.y - scroll_rects.y
+
+			frame_intersects = (
+				adjusted_x < client_rects.width
+				and adjusted_x + current_bounds.width > 0
+				and adjusted_y < client_rects.height + VIEWPORT_MARGIN
+				and adjusted_y + current_bounds.height > -VIEWPORT_MARGIN
+			)
+
+			if not frame_intersects:
+				return False
+
+			# Keep the coordinate adjustment to maintain consistency with the parent frames
+			current_bounds.x = adjusted_x
+			current_bounds.y = adjusted_y
+
+		elif frame.node_name.upper() in ('IFRAME', 'FRAME') and frame_snapshot.bounds:
+			# negate the values added in `_construct_enhanced_node`
+			current_bounds.x += frame_snapshot.bounds.x
+			current_bounds.y += frame_snapshot.bounds.y
+
+	# If we reach here, element is visible in main viewport and all containing iframes
+	return True
+
+
+def should_load_cross_origin_iframe(iframe_node: EnhancedDOMTreeNode, logger: logging.Logger = logger) -> bool:
+	"""Whether a cross-origin iframe is visible and large enough to be worth loading its content"""
+	if not iframe_node.is_visible:
+		logger.debug('Skipping invisible cross-origin iframe')
+		return False
+	if not (iframe_node.snapshot_node and iframe_node.snapshot_node.bounds):
+		logger.debug('Skipping cross-origin iframe: no bounds available')
+		return False
+
+	bounds = iframe_node.snapshot_node.bounds
+	if bounds.width < MIN_CROSS_ORIGIN_IFRAME_SIZE or bounds.height < MIN_CROSS_ORIGIN_IFRAME_SIZE:
+		logger.debug(
+			f'Skipping small cross-origin iframe: width={bounds.width}, height={bounds.height} (needs >= {MIN_CROSS_ORIGIN_IFRAME_SIZE}px)'
+		)
+		return False
+
+	logger.debug(f'Processing cross-origin iframe: visible=True, width={bounds.width}, height={bounds.height}')
+	return True
+
+
+def _log_form_element_visibility(dom_tree_node: EnhancedDOMTreeNode, logger: logging.Logger) -> None:
+	"""DEBUG: Log visibility info for form elements in iframes"""
+	if dom_tree_node.tag_name and dom_tree_node.tag_name.upper() in ['INPUT', 'SELECT', 'TEXTAREA', 'LABEL']:
+		attrs = dom_tree_node.attributes or {}
+		elem_id = attrs.get('id', '')
+		elem_name = attrs.get('name', '')
+		if (
+			'city' in elem_id.lower()
+			or 'city' in elem_name.lower()
+			or 'state' in elem_id.lower()
+			or 'state' in elem_name.lower()
+			or 'zip' in elem_id.lower()
+			or 'zip' in elem_name.lower()
+		):
+			logger.debug(
+				f"🔍 DEBUG: Form element {dom_tree_node.tag_name} id='{elem_id}' name='{elem_name}' - visible={dom_tree_node.is_visible}, bounds={dom_tree_node.snapshot_node.bounds if dom_tree_node.snapshot_node else 'NO_SNAPSHOT'}"
+			)
@@ -1,6 +1,7 @@
 import hashlib
 from dataclasses import asdict, dataclass, field
 from enum import Enum
+from functools import cached_property
 from typing import Any
 
 from cdp_use.cdp.accessibility.commands import GetFullAXTreeReturns
@@ -121,6 +122,24 @@ STATIC_ATTRIBUTES = {
 }
 
 
+def compute_element_hash(parent_branch_path: list[str], attributes: dict[str, str]) -> int:
+	"""
+	Hash of an element from the tag names of its parent branch (root to element) and its static attributes.
+
+	Used by `EnhancedDOMTreeNode.__hash__`, and to match elements recorded in history without building a DOM tree.
+	"""
+	parent_branch_path_string = '/'.join(parent_branch_path)
+
+	attributes_string = ''.join(f'{k}={v}' for k, v in sorted((k, v) for k, v in attributes.items() if k in STATIC_ATTRIBUTES))
+
+	# Combine both for final hash
+	combined_string = f'{parent_branch_path_string}|{attributes_string}'
+	element_hash = hashlib.sha256(combined_string.encode()).hexdigest()
+
+	# Convert to int for __hash__ return type - use first 16 chars and convert from hex to int
+	return int(element_hash[:16], 16)
+
+
 @dataclass
 class CurrentPageTargets:
 	page_session: TargetInfo
@@ -281,11 +300,34 @@ class EnhancedSnapshotNode:
 	"""
 
 	computed_styles: dict[str, str] | None
-	"""Computed styles from the layout tree"""
+	"""Computed styles from the layout tree (read-only: nodes with the same styles share one dict)"""
 	paint_order: int | None
 	"""Paint order from the layout tree"""
 	stacking_contexts: int | None
 	"""Stacking contexts from the layout tree"""
+	is_hidden_by_styles: bool | None = None
+	"""Whether `display`, `visibility` or `opacity` hide the element (derived from computed_styles when not given)"""
+
+	def __post_init__(self) -> None:
+		if self.is_hidden_by_styles is None:
+			self.is_hidden_by_styles = self.styles_hide_element(self.computed_styles)
+
+	@staticmethod
+	def styles_hide_element(computed_styles: dict[str, str] | None) -> bool:
+		"""Whether these computed styles make the element invisible."""
+		computed_styles = computed_styles or {}
+
+		display = computed_styles.get('display', '').lower()
+		visibility = computed_styles.get('visibility', '').lower()
+		opacity = computed_styles.get('opacity', '1')
+
+		if display == 'none' or visibility == 'hidden':
+			return True
+
+		try:
+			return float(opacity) <= 0
+		except (ValueError, TypeError):
+			return False
 
 
 # @dataclass(slots=True)
@@ -754,20 +796,7 @@ class EnhancedDOMTreeNode:
 		TODO: migrate this to use only backendNodeId + current SessionId
 		"""
 
-		# Get parent branch path
-		parent_branch_path = self._get_parent_branch_path()
-		parent_branch_path_string = '/'.join(parent_branch_path)
-
-		attributes_string = ''.join(
-			f'{k}={v}' for k, v in sorted((k, v) for k, v in self.attributes.items() if k in STATIC_ATTRIBUTES)
-		)
-
-		# Combine both for final hash
-		combined_string = f'{parent_branch_path_string}|{attributes_string}'
-		element_hash = hashlib.sha256(combined_string.encode()).hexdigest()
-
-		# Convert to int for __hash__ return type - use first 16 chars and convert from hex to int
-		return int(element_hash[:16], 16)
+		return compute_element_hash(self._get_parent_branch_path(), self.attributes)
 
 	def parent_branch_hash(self) -> int:
 		"""
@@ -796,6 +825,100 @@ class EnhancedDOMTreeNode:
 DOMSelectorMap = dict[int, EnhancedDOMTreeNode]
 
 
+class _VersionedSelectorMap(dict[int, EnhancedDOMTreeNode]):
+	"""Selector map that counts its mutations, so lookups derived from it know when to rebuild."""
+
+	version = 0
+
+	def __setitem__(self, key, value):
+		self.version += 1
+		super().__setitem__(key, value)
+
+	def __delitem__(self, key):
+		self.version += 1
+		super().__delitem__(key)
+
+	def __ior__(self, other):  # type: ignore[override]
+		self.version += 1
+		return super().__ior__(other)
+
+	def update(self, *args, **kwargs):
+		self.version += 1
+		super().update(*args, **kwargs)
+
+	def setdefault(self, key, default=None):  # type: ignore[override]
+		self.version += 1
+		return super().setdefault(key, default)  # type: ignore[arg-type]
+
+	def pop(self, *args):  # type: ignore[override]
+		self.version += 1
+		return super().pop(*args)
+
+	def popitem(self):
+		self.version += 1
+		return super().popitem()
+
+	def clear(self):
+		self.version += 1
+		super().clear()
+
+
+class ElementIdentityIndex:
+	"""
+	Identity lookups over the elements of a selector map.
+
+	Built once per SerializedDOMState and reused while that state is the cached one, so comparing the next step
+	against it (new element markers, multi_act page change checks, history element lookups) doesn't
+	rehash every element again. Each lookup table is computed on first use.
+	"""
+
+	def __init__(self, selector_map: DOMSelectorMap):
+		self._selector_map = selector_map
+
+	@cached_property
+	def backend_node_ids(self) -> frozenset[int]:
+		"""Backend node ids of all elements in the selector map."""
+		return frozenset(element.backend_node_id for element in self._selector_map.values())
+
+	@cached_property
+	def branch_hash_by_index(self) -> dict[int, int]:
+		"""`parent_branch_hash()` of each element, by highlight index."""
+		return {index: element.parent_branch_hash() for index, element in self._selector_map.items()}
+
+	@cached_property
+	def branch_hashes(self) -> frozenset[int]:
+		"""`parent_branch_hash()` of all elements in the selector map."""
+		return frozenset(self.branch_hash_by_index.values())
+
+	@cached_property
+	def index_by_element_hash(self) -> dict[int, int]:
+		"""Highlight index of the first element with each `element_hash`."""
+		index_by_hash: dict[int, int] = {}
+		for index, element in self._selector_map.items():
+			index_by_hash.setdefault(element.element_hash, index)
+		return index_by_hash
+
+	def is_new_element(self, element: EnhancedDOMTreeNode) -> bool:
+		"""Whether the element was not part of this selector map."""
+		return element.backend_node_id not in self.backend_node_ids
+
+	def has_new_elements_since(self, previous: 'ElementIdentityIndex') -> bool:
+		"""Whether any element here has a parent branch that did not exist in the previous selector map."""
+		return not self.branch_hashes <= previous.branch_hashes
+
+
+@dataclass
+class BudgetedDOMText:
+	"""Serialized DOM tree cut off at a character budget"""
+
+	text: str
+	truncated: bool = False
+	omitted_elements: int = 0
+	"""Interactive elements that didn't fit in the budget"""
+	viewport_first: bool = False
+	"""Whether elements in the viewport were written before the rest of the page"""
+
+
 @dataclass
 class SerializedDOMState:
 	_root: SimplifiedNode | None
@@ -803,6 +926,27 @@ class SerializedDOMState:
 
 	selector_map: DOMSelectorMap
 
+	_identity_index: ElementIdentityIndex | None = field(default=None, init=False, repr=False, compare=False)
+	_identity_index_version: int = field(default=0, init=False, repr=False, compare=False)
+
+	def __setattr__(self, name: str, value: Any) -> None:
+		# the selector map counts its mutations, so the identity index is rebuilt after any change to it
+		if name == 'selector_map':
+			if not isinstance(value, _VersionedSelectorMap):
+				value = _VersionedSelectorMap(value)
+			object.__setattr__(self, '_identity_index', None)
+		object.__setattr__(self, name, value)
+
+	@property
+	def identity_index(self) -> ElementIdentityIndex:
+		"""Identity lookups over `selector_map`, computed once per version of it and reused by every consumer of this state."""
+		selector_map = self.selector_map
+		version = selector_map.version if isinstance(selector_map, _VersionedSelectorMap) else -1
+		if self._identity_index is None or self._identity_index_version != version:
+			self._identity_index = ElementIdentityIndex(selector_map)
+			self._identity_index_version = version
+		return self._identity_index
+
 	@observe_debug(ignore_input=True, ignore_output=True, name='llm_representation')
 	def llm_representation(
 		self,
@@ -818,6 +962,26 @@ class SerializedDOMState:
 
 		return DOMTreeSerializer.serialize_tree(self._root, include_attributes)
 
+	@observe_debug(ignore_input=True, ignore_output=True, name='llm_representation_with_budget')
+	def llm_representation_with_budget(
+		self,
+		max_length: int,
+		include_attributes: list[str] | None = None,
+		viewport: tuple[float, float] | None = None,
+	) -> BudgetedDOMText:
+		"""Like `llm_representation`, but stops serializing once `max_length` characters are written.
+
+		If the page doesn't fit and a `viewport` (top, bottom) in page coordinates is given, elements in the viewport come first.
+		"""
+		from browser_use.dom.serializer.serializer import DOMTreeSerializer
+
+		if not self._root:
+			return BudgetedDOMText(text='Empty DOM tree (you might have to wait for the page to load)')
+
+		include_attributes = include_attributes or DEFAULT_INCLUDE_ATTRIBUTES
+
+		return DOMTreeSerializer.serialize_tree_with_budget(self._root, include_attributes, max_length, viewport=viewport)
+
 
 @dataclass
 class DOMInteractedElement:
@@ -0,0 +1,102 @@
+"""
+Waiting for files to appear in a directory without sleeping in coarse steps.
+
+On Linux `DirectoryWatcher` uses inotify (through libc, no extra dependency) and wakes up as soon as a file in the
+directory is created, written or renamed into it. Elsewhere, or if inotify isn't available, it falls back to polling at
+a fine interval.
+"""
+
+import asyncio
+import ctypes
+import ctypes.util
+import logging
+import os
+import sys
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POLL_INTERVAL = 0.1  # seconds
+
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_NONBLOCK = os.O_NONBLOCK
+_IN_CLOEXEC = 0o2000000
+
+_libc: ctypes.CDLL | None = None
+
+
+def _load_libc() -> ctypes.CDLL | None:
+	global _libc
+	if _libc is None and sys.platform.startswith('linux'):
+		try:
+			libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+			libc.inotify_init1.argtypes = [ctypes.c_int]
+			libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+			_libc = libc
+		except (OSError, AttributeError) as e:
+			logger.debug(f'inotify is not available, polling directories instead: {type(e).__name__}: {e}')
+	return _libc
+
+
+class DirectoryWatcher:
+	"""Wakes up waiters when files in a directory change. Use as an async context manager."""
+
+	def __init__(self, directory: str | Path, poll_interval: float = DEFAULT_POLL_INTERVAL, use_inotify: bool = True):
+		self.directory = Path(directory)
+		self.poll_interval = poll_interval
+		self.use_inotify = use_inotify
+		self._fd: int | None = None
+		self._loop: asyncio.AbstractEventLoop | None = None
+		self._changed = asyncio.Event()
+
+	@property
+	def is_event_driven(self) -> bool:
+		"""Whether changes are reported by inotify rather than found by polling"""
+		return self._fd is not None
+
+	async def __aenter__(self) -> 'DirectoryWatcher':
+		libc = _load_libc() if self.use_inotify else None
+		if libc is not None:
+			fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+			if fd >= 0:
+				wd = libc.inotify_add_watch(fd, os.fsencode(self.directory), _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE)
+				try:
+					if wd < 0:
+						raise OSError(ctypes.get_errno(), 'inotify_add_watch failed')
+					self._loop = asyncio.get_running_loop()
+					self._loop.add_reader(fd, self._on_readable)
+					self._fd = fd
+				except (OSError, NotImplementedError) as e:
+					# e.g. the directory doesn't exist yet, or the event loop can't watch file descriptors (Windows)
+					logger.debug(f'Could not watch {self.directory} with inotify, polling instead: {type(e).__name__}: {e}')
+					os.close(fd)
+		return self
+
+	async def __aexit__(self, *exc_info) -> None:
+		if self._fd is not None:
+			assert self._loop is not None
+			self._loop.remove_reader(self._fd)
+			os.close(self._fd)
+			self._fd = None
+
+	def _on_readable(self) -> None:
+		assert self._fd is not None
+		try:
+			while os.read(self._fd, 4096):
+				pass
+		except BlockingIOError:
+			pass
+		self._changed.set()
+
+	async def wait_for_change(self, timeout: float | None = None) -> None:
+		"""Return once the directory changed (inotify) or the next poll is due, or after `timeout` seconds"""
+		if self._fd is None:
+			await asyncio.sleep(self.poll_interval if timeout is None else min(timeout, self.poll_interval))
+			return
+		try:
+			await asyncio.wait_for(self._changed.wait(), timeout)
+		except TimeoutError:
+			pass
+		self._changed.clear()
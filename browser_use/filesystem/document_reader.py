@@ -0,0 +1,140 @@
+"""
+Reading external documents (downloads, user-provided files) for the read_file action.
+
+PDF text extraction is CPU-bound, so `FileSystem` runs these reads on its file I/O executor instead of the event loop,
+and only for the requested page range. Extracted page text is cached per (path, mtime, size), so paging through a
+document doesn't parse it again. Text files are read in byte ranges instead of whole.
+"""
+
+import codecs
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+DEFAULT_PDF_PAGES = 10
+DEFAULT_TEXT_BYTES = 100_000
+_MAX_CACHED_DOCUMENTS = 16
+
+
+@dataclass
+class DocumentChunk:
+	"""A page range of a PDF or a byte range of a text file"""
+
+	text: str
+	start: int  # first page (1-based) or offset of the first byte
+	end: int  # last page (inclusive) or offset after the last byte
+	total: int  # pages or bytes in the document
+
+	@property
+	def remaining(self) -> int:
+		return self.total - self.end
+
+
+@dataclass
+class _PdfDocument:
+	reader: Any  # pypdf.PdfReader, which holds the whole file in memory
+	pages: dict[int, str] = field(default_factory=dict)  # 0-based page number -> extracted text
+	lock: threading.Lock = field(default_factory=threading.Lock)  # PdfReader isn't thread-safe
+
+
+def _file_key(path: Path) -> tuple[str, int, int]:
+	stat = path.stat()
+	return str(path.resolve()), stat.st_mtime_ns, stat.st_size
+
+
+class DocumentReader:
+	"""Reads page ranges of PDFs and byte ranges of text files, caching extracted PDF text"""
+
+	def __init__(self, max_cached_documents: int = _MAX_CACHED_DOCUMENTS):
+		self.max_cached_documents = max_cached_documents
+		self._documents: OrderedDict[tuple[str, int, int], _PdfDocument] = OrderedDict()
+		self._lock = threading.Lock()
+
+	def read_pdf(self, path: str | Path, start_page: int = 1, end_page: int | None = None) -> DocumentChunk:
+		"""Extract the text of pages `start_page` to `end_page` (1-based, inclusive). Blocking, run it off the event loop.
+
+		Raises:
+			ValueError: If the page range is outside the document
+		"""
+		document = self._get_pdf(Path(path))
+		with document.lock:
+			total = len(document.reader.pages)
+			if total == 0:
+				return DocumentChunk(text='', start=1, end=0, total=0)
+			if start_page < 1 or start_page > total:
+				raise ValueError(f'start_page must be between 1 and {total}, got {start_page}')
+			if end_page is None:
+				end_page = start_page + DEFAULT_PDF_PAGES - 1
+			end_page = min(end_page, total)
+			if end_page < start_page:
+				raise ValueError(f'end_page must not be before start_page {start_page}, got {end_page}')
+
+			texts = []
+			for page_number in range(start_page - 1, end_page):
+				if page_number not in document.pages:
+					document.pages[page_number] = document.reader.pages[page_number].extract_text()
+				texts.append(document.pages[page_number])
+
+		return DocumentChunk(text='\n'.join(texts), start=start_page, end=end_page, total=total)
+
+	def _get_pdf(self, path: Path) -> _PdfDocument:
+		key = _file_key(path)
+		with self._lock:
+			document = self._documents.get(key)
+			if document is not None:
+				self._documents.move_to_end(key)
+				return document
+
+		import pypdf
+
+		document = _PdfDocument(reader=pypdf.PdfReader(path))
+		with self._lock:
+			# drop older versions of the same file, then the least recently read documents
+			for stale_key in [k for k in self._documents if k[0] == key[0]]:
+				del self._documents[stale_key]
+			self._documents[key] = document
+			while len(self._documents) > self.max_cached_documents:
+				self._documents.popitem(last=False)
+		return document
+
+	def read_text(self, path: str | Path, start_byte: int = 0, max_bytes: int = DEFAULT_TEXT_BYTES) -> DocumentChunk:
+		"""Read up to `max_bytes` of a UTF-8 text file from `start_byte`, without splitting characters. Blocking.
+
+		Raises:
+			ValueError: If `start_byte` is outside the file
+		"""
+		with open(path, 'rb') as f:
+			total = os.fstat(f.fileno()).st_size
+			if start_byte < 0 or start_byte > total:
+				raise ValueError(f'start_byte must be between 0 and {total}, got {start_byte}')
+			f.seek(start_byte)
+			data = f.read(max_bytes)
+
+		# an offset in the middle of a character starts at the next one
+		skip = 0
+		while skip < min(len(data), 3) and data[skip] & 0xC0 == 0x80:
+			skip += 1
+		# a range ending in the middle of a character ends before it, the next range picks it up
+		decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+		end = start_byte + len(data)
+		text = decoder.decode(data[skip:], final=end == total)
+		pending, _ = decoder.getstate()
+		return DocumentChunk(text=text, start=start_byte + skip, end=end - len(pending), total=total)
+
+	def clear(self) -> None:
+		with self._lock:
+			self._documents.clear()
+
+
+# One reader shared by every FileSystem, so agents reading the same download share its extracted text
+_DOCUMENT_READER: DocumentReader | None = None
+
+
+def get_document_reader() -> DocumentReader:
+	global _DOCUMENT_READER
+	if _DOCUMENT_READER is None:
+		_DOCUMENT_READER = DocumentReader()
+	return _DOCUMENT_READER
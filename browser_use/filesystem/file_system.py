@@ -2,18 +2,23 @@ import asyncio
 import re
 import shutil
 from abc import ABC, abstractmethod
+from collections.abc import Callable
 from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any
+from typing import Any, TypeVar
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.styles import getSampleStyleSheet
 from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer
 
+from browser_use.filesystem.document_reader import get_document_reader
+
 INVALID_FILENAME_ERROR_MESSAGE = 'Error: Invalid filename format. Must be alphanumeric with supported extension.'
 DEFAULT_FILE_SYSTEM_PATH = 'browseruse_agent_data'
 
+T = TypeVar('T')
+
 
 class FileSystemError(Exception):
 	"""Custom exception for file system operations that should be shown to LLM"""
@@ -21,12 +26,34 @@ class FileSystemError(Exception):
 	pass
 
 
+# One executor shared by every FileSystem, instead of spinning up a new thread pool per write
+_FILE_IO_EXECUTOR: ThreadPoolExecutor | None = None
+_FILE_IO_MAX_WORKERS = 4
+
+
+def _get_file_io_executor() -> ThreadPoolExecutor:
+	global _FILE_IO_EXECUTOR
+	if _FILE_IO_EXECUTOR is None:
+		_FILE_IO_EXECUTOR = ThreadPoolExecutor(max_workers=_FILE_IO_MAX_WORKERS, thread_name_prefix='browser_use_file_io')
+	return _FILE_IO_EXECUTOR
+
+
+async def _run_file_io(func: Callable[[], T]) -> T:
+	"""Run a blocking file operation on the shared file I/O executor."""
+	return await asyncio.get_running_loop().run_in_executor(_get_file_io_executor(), func)
+
+
 class BaseFile(BaseModel, ABC):
 	"""Base class for all file types"""
 
 	name: str
 	content: str = ''
 
+	# Disk file that currently mirrors `content` byte-for-byte, used to turn appends into O_APPEND writes
+	_synced_file_path: Path | None = PrivateAttr(default=None)
+	# Bumped on every content change, lets callers cache things derived from the content
+	_version: int = PrivateAttr(default=0)
+
 	# --- Subclass must define this ---
 	@property
 	@abstractmethod
@@ -46,23 +73,45 @@ class BaseFile(BaseModel, ABC):
 
 	def update_content(self, content: str) -> None:
 		self.content = content
+		self._synced_file_path = None
+		self._version += 1
+
+	@property
+	def version(self) -> int:
+		"""Counter that increases every time the content changes"""
+		return self._version
 
 	def sync_to_disk_sync(self, path: Path) -> None:
 		file_path = path / self.full_name
 		file_path.write_text(self.content)
+		self._synced_file_path = file_path
 
-	async def sync_to_disk(self, path: Path) -> None:
+	def append_to_disk_sync(self, content: str, path: Path, in_sync: bool) -> None:
+		"""Append only the new content to the file on disk, falling back to a full rewrite if the disk copy is stale"""
 		file_path = path / self.full_name
-		with ThreadPoolExecutor() as executor:
-			await asyncio.get_event_loop().run_in_executor(executor, lambda: file_path.write_text(self.content))
+		if not in_sync or not file_path.exists():
+			self.sync_to_disk_sync(path)
+			return
+		# mode 'a' opens with O_APPEND, so only the new bytes are written
+		with open(file_path, 'a') as f:
+			f.write(content)
+		self._synced_file_path = file_path
+
+	async def sync_to_disk(self, path: Path) -> None:
+		await _run_file_io(lambda: self.sync_to_disk_sync(path))
 
 	async def write(self, content: str, path: Path) -> None:
 		self.write_file_content(content)
 		await self.sync_to_disk(path)
 
 	async def append(self, content: str, path: Path) -> None:
+		in_sync = self._synced_file_path == path / self.full_name
 		self.append_file_content(content)
-		await self.sync_to_disk(path)
+		await _run_file_io(lambda: self.append_to_disk_sync(content, path, in_sync))
+
+	async def flush(self) -> None:
+		"""Write out any deferred disk updates. Plain text files are written through, so there is nothing to do."""
+		pass
 
 	def read(self) -> str:
 		return self.content
@@ -115,6 +164,9 @@ class CsvFile(BaseFile):
 class PdfFile(BaseFile):
 	"""PDF file implementation"""
 
+	# Directory to render into on the next flush(), set when content changed since the last render
+	_pending_render_path: Path | None = PrivateAttr(default=None)
+
 	@property
 	def extension(self) -> str:
 		return 'pdf'
@@ -152,8 +204,22 @@ class PdfFile(BaseFile):
 			raise FileSystemError(f"Error: Could not write to file '{self.full_name}'. {str(e)}")
 
 	async def sync_to_disk(self, path: Path) -> None:
-		with ThreadPoolExecutor() as executor:
-			await asyncio.get_event_loop().run_in_executor(executor, lambda: self.sync_to_disk_sync(path))
+		self._pending_render_path = None
+		await _run_file_io(lambda: self.sync_to_disk_sync(path))
+
+	async def write(self, content: str, path: Path) -> None:
+		# Rendering with reportlab is expensive, defer it until flush() instead of re-rendering on every edit
+		self.write_file_content(content)
+		self._pending_render_path = path
+
+	async def append(self, content: str, path: Path) -> None:
+		self.append_file_content(content)
+		self._pending_render_path = path
+
+	async def flush(self) -> None:
+		"""Render the PDF if its content changed since the last render"""
+		if self._pending_render_path is not None:
+			await self.sync_to_disk(self._pending_render_path)
 
 
 class FileSystemState(BaseModel):
@@ -188,6 +254,8 @@ class FileSystem:
 		}
 
 		self.files = {}
+		# full filename -> (file object, file version, rendered <file> block) for describe()
+		self._describe_cache: dict[str, tuple[BaseFile, int, str]] = {}
 		if create_default_files:
 			self.default_files = ['todo.md']
 			self._create_default_files()
@@ -253,38 +321,54 @@ class FileSystem:
 
 		return file_obj.read()
 
-	async def read_file(self, full_filename: str, external_file: bool = False) -> str:
-		"""Read file content using file-specific read method and return appropriate message to LLM"""
+	async def read_file(
+		self,
+		full_filename: str,
+		external_file: bool = False,
+		start_page: int = 1,
+		end_page: int | None = None,
+		start_byte: int = 0,
+	) -> str:
+		"""Read file content using file-specific read method and return appropriate message to LLM
+
+		External PDFs are read `start_page` to `end_page` (1-based, 10 pages by default) and external text files from
+		`start_byte`, up to 100k bytes. Both are read off the event loop.
+		"""
 		if external_file:
 			try:
 				try:
 					_, extension = self._parse_filename(full_filename)
 				except Exception:
 					return f'Error: Invalid filename format {full_filename}. Must be alphanumeric with a supported extension.'
+				reader = get_document_reader()
 				if extension in ['md', 'txt', 'json', 'csv']:
-					import anyio
-
-					async with await anyio.open_file(full_filename, 'r') as f:
-						content = await f.read()
-						return f'Read from file {full_filename}.\n<content>\n{content}\n</content>'
+					chunk = await _run_file_io(lambda: reader.read_text(full_filename, start_byte))
+					if chunk.start == 0 and chunk.remaining == 0:
+						return f'Read from file {full_filename}.\n<content>\n{chunk.text}\n</content>'
+					more_text = (
+						f'{chunk.remaining} more bytes, continue with start_byte={chunk.end}.' if chunk.remaining > 0 else ''
+					)
+					return (
+						f'Read bytes {chunk.start}-{chunk.end} of {chunk.total} from file {full_filename}.\n'
+						f'<content>\n{chunk.text}\n{more_text}</content>'
+					)
 				elif extension == 'pdf':
-					import pypdf
-
-					reader = pypdf.PdfReader(full_filename)
-					num_pages = len(reader.pages)
-					MAX_PDF_PAGES = 10
-					extra_pages = num_pages - MAX_PDF_PAGES
-					extracted_text = ''
-					for page in reader.pages[:MAX_PDF_PAGES]:
-						extracted_text += page.extract_text()
-					extra_pages_text = f'{extra_pages} more pages...' if extra_pages > 0 else ''
-					return f'Read from file {full_filename}.\n<content>\n{extracted_text}\n{extra_pages_text}</content>'
+					chunk = await _run_file_io(lambda: reader.read_pdf(full_filename, start_page, end_page))
+					more_text = (
+						f'{chunk.remaining} more pages, continue with start_page={chunk.end + 1}.' if chunk.remaining > 0 else ''
+					)
+					pages_text = (
+						f' pages {chunk.start}-{chunk.end} of {chunk.total}' if chunk.start > 1 or chunk.remaining > 0 else ''
+					)
+					return f'Read{pages_text} from file {full_filename}.\n<content>\n{chunk.text}\n{more_text}</content>'
 				else:
 					return f'Error: Cannot read file {full_filename} as {extension} extension is not supported.'
 			except FileNotFoundError:
 				return f"Error: File '{full_filename}' not found."
 			except PermissionError:
 				return f"Error: Permission denied to read file '{full_filename}'."
+			except ValueError as e:
+				return f"Error: Could not read file '{full_filename}': {e}"
 			except Exception as e:
 				return f"Error: Could not read file '{full_filename}'."
 
@@ -360,8 +444,9 @@ class FileSystem:
 
 		try:
 			content = file_obj.read()
-			content = content.replace(old_str, new_str)
-			await file_obj.write(content, self.data_dir)
+			new_content = content.replace(old_str, new_str)
+			if new_content != content:
+				await file_obj.write(new_content, self.data_dir)
 			return f'Successfully replaced all occurrences of "{old_str}" with "{new_str}" in file {full_filename}'
 		except FileSystemError as e:
 			return str(e)
@@ -380,82 +465,107 @@ class FileSystem:
 
 	def describe(self) -> str:
 		"""List all files with their content information using file-specific display methods"""
-		DISPLAY_CHARS = 400
 		description = ''
+		described_files: set[str] = set()
 
-		for file_obj in self.files.values():
+		for full_filename, file_obj in self.files.items():
 			# Skip todo.md from description
 			if file_obj.full_name == 'todo.md':
 				continue
 
-			content = file_obj.read()
-
-			# Handle empty files
-			if not content:
-				description += f'<file>\n{file_obj.full_name} - [empty file]\n</file>\n'
-				continue
-
-			lines = content.splitlines()
-			line_count = len(lines)
-
-			# For small files, display the entire content
-			whole_file_description = (
-				f'<file>\n{file_obj.full_name} - {line_count} lines\n<content>\n{content}\n</content>\n</file>\n'
-			)
-			if len(content) < int(1.5 * DISPLAY_CHARS):
-				description += whole_file_description
-				continue
-
-			# For larger files, display start and end previews
-			half_display_chars = DISPLAY_CHARS // 2
-
-			# Get start preview
-			start_preview = ''
-			start_line_count = 0
-			chars_count = 0
-			for line in lines:
-				if chars_count + len(line) + 1 > half_display_chars:
-					break
-				start_preview += line + '\n'
-				chars_count += len(line) + 1
-				start_line_count += 1
-
-			# Get end preview
-			end_preview = ''
-			end_line_count = 0
-			chars_count = 0
-			for line in reversed(lines):
-				if chars_count + len(line) + 1 > half_display_chars:
-					break
-				end_preview = line + '\n' + end_preview
-				chars_count += len(line) + 1
-				end_line_count += 1
-
-			# Calculate lines in between
-			middle_line_count = line_count - start_line_count - end_line_count
-			if middle_line_count <= 0:
-				description += whole_file_description
-				continue
+			# Only rebuild the preview block for files written since the last describe()
+			cached = self._describe_cache.get(full_filename)
+			if cached is not None and cached[0] is file_obj and cached[1] == file_obj.version:
+				file_description = cached[2]
+			else:
+				file_description = self._describe_file(file_obj)
+				self._describe_cache[full_filename] = (file_obj, file_obj.version, file_description)
 
-			start_preview = start_preview.strip('\n').rstrip()
-			end_preview = end_preview.strip('\n').rstrip()
+			described_files.add(full_filename)
+			description += file_description
 
-			# Format output
-			if not (start_preview or end_preview):
-				description += f'<file>\n{file_obj.full_name} - {line_count} lines\n<content>\n{middle_line_count} lines...\n</content>\n</file>\n'
-			else:
-				description += f'<file>\n{file_obj.full_name} - {line_count} lines\n<content>\n{start_preview}\n'
-				description += f'... {middle_line_count} more lines ...\n'
-				description += f'{end_preview}\n'
-				description += '</content>\n</file>\n'
+		# Drop cache entries for files that no longer exist
+		for full_filename in self._describe_cache.keys() - described_files:
+			del self._describe_cache[full_filename]
 
 		return description.strip('\n')
 
+	@staticmethod
+	def _describe_file(file_obj: BaseFile) -> str:
+		"""Build the <file> block for a single file, with start/end previews for large files"""
+		DISPLAY_CHARS = 400
+		content = file_obj.read()
+
+		# Handle empty files
+		if not content:
+			return f'<file>\n{file_obj.full_name} - [empty file]\n</file>\n'
+
+		lines = content.splitlines()
+		line_count = len(lines)
+
+		# For small files, display the entire content
+		whole_file_description = f'<file>\n{file_obj.full_name} - {line_count} lines\n<content>\n{content}\n</content>\n</file>\n'
+		if len(content) < int(1.5 * DISPLAY_CHARS):
+			return whole_file_description
+
+		# For larger files, display start and end previews
+		half_display_chars = DISPLAY_CHARS // 2
+
+		# Get start preview
+		start_preview = ''
+		start_line_count = 0
+		chars_count = 0
+		for line in lines:
+			if chars_count + len(line) + 1 > half_display_chars:
+				break
+			start_preview += line + '\n'
+			chars_count += len(line) + 1
+			start_line_count += 1
+
+		# Get end preview
+		end_preview = ''
+		end_line_count = 0
+		chars_count = 0
+		for line in reversed(lines):
+			if chars_count + len(line) + 1 > half_display_chars:
+				break
+			end_preview = line + '\n' + end_preview
+			chars_count += len(line) + 1
+			end_line_count += 1
+
+		# Calculate lines in between
+		middle_line_count = line_count - start_line_count - end_line_count
+		if middle_line_count <= 0:
+			return whole_file_description
+
+		start_preview = start_preview.strip('\n').rstrip()
+		end_preview = end_preview.strip('\n').rstrip()
+
+		# Format output
+		if not (start_preview or end_preview):
+			return f'<file>\n{file_obj.full_name} - {line_count} lines\n<content>\n{middle_line_count} lines...\n</content>\n</file>\n'
+
+		file_description = f'<file>\n{file_obj.full_name} - {line_count} lines\n<content>\n{start_preview}\n'
+		file_description += f'... {middle_line_count} more lines ...\n'
+		file_description += f'{end_preview}\n'
+		file_description += '</content>\n</file>\n'
+		return file_description
+
+	async def flush(self) -> None:
+		"""Write out deferred disk updates (e.g. PDF renders) so files on disk match their contents"""
+		for file_obj in list(self.files.values()):
+			await file_obj.flush()
+
 	def get_todo_contents(self) -> str:
 		"""Get todo file contents"""
 		todo_file = self.get_file('todo.md')
 		return todo_file.read() if todo_file else ''
 
+	@property
+	def version(self) -> tuple[int, tuple[tuple[str, int], ...]]:
+		"""Changes whenever a file is added or its content changes, without reading any content"""
+		return self.extracted_content_count, tuple((name, file_obj.version) for name, file_obj in self.files.items())
+
 	def get_state(self) -> FileSystemState:
 		"""Get serializable state of the file system"""
 		files_data = {}
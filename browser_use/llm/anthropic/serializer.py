@@ -100,7 +100,11 @@ class AnthropicMessageSerializer:
 		serialized_blocks: list[TextBlockParam] = []
 		for part in content:
 			if part.type == 'text':
-				serialized_blocks.append(AnthropicMessageSerializer._serialize_content_part_text(part, use_cache))
+				serialized_blocks.append(AnthropicMessageSerializer._serialize_content_part_text(part, use_cache=False))
+
+		if cache_control and serialized_blocks:
+			# One breakpoint at the end caches the whole message, Anthropic allows only 4 per request
+			serialized_blocks[-1]['cache_control'] = cache_control
 
 		return serialized_blocks
 
@@ -119,10 +123,14 @@ class AnthropicMessageSerializer:
 		serialized_blocks: list[TextBlockParam | ImageBlockParam] = []
 		for part in content:
 			if part.type == 'text':
-				serialized_blocks.append(AnthropicMessageSerializer._serialize_content_part_text(part, use_cache))
+				serialized_blocks.append(AnthropicMessageSerializer._serialize_content_part_text(part, use_cache=False))
 			elif part.type == 'image_url':
 				serialized_blocks.append(AnthropicMessageSerializer._serialize_content_part_image(part))
 
+		if use_cache and serialized_blocks:
+			# One breakpoint at the end caches the whole message, Anthropic allows only 4 per request
+			serialized_blocks[-1]['cache_control'] = CacheControlEphemeralParam(type='ephemeral')
+
 		return serialized_blocks
 
 	@staticmethod
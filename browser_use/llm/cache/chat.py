@@ -0,0 +1,160 @@
+import asyncio
+import hashlib
+import json
+import logging
+import re
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, TypeVar, overload
+
+from pydantic import BaseModel
+
+from browser_use.config import CONFIG
+from browser_use.llm.base import BaseChatModel
+from browser_use.llm.cache.store import ResponseCacheStore
+from browser_use.llm.messages import BaseMessage
+from browser_use.llm.views import ChatInvokeCompletion, ChatInvokeUsage
+
+T = TypeVar('T', bound=BaseModel)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_IGNORED_PATTERNS: tuple[str, ...] = (r'Current date: \d{4}-\d{2}-\d{2}',)
+"""Parts of the prompt left out of the cache key, so that identical runs on different days share responses"""
+
+
+@dataclass
+class ChatCache(BaseChatModel):
+	"""
+	Wraps a chat model and caches its responses on disk, for repeated runs of the same task on the same pages.
+
+	Responses are keyed by a hash of the provider, model, messages and output schema. The messages are normalized first:
+	whitespace is collapsed, `ignored_patterns` are removed and the `cache` flag of the messages is left out.
+	Hits are reported to `TokenCost` through `ChatInvokeCompletion.cache_hit`.
+
+	Usage:
+		llm = ChatCache(llm=ChatOpenAI(model='gpt-4.1-mini'), ttl=timedelta(days=1))
+	"""
+
+	llm: BaseChatModel
+
+	path: str | Path | None = None
+	"""SQLite database of the cache, shared by all processes using it. Defaults to a file in the XDG cache directory."""
+	ttl: timedelta | None = timedelta(days=7)
+	"""How long responses are reused, None to keep them until they are evicted"""
+	max_size_mb: float = 512
+	"""Least recently used responses are evicted once the database grows past this size"""
+	ignored_patterns: Sequence[str] = DEFAULT_IGNORED_PATTERNS
+
+	_store: ResponseCacheStore | None = field(default=None, init=False, repr=False)
+	_ignored_regexes: list[re.Pattern[str]] = field(default_factory=list, init=False, repr=False)
+
+	def __post_init__(self):
+		self._ignored_regexes = [re.compile(pattern) for pattern in self.ignored_patterns]
+
+	@property
+	def model(self) -> str:  # type: ignore[override]
+		return self.llm.model
+
+	@property
+	def provider(self) -> str:
+		return self.llm.provider
+
+	@property
+	def name(self) -> str:
+		return self.llm.name
+
+	@property
+	def cache_path(self) -> Path:
+		if self.path is not None:
+			return Path(self.path).expanduser()
+		return CONFIG.XDG_CACHE_HOME / 'browseruse' / 'llm_responses.sqlite'
+
+	def _get_store(self) -> ResponseCacheStore:
+		if self._store is None:
+			self._store = ResponseCacheStore(self.cache_path, self.ttl, int(self.max_size_mb * 1024 * 1024))
+		return self._store
+
+	def _normalize(self, value: Any) -> Any:
+		if isinstance(value, str):
+			for regex in self._ignored_regexes:
+				value = regex.sub('', value)
+			return ' '.join(value.split())
+		if isinstance(value, dict):
+			return {key: self._normalize(item) for key, item in value.items()}
+		if isinstance(value, list):
+			return [self._normalize(item) for item in value]
+		return value
+
+	def cache_key(self, messages: list[BaseMessage], output_format: type[BaseModel] | None = None) -> str:
+		"""Hash of the normalized request, see the class docstring"""
+		request = {
+			'provider': self.llm.provider,
+			'model': self.llm.model,
+			'messages': [self._normalize(message.model_dump(mode='json', exclude={'cache'})) for message in messages],
+			'output_schema': output_format.model_json_schema() if output_format is not None else None,
+		}
+		return hashlib.sha256(json.dumps(request, sort_keys=True, separators=(',', ':')).encode()).hexdigest()
+
+	@overload
+	async def ainvoke(self, messages: list[BaseMessage], output_format: None = None) -> ChatInvokeCompletion[str]: ...
+
+	@overload
+	async def ainvoke(self, messages: list[BaseMessage], output_format: type[T]) -> ChatInvokeCompletion[T]: ...
+
+	async def ainvoke(
+		self, messages: list[BaseMessage], output_format: type[T] | None = None
+	) -> ChatInvokeCompletion[T] | ChatInvokeCompletion[str]:
+		key = self.cache_key(messages, output_format)
+
+		cached = None
+		try:
+			stored = await asyncio.to_thread(self._get_store().get, key)
+			if stored is not None:
+				cached = self._load_response(stored, output_format)
+		except Exception as e:
+			# A broken or locked cache never fails the call, it's just a miss
+			logger.warning(f'Reading LLM response cache {self.cache_path} failed: {type(e).__name__}: {e}')
+		if cached is not None:
+			logger.debug(f'LLM response cache hit for {self.name} ({key[:12]})')
+			return cached
+
+		result = await self.llm.ainvoke(messages, output_format)
+		result.cache_hit = False
+
+		try:
+			await asyncio.to_thread(self._get_store().put, key, self.llm.model, self._dump_response(result))
+		except Exception as e:
+			logger.warning(f'Writing LLM response cache {self.cache_path} failed: {type(e).__name__}: {e}')
+		return result
+
+	@staticmethod
+	def _dump_response(result: ChatInvokeCompletion) -> str:
+		completion = result.completion
+		return json.dumps(
+			{
+				'completion': completion.model_dump(mode='json') if isinstance(completion, BaseModel) else completion,
+				'thinking': result.thinking,
+				'redacted_thinking': result.redacted_thinking,
+				'usage': result.usage.model_dump() if result.usage else None,
+				'model': result.model,
+			}
+		)
+
+	@staticmethod
+	def _load_response(stored: str, output_format: type[T] | None) -> ChatInvokeCompletion:
+		data = json.loads(stored)
+		return ChatInvokeCompletion(
+			completion=output_format.model_validate(data['completion']) if output_format is not None else data['completion'],
+			thinking=data['thinking'],
+			redacted_thinking=data['redacted_thinking'],
+			usage=ChatInvokeUsage.model_validate(data['usage']) if data['usage'] else None,
+			cache_hit=True,
+			model=data.get('model'),
+		)
+
+	async def clear(self) -> None:
+		"""Delete all cached responses"""
+		await asyncio.to_thread(self._get_store().clear)
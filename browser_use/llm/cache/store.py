@@ -0,0 +1,120 @@
+"""
+SQLite storage for cached LLM responses.
+
+Shared by all processes using the same file (WAL journal), so parallel agents and swarm workers read each other's
+responses. Entries expire after a TTL, and the least recently used ones are evicted once the database grows past its
+size limit.
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from datetime import timedelta
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+	key TEXT PRIMARY KEY,
+	model TEXT NOT NULL,
+	value TEXT NOT NULL,
+	size INTEGER NOT NULL,
+	created_at REAL NOT NULL,
+	accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at);
+"""
+
+EVICT_TO_FRACTION = 0.9
+"""Eviction stops once the stored responses take up this fraction of the size limit, so it doesn't run on every write"""
+
+
+class ResponseCacheStore:
+	"""Serialized responses by cache key, with a TTL and a size limit. Blocking, call it from a worker thread."""
+
+	def __init__(self, path: Path, ttl: timedelta | None, max_size_bytes: int):
+		self.path = path
+		self.ttl = ttl
+		self.max_size_bytes = max_size_bytes
+
+		path.parent.mkdir(parents=True, exist_ok=True)
+		self._lock = threading.Lock()
+		self._connection = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+		self._connection.execute('PRAGMA journal_mode=WAL')
+		self._connection.executescript(_SCHEMA)
+		# Other processes write to the same file, so this is re-read whenever it goes over the limit
+		self._size = self._stored_size()
+
+	def _stored_size(self) -> int:
+		return self._connection.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+
+	def _expired_before(self) -> float | None:
+		return time.time() - self.ttl.total_seconds() if self.ttl is not None else None
+
+	def get(self, key: str) -> str | None:
+		"""The response stored under `key`, or None if there is none or it expired"""
+		with self._lock:
+			row = self._connection.execute('SELECT value, created_at FROM responses WHERE key = ?', (key,)).fetchone()
+			if row is None:
+				return None
+			value, created_at = row
+			expired_before = self._expired_before()
+			if expired_before is not None and created_at < expired_before:
+				self._connection.execute('DELETE FROM responses WHERE key = ?', (key,))
+				return None
+			self._connection.execute('UPDATE responses SET accessed_at = ? WHERE key = ?', (time.time(), key))
+			return value
+
+	def put(self, key: str, model: str, value: str) -> None:
+		"""Store a response, evicting expired and least recently used responses if the database is over its size limit"""
+		size = len(value.encode())
+		now = time.time()
+		with self._lock:
+			self._connection.execute(
+				'INSERT OR REPLACE INTO responses (key, model, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?, ?)',
+				(key, model, value, size, now, now),
+			)
+			self._size += size
+			if self._size > self.max_size_bytes:
+				self._evict()
+
+	def _evict(self) -> None:
+		expired_before = self._expired_before()
+		if expired_before is not None:
+			self._connection.execute('DELETE FROM responses WHERE created_at < ?', (expired_before,))
+		self._size = self._stored_size()
+
+		target_size = self.max_size_bytes * EVICT_TO_FRACTION
+		while self._size > target_size:
+			# Delete the least recently used responses that take up the excess, at least one
+			excess = self._size - target_size
+			keys = []
+			freed = 0
+			cursor = self._connection.execute('SELECT key, size FROM responses ORDER BY accessed_at')
+			for key, size in cursor:
+				keys.append(key)
+				freed += size
+				if freed >= excess:
+					break
+			cursor.close()
+			if not keys:
+				break
+			self._connection.executemany('DELETE FROM responses WHERE key = ?', [(key,) for key in keys])
+			self._size = self._stored_size()
+		logger.debug(f'Evicted LLM responses from {self.path}, {self._size} bytes left')
+
+	def __len__(self) -> int:
+		with self._lock:
+			return self._connection.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+
+	def clear(self) -> None:
+		"""Delete all stored responses"""
+		with self._lock:
+			self._connection.execute('DELETE FROM responses')
+			self._size = 0
+
+	def close(self) -> None:
+		with self._lock:
+			self._connection.close()
@@ -0,0 +1,220 @@
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, TypeVar, overload
+
+from pydantic import BaseModel
+
+from browser_use.llm.base import BaseChatModel
+from browser_use.llm.messages import BaseMessage
+from browser_use.llm.views import ChatInvokeCompletion
+
+T = TypeVar('T', bound=BaseModel)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _ModelStats:
+	"""Latencies and outcomes of the recent calls to one model"""
+
+	window: int
+	latencies: deque[float] = field(init=False)
+	"""Latency of recent successful calls, in seconds"""
+	censored: deque[float] = field(init=False)
+	"""Time after which recent calls were cancelled, a lower bound of their latency"""
+	outcomes: deque[bool] = field(init=False)
+	"""Whether recent calls succeeded, cancelled calls are not counted"""
+	wins: int = 0
+	"""Calls whose response was returned"""
+
+	def __post_init__(self):
+		self.latencies = deque(maxlen=self.window)
+		self.censored = deque(maxlen=self.window)
+		self.outcomes = deque(maxlen=self.window)
+
+	def quantile(self, q: float) -> float:
+		"""Kaplan-Meier estimate of the latency quantile, so calls cancelled while slow still count as slow"""
+		# at equal times, completed calls go first: a call cancelled at t would have taken longer than t
+		samples = sorted([(latency, False) for latency in self.latencies] + [(elapsed, True) for elapsed in self.censored])
+		at_risk = len(samples)
+		survival = 1.0
+		for latency, censored in samples:
+			if not censored:
+				survival *= 1 - 1 / at_risk
+				if 1 - survival > q + 1e-9:
+					return latency
+			at_risk -= 1
+		# the quantile is beyond every completed call, the slowest sample is the best lower bound
+		return samples[-1][0]
+
+	@property
+	def error_rate(self) -> float:
+		return self.outcomes.count(False) / len(self.outcomes) if self.outcomes else 0.0
+
+
+@dataclass
+class ChatHedged(BaseChatModel):
+	"""
+	Calls the first of several chat models, and hedges with the next one when it's slow or fails.
+
+	If no response arrived after the p95 latency of the model (`hedge_quantile`), the same request is sent to the next
+	model, and whichever returns a valid response first wins; the other requests are cancelled. A failed request falls
+	back to the next model right away.
+
+	Models are tried in order of expected latency (median latency, inflated by their error rate) once they have
+	`min_samples` calls, models without enough calls keep their configured order behind the measured ones. Models that
+	failed at least `max_error_rate` of their recent calls are tried last.
+
+	`model` and `provider` are the ones of the first configured model. The model that answered is set on
+	`ChatInvokeCompletion.model`, so `TokenCost` bills the usage at its price. Losing requests are cancelled, but the
+	provider may still bill the tokens it already processed; no usage is reported for them, so they're not tracked.
+
+	Usage:
+		llm = ChatHedged(llms=[ChatOpenAI(model='gpt-4.1-mini'), ChatAzureOpenAI(model='gpt-4.1-mini')])
+	"""
+
+	llms: list[BaseChatModel]
+
+	hedge_after: float | None = None
+	"""Fixed delay in seconds before hedging, instead of the latency quantile"""
+	hedge_quantile: float = 0.95
+	initial_hedge_after: float = 10.0
+	"""Delay before hedging while the model has fewer than `min_samples` successful calls"""
+	max_concurrent: int = 2
+	"""Most requests in flight for one call"""
+	max_error_rate: float = 0.5
+	min_samples: int = 5
+	window: int = 100
+	"""Number of recent calls per model the statistics are computed on"""
+
+	_stats: list[_ModelStats] = field(default_factory=list, init=False, repr=False)
+
+	def __post_init__(self):
+		if not self.llms:
+			raise ValueError('ChatHedged needs at least one model')
+		self._stats = [_ModelStats(window=self.window) for _ in self.llms]
+
+	@property
+	def model(self) -> str:  # type: ignore[override]
+		return self.llms[0].model
+
+	@property
+	def provider(self) -> str:
+		return self.llms[0].provider
+
+	@property
+	def name(self) -> str:
+		return self.llms[0].name
+
+	def _route(self) -> list[int]:
+		"""Indices of the models, in the order they are tried"""
+
+		def sort_key(index: int) -> tuple[bool, float, int]:
+			stats = self._stats[index]
+			unhealthy = len(stats.outcomes) >= self.min_samples and stats.error_rate >= self.max_error_rate
+			expected_latency = math.inf
+			if len(stats.latencies) >= self.min_samples:
+				expected_latency = stats.quantile(0.5) / (1 - min(stats.error_rate, 0.9))
+			return unhealthy, expected_latency, index
+
+		return sorted(range(len(self.llms)), key=sort_key)
+
+	def _hedge_delay(self, index: int) -> float:
+		if self.hedge_after is not None:
+			return self.hedge_after
+		stats = self._stats[index]
+		if len(stats.latencies) < self.min_samples:
+			return self.initial_hedge_after
+		return stats.quantile(self.hedge_quantile)
+
+	def get_stats(self) -> list[dict[str, Any]]:
+		"""Latency and error statistics of each model, in configured order"""
+		return [
+			{
+				'model': llm.name,
+				'calls': len(stats.outcomes),
+				'wins': stats.wins,
+				'error_rate': stats.error_rate,
+				'p50_latency': stats.quantile(0.5) if stats.latencies else None,
+				'p95_latency': stats.quantile(0.95) if stats.latencies else None,
+			}
+			for llm, stats in zip(self.llms, self._stats)
+		]
+
+	async def _timed_invoke(self, index: int, messages: list[BaseMessage], output_format: type[T] | None) -> ChatInvokeCompletion:
+		stats = self._stats[index]
+		start = time.monotonic()
+		try:
+			result = await self.llms[index].ainvoke(messages, output_format)
+		except asyncio.CancelledError:
+			stats.censored.append(time.monotonic() - start)
+			raise
+		except Exception:
+			stats.outcomes.append(False)
+			raise
+		stats.latencies.append(time.monotonic() - start)
+		stats.outcomes.append(True)
+		return result
+
+	@overload
+	async def ainvoke(self, messages: list[BaseMessage], output_format: None = None) -> ChatInvokeCompletion[str]: ...
+
+	@overload
+	async def ainvoke(self, messages: list[BaseMessage], output_format: type[T]) -> ChatInvokeCompletion[T]: ...
+
+	async def ainvoke(
+		self, messages: list[BaseMessage], output_format: type[T] | None = None
+	) -> ChatInvokeCompletion[T] | ChatInvokeCompletion[str]:
+		order = self._route()
+		hedge_delay = self._hedge_delay(order[0])
+		running: dict[asyncio.Task, int] = {}
+		started = 0
+		last_error: BaseException | None = None
+
+		def start_next() -> None:
+			nonlocal started
+			index = order[started]
+			started += 1
+			running[asyncio.create_task(self._timed_invoke(index, messages, output_format))] = index
+
+		start_next()
+		try:
+			while running:
+				can_start = started < len(order) and len(running) < self.max_concurrent
+				done, _ = await asyncio.wait(
+					running, timeout=hedge_delay if can_start else None, return_when=asyncio.FIRST_COMPLETED
+				)
+				if not done:
+					logger.debug(
+						f'No response from {", ".join(self.llms[index].name for index in running.values())} after '
+						f'{hedge_delay:.1f}s, hedging with {self.llms[order[started]].name}'
+					)
+					start_next()
+					continue
+
+				for task in done:
+					index = running.pop(task)
+					if task.exception() is None:
+						self._stats[index].wins += 1
+						if index != order[0]:
+							logger.debug(f'Response from {self.llms[index].name} instead of {self.llms[order[0]].name}')
+						result = task.result()
+						result.model = result.model or self.llms[index].model
+						return result
+					last_error = task.exception()
+					logger.debug(f'{self.llms[index].name} failed: {type(last_error).__name__}: {last_error}')
+
+				# Fall back to the next model right away
+				if started < len(order):
+					start_next()
+		finally:
+			for task in running:
+				task.cancel()
+			await asyncio.gather(*running, return_exceptions=True)
+
+		assert last_error is not None
+		raise last_error
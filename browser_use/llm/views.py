@@ -43,3 +43,10 @@ class ChatInvokeCompletion(BaseModel, Generic[T]):
 
 	usage: ChatInvokeUsage | None
 	"""The usage of the response."""
+
+	cache_hit: bool | None = None
+	"""Whether the response was served from an LLM response cache (`ChatCache`), None if no cache was looked up.
+	On a hit, `usage` is the usage of the original call, which was not spent again."""
+
+	model: str | None = None
+	"""The model that answered, when a wrapper picks between several models (`ChatHedged`). Usage is attributed to it."""
@@ -3,16 +3,31 @@
 This module provides integration with MCP servers and clients for browser automation.
 """
 
-from browser_use.mcp.client import MCPClient
-from browser_use.mcp.controller import MCPToolWrapper
+from typing import TYPE_CHECKING
 
-__all__ = ['MCPClient', 'MCPToolWrapper', 'BrowserUseServer']  # type: ignore
+if TYPE_CHECKING:
+	from browser_use.mcp.client import MCPClient
+	from browser_use.mcp.controller import MCPToolWrapper
+	from browser_use.mcp.server import BrowserUseServer
+
+__all__ = ['MCPClient', 'MCPToolWrapper', 'BrowserUseServer']
+
+# Lazy imports mapping - the client pulls in the tools registry and the server configures logging on import,
+# so neither is loaded until it's actually used (keeps `python -m browser_use.mcp` startup fast)
+_LAZY_IMPORTS = {
+	'MCPClient': ('browser_use.mcp.client', 'MCPClient'),
+	'MCPToolWrapper': ('browser_use.mcp.controller', 'MCPToolWrapper'),
+	'BrowserUseServer': ('browser_use.mcp.server', 'BrowserUseServer'),
+}
 
 
 def __getattr__(name):
-	"""Lazy import to avoid importing server module when only client is needed."""
-	if name == 'BrowserUseServer':
-		from browser_use.mcp.server import BrowserUseServer
+	"""Lazy import to avoid importing the client or server module when only one of them is needed."""
+	if name in _LAZY_IMPORTS:
+		from importlib import import_module
 
-		return BrowserUseServer
+		module_path, attr_name = _LAZY_IMPORTS[name]
+		attr = getattr(import_module(module_path), attr_name)
+		globals()[name] = attr
+		return attr
 	raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
@@ -33,9 +33,13 @@ os.environ['BROWSER_USE_SETUP_LOGGING'] = 'false'
 import asyncio
 import json
 import logging
+import re
 import time
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
+
+from uuid_extensions import uuid7str
 
 # Configure logging for MCP mode - redirect to stderr but preserve critical diagnostics
 logging.basicConfig(
@@ -49,10 +53,22 @@ try:
 except ImportError:
 	PSUTIL_AVAILABLE = False
 
+# Try to import MCP SDK (before the path tweak below, which would let this package shadow the `mcp` SDK)
+try:
+	import mcp.server.stdio
+	import mcp.types as types
+	from mcp.server import NotificationOptions, Server
+	from mcp.server.models import InitializationOptions
+
+	MCP_AVAILABLE = True
+except ImportError:
+	MCP_AVAILABLE = False
+
 # Add browser-use to path if running from source
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 # Import and configure logging to use stderr before other imports
+from browser_use.config import CONFIG
 from browser_use.logging_config import setup_logging
 
 
@@ -61,6 +77,7 @@ def _configure_mcp_server_logging():
 	# Set environment to suppress browser-use logging during server mode
 	os.environ['BROWSER_USE_LOGGING_LEVEL'] = 'warning'
 	os.environ['BROWSER_USE_SETUP_LOGGING'] = 'false'  # Prevent automatic logging setup
+	CONFIG.reload()
 
 	# Configure logging to stderr for MCP mode - preserve warnings and above for troubleshooting
 	setup_logging(stream=sys.stderr, log_level='warning', force_setup=True)
@@ -87,13 +104,17 @@ _configure_mcp_server_logging()
 # Additional suppression - disable all logging completely for MCP mode
 logging.disable(logging.CRITICAL)
 
-# Import browser_use modules
-from browser_use import ActionModel, Agent
-from browser_use.browser import BrowserProfile, BrowserSession
+# Import browser_use modules (the agent, browser and LLM stack is imported when a tool first needs it,
+# so the server can start and answer list_tools without loading it)
 from browser_use.config import get_default_llm, get_default_profile, load_browser_use_config
-from browser_use.filesystem.file_system import FileSystem
-from browser_use.llm.openai.chat import ChatOpenAI
-from browser_use.tools.service import Tools
+from browser_use.mcp.session_pool import SessionPool
+
+if TYPE_CHECKING:
+	from browser_use import Agent
+	from browser_use.browser import BrowserSession
+	from browser_use.filesystem.file_system import FileSystem
+	from browser_use.llm.openai.chat import ChatOpenAI
+	from browser_use.tools.service import Tools
 
 logger = logging.getLogger(__name__)
 
@@ -127,29 +148,47 @@ def _ensure_all_loggers_use_stderr():
 _ensure_all_loggers_use_stderr()
 
 
-# Try to import MCP SDK
-try:
-	import mcp.server.stdio
-	import mcp.types as types
-	from mcp.server import NotificationOptions, Server
-	from mcp.server.models import InitializationOptions
-
-	MCP_AVAILABLE = True
-
+if MCP_AVAILABLE:
 	# Configure MCP SDK logging to stderr as well
 	mcp_logger = logging.getLogger('mcp')
 	mcp_logger.handlers = []
 	mcp_logger.addHandler(logging.root.handlers[0] if logging.root.handlers else logging.StreamHandler(sys.stderr))
 	mcp_logger.setLevel(logging.ERROR)
 	mcp_logger.propagate = False
-except ImportError:
-	MCP_AVAILABLE = False
+else:
 	logger.error('MCP SDK not installed. Install with: pip install mcp')
 	sys.exit(1)
 
 from browser_use.telemetry import MCPServerTelemetryEvent, ProductTelemetry
 from browser_use.utils import get_browser_use_version
 
+# Tools that run inside a browser session and accept a `session_id` argument to pick which one
+SESSION_SCOPED_TOOLS = frozenset(
+	{
+		'browser_navigate',
+		'browser_click',
+		'browser_type',
+		'browser_get_state',
+		'browser_extract_content',
+		'browser_scroll',
+		'browser_go_back',
+		'browser_list_tabs',
+		'browser_switch_tab',
+		'browser_close_tab',
+	}
+)
+
+SESSION_ID_SCHEMA = {
+	'type': 'string',
+	'description': (
+		'ID of the browser session to run in. Calls with the same session_id share one browser and run one at a time, '
+		'a new session_id starts a new browser. Omit it to use the default session.'
+	),
+}
+
+# session ids end up in file system paths, so keep them to a safe alphabet
+_SESSION_ID_RE = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
 
 def get_parent_process_cmdline() -> str | None:
 	"""Get the command line of all parent processes up the chain."""
@@ -182,26 +221,39 @@ def get_parent_process_cmdline() -> str | None:
 		return None
 
 
+@dataclass
+class MCPBrowserSession:
+	"""A pooled browser session together with the file system its extraction actions write to."""
+
+	browser_session: 'BrowserSession'
+	file_system: 'FileSystem'
+
+
 class BrowserUseServer:
 	"""MCP Server for browser-use capabilities."""
 
-	def __init__(self, session_timeout_minutes: int = 10):
+	def __init__(self, session_timeout_minutes: int = 10, max_sessions: int = 5):
 		# Ensure all logging goes to stderr (in case new loggers were created)
 		_ensure_all_loggers_use_stderr()
 
 		self.server = Server('browser-use')
 		self.config = load_browser_use_config()
-		self.agent: Agent | None = None
-		self.browser_session: BrowserSession | None = None
-		self.tools: Tools | None = None
-		self.llm: ChatOpenAI | None = None
-		self.file_system: FileSystem | None = None
+		self.agent: 'Agent | None' = None
+		self.tools: 'Tools | None' = None
+		self.llm: 'ChatOpenAI | None' = None
 		self._telemetry = ProductTelemetry()
 		self._start_time = time.time()
 
-		# Session management
-		self.active_sessions: dict[str, dict[str, Any]] = {}  # session_id -> session info
+		# Session management: every browser_* tool call runs in a pooled session (one lock per session,
+		# concurrent across sessions), idle sessions are evicted after session_timeout_minutes
 		self.session_timeout_minutes = session_timeout_minutes
+		self.sessions: SessionPool[MCPBrowserSession] = SessionPool(
+			factory=self._init_browser_session,
+			closer=self._stop_browser_session,
+			max_sessions=max_sessions,
+			idle_timeout=session_timeout_minutes * 60,
+		)
+		self.default_session_id: str | None = None
 		self._cleanup_task: Any = None
 
 		# Setup handlers
@@ -213,7 +265,7 @@ class BrowserUseServer:
 		@self.server.list_tools()
 		async def handle_list_tools() -> list[types.Tool]:
 			"""List all available browser-use tools."""
-			return [
+			tools = [
 				# Agent tools
 				# Direct browser control tools
 				types.Tool(
@@ -403,6 +455,10 @@ class BrowserUseServer:
 					inputSchema={'type': 'object', 'properties': {}},
 				),
 			]
+			for tool in tools:
+				if tool.name in SESSION_SCOPED_TOOLS:
+					tool.inputSchema['properties']['session_id'] = SESSION_ID_SCHEMA
+			return tools
 
 		@self.server.list_resources()
 		async def handle_list_resources() -> list[types.Resource]:
@@ -462,56 +518,76 @@ class BrowserUseServer:
 		elif tool_name == 'browser_close_all':
 			return await self._close_all_sessions()
 
-		# Direct browser control tools (require active session)
+		# Direct browser control tools (run in the requested pooled session)
 		elif tool_name.startswith('browser_'):
-			# Ensure browser session exists
-			if not self.browser_session:
-				await self._init_browser_session()
+			session_id = self._resolve_session_id(arguments.get('session_id'))
+
+			if tool_name == 'browser_close':
+				return await self._close_session(session_id)
 
-			if tool_name == 'browser_navigate':
-				return await self._navigate(arguments['url'], arguments.get('new_tab', False))
+			if tool_name not in SESSION_SCOPED_TOOLS:
+				return f'Unknown tool: {tool_name}'
 
-			elif tool_name == 'browser_click':
-				return await self._click(arguments['index'], arguments.get('new_tab', False))
+			# Holding the session for the whole call serializes calls on the same browser,
+			# calls on other sessions keep running concurrently
+			async with self.sessions.session(session_id) as session:
+				browser_session = session.browser_session
 
-			elif tool_name == 'browser_type':
-				return await self._type_text(arguments['index'], arguments['text'])
+				if tool_name == 'browser_navigate':
+					return await self._navigate(browser_session, arguments['url'], arguments.get('new_tab', False))
 
-			elif tool_name == 'browser_get_state':
-				return await self._get_browser_state(arguments.get('include_screenshot', False))
+				elif tool_name == 'browser_click':
+					return await self._click(browser_session, arguments['index'], arguments.get('new_tab', False))
 
-			elif tool_name == 'browser_extract_content':
-				return await self._extract_content(arguments['query'], arguments.get('extract_links', False))
+				elif tool_name == 'browser_type':
+					return await self._type_text(browser_session, arguments['index'], arguments['text'])
 
-			elif tool_name == 'browser_scroll':
-				return await self._scroll(arguments.get('direction', 'down'))
+				elif tool_name == 'browser_get_state':
+					return await self._get_browser_state(browser_session, arguments.get('include_screenshot', False))
 
-			elif tool_name == 'browser_go_back':
-				return await self._go_back()
+				elif tool_name == 'browser_extract_content':
+					return await self._extract_content(session, arguments['query'], arguments.get('extract_links', False))
 
-			elif tool_name == 'browser_close':
-				return await self._close_browser()
+				elif tool_name == 'browser_scroll':
+					return await self._scroll(browser_session, arguments.get('direction', 'down'))
 
-			elif tool_name == 'browser_list_tabs':
-				return await self._list_tabs()
+				elif tool_name == 'browser_go_back':
+					return await self._go_back(browser_session)
 
-			elif tool_name == 'browser_switch_tab':
-				return await self._switch_tab(arguments['tab_id'])
+				elif tool_name == 'browser_list_tabs':
+					return await self._list_tabs(browser_session)
 
-			elif tool_name == 'browser_close_tab':
-				return await self._close_tab(arguments['tab_id'])
+				elif tool_name == 'browser_switch_tab':
+					return await self._switch_tab(browser_session, arguments['tab_id'])
+
+				elif tool_name == 'browser_close_tab':
+					return await self._close_tab(browser_session, arguments['tab_id'])
 
 		return f'Unknown tool: {tool_name}'
 
-	async def _init_browser_session(self, allowed_domains: list[str] | None = None, **kwargs):
-		"""Initialize browser session using config"""
-		if self.browser_session:
-			return
+	def _resolve_session_id(self, session_id: str | None) -> str:
+		"""Validate a requested session id, falling back to the default session."""
+		if not session_id:
+			if self.default_session_id is None:
+				self.default_session_id = str(uuid7str())
+			return self.default_session_id
+		if not _SESSION_ID_RE.match(session_id):
+			raise ValueError(f'Invalid session_id {session_id!r}: use 1-64 letters, digits, "-" or "_"')
+		return session_id
+
+	async def _init_browser_session(
+		self, session_id: str, allowed_domains: list[str] | None = None, **kwargs
+	) -> MCPBrowserSession:
+		"""Initialize a browser session using config (called by the session pool)"""
+		from browser_use.browser import BrowserProfile, BrowserSession
+		from browser_use.filesystem.file_system import FileSystem
+		from browser_use.llm.openai.chat import ChatOpenAI
+		from browser_use.tools.service import Tools
 
 		# Ensure all logging goes to stderr before browser initialization
 		_ensure_all_loggers_use_stderr()
 
-		logger.debug('Initializing browser session...')
+		logger.debug(f'Initializing browser session {session_id}...')
 
 		# Get profile config
 		profile_config = get_default_profile(self.config)
@@ -528,6 +604,11 @@ class BrowserUseServer:
 			**profile_config,  # Config values override defaults
 		}
 
+		# Only one browser can use a profile directory at a time, so extra sessions get a temporary one
+		is_default_session = session_id == self.default_session_id
+		if not is_default_session:
+			profile_data['user_data_dir'] = None
+
 		# Tool parameter overrides (highest priority)
 		if allowed_domains is not None:
 			profile_data['allowed_domains'] = allowed_domains
@@ -540,30 +621,36 @@ class BrowserUseServer:
 		profile = BrowserProfile(**profile_data)
 
 		# Create browser session
-		self.browser_session = BrowserSession(browser_profile=profile)
-		await self.browser_session.start()
+		browser_session = BrowserSession(id=session_id, browser_profile=profile)
+		await browser_session.start()
 
-		# Track the session for management
-		self._track_session(self.browser_session)
-
-		# Create tools for direct actions
-		self.tools = Tools()
+		# Create tools for direct actions (stateless, shared by all sessions)
+		if self.tools is None:
+			self.tools = Tools()
 
 		# Initialize LLM from config
-		llm_config = get_default_llm(self.config)
-		if api_key := llm_config.get('api_key'):
-			self.llm = ChatOpenAI(
-				model=llm_config.get('model', 'gpt-4o-mini'),
-				api_key=api_key,
-				temperature=llm_config.get('temperature', 0.7),
-				# max_tokens=llm_config.get('max_tokens'),
-			)
+		if self.llm is None:
+			llm_config = get_default_llm(self.config)
+			if api_key := llm_config.get('api_key'):
+				self.llm = ChatOpenAI(
+					model=llm_config.get('model', 'gpt-4o-mini'),
+					api_key=api_key,
+					temperature=llm_config.get('temperature', 0.7),
+					# max_tokens=llm_config.get('max_tokens'),
+				)
 
-		# Initialize FileSystem for extraction actions
-		file_system_path = profile_config.get('file_system_path', '~/.browser-use-mcp')
-		self.file_system = FileSystem(base_dir=Path(file_system_path).expanduser())
+		# Initialize FileSystem for extraction actions (FileSystem wipes its data dir, so every session gets its own)
+		file_system_path = Path(profile_config.get('file_system_path', '~/.browser-use-mcp')).expanduser()
+		if not is_default_session:
+			file_system_path = file_system_path / 'sessions' / session_id
+		file_system = FileSystem(base_dir=file_system_path)
 
-		logger.debug('Browser session initialized')
+		logger.debug(f'Browser session {session_id} initialized')
+		return MCPBrowserSession(browser_session=browser_session, file_system=file_system)
+
+	async def _stop_browser_session(self, session: MCPBrowserSession) -> None:
+		"""Shut down a pooled browser session (called by the session pool)"""
+		await session.browser_session.kill()
 
 	async def _retry_with_browser_use_agent(
 		self,
@@ -574,6 +661,10 @@ class BrowserUseServer:
 		use_vision: bool = True,
 	) -> str:
 		"""Run an autonomous agent task."""
+		from browser_use import Agent
+		from browser_use.browser import BrowserProfile
+		from browser_use.llm.openai.chat import ChatOpenAI
+
 		logger.debug(f'Running agent task: {task}')
 
 		# Get LLM config
@@ -647,35 +738,23 @@ class BrowserUseServer:
 			# Clean up
 			await agent.close()
 
-	async def _navigate(self, url: str, new_tab: bool = False) -> str:
+	async def _navigate(self, browser_session: 'BrowserSession', url: str, new_tab: bool = False) -> str:
 		"""Navigate to a URL."""
-		if not self.browser_session:
-			return 'Error: No browser session active'
-
-		# Update session activity
-		self._update_session_activity(self.browser_session.id)
-
 		from browser_use.browser.events import NavigateToUrlEvent
 
 		if new_tab:
-			event = self.browser_session.event_bus.dispatch(NavigateToUrlEvent(url=url, new_tab=True))
+			event = browser_session.event_bus.dispatch(NavigateToUrlEvent(url=url, new_tab=True))
 			await event
 			return f'Opened new tab with URL: {url}'
 		else:
-			event = self.browser_session.event_bus.dispatch(NavigateToUrlEvent(url=url))
+			event = browser_session.event_bus.dispatch(NavigateToUrlEvent(url=url))
 			await event
 			return f'Navigated to: {url}'
 
-	async def _click(self, index: int, new_tab: bool = False) -> str:
+	async def _click(self, browser_session: 'BrowserSession', index: int, new_tab: bool = False) -> str:
 		"""Click an element by index."""
-		if not self.browser_session:
-			return 'Error: No browser session active'
-
-		# Update session activity
-		self._update_session_activity(self.browser_session.id)
-
 		# Get the element
-		element = await self.browser_session.get_dom_element_by_index(index)
+		element = await browser_session.get_dom_element_by_index(index)
 		if not element:
 			return f'Element with index {index} not found'
 
@@ -684,7 +763,7 @@ class BrowserUseServer:
 			href = element.attributes.get('href')
 			if href:
 				# Convert relative href to absolute URL
-				state = await self.browser_session.get_browser_state_summary()
+				state = await browser_session.get_browser_state_summary()
 				current_url = state.url
 				if href.startswith('/'):
 					# Relative URL - construct full URL
@@ -698,7 +777,7 @@ class BrowserUseServer:
 				# Open link in new tab
 				from browser_use.browser.events import NavigateToUrlEvent
 
-				event = self.browser_session.event_bus.dispatch(NavigateToUrlEvent(url=full_url, new_tab=True))
+				event = browser_session.event_bus.dispatch(NavigateToUrlEvent(url=full_url, new_tab=True))
 				await event
 				return f'Clicked element {index} and opened in new tab {full_url[:20]}...'
 			else:
@@ -706,23 +785,20 @@ class BrowserUseServer:
 				# Opening in new tab without href is not reliably supported
 				from browser_use.browser.events import ClickElementEvent
 
-				event = self.browser_session.event_bus.dispatch(ClickElementEvent(node=element))
+				event = browser_session.event_bus.dispatch(ClickElementEvent(node=element))
 				await event
 				return f'Clicked element {index} (new tab not supported for non-link elements)'
 		else:
 			# Normal click
 			from browser_use.browser.events import ClickElementEvent
 
-			event = self.browser_session.event_bus.dispatch(ClickElementEvent(node=element))
+			event = browser_session.event_bus.dispatch(ClickElementEvent(node=element))
 			await event
 			return f'Clicked element {index}'
 
-	async def _type_text(self, index: int, text: str) -> str:
+	async def _type_text(self, browser_session: 'BrowserSession', index: int, text: str) -> str:
 		"""Type text into an element."""
-		if not self.browser_session:
-			return 'Error: No browser session active'
-
-		element = await self.browser_session.get_dom_element_by_index(index)
+		element = await browser_session.get_dom_element_by_index(index)
 		if not element:
 			return f'Element with index {index} not found'
 
@@ -750,7 +826,7 @@ class BrowserUseServer:
 			else:
 				sensitive_key_name = 'credential'
 
-		event = self.browser_session.event_bus.dispatch(
+		event = browser_session.event_bus.dispatch(
 			TypeTextEvent(node=element, text=text, is_sensitive=is_potentially_sensitive, sensitive_key_name=sensitive_key_name)
 		)
 		await event
@@ -763,12 +839,9 @@ class BrowserUseServer:
 		else:
 			return f"Typed '{text}' into element {index}"
 
-	async def _get_browser_state(self, include_screenshot: bool = False) -> str:
+	async def _get_browser_state(self, browser_session: 'BrowserSession', include_screenshot: bool = False) -> str:
 		"""Get current browser state."""
-		if not self.browser_session:
-			return 'Error: No browser session active'
-
-		state = await self.browser_session.get_browser_state_summary()
+		state = await browser_session.get_browser_state_summary()
 
 		result = {
 			'url': state.url,
@@ -795,26 +868,22 @@ class BrowserUseServer:
 
 		return json.dumps(result, indent=2)
 
-	async def _extract_content(self, query: str, extract_links: bool = False) -> str:
+	async def _extract_content(self, session: MCPBrowserSession, query: str, extract_links: bool = False) -> str:
 		"""Extract content from current page."""
 		if not self.llm:
 			return 'Error: LLM not initialized (set OPENAI_API_KEY)'
 
-		if not self.file_system:
-			return 'Error: FileSystem not initialized'
-
-		if not self.browser_session:
-			return 'Error: No browser session active'
-
 		if not self.tools:
 			return 'Error: Tools not initialized'
 
-		state = await self.browser_session.get_browser_state_summary()
+		await session.browser_session.get_browser_state_summary()
 
 		# Use the extract_structured_data action
 		# Create a dynamic action model that matches the tools's expectations
 		from pydantic import create_model
 
+		from browser_use import ActionModel
+
 		# Create action model dynamically
 		ExtractAction = create_model(
 			'ExtractAction',
@@ -825,22 +894,19 @@ class BrowserUseServer:
 		action = ExtractAction()
 		action_result = await self.tools.act(
 			action=action,
-			browser_session=self.browser_session,
+			browser_session=session.browser_session,
 			page_extraction_llm=self.llm,
-			file_system=self.file_system,
+			file_system=session.file_system,
 		)
 
 		return action_result.extracted_content or 'No content extracted'
 
-	async def _scroll(self, direction: str = 'down') -> str:
+	async def _scroll(self, browser_session: 'BrowserSession', direction: str = 'down') -> str:
 		"""Scroll the page."""
-		if not self.browser_session:
-			return 'Error: No browser session active'
-
 		from browser_use.browser.events import ScrollEvent
 
 		# Scroll by a standard amount (500 pixels)
-		event = self.browser_session.event_bus.dispatch(
+		event = browser_session.event_bus.dispatch(
 			ScrollEvent(
 				direction=direction,  # type: ignore
 				amount=500,
@@ -849,179 +915,98 @@ class BrowserUseServer:
 		await event
 		return f'Scrolled {direction}'
 
-	async def _go_back(self) -> str:
+	async def _go_back(self, browser_session: 'BrowserSession') -> str:
 		"""Go back in browser history."""
-		if not self.browser_session:
-			return 'Error: No browser session active'
-
 		from browser_use.browser.events import GoBackEvent
 
-		event = self.browser_session.event_bus.dispatch(GoBackEvent())
+		event = browser_session.event_bus.dispatch(GoBackEvent())
 		await event
 		return 'Navigated back'
 
-	async def _close_browser(self) -> str:
-		"""Close the browser session."""
-		if self.browser_session:
-			from browser_use.browser.events import BrowserStopEvent
-
-			event = self.browser_session.event_bus.dispatch(BrowserStopEvent())
-			await event
-			self.browser_session = None
-			self.tools = None
-			return 'Browser closed'
-		return 'No browser session to close'
-
-	async def _list_tabs(self) -> str:
+	async def _list_tabs(self, browser_session: 'BrowserSession') -> str:
 		"""List all open tabs."""
-		if not self.browser_session:
-			return 'Error: No browser session active'
-
-		tabs_info = await self.browser_session.get_tabs()
+		tabs_info = await browser_session.get_tabs()
 		tabs = []
 		for i, tab in enumerate(tabs_info):
 			tabs.append({'tab_id': tab.target_id[-4:], 'url': tab.url, 'title': tab.title or ''})
 		return json.dumps(tabs, indent=2)
 
-	async def _switch_tab(self, tab_id: str) -> str:
+	async def _switch_tab(self, browser_session: 'BrowserSession', tab_id: str) -> str:
 		"""Switch to a different tab."""
-		if not self.browser_session:
-			return 'Error: No browser session active'
-
 		from browser_use.browser.events import SwitchTabEvent
 
-		target_id = await self.browser_session.get_target_id_from_tab_id(tab_id)
-		event = self.browser_session.event_bus.dispatch(SwitchTabEvent(target_id=target_id))
+		target_id = await browser_session.get_target_id_from_tab_id(tab_id)
+		event = browser_session.event_bus.dispatch(SwitchTabEvent(target_id=target_id))
 		await event
-		state = await self.browser_session.get_browser_state_summary()
+		state = await browser_session.get_browser_state_summary()
 		return f'Switched to tab {tab_id}: {state.url}'
 
-	async def _close_tab(self, tab_id: str) -> str:
+	async def _close_tab(self, browser_session: 'BrowserSession', tab_id: str) -> str:
 		"""Close a specific tab."""
-		if not self.browser_session:
-			return 'Error: No browser session active'
-
 		from browser_use.browser.events import CloseTabEvent
 
-		target_id = await self.browser_session.get_target_id_from_tab_id(tab_id)
-		event = self.browser_session.event_bus.dispatch(CloseTabEvent(target_id=target_id))
+		target_id = await browser_session.get_target_id_from_tab_id(tab_id)
+		event = browser_session.event_bus.dispatch(CloseTabEvent(target_id=target_id))
 		await event
-		current_url = await self.browser_session.get_current_page_url()
+		current_url = await browser_session.get_current_page_url()
 		return f'Closed tab # {tab_id}, now on {current_url}'
 
-	def _track_session(self, session: BrowserSession) -> None:
-		"""Track a browser session for management."""
-		self.active_sessions[session.id] = {
-			'session': session,
-			'created_at': time.time(),
-			'last_activity': time.time(),
-			'url': getattr(session, 'current_url', None),
-		}
-
-	def _update_session_activity(self, session_id: str) -> None:
-		"""Update the last activity time for a session."""
-		if session_id in self.active_sessions:
-			self.active_sessions[session_id]['last_activity'] = time.time()
-
 	async def _list_sessions(self) -> str:
 		"""List all active browser sessions."""
-		if not self.active_sessions:
+		entries = self.sessions.entries()
+		if not entries:
 			return 'No active browser sessions'
 
 		sessions_info = []
-		for session_id, session_data in self.active_sessions.items():
-			session = session_data['session']
-			created_at = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(session_data['created_at']))
-			last_activity = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(session_data['last_activity']))
+		for entry in reversed(entries):
+			session = entry.value.browser_session if entry.value else None
+			created_at = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(entry.created_at))
+			last_activity = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(entry.last_activity))
 
 			# Check if session is still active
-			is_active = hasattr(session, 'cdp_client') and session.cdp_client is not None
+			is_active = session is not None and getattr(session, 'cdp_client', None) is not None
 
 			sessions_info.append(
 				{
-					'session_id': session_id,
+					'session_id': entry.session_id,
 					'created_at': created_at,
 					'last_activity': last_activity,
 					'active': is_active,
-					'current_url': session_data.get('url', 'Unknown'),
-					'age_minutes': (time.time() - session_data['created_at']) / 60,
+					'busy': entry.busy,
+					'default': entry.session_id == self.default_session_id,
+					'age_minutes': (time.time() - entry.created_at) / 60,
 				}
 			)
 
 		return json.dumps(sessions_info, indent=2)
 
 	async def _close_session(self, session_id: str) -> str:
-		"""Close a specific browser session."""
-		if session_id not in self.active_sessions:
-			return f'Session {session_id} not found'
-
-		session_data = self.active_sessions[session_id]
-		session = session_data['session']
-
+		"""Close a specific browser session (waits for its running tool call to finish)."""
 		try:
-			# Close the session
-			if hasattr(session, 'kill'):
-				await session.kill()
-			elif hasattr(session, 'close'):
-				await session.close()
-
-			# Remove from tracking
-			del self.active_sessions[session_id]
-
-			# If this was the current session, clear it
-			if self.browser_session and self.browser_session.id == session_id:
-				self.browser_session = None
-				self.tools = None
-
+			if not await self.sessions.close(session_id):
+				return f'Session {session_id} not found'
 			return f'Successfully closed session {session_id}'
 		except Exception as e:
 			return f'Error closing session {session_id}: {str(e)}'
 
 	async def _close_all_sessions(self) -> str:
 		"""Close all active browser sessions."""
-		if not self.active_sessions:
+		session_count = len(self.sessions)
+		if not session_count:
 			return 'No active sessions to close'
 
-		closed_count = 0
-		errors = []
+		failed_session_ids = await self.sessions.close_all()
 
-		for session_id in list(self.active_sessions.keys()):
-			try:
-				result = await self._close_session(session_id)
-				if 'Successfully closed' in result:
-					closed_count += 1
-				else:
-					errors.append(f'{session_id}: {result}')
-			except Exception as e:
-				errors.append(f'{session_id}: {str(e)}')
-
-		# Clear current session references
-		self.browser_session = None
-		self.tools = None
-
-		result = f'Closed {closed_count} sessions'
-		if errors:
-			result += f'. Errors: {"; ".join(errors)}'
+		result = f'Closed {session_count - len(failed_session_ids)} sessions'
+		if failed_session_ids:
+			result += f'. Errors closing: {"; ".join(failed_session_ids)}'
 
 		return result
 
 	async def _cleanup_expired_sessions(self) -> None:
-		"""Background task to clean up expired sessions."""
-		current_time = time.time()
-		timeout_seconds = self.session_timeout_minutes * 60
-
-		expired_sessions = []
-		for session_id, session_data in self.active_sessions.items():
-			last_activity = session_data['last_activity']
-			if current_time - last_activity > timeout_seconds:
-				expired_sessions.append(session_id)
-
-		for session_id in expired_sessions:
-			try:
-				await self._close_session(session_id)
-				logger.info(f'Auto-closed expired session {session_id}')
-			except Exception as e:
-				logger.error(f'Error auto-closing session {session_id}: {e}')
+		"""Background task to clean up sessions idle for longer than the session timeout."""
+		for session_id in await self.sessions.evict_idle():
+			logger.info(f'Auto-closed expired session {session_id}')
 
 	async def _start_cleanup_task(self) -> None:
 		"""Start the background cleanup task."""
@@ -1058,12 +1043,12 @@ class BrowserUseServer:
 			)
 
 
-async def main(session_timeout_minutes: int = 10):
+async def main(session_timeout_minutes: int = 10, max_sessions: int = 5):
 	if not MCP_AVAILABLE:
 		print('MCP SDK is required. Install with: pip install mcp', file=sys.stderr)
 		sys.exit(1)
 
-	server = BrowserUseServer(session_timeout_minutes=session_timeout_minutes)
+	server = BrowserUseServer(session_timeout_minutes=session_timeout_minutes, max_sessions=max_sessions)
 	server._telemetry.capture(
 		MCPServerTelemetryEvent(
 			version=get_browser_use_version(),
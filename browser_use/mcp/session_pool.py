@@ -0,0 +1,172 @@
+"""Bounded pool of named sessions for the browser-use MCP server.
+
+Every MCP tool call names the session it runs in. Calls on the same session are serialized by a per-session
+lock, calls on different sessions run concurrently. The pool holds at most `max_sessions` sessions: when it is
+full, the least recently used idle session is evicted to make room, and sessions idle for longer than
+`idle_timeout` seconds are closed by `evict_idle()`.
+"""
+
+import asyncio
+import logging
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Generic, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+
+class SessionPoolFullError(RuntimeError):
+	"""Raised when a new session is needed but every pooled session is busy."""
+
+
+@dataclass(eq=False)
+class PooledSession(Generic[T]):
+	"""A pool entry. `value` is None until the session has been started by the pool's factory."""
+
+	session_id: str
+	value: T | None = None
+	created_at: float = field(default_factory=time.time)
+	last_activity: float = field(default_factory=time.time)
+	lock: asyncio.Lock = field(default_factory=asyncio.Lock, repr=False)
+	closed: bool = False
+
+	@property
+	def busy(self) -> bool:
+		return self.lock.locked()
+
+
+class SessionPool(Generic[T]):
+	"""Bounded, LRU-evicting pool of sessions keyed by session id, with one lock per session."""
+
+	def __init__(
+		self,
+		factory: Callable[[str], Awaitable[T]],
+		closer: Callable[[T], Awaitable[None]],
+		max_sessions: int = 5,
+		idle_timeout: float = 600,
+	):
+		if max_sessions < 1:
+			raise ValueError(f'SessionPool max_sessions must be >= 1, got {max_sessions}')
+		self._factory = factory
+		self._closer = closer
+		self.max_sessions = max_sessions
+		self.idle_timeout = idle_timeout
+		self._entries: dict[str, PooledSession[T]] = {}
+
+	def __len__(self) -> int:
+		return len(self._entries)
+
+	def __contains__(self, session_id: str) -> bool:
+		return session_id in self._entries
+
+	def entries(self) -> list[PooledSession[T]]:
+		"""Snapshot of the pooled sessions, least recently used first."""
+		return sorted(self._entries.values(), key=lambda entry: entry.last_activity)
+
+	@asynccontextmanager
+	async def session(self, session_id: str) -> AsyncIterator[T]:
+		"""Hold the named session's lock for the duration of the block, starting the session first if needed."""
+		entry = await self._checkout(session_id)
+		try:
+			yield entry.value  # type: ignore[misc]
+		finally:
+			entry.last_activity = time.time()
+			entry.lock.release()
+
+	async def _checkout(self, session_id: str) -> PooledSession[T]:
+		while True:
+			# dict updates happen without awaiting in between, so they are atomic on the event loop
+			entry = self._entries.get(session_id)
+			evicted: list[PooledSession[T]] = []
+			if entry is None:
+				evicted = self._make_room()
+				entry = self._entries[session_id] = PooledSession(session_id=session_id)
+
+			await entry.lock.acquire()
+			if entry.closed:
+				# closed or evicted while we were waiting for it, start over with a fresh entry
+				entry.lock.release()
+				continue
+
+			for old_entry in evicted:
+				logger.info(f'Evicting least recently used session {old_entry.session_id} to make room for {session_id}')
+				await self._close_entry(old_entry)
+
+			if entry.value is None:
+				try:
+					entry.value = await self._factory(session_id)
+				except BaseException:
+					entry.closed = True
+					if self._entries.get(session_id) is entry:
+						del self._entries[session_id]
+					entry.lock.release()
+					raise
+
+			entry.last_activity = time.time()
+			return entry
+
+	def _make_room(self) -> list[PooledSession[T]]:
+		"""Remove least recently used idle entries until a new one fits, returning them for closing."""
+		excess = len(self._entries) - self.max_sessions + 1
+		if excess <= 0:
+			return []
+		idle_entries = [entry for entry in self.entries() if not entry.busy]
+		if len(idle_entries) < excess:
+			raise SessionPoolFullError(
+				f'All {self.max_sessions} browser sessions are busy, close one or retry once a session is idle'
+			)
+		evicted = idle_entries[:excess]
+		for entry in evicted:
+			entry.closed = True
+			del self._entries[entry.session_id]
+		return evicted
+
+	async def close(self, session_id: str) -> bool:
+		"""Close a session once its running call (if any) has finished. Returns False if it isn't pooled.
+
+		The session is removed from the pool even if closing it raises.
+		"""
+		entry = self._entries.pop(session_id, None)
+		if entry is None:
+			return False
+		entry.closed = True
+		await self._close_entry(entry, raise_errors=True)
+		return True
+
+	async def close_all(self) -> list[str]:
+		"""Close every pooled session, returning the ids of those that failed to close cleanly."""
+		entries = list(self._entries.values())
+		self._entries.clear()
+		for entry in entries:
+			entry.closed = True
+		results = await asyncio.gather(
+			*(self._close_entry(entry, raise_errors=True) for entry in entries), return_exceptions=True
+		)
+		return [entry.session_id for entry, result in zip(entries, results) if isinstance(result, BaseException)]
+
+	async def evict_idle(self) -> list[str]:
+		"""Close sessions that have been idle for longer than `idle_timeout`, returning their ids."""
+		now = time.time()
+		expired = [entry for entry in self._entries.values() if not entry.busy and now - entry.last_activity > self.idle_timeout]
+		for entry in expired:
+			entry.closed = True
+			del self._entries[entry.session_id]
+		for entry in expired:
+			await self._close_entry(entry)
+		return [entry.session_id for entry in expired]
+
+	async def _close_entry(self, entry: PooledSession[T], raise_errors: bool = False) -> None:
+		async with entry.lock:
+			value, entry.value = entry.value, None
+			if value is None:
+				return
+			try:
+				await self._closer(value)
+			except Exception as e:
+				logger.error(f'Error closing session {entry.session_id}: {type(e).__name__}: {e}')
+				if raise_errors:
+					raise
@@ -0,0 +1,228 @@
+"""
+Per-step latency profiling for browser-use.
+
+Spans are recorded into a tree through a context variable, so anything that runs below a profiled `Agent.step` (browser
+state capture, CDP calls, DOM tree building and serialization, prompt building, the LLM call, actions) can add a span
+without a profiler being passed to it. Outside of a profiled step `profile_span` and `record_span` do nothing, so they
+are cheap to leave in hot paths.
+
+Span trees are attached to `AgentHistory.metadata`, and can be exported as Chrome trace JSON (chrome://tracing,
+https://ui.perfetto.dev) or OTLP/JSON, or summarized as p50/p95 per phase across steps and runs.
+"""
+
+import secrets
+import time
+import weakref
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+from pydantic import BaseModel, Field
+
+SpanAttributeValue = str | int | float | bool
+
+
+class ProfileSpan(BaseModel):
+	"""A timed phase of an agent step, with the phases it consists of"""
+
+	name: str
+	start_time: float
+	end_time: float | None = None  # None while the span is open
+	attributes: dict[str, SpanAttributeValue] = Field(default_factory=dict)
+	children: list['ProfileSpan'] = Field(default_factory=list)
+
+	@property
+	def duration_seconds(self) -> float:
+		"""Duration of the span, 0 if it never finished"""
+		return 0.0 if self.end_time is None else self.end_time - self.start_time
+
+	def walk(self, path: str = '') -> Iterator[tuple[str, 'ProfileSpan']]:
+		"""Yield (path, span) for this span and all its descendants, paths are span names joined by '/'"""
+		path = f'{path}/{self.name}' if path else self.name
+		yield path, self
+		for child in self.children:
+			yield from child.walk(path)
+
+
+class PhaseTiming(BaseModel):
+	"""Latency statistics of one phase across steps"""
+
+	count: int
+	total_seconds: float
+	p50_seconds: float
+	p95_seconds: float
+	max_seconds: float
+
+
+_current_span: ContextVar[ProfileSpan | None] = ContextVar('browser_use_profile_span', default=None)
+
+# Spans handed over to code running in another context, e.g. event bus handlers (see `link_span`)
+_linked_spans: 'weakref.WeakValueDictionary[str, ProfileSpan]' = weakref.WeakValueDictionary()
+
+
+def current_span() -> ProfileSpan | None:
+	"""The innermost open span of the current context, None outside of a profiled step"""
+	span = _current_span.get()
+	# tasks started during a step can outlive it, they must not add spans to a finished step
+	return span if span is not None and span.end_time is None else None
+
+
+@contextmanager
+def profile_step(name: str = 'step', **attributes: SpanAttributeValue) -> Iterator[ProfileSpan]:
+	"""Start recording a new span tree, rooted at the returned span"""
+	root = ProfileSpan(name=name, start_time=time.time(), attributes=attributes)
+	token = _current_span.set(root)
+	try:
+		yield root
+	finally:
+		root.end_time = time.time()
+		_current_span.reset(token)
+
+
+@contextmanager
+def profile_span(name: str, **attributes: SpanAttributeValue) -> Iterator[ProfileSpan | None]:
+	"""Record the enclosed code as a child of the current span. Does nothing outside of a profiled step."""
+	parent = current_span()
+	if parent is None:
+		yield None
+		return
+	span = ProfileSpan(name=name, start_time=time.time(), attributes=attributes)
+	parent.children.append(span)
+	token = _current_span.set(span)
+	try:
+		yield span
+	finally:
+		span.end_time = time.time()
+		_current_span.reset(token)
+
+
+def record_span(name: str, start_time: float, end_time: float, **attributes: SpanAttributeValue) -> None:
+	"""Add an already measured phase (`time.time()` timestamps) as a child of the current span"""
+	parent = current_span()
+	if parent is not None:
+		parent.children.append(ProfileSpan(name=name, start_time=start_time, end_time=end_time, attributes=attributes))
+
+
+def link_span(key: str) -> None:
+	"""Hand the current span over to code that runs in another context under `key`, e.g. the handler of an event.
+
+	Event bus handlers don't run in the context of the code that dispatched the event, so they can't see its span.
+	"""
+	span = current_span()
+	if span is not None:
+		_linked_spans[key] = span
+
+
+@contextmanager
+def linked_span(key: str, name: str, **attributes: SpanAttributeValue) -> Iterator[ProfileSpan | None]:
+	"""Like `profile_span`, but below the span that was handed over with `link_span(key)`"""
+	parent = _linked_spans.pop(key, None)
+	if parent is None or parent.end_time is not None:
+		yield None
+		return
+	token = _current_span.set(parent)
+	try:
+		with profile_span(name, **attributes) as span:
+			yield span
+	finally:
+		_current_span.reset(token)
+
+
+def _percentile(sorted_values: list[float], q: float) -> float:
+	"""Linearly interpolated percentile of already sorted values"""
+	position = (len(sorted_values) - 1) * q
+	lower = int(position)
+	upper = min(lower + 1, len(sorted_values) - 1)
+	return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def summarize_spans(roots: Iterable[ProfileSpan]) -> dict[str, PhaseTiming]:
+	"""p50/p95 latency per phase across span trees, keyed by the path of span names (e.g. 'step/browser_state')"""
+	durations: dict[str, list[float]] = {}
+	for root in roots:
+		for path, span in root.walk():
+			if span.end_time is not None:
+				durations.setdefault(path, []).append(span.duration_seconds)
+
+	summary = {}
+	for path, values in durations.items():
+		values.sort()
+		summary[path] = PhaseTiming(
+			count=len(values),
+			total_seconds=sum(values),
+			p50_seconds=_percentile(values, 0.5),
+			p95_seconds=_percentile(values, 0.95),
+			max_seconds=values[-1],
+		)
+	return summary
+
+
+def to_chrome_trace(roots: Iterable[ProfileSpan], process_name: str = 'browser-use') -> dict[str, Any]:
+	"""Export span trees in the Chrome trace event format, as loaded by chrome://tracing and Perfetto"""
+	events: list[dict[str, Any]] = [{'name': 'process_name', 'ph': 'M', 'pid': 1, 'tid': 1, 'args': {'name': process_name}}]
+	for root in roots:
+		for _, span in root.walk():
+			if span.end_time is None:
+				continue
+			events.append(
+				{
+					'name': span.name,
+					'cat': 'browser_use',
+					'ph': 'X',  # complete event
+					'ts': span.start_time * 1_000_000,
+					'dur': span.duration_seconds * 1_000_000,
+					'pid': 1,
+					'tid': 1,
+					'args': dict(span.attributes),
+				}
+			)
+	return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+
+def _otlp_attribute(key: str, value: SpanAttributeValue) -> dict[str, Any]:
+	if isinstance(value, bool):
+		return {'key': key, 'value': {'boolValue': value}}
+	if isinstance(value, int):
+		return {'key': key, 'value': {'intValue': str(value)}}
+	if isinstance(value, float):
+		return {'key': key, 'value': {'doubleValue': value}}
+	return {'key': key, 'value': {'stringValue': str(value)}}
+
+
+def to_otlp_json(roots: Iterable[ProfileSpan], service_name: str = 'browser-use') -> dict[str, Any]:
+	"""Export span trees as an OTLP/JSON trace export request, one trace per root span.
+
+	The result can be POSTed to the /v1/traces endpoint of an OpenTelemetry collector.
+	"""
+	otlp_spans: list[dict[str, Any]] = []
+
+	def add(span: ProfileSpan, trace_id: str, parent_span_id: str) -> None:
+		span_id = secrets.token_hex(8)
+		end_time = span.end_time if span.end_time is not None else span.start_time
+		otlp_spans.append(
+			{
+				'traceId': trace_id,
+				'spanId': span_id,
+				'parentSpanId': parent_span_id,
+				'name': span.name,
+				'kind': 1,  # SPAN_KIND_INTERNAL
+				'startTimeUnixNano': str(int(span.start_time * 1e9)),
+				'endTimeUnixNano': str(int(end_time * 1e9)),
+				'attributes': [_otlp_attribute(key, value) for key, value in span.attributes.items()],
+			}
+		)
+		for child in span.children:
+			add(child, trace_id, span_id)
+
+	for root in roots:
+		add(root, secrets.token_hex(16), '')
+
+	return {
+		'resourceSpans': [
+			{
+				'resource': {'attributes': [_otlp_attribute('service.name', service_name)]},
+				'scopeSpans': [{'scope': {'name': 'browser_use.profiling'}, 'spans': otlp_spans}],
+			}
+		]
+	}
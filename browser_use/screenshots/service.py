@@ -1,52 +1,152 @@
 """
 Screenshot storage service for browser-use agents.
+
+Screenshots are stored content-addressed: each blob is named after the hash of the captured PNG, so steps that
+capture byte-identical screenshots (e.g. on a static page) share one file. Blobs are reference counted per step and
+deleted once no retained step refers to them.
 """
 
 import base64
+import hashlib
+import io
+import logging
+from collections import OrderedDict
 from pathlib import Path
+from typing import Literal
 
 import anyio
 
 from browser_use.observability import observe_debug
 
+logger = logging.getLogger(__name__)
+
+ScreenshotFormat = Literal['png', 'webp', 'jpeg']
+
+_FILE_EXTENSIONS: dict[ScreenshotFormat, str] = {'png': 'png', 'webp': 'webp', 'jpeg': 'jpg'}
+
+
+def _transcode(png_data: bytes, image_format: ScreenshotFormat, quality: int) -> bytes:
+	"""Re-encode a PNG screenshot in a more compact format (CPU-bound, runs in a worker thread)."""
+	from PIL import Image
+
+	with Image.open(io.BytesIO(png_data)) as image:
+		if image_format == 'jpeg' and image.mode != 'RGB':
+			image = image.convert('RGB')
+		output = io.BytesIO()
+		image.save(output, format=image_format.upper(), quality=quality)
+	return output.getvalue()
+
 
 class ScreenshotService:
-	"""Simple screenshot storage service that saves screenshots to disk"""
+	"""Content-addressed screenshot store with per-step reference counting and an optional retention limit"""
+
+	def __init__(
+		self,
+		agent_directory: str | Path,
+		image_format: ScreenshotFormat = 'png',
+		quality: int = 80,
+		max_screenshots: int | None = None,
+	):
+		"""Initialize with agent directory path.
+
+		Args:
+			agent_directory: Screenshots are stored in its `screenshots` subdirectory
+			image_format: Format blobs are stored in, 'webp' and 'jpeg' are transcoded from the captured PNG
+			quality: Quality for lossy formats (1-100)
+			max_screenshots: Keep screenshots of at most this many most recent steps on disk (None keeps all)
+		"""
+		if image_format not in _FILE_EXTENSIONS:
+			raise ValueError(f'Unsupported screenshot format {image_format!r}, expected one of {list(_FILE_EXTENSIONS)}')
+		if max_screenshots is not None and max_screenshots < 1:
+			raise ValueError(f'max_screenshots must be >= 1 or None, got {max_screenshots}')
 
-	def __init__(self, agent_directory: str | Path):
-		"""Initialize with agent directory path"""
 		self.agent_directory = Path(agent_directory) if isinstance(agent_directory, str) else agent_directory
+		self.image_format: ScreenshotFormat = image_format
+		self.quality = quality
+		self.max_screenshots = max_screenshots
 
 		# Create screenshots subdirectory
 		self.screenshots_dir = self.agent_directory / 'screenshots'
 		self.screenshots_dir.mkdir(parents=True, exist_ok=True)
 
+		# step number -> blob path, oldest step first (retention order)
+		self._step_blobs: OrderedDict[int, Path] = OrderedDict()
+		self._refcounts: dict[Path, int] = {}
+
+	def _blob_path(self, png_data: bytes) -> Path:
+		# hash the captured PNG rather than the transcoded blob, so duplicates are found before any transcoding
+		digest = hashlib.sha256(png_data).hexdigest()[:32]
+		return self.screenshots_dir / f'{digest}.{_FILE_EXTENSIONS[self.image_format]}'
+
+	def _encode_blob(self, screenshot_b64: str) -> tuple[Path, bytes | None]:
+		"""Decode, hash and (if the blob is new) transcode a screenshot. Returns the blob path and the bytes to write."""
+		png_data = base64.b64decode(screenshot_b64)
+		blob_path = self._blob_path(png_data)
+		if blob_path in self._refcounts:
+			return blob_path, None
+		if self.image_format == 'png':
+			return blob_path, png_data
+		try:
+			return blob_path, _transcode(png_data, self.image_format, self.quality)
+		except Exception as e:
+			logger.warning(
+				f'📸 Failed to transcode screenshot to {self.image_format}, storing it as png: {type(e).__name__}: {e}'
+			)
+			return blob_path.with_suffix('.png'), png_data
+
 	@observe_debug(ignore_input=True, ignore_output=True, name='store_screenshot')
 	async def store_screenshot(self, screenshot_b64: str, step_number: int) -> str:
-		"""Store screenshot to disk and return the full path as string"""
-		screenshot_filename = f'step_{step_number}.png'
-		screenshot_path = self.screenshots_dir / screenshot_filename
+		"""Store screenshot to disk (deduplicated by content) and return the full path as string"""
+		# decoding, hashing and transcoding large screenshots is CPU-bound, keep it off the event loop
+		blob_path, blob_data = await anyio.to_thread.run_sync(self._encode_blob, screenshot_b64)
 
-		# Decode base64 and save to disk
-		screenshot_data = base64.b64decode(screenshot_b64)
+		if blob_data is not None and blob_path not in self._refcounts:
+			async with await anyio.open_file(blob_path, 'wb') as f:
+				await f.write(blob_data)
 
-		async with await anyio.open_file(screenshot_path, 'wb') as f:
-			await f.write(screenshot_data)
+		# take the new reference before releasing the step's previous blob, which may be the same one
+		self._refcounts[blob_path] = self._refcounts.get(blob_path, 0) + 1
+		await self._release_step(step_number)
+		self._step_blobs[step_number] = blob_path
+		self._step_blobs.move_to_end(step_number)
 
-		return str(screenshot_path)
+		if self.max_screenshots is not None:
+			while len(self._step_blobs) > self.max_screenshots:
+				oldest_step = next(iter(self._step_blobs))
+				await self._release_step(oldest_step)
 
-	@observe_debug(ignore_input=True, ignore_output=True, name='get_screenshot_from_disk')
-	async def get_screenshot(self, screenshot_path: str) -> str | None:
-		"""Load screenshot from disk path and return as base64"""
+		return str(blob_path)
+
+	async def _release_step(self, step_number: int) -> None:
+		"""Drop a step's reference to its blob, deleting the blob once nothing refers to it."""
+		blob_path = self._step_blobs.pop(step_number, None)
+		if blob_path is None:
+			return
+		self._refcounts[blob_path] -= 1
+		if self._refcounts[blob_path] == 0:
+			del self._refcounts[blob_path]
+			await anyio.Path(blob_path).unlink(missing_ok=True)
+
+	def blob_count(self) -> int:
+		"""Number of distinct screenshot files currently stored"""
+		return len(self._refcounts)
+
+	@observe_debug(ignore_input=True, ignore_output=True, name='get_screenshot_bytes_from_disk')
+	async def get_screenshot_bytes(self, screenshot_path: str) -> bytes | None:
+		"""Load screenshot bytes from disk path, without base64 encoding them"""
 		if not screenshot_path:
 			return None
 
-		path = Path(screenshot_path)
-		if not path.exists():
+		path = anyio.Path(screenshot_path)
+		if not await path.exists():
 			return None
 
-		# Load from disk and encode to base64
-		async with await anyio.open_file(path, 'rb') as f:
-			screenshot_data = await f.read()
+		return await path.read_bytes()
 
+	@observe_debug(ignore_input=True, ignore_output=True, name='get_screenshot_from_disk')
+	async def get_screenshot(self, screenshot_path: str) -> str | None:
+		"""Load screenshot from disk path and return as base64"""
+		screenshot_data = await self.get_screenshot_bytes(screenshot_path)
+		if screenshot_data is None:
+			return None
 		return base64.b64encode(screenshot_data).decode('utf-8')
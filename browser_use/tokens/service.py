@@ -8,6 +8,8 @@ Automatically tracks token usage when LLMs are registered and invoked.
 import asyncio
 import logging
 import os
+from collections import deque
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Any
@@ -23,6 +25,7 @@ from browser_use.tokens.views import (
 	ModelPricing,
 	ModelUsageStats,
 	ModelUsageTokens,
+	ResponseCacheLookup,
 	TokenCostCalculated,
 	TokenUsageEntry,
 	UsageSummary,
@@ -43,19 +46,79 @@ def xdg_cache_home() -> Path:
 	return default
 
 
+@dataclass
+class _UsageTotals:
+	"""Running sums of token usage. Costs are linear in the token counts, so they're priced from the sums."""
+
+	prompt_tokens: int = 0
+	prompt_cached_tokens: int = 0
+	prompt_cache_creation_tokens: int = 0
+	completion_tokens: int = 0
+	count: int = 0
+
+	def add(self, usage: ChatInvokeUsage) -> None:
+		self.prompt_tokens += usage.prompt_tokens
+		self.prompt_cached_tokens += usage.prompt_cached_tokens or 0
+		self.prompt_cache_creation_tokens += usage.prompt_cache_creation_tokens or 0
+		self.completion_tokens += usage.completion_tokens
+		self.count += 1
+
+	@property
+	def total_tokens(self) -> int:
+		return self.prompt_tokens + self.completion_tokens
+
+	def as_usage(self) -> ChatInvokeUsage:
+		return ChatInvokeUsage(
+			prompt_tokens=self.prompt_tokens,
+			prompt_cached_tokens=self.prompt_cached_tokens,
+			prompt_cache_creation_tokens=self.prompt_cache_creation_tokens,
+			prompt_image_tokens=None,
+			completion_tokens=self.completion_tokens,
+			total_tokens=self.total_tokens,
+		)
+
+
+@dataclass
+class _ModelTotals:
+	"""Running totals of one model"""
+
+	usage: _UsageTotals = field(default_factory=_UsageTotals)
+	saved_usage: _UsageTotals = field(default_factory=_UsageTotals)
+	"""Usage of the calls served from a response cache instead"""
+	response_cache_hits: int = 0
+	response_cache_misses: int = 0
+
+	def add_lookup(self, lookup: ResponseCacheLookup) -> None:
+		if not lookup.hit:
+			self.response_cache_misses += 1
+			return
+		self.response_cache_hits += 1
+		if lookup.saved_usage:
+			self.saved_usage.add(lookup.saved_usage)
+
+
 class TokenCost:
-	"""Service for tracking token usage and calculating costs"""
+	"""
+	Service for tracking token usage and calculating costs
+
+	Usage is aggregated per model as it's added, so summaries don't grow with the number of calls. Only the last
+	`history_size` entries are kept in `usage_history` and `response_cache_history`.
+	"""
 
 	CACHE_DIR_NAME = 'browser_use/token_cost'
 	CACHE_DURATION = timedelta(days=1)
 	PRICING_URL = 'https://raw.githubusercontent.com/BerriAI/litellm/main/model_prices_and_context_window.json'
 
-	def __init__(self, include_cost: bool = False):
+	def __init__(self, include_cost: bool = False, history_size: int | None = 10_000):
 		self.include_cost = include_cost or os.getenv('BROWSER_USE_CALCULATE_COST', 'false').lower() == 'true'
 
-		self.usage_history: list[TokenUsageEntry] = []
+		self.history_size = history_size
+		self.usage_history: deque[TokenUsageEntry] = deque(maxlen=history_size)
+		self.response_cache_history: deque[ResponseCacheLookup] = deque(maxlen=history_size)
+		self._totals: dict[str, _ModelTotals] = {}
 		self.registered_llms: dict[str, BaseChatModel] = {}
 		self._pricing_data: dict[str, Any] | None = None
+		self._pricing_by_model: dict[str, ModelPricing | None] = {}
 		self._initialized = False
 		self._cache_dir = xdg_cache_home() / self.CACHE_DIR_NAME
 
@@ -167,6 +230,11 @@ class TokenCost:
 		if not self._initialized:
 			await self.initialize()
 
+		if model_name not in self._pricing_by_model:
+			self._pricing_by_model[model_name] = self._resolve_model_pricing(model_name)
+		return self._pricing_by_model[model_name]
+
+	def _resolve_model_pricing(self, model_name: str) -> ModelPricing | None:
 		if not self._pricing_data or model_name not in self._pricing_data:
 			return None
 
@@ -219,9 +287,19 @@ class TokenCost:
 		)
 
 		self.usage_history.append(entry)
+		self._totals.setdefault(model, _ModelTotals()).usage.add(usage)
 
 		return entry
 
+	def add_response_cache_lookup(self, model: str, hit: bool, saved_usage: ChatInvokeUsage | None = None) -> ResponseCacheLookup:
+		"""Add a lookup in an LLM response cache to history, hits don't add token usage"""
+		lookup = ResponseCacheLookup(model=model, timestamp=datetime.now(), hit=hit, saved_usage=saved_usage if hit else None)
+
+		self.response_cache_history.append(lookup)
+		self._totals.setdefault(model, _ModelTotals()).add_lookup(lookup)
+
+		return lookup
+
 	# async def _log_non_usage_llm(self, llm: BaseChatModel) -> None:
 	# 	"""Log non-usage to the logger"""
 	# 	C_CYAN = '\033[96m'
@@ -326,13 +404,20 @@ class TokenCost:
 			# Call the original method
 			result = await original_ainvoke(messages, output_format)
 
+			# Wrappers calling several models (ChatHedged) report the one that answered
+			model = result.model or llm.model
+
+			# Responses served from a response cache (ChatCache) cost nothing, their usage is what was saved
+			if result.cache_hit is not None:
+				token_cost_service.add_response_cache_lookup(model, result.cache_hit, result.usage)
+
 			# Track usage if available (no await needed since add_usage is now sync)
-			if result.usage:
-				usage = token_cost_service.add_usage(llm.model, result.usage)
+			if result.usage and not result.cache_hit:
+				usage = token_cost_service.add_usage(model, result.usage)
 
 				logger.debug(f'Token cost service: {usage}')
 
-				asyncio.create_task(token_cost_service._log_usage(llm.model, usage))
+				asyncio.create_task(token_cost_service._log_usage(model, usage))
 
 			# else:
 			# 	await token_cost_service._log_non_usage_llm(llm)
@@ -347,27 +432,35 @@ class TokenCost:
 
 	def get_usage_tokens_for_model(self, model: str) -> ModelUsageTokens:
 		"""Get usage tokens for a specific model"""
-		filtered_usage = [u for u in self.usage_history if u.model == model]
+		totals = self._totals[model].usage if model in self._totals else _UsageTotals()
 
 		return ModelUsageTokens(
 			model=model,
-			prompt_tokens=sum(u.usage.prompt_tokens for u in filtered_usage),
-			prompt_cached_tokens=sum(u.usage.prompt_cached_tokens or 0 for u in filtered_usage),
-			completion_tokens=sum(u.usage.completion_tokens for u in filtered_usage),
-			total_tokens=sum(u.usage.prompt_tokens + u.usage.completion_tokens for u in filtered_usage),
+			prompt_tokens=totals.prompt_tokens,
+			prompt_cached_tokens=totals.prompt_cached_tokens,
+			completion_tokens=totals.completion_tokens,
+			total_tokens=totals.total_tokens,
 		)
 
 	async def get_usage_summary(self, model: str | None = None, since: datetime | None = None) -> UsageSummary:
-		"""Get summary of token usage and costs (costs calculated on-the-fly)"""
-		filtered_usage = self.usage_history
-
-		if model:
-			filtered_usage = [u for u in filtered_usage if u.model == model]
-
-		if since:
-			filtered_usage = [u for u in filtered_usage if u.timestamp >= since]
+		"""
+		Get summary of token usage and costs
 
-		if not filtered_usage:
+		Reads the running totals, costs are priced once per model. With `since`, the summary is computed from the
+		entries kept in the history, so it only covers the last `history_size` calls.
+		"""
+		if since is None:
+			totals = {name: model_totals for name, model_totals in self._totals.items() if not model or name == model}
+		else:
+			totals = {}
+			for entry in self.usage_history:
+				if (not model or entry.model == model) and entry.timestamp >= since:
+					totals.setdefault(entry.model, _ModelTotals()).usage.add(entry.usage)
+			for lookup in self.response_cache_history:
+				if (not model or lookup.model == model) and lookup.timestamp >= since:
+					totals.setdefault(lookup.model, _ModelTotals()).add_lookup(lookup)
+
+		if not totals:
 			return UsageSummary(
 				total_prompt_tokens=0,
 				total_prompt_cost=0.0,
@@ -380,53 +473,64 @@ class TokenCost:
 				entry_count=0,
 			)
 
-		# Calculate totals
-		total_prompt = sum(u.usage.prompt_tokens for u in filtered_usage)
-		total_completion = sum(u.usage.completion_tokens for u in filtered_usage)
-		total_tokens = total_prompt + total_completion
-		total_prompt_cached = sum(u.usage.prompt_cached_tokens or 0 for u in filtered_usage)
-		models = list({u.model for u in filtered_usage})
-
-		# Calculate per-model stats with record-by-record cost calculation
 		model_stats: dict[str, ModelUsageStats] = {}
 		total_prompt_cost = 0.0
 		total_completion_cost = 0.0
 		total_prompt_cached_cost = 0.0
-
-		for entry in filtered_usage:
-			if entry.model not in model_stats:
-				model_stats[entry.model] = ModelUsageStats(model=entry.model)
-
-			stats = model_stats[entry.model]
-			stats.prompt_tokens += entry.usage.prompt_tokens
-			stats.completion_tokens += entry.usage.completion_tokens
-			stats.total_tokens += entry.usage.prompt_tokens + entry.usage.completion_tokens
-			stats.invocations += 1
+		response_cache_saved_cost = 0.0
+
+		for name, model_totals in totals.items():
+			usage = model_totals.usage
+			lookups = model_totals.response_cache_hits + model_totals.response_cache_misses
+			stats = ModelUsageStats(
+				model=name,
+				prompt_tokens=usage.prompt_tokens,
+				prompt_cached_tokens=usage.prompt_cached_tokens,
+				prompt_cache_creation_tokens=usage.prompt_cache_creation_tokens,
+				completion_tokens=usage.completion_tokens,
+				total_tokens=usage.total_tokens,
+				invocations=usage.count,
+				average_tokens_per_invocation=usage.total_tokens / usage.count if usage.count else 0.0,
+				cache_hit_ratio=usage.prompt_cached_tokens / usage.prompt_tokens if usage.prompt_tokens else 0.0,
+				response_cache_hits=model_totals.response_cache_hits,
+				response_cache_misses=model_totals.response_cache_misses,
+				response_cache_hit_ratio=model_totals.response_cache_hits / lookups if lookups else 0.0,
+				response_cache_saved_tokens=model_totals.saved_usage.total_tokens,
+			)
+			model_stats[name] = stats
 
 			if self.include_cost:
-				# Calculate cost record by record using the updated calculate_cost function
-				cost = await self.calculate_cost(entry.model, entry.usage)
-				if cost:
-					stats.cost += cost.total_cost
+				if usage.count and (cost := await self.calculate_cost(name, usage.as_usage())):
+					stats.cost = cost.total_cost
 					total_prompt_cost += cost.prompt_cost
 					total_completion_cost += cost.completion_cost
 					total_prompt_cached_cost += cost.prompt_read_cached_cost or 0
+				saved_usage = model_totals.saved_usage
+				if saved_usage.count and (cost := await self.calculate_cost(name, saved_usage.as_usage())):
+					response_cache_saved_cost += cost.total_cost
 
-		# Calculate averages
-		for stats in model_stats.values():
-			if stats.invocations > 0:
-				stats.average_tokens_per_invocation = stats.total_tokens / stats.invocations
+		total_prompt = sum(stats.prompt_tokens for stats in model_stats.values())
+		total_prompt_cached = sum(stats.prompt_cached_tokens for stats in model_stats.values())
+		response_cache_hits = sum(stats.response_cache_hits for stats in model_stats.values())
+		response_cache_lookups = response_cache_hits + sum(stats.response_cache_misses for stats in model_stats.values())
 
 		return UsageSummary(
 			total_prompt_tokens=total_prompt,
 			total_prompt_cost=total_prompt_cost,
 			total_prompt_cached_tokens=total_prompt_cached,
 			total_prompt_cached_cost=total_prompt_cached_cost,
-			total_completion_tokens=total_completion,
+			total_prompt_cache_creation_tokens=sum(stats.prompt_cache_creation_tokens for stats in model_stats.values()),
+			cache_hit_ratio=total_prompt_cached / total_prompt if total_prompt else 0.0,
+			response_cache_hits=response_cache_hits,
+			response_cache_misses=response_cache_lookups - response_cache_hits,
+			response_cache_hit_ratio=response_cache_hits / response_cache_lookups if response_cache_lookups else 0.0,
+			response_cache_saved_tokens=sum(stats.response_cache_saved_tokens for stats in model_stats.values()),
+			response_cache_saved_cost=response_cache_saved_cost,
+			total_completion_tokens=sum(stats.completion_tokens for stats in model_stats.values()),
 			total_completion_cost=total_completion_cost,
-			total_tokens=total_tokens,
+			total_tokens=sum(stats.total_tokens for stats in model_stats.values()),
 			total_cost=total_prompt_cost + total_completion_cost + total_prompt_cached_cost,
-			entry_count=len(filtered_usage),
+			entry_count=sum(stats.invocations for stats in model_stats.values()),
 			by_model=model_stats,
 		)
 
@@ -442,12 +546,13 @@ class TokenCost:
 
 	async def log_usage_summary(self) -> None:
 		"""Log a comprehensive usage summary per model with colors and nice formatting"""
-		if not self.usage_history:
+		if not self._totals:
 			return
 
 		summary = await self.get_usage_summary()
+		response_cache_lookups = summary.response_cache_hits + summary.response_cache_misses
 
-		if summary.entry_count == 0:
+		if summary.entry_count == 0 and not response_cache_lookups:
 			return
 
 		# ANSI color codes
@@ -474,10 +579,19 @@ class TokenCost:
 			prompt_cost_part = ''
 			completion_cost_part = ''
 
-		if len(summary.by_model) > 1:
+		# Only show cache hits for providers that report them
+		cache_part = f' | 💾 {summary.cache_hit_ratio:.0%} cached' if summary.total_prompt_cached_tokens else ''
+		if response_cache_lookups:
+			cache_part += (
+				f' | ♻️ {summary.response_cache_hits}/{response_cache_lookups} '
+				f'from response cache ({self._format_tokens(summary.response_cache_saved_tokens)} tokens saved)'
+			)
+
+		if len(summary.by_model) > 1 or response_cache_lookups:
 			cost_logger.debug(
 				f'💲 {C_BOLD}Total Usage Summary{C_RESET}: {C_BLUE}{total_tokens_fmt} tokens{C_RESET}{total_cost_part} | '
 				f'⬅️ {C_YELLOW}{prompt_tokens_fmt}{prompt_cost_part}{C_RESET} | ➡️ {C_GREEN}{completion_tokens_fmt}{completion_cost_part}{C_RESET}'
+				f'{cache_part}'
 			)
 
 		# Log per-model breakdown
@@ -492,19 +606,10 @@ class TokenCost:
 
 			# Format cost display (only if cost tracking is enabled)
 			if self.include_cost:
-				# Calculate per-model costs on-the-fly
-				total_model_cost = 0.0
-				model_prompt_cost = 0.0
-				model_completion_cost = 0.0
-
-				# Calculate costs for this model
-				for entry in self.usage_history:
-					if entry.model == model:
-						cost = await self.calculate_cost(entry.model, entry.usage)
-						if cost:
-							model_prompt_cost += cost.prompt_cost
-							model_completion_cost += cost.completion_cost
-
+				# Price the running totals of this model
+				cost = await self.calculate_cost(model, self._totals[model].usage.as_usage())
+				model_prompt_cost = cost.prompt_cost if cost else 0.0
+				model_completion_cost = cost.completion_cost if cost else 0.0
 				total_model_cost = model_prompt_cost + model_completion_cost
 
 				if total_model_cost > 0:
@@ -524,6 +629,12 @@ class TokenCost:
 				f'  🤖 {C_CYAN}{model}{C_RESET}: {C_BLUE}{model_total_fmt} tokens{C_RESET}{cost_part} | '
 				f'⬅️ {prompt_part} | ➡️ {completion_part} | '
 				f'📞 {stats.invocations} calls | 📈 {avg_tokens_fmt}/call'
+				+ (f' | 💾 {stats.cache_hit_ratio:.0%} cached' if stats.prompt_cached_tokens else '')
+				+ (
+					f' | ♻️ {stats.response_cache_hit_ratio:.0%} from response cache'
+					if stats.response_cache_hits or stats.response_cache_misses
+					else ''
+				)
 			)
 
 	async def get_cost_by_model(self) -> dict[str, ModelUsageStats]:
@@ -533,12 +644,15 @@ class TokenCost:
 
 	def clear_history(self) -> None:
 		"""Clear usage history"""
-		self.usage_history = []
+		self.usage_history.clear()
+		self.response_cache_history.clear()
+		self._totals.clear()
 
 	async def refresh_pricing_data(self) -> None:
 		"""Force refresh of pricing data from GitHub"""
 		if self.include_cost:
 			await self._fetch_and_cache_pricing_data()
+			self._pricing_by_model.clear()
 
 	async def clean_old_caches(self, keep_count: int = 3) -> None:
 		"""Clean up old cache files, keeping only the most recent ones"""
@@ -16,6 +16,16 @@ class TokenUsageEntry(BaseModel):
 	usage: ChatInvokeUsage
 
 
+class ResponseCacheLookup(BaseModel):
+	"""Single lookup in an LLM response cache (`ChatCache`)"""
+
+	model: str
+	timestamp: datetime
+	hit: bool
+	saved_usage: ChatInvokeUsage | None = None
+	"""On a hit, the usage of the cached call that was not spent again"""
+
+
 class TokenCostCalculated(BaseModel):
 	"""Token cost"""
 
@@ -73,11 +83,18 @@ class ModelUsageStats(BaseModel):
 
 	model: str
 	prompt_tokens: int = 0
+	prompt_cached_tokens: int = 0
+	prompt_cache_creation_tokens: int = 0
 	completion_tokens: int = 0
 	total_tokens: int = 0
 	cost: float = 0.0
 	invocations: int = 0
 	average_tokens_per_invocation: float = 0.0
+	cache_hit_ratio: float = 0.0  # Share of prompt tokens read from the provider's prompt cache
+	response_cache_hits: int = 0
+	response_cache_misses: int = 0
+	response_cache_hit_ratio: float = 0.0  # Share of calls served from an LLM response cache
+	response_cache_saved_tokens: int = 0
 
 
 class ModelUsageTokens(BaseModel):
@@ -98,6 +115,14 @@ class UsageSummary(BaseModel):
 
 	total_prompt_cached_tokens: int
 	total_prompt_cached_cost: float
+	total_prompt_cache_creation_tokens: int = 0
+	cache_hit_ratio: float = 0.0  # Share of prompt tokens read from the provider's prompt cache
+
+	response_cache_hits: int = 0
+	response_cache_misses: int = 0
+	response_cache_hit_ratio: float = 0.0  # Share of calls served from an LLM response cache
+	response_cache_saved_tokens: int = 0
+	response_cache_saved_cost: float = 0.0
 
 	total_completion_tokens: int
 	total_completion_cost: float
@@ -405,7 +405,8 @@ class Tools(Generic[Context]):
 						# The path should be just the filename for FileSystem files
 						file_obj = file_system.get_file(params.path)
 						if file_obj:
-							# File is managed by FileSystem, construct the full path
+							# File is managed by FileSystem, make sure deferred renders are on disk and construct the full path
+							await file_system.flush()
 							file_system_path = str(file_system.get_dir() / params.path)
 							params = UploadFileAction(index=params.index, path=file_system_path)
 						else:
@@ -911,25 +912,30 @@ You will be given a query and the markdown of a webpage that has been filtered t
 			logger.info(f'💾 {result}')
 			return ActionResult(extracted_content=result, long_term_memory=result)
 
-		@self.registry.action('Read file_name from file system')
-		async def read_file(file_name: str, available_file_paths: list[str], file_system: FileSystem):
+		@self.registry.action(
+			'Read file_name from file system. Long PDFs from available_file_paths are read 10 pages at a time from start_page, '
+			'long text files 100k bytes at a time from start_byte.'
+		)
+		async def read_file(
+			file_name: str,
+			available_file_paths: list[str],
+			file_system: FileSystem,
+			start_page: int = 1,
+			start_byte: int = 0,
+		):
 			if available_file_paths and file_name in available_file_paths:
-				result = await file_system.read_file(file_name, external_file=True)
+				result = await file_system.read_file(file_name, external_file=True, start_page=start_page, start_byte=start_byte)
 			else:
 				result = await file_system.read_file(file_name)
 
 			MAX_MEMORY_SIZE = 1000
 			if len(result) > MAX_MEMORY_SIZE:
-				lines = result.splitlines()
-				display = ''
-				lines_count = 0
-				for line in lines:
-					if len(display) + len(line) < MAX_MEMORY_SIZE:
-						display += line + '\n'
-						lines_count += 1
-					else:
-						break
-				remaining_lines = len(lines) - lines_count
+				# Only look at the lines that fit in the preview, and count the rest without splitting them
+				end = 0
+				while (next_newline := result.find('\n', end, MAX_MEMORY_SIZE)) != -1:
+					end = next_newline + 1
+				display = result[:end]
+				remaining_lines = result.count('\n', end) + (1 if not result.endswith('\n') else 0)
 				memory = f'{display}{remaining_lines} more lines...' if remaining_lines > 0 else display
 			else:
 				memory = result
@@ -1216,6 +1222,8 @@ SHADOW DOM ACCESS EXAMPLE:
 							if file_content:
 								attachments.append(file_name)
 
+				if attachments:
+					await file_system.flush()
 				attachments = [str(file_system.get_dir() / file_name) for file_name in attachments]
 
 				return ActionResult(
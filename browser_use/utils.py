@@ -16,6 +16,8 @@ from urllib.parse import urlparse
 import httpx
 from dotenv import load_dotenv
 
+from browser_use.profiling import profile_span
+
 load_dotenv()
 
 # Pre-compiled regex for URL detection - used in URL shortening
@@ -24,18 +26,6 @@ URL_PATTERN = re.compile(r'https?://[^\s<>"\']+|www\.[^\s<>"\']+|[^\s<>"\']+\.[a
 
 logger = logging.getLogger(__name__)
 
-# Import error types - these may need to be adjusted based on actual import paths
-try:
-	from openai import BadRequestError as OpenAIBadRequestError
-except ImportError:
-	OpenAIBadRequestError = None
-
-try:
-	from groq import BadRequestError as GroqBadRequestError  # type: ignore[import-not-found]
-except ImportError:
-	GroqBadRequestError = None
-
-
 # Global flag to prevent duplicate exit messages
 _exiting = False
 
@@ -328,11 +318,14 @@ class SignalHandler:
 
 
 def time_execution_sync(additional_text: str = '') -> Callable[[Callable[P, R]], Callable[P, R]]:
+	span_name = additional_text.strip('-')
+
 	def decorator(func: Callable[P, R]) -> Callable[P, R]:
 		@wraps(func)
 		def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
 			start_time = time.time()
-			result = func(*args, **kwargs)
+			with profile_span(span_name):
+				result = func(*args, **kwargs)
 			execution_time = time.time() - start_time
 			# Only log if execution takes more than 0.25 seconds
 			if execution_time > 0.25:
@@ -345,7 +338,7 @@ def time_execution_sync(additional_text: str = '') -> Callable[[Callable[P, R]],
 					logger = getattr(kwargs['browser_session'], 'logger')
 				else:
 					logger = logging.getLogger(__name__)
-				logger.debug(f'⏳ {additional_text.strip("-")}() took {execution_time:.2f}s')
+				logger.debug(f'⏳ {span_name}() took {execution_time:.2f}s')
 			return result
 
 		return wrapper
@@ -356,11 +349,14 @@ def time_execution_sync(additional_text: str = '') -> Callable[[Callable[P, R]],
 def time_execution_async(
 	additional_text: str = '',
 ) -> Callable[[Callable[P, Coroutine[Any, Any, R]]], Callable[P, Coroutine[Any, Any, R]]]:
+	span_name = additional_text.strip('-')
+
 	def decorator(func: Callable[P, Coroutine[Any, Any, R]]) -> Callable[P, Coroutine[Any, Any, R]]:
 		@wraps(func)
 		async def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
 			start_time = time.time()
-			result = await func(*args, **kwargs)
+			with profile_span(span_name):
+				result = await func(*args, **kwargs)
 			execution_time = time.time() - start_time
 			# Only log if execution takes more than 0.25 seconds to avoid spamming the logs
 			# you can lower this threshold locally when you're doing dev work to performance optimize stuff
@@ -374,7 +370,7 @@ def time_execution_async(
 					logger = getattr(kwargs['browser_session'], 'logger')
 				else:
 					logger = logging.getLogger(__name__)
-				logger.debug(f'⏳ {additional_text.strip("-")}() took {execution_time:.2f}s')
+				logger.debug(f'⏳ {span_name}() took {execution_time:.2f}s')
 			return result
 
 		return wrapper
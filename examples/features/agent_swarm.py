@@ -0,0 +1,47 @@
+import asyncio
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from browser_use import AgentSwarm, BrowserProfile, ChatOpenAI, SwarmTask
+
+
+# LLMs are created inside the worker processes, so the swarm gets a module-level function instead of an LLM
+def make_llm():
+	return ChatOpenAI(model='gpt-4.1-mini')
+
+
+# NOTE: This is experimental - the agents of each worker process share one browser, with a tab per agent
+async def main():
+	swarm = AgentSwarm(
+		make_llm,
+		workers=2,
+		agents_per_worker=3,
+		provider_limits={'openai': 4},
+		task_timeout=300,
+		browser_profile=BrowserProfile(headless=True),
+	)
+	result = await swarm.run(
+		[
+			'Search Google for weather in Tokyo',
+			'Check Reddit front page title',
+			'Look up Bitcoin price on Coinbase',
+			'Find NASA image of the day',
+			'Check top story on CNN',
+			SwarmTask(task='Search latest SpaceX launch date', max_steps=20),
+		]
+	)
+
+	for task_result in result.results:
+		print(f'{task_result.task}: {task_result.final_result or task_result.error}')
+	print(f'Total tokens: {result.usage.total_tokens}')
+	result.save('./tmp/swarm')
+
+
+if __name__ == '__main__':
+	asyncio.run(main())
@@ -4,6 +4,7 @@ Example: Rerunning saved agent history
 This example shows how to:
 1. Run an agent and save its history (including initial URL navigation)
 2. Load and rerun the history with a new agent instance
+3. Rerun it in fast mode, without capturing the browser state before each step
 
 Useful for:
 - Debugging agent behavior
@@ -36,6 +37,11 @@ async def main():
 
 	await rerun_agent.load_and_rerun(history_file)
 
+	# For regression runs: resolve the recorded elements with targeted page queries instead of capturing
+	# the full browser state, and wait for the page to settle instead of fixed delays
+	fast_agent = Agent(task='', llm=llm)
+	await fast_agent.load_and_rerun(history_file, fast=True)
+
 
 if __name__ == '__main__':
 	asyncio.run(main())
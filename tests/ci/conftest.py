@@ -35,6 +35,7 @@ from bubus import BaseEvent
 
 from browser_use import Agent
 from browser_use.browser import BrowserProfile, BrowserSession
+from browser_use.config import CONFIG
 from browser_use.sync.service import CloudSync
 
 
@@ -62,6 +63,9 @@ def setup_test_environment():
 		original_env[key] = os.environ.get(key)
 		os.environ[key] = value
 
+	# Don't serve a config snapshot taken under a previous test's environment
+	CONFIG.reload()
+
 	yield
 
 	# Restore original environment
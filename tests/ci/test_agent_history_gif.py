@@ -0,0 +1,55 @@
+"""Tests for rendering agent history into a GIF."""
+
+import base64
+
+from PIL import Image
+
+from browser_use.agent.gif import create_history_gif
+from browser_use.agent.views import ActionResult, AgentHistory, AgentHistoryList
+from browser_use.browser.views import PLACEHOLDER_4PX_SCREENSHOT, BrowserStateHistory
+
+
+def _make_history(tmp_path, colors: list[str | None]) -> AgentHistoryList:
+	history = []
+	for i, color in enumerate(colors):
+		screenshot_path = tmp_path / f'step_{i}.png'
+		if color is None:
+			screenshot_path.write_bytes(base64.b64decode(PLACEHOLDER_4PX_SCREENSHOT))
+		else:
+			Image.new('RGB', (200, 120), color).save(screenshot_path)
+		history.append(
+			AgentHistory(
+				model_output=None,
+				result=[ActionResult()],
+				state=BrowserStateHistory(
+					url=f'https://example.com/{i}',
+					title=f'Page {i}',
+					tabs=[],
+					interacted_element=[None],
+					screenshot_path=str(screenshot_path),
+				),
+			)
+		)
+	return AgentHistoryList(history=history)
+
+
+def test_gif_streams_frames_from_screenshot_files(tmp_path):
+	"""Test the GIF is built from on-disk screenshots, skipping placeholder frames."""
+	history = _make_history(tmp_path, [None, 'red', 'green', None, 'blue'])
+	output_path = tmp_path / 'history.gif'
+
+	create_history_gif(task='Test task', history=history, output_path=str(output_path))
+
+	with Image.open(output_path) as gif:
+		assert gif.n_frames == 4  # task frame + 3 real screenshots
+		assert gif.size == (200, 120)
+
+
+def test_gif_not_created_without_real_screenshots(tmp_path):
+	"""Test no GIF is written when every screenshot is a placeholder."""
+	history = _make_history(tmp_path, [None, None])
+	output_path = tmp_path / 'history.gif'
+
+	create_history_gif(task='Test task', history=history, output_path=str(output_path))
+
+	assert not output_path.exists()
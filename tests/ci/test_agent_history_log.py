@@ -0,0 +1,157 @@
+"""
+Tests for the append-only JSONL agent history log in browser_use/agent/history_log.py.
+
+Steps are simulated by adding history items and calling the agent's history log hook directly, so no browser is started.
+"""
+
+import json
+
+import pytest
+
+from browser_use.agent.history_log import AgentHistoryLog, AgentHistoryWriter
+from browser_use.agent.message_manager.views import HistoryItem
+from browser_use.agent.service import Agent
+from browser_use.agent.views import ActionResult, AgentHistory, AgentHistoryList, AgentState
+from browser_use.browser.views import BrowserStateHistory
+from browser_use.filesystem.file_system import FileSystemState
+from tests.ci.conftest import create_mock_llm
+
+
+def _history_item(agent: Agent, step: int) -> AgentHistory:
+	model_output = agent.AgentOutput.model_validate(
+		{
+			'evaluation_previous_goal': f'eval {step}',
+			'memory': f'memory {step}',
+			'next_goal': f'goal {step}',
+			'action': [{'go_to_url': {'url': f'https://example.com/{step}', 'new_tab': False}}],
+		}
+	)
+	return AgentHistory(
+		model_output=model_output,
+		result=[ActionResult(extracted_content=f'result {step}')],
+		state=BrowserStateHistory(
+			url=f'https://example.com/{step}', title=f'Page {step}', tabs=[], interacted_element=[None], screenshot_path=None
+		),
+	)
+
+
+async def _run_steps(agent: Agent, steps: range) -> None:
+	"""Do what _finalize does for each step: record history, update state, persist."""
+	for step in steps:
+		item = _history_item(agent, step)
+		agent.history.add_item(item)
+		agent.state.last_model_output = item.model_output
+		agent.state.last_result = item.result
+		agent.state.message_manager_state.agent_history_items.append(HistoryItem(step_number=step, memory=f'memory {step}'))
+		agent.state.n_steps += 1
+		await agent._write_history_log()
+
+
+def _append_partial_line(path) -> None:
+	with open(path, 'a') as f:
+		f.write('{"history": {"model_output": nu')  # write interrupted by a crash
+
+
+@pytest.fixture
+def history_path(tmp_path):
+	return tmp_path / 'history.jsonl'
+
+
+async def test_each_step_is_appended_as_one_line(history_path):
+	agent = Agent(task='Test history log', llm=create_mock_llm(), save_history_path=history_path)
+
+	await _run_steps(agent, range(1, 4))
+
+	lines = history_path.read_text().splitlines()
+	assert len(lines) == 3
+	records = [json.loads(line) for line in lines]
+	assert [r['history']['state']['url'] for r in records] == [f'https://example.com/{i}' for i in range(1, 4)]
+	assert records[-1]['state']['n_steps'] == 4
+	# message manager history items are stored as deltas, not re-serialized every step
+	assert len(records[0]['agent_history_items']) == 2  # 'Agent initialized' + step 1
+	assert len(records[1]['agent_history_items']) == 1
+
+
+async def test_log_reads_items_lazily_and_matches_json_history(history_path, tmp_path):
+	agent = Agent(task='Test history log', llm=create_mock_llm(), save_history_path=history_path)
+	await _run_steps(agent, range(1, 6))
+
+	log = AgentHistoryLog(history_path, agent.AgentOutput)
+	assert len(log) == 5
+	assert log[3].state.url == 'https://example.com/4'
+	assert log[-1].model_output is not None and log[-1].model_output.next_goal == 'goal 5'
+
+	json_path = tmp_path / 'history.json'
+	agent.history.save_to_file(json_path)
+	from_json = AgentHistoryList.load_from_file(json_path, agent.AgentOutput)
+	from_jsonl = AgentHistoryList.load_from_file(history_path, agent.AgentOutput)
+	assert from_jsonl.model_dump() == from_json.model_dump()
+
+
+async def test_resume_continues_from_last_persisted_step(history_path):
+	agent = Agent(task='Test history log', llm=create_mock_llm(), save_history_path=history_path)
+	await _run_steps(agent, range(1, 4))
+	agent.state.consecutive_failures = 1
+	await _run_steps(agent, range(4, 5))
+
+	resumed = Agent(task='Test history log', llm=create_mock_llm(), save_history_path=history_path)
+	resumed.resume_from_history()
+
+	assert len(resumed.history) == 4
+	assert resumed.state.n_steps == 5
+	assert resumed.state.consecutive_failures == 1
+	assert resumed.state.last_model_output is not None and resumed.state.last_model_output.next_goal == 'goal 4'
+	assert resumed.state.message_manager_state.agent_history_items == agent.state.message_manager_state.agent_history_items
+	assert resumed.initial_actions is not None
+	assert resumed.initial_actions[0].model_dump(exclude_none=True)['go_to_url']['url'] == 'https://example.com/4'
+
+	# new steps are appended to the same log
+	await _run_steps(resumed, range(5, 7))
+	checkpoint = AgentHistoryLog(history_path, resumed.AgentOutput).load_checkpoint()
+	assert len(checkpoint.history) == 6
+	assert checkpoint.state is not None and checkpoint.state.n_steps == 7
+	assert len(checkpoint.state.message_manager_state.agent_history_items) == 7
+
+
+async def test_incomplete_last_line_is_ignored_and_dropped_before_appending(history_path):
+	agent = Agent(task='Test history log', llm=create_mock_llm(), save_history_path=history_path)
+	await _run_steps(agent, range(1, 3))
+	_append_partial_line(history_path)
+
+	log = AgentHistoryLog(history_path, agent.AgentOutput)
+	assert len(log) == 2
+	assert len(list(log)) == 2
+
+	writer = AgentHistoryWriter(history_path)
+	writer.continue_log(items_written=2, agent_history_items_written=3)
+	await writer.write([_history_item(agent, 3)], AgentState())
+	assert len(AgentHistoryLog(history_path, agent.AgentOutput)) == 3
+
+
+async def test_file_system_state_is_written_only_when_it_changes(history_path, monkeypatch):
+	agent = Agent(task='Test history log', llm=create_mock_llm(), save_history_path=history_path)
+	dumps = []
+	model_dump = FileSystemState.model_dump
+	monkeypatch.setattr(FileSystemState, 'model_dump', lambda self, **kwargs: dumps.append(1) or model_dump(self, **kwargs))
+
+	await _run_steps(agent, range(1, 3))
+	await agent.file_system.write_file('notes.md', 'first draft')
+	agent.save_file_system_state()
+	await _run_steps(agent, range(3, 5))
+
+	# unchanged file systems are detected from their version, without serializing them
+	assert len(dumps) == 2
+
+	records = [json.loads(line) for line in history_path.read_text().splitlines()]
+	assert 'file_system_state' not in records[-1]['state']
+	assert [r['file_system_state'] is not None for r in records] == [True, False, True, False]
+	assert records[2]['file_system_state']['files']['notes.md']['data']['content'] == 'first draft'
+
+	resumed = Agent(task='Test history log', llm=create_mock_llm(), save_history_path=history_path)
+	resumed.resume_from_history()
+	assert resumed.state.file_system_state == agent.state.file_system_state
+	assert resumed.file_system.get_file('notes.md') is not None
+
+	# the resumed writer knows the persisted file system state, so it isn't written again
+	await _run_steps(resumed, range(5, 6))
+	assert json.loads(history_path.read_text().splitlines()[-1])['file_system_state'] is None
@@ -0,0 +1,134 @@
+"""Tests for the cache-friendly message layout and prompt cache reporting."""
+
+from browser_use.agent.message_manager.service import MessageManager
+from browser_use.agent.message_manager.views import HistoryItem
+from browser_use.agent.views import MessageManagerState
+from browser_use.browser.views import BrowserStateSummary
+from browser_use.dom.views import SerializedDOMState
+from browser_use.filesystem.file_system import FileSystem
+from browser_use.llm import SystemMessage
+from browser_use.llm.anthropic.serializer import AnthropicMessageSerializer
+from browser_use.llm.messages import ContentPartTextParam, UserMessage
+from browser_use.llm.views import ChatInvokeUsage
+from browser_use.tokens.service import TokenCost
+
+
+def _message_manager(tmp_path, message_layout='default', max_history_items=None) -> MessageManager:
+	return MessageManager(
+		task='Test task',
+		system_message=SystemMessage(content='System message', cache=True),
+		state=MessageManagerState(),
+		file_system=FileSystem(tmp_path),
+		max_history_items=max_history_items,
+		message_layout=message_layout,
+	)
+
+
+def _step(message_manager: MessageManager, step: int) -> None:
+	message_manager.state.agent_history_items.append(HistoryItem(step_number=step, memory=f'memory {step}'))
+	browser_state = BrowserStateSummary(
+		dom_state=SerializedDOMState(_root=None, selector_map={}),
+		url=f'https://example.com/{step}',
+		title='Example',
+		tabs=[],
+	)
+	message_manager.create_state_messages(browser_state_summary=browser_state, use_vision=False)
+
+
+def _text(message) -> str:
+	if isinstance(message.content, str):
+		return message.content
+	return ''.join(part.text for part in message.content if isinstance(part, ContentPartTextParam))
+
+
+def _history_parts(message_manager: MessageManager) -> list[str]:
+	history_message = message_manager.state.history.history_message
+	assert history_message is not None
+	return [_text(UserMessage(content=[part])) for part in history_message.content]  # type: ignore[list-item]
+
+
+def test_cache_friendly_layout_sends_the_same_text(tmp_path):
+	default = _message_manager(tmp_path / 'default')
+	cache_friendly = _message_manager(tmp_path / 'cache_friendly', message_layout='cache_friendly')
+	for step in range(1, 4):
+		_step(default, step)
+		_step(cache_friendly, step)
+
+	default_messages = default.get_messages()
+	messages = cache_friendly.get_messages()
+
+	assert len(default_messages) == 2 and len(messages) == 3
+	# the history message and the state message together read exactly like the default single state message
+	assert _text(messages[1]) + _text(messages[2]) == _text(default_messages[1])
+	assert messages[1].cache and not messages[2].cache
+
+
+def test_history_message_is_an_append_only_prefix(tmp_path):
+	message_manager = _message_manager(tmp_path, message_layout='cache_friendly')
+
+	previous: list[str] = []
+	for step in range(1, 10):
+		_step(message_manager, step)
+		parts = _history_parts(message_manager)
+		assert parts[: len(previous)] == previous
+		assert len(parts) == step + 1  # 'Agent initialized' + one item per step
+		previous = parts
+
+
+def test_history_window_shifts_in_chunks(tmp_path):
+	message_manager = _message_manager(tmp_path, message_layout='cache_friendly', max_history_items=6)
+
+	changed_prefix_steps = []
+	previous: list[str] = []
+	for step in range(1, 20):
+		_step(message_manager, step)
+		parts = _history_parts(message_manager)
+		assert len(parts) - 1 <= 6  # the omitted marker doesn't count against the limit
+		if parts[: len(previous)] != previous:
+			changed_prefix_steps.append(step)
+		previous = parts
+
+	# the window moves by 3 (half the limit) at a time instead of every step
+	assert changed_prefix_steps == [6, 9, 12, 15, 18]
+
+
+def test_anthropic_breakpoints_are_placed_on_system_and_history(tmp_path):
+	message_manager = _message_manager(tmp_path, message_layout='cache_friendly')
+	for step in range(1, 4):
+		_step(message_manager, step)
+
+	messages, system = AnthropicMessageSerializer.serialize_messages(message_manager.get_messages())
+
+	assert isinstance(system, list) and system[-1].get('cache_control')
+	history_blocks, state_blocks = messages[0]['content'], messages[1]['content']
+	assert isinstance(history_blocks, list)
+	# a single breakpoint at the end of the history
+	assert [bool(block.get('cache_control')) for block in history_blocks] == [False] * (len(history_blocks) - 1) + [True]
+	assert isinstance(state_blocks, str)
+
+
+def _usage(prompt_tokens: int, cached_tokens: int | None, cache_creation_tokens: int | None = None) -> ChatInvokeUsage:
+	return ChatInvokeUsage(
+		prompt_tokens=prompt_tokens,
+		prompt_cached_tokens=cached_tokens,
+		prompt_cache_creation_tokens=cache_creation_tokens,
+		prompt_image_tokens=None,
+		completion_tokens=10,
+		total_tokens=prompt_tokens + 10,
+	)
+
+
+async def test_usage_summary_reports_cache_hit_ratio():
+	token_cost = TokenCost(include_cost=False)
+	token_cost.add_usage('claude', _usage(1000, 0, 800))
+	token_cost.add_usage('claude', _usage(1000, 800, 100))
+	token_cost.add_usage('gpt', _usage(2000, None))
+
+	summary = await token_cost.get_usage_summary()
+
+	assert summary.total_prompt_cached_tokens == 800
+	assert summary.total_prompt_cache_creation_tokens == 900
+	assert summary.cache_hit_ratio == 800 / 4000
+	assert summary.by_model['claude'].cache_hit_ratio == 800 / 2000
+	assert summary.by_model['claude'].prompt_cache_creation_tokens == 900
+	assert summary.by_model['gpt'].cache_hit_ratio == 0.0
@@ -0,0 +1,138 @@
+"""Tests for running task queues across workers with browser_use/agent/swarm.py."""
+
+import asyncio
+import json
+
+from browser_use.agent.swarm import AgentSwarm, SwarmTask
+from browser_use.agent.views import ActionResult, AgentHistory, AgentHistoryList
+from browser_use.browser.views import BrowserStateHistory
+from browser_use.llm.views import ChatInvokeUsage
+from browser_use.tokens.service import TokenCost
+
+# Fake LLMs and agents are module-level so they can be pickled into worker processes
+
+_running: dict[str, int] = {}
+_max_running: dict[str, int] = {}
+_attempts: dict[str, int] = {}
+
+
+class FakeLLM:
+	def __init__(self, provider: str):
+		self.provider = provider
+		self.model = f'{provider}-model'
+
+
+def openai_llm() -> FakeLLM:
+	return FakeLLM('openai')
+
+
+def anthropic_llm() -> FakeLLM:
+	return FakeLLM('anthropic')
+
+
+class FakeAgent:
+	"""Behaves according to its task: 'sleep <seconds>', 'flaky' (fails on the first attempt), 'error', or done right away"""
+
+	def __init__(self, task: SwarmTask, llm: FakeLLM):
+		self.task = task
+		self.llm = llm
+		self.token_cost_service = TokenCost()
+
+	async def run(self, max_steps: int = 100) -> AgentHistoryList:
+		provider = self.llm.provider
+		_running[provider] = _running.get(provider, 0) + 1
+		_max_running[provider] = max(_max_running.get(provider, 0), _running[provider])
+		_attempts[self.task.task_id] = _attempts.get(self.task.task_id, 0) + 1
+		try:
+			self.token_cost_service.add_usage(
+				self.llm.model,
+				ChatInvokeUsage(
+					prompt_tokens=100,
+					prompt_cached_tokens=None,
+					prompt_cache_creation_tokens=None,
+					prompt_image_tokens=None,
+					completion_tokens=10,
+					total_tokens=110,
+				),
+			)
+			if self.task.task.startswith('sleep'):
+				await asyncio.sleep(float(self.task.task.split()[1]))
+			elif self.task.task == 'error' or (self.task.task == 'flaky' and _attempts[self.task.task_id] == 1):
+				raise RuntimeError('LLM exploded')
+			return AgentHistoryList(
+				history=[
+					AgentHistory(
+						model_output=None,
+						result=[ActionResult(is_done=True, success=True, extracted_content=f'done: {self.task.task}')],
+						state=BrowserStateHistory(url='', title='', tabs=[], interacted_element=[], screenshot_path=None),
+					)
+				]
+			)
+		finally:
+			_running[provider] -= 1
+
+
+def fake_agent_factory(task: SwarmTask, llm: FakeLLM, browser_session) -> FakeAgent:
+	return FakeAgent(task, llm)
+
+
+def _swarm(**kwargs) -> AgentSwarm:
+	kwargs.setdefault('workers', 0)
+	return AgentSwarm(openai_llm, agent_factory=fake_agent_factory, shared_browser=False, **kwargs)  # type: ignore[arg-type]
+
+
+async def test_results_and_usage_are_aggregated(tmp_path):
+	result = await _swarm(agents_per_worker=3).run(['a', 'b', SwarmTask(task='c', task_id='task-c')])
+
+	assert [r.final_result for r in result.results] == ['done: a', 'done: b', 'done: c']
+	assert all(r.is_successful and r.attempts == 1 and r.n_steps == 1 for r in result.results)
+	assert result.usage.total_tokens == 330
+	assert result.usage.entry_count == 3
+	history = result.results[2].load_history()
+	assert history is not None and history.final_result() == 'done: c'
+
+	result.save(tmp_path)
+	overview = json.loads((tmp_path / 'swarm.json').read_text())
+	assert [r['task_id'] for r in overview['results']][2] == 'task-c'
+	assert 'history' not in overview['results'][0]
+	assert (tmp_path / 'task-c.json').exists()
+
+
+async def test_provider_limits():
+	_max_running.clear()
+	tasks = [SwarmTask(task='sleep 0.05') for _ in range(6)]
+	tasks += [SwarmTask(task='sleep 0.05', llm_factory=anthropic_llm) for _ in range(6)]  # type: ignore[arg-type]
+
+	result = await _swarm(agents_per_worker=8, provider_limits={'openai': 2}).run(tasks)
+
+	assert len(result.succeeded) == 12
+	assert _max_running['openai'] == 2
+	assert _max_running['anthropic'] > 2
+
+
+async def test_retries_and_timeouts():
+	tasks = [
+		SwarmTask(task='flaky'),
+		SwarmTask(task='error'),
+		SwarmTask(task='sleep 10', timeout=0.1),
+	]
+
+	result = await _swarm(max_retries=1).run(tasks)
+
+	flaky, error, slow = result.results
+	assert flaky.is_successful and flaky.attempts == 2
+	assert not error.is_successful and error.attempts == 2
+	assert error.error == 'RuntimeError: LLM exploded'
+	assert error.history is None
+	assert slow.attempts == 2 and slow.error == 'Timed out after 0.1 seconds'
+	assert len(result.failed) == 2
+	# usage of failed attempts still counts
+	assert result.usage.entry_count == 6
+
+
+async def test_worker_processes():
+	result = await _swarm(workers=2, agents_per_worker=2, max_retries=0).run(['a', 'b', 'c', 'error'])
+
+	assert [r.final_result for r in result.results[:3]] == ['done: a', 'done: b', 'done: c']
+	assert result.results[3].error == 'RuntimeError: LLM exploded'
+	assert result.usage.entry_count == 4
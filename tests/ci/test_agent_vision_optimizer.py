@@ -0,0 +1,149 @@
+"""Tests for the state message screenshot optimizer in browser_use/agent/message_manager/vision.py."""
+
+import base64
+import io
+
+import pytest
+from PIL import Image, ImageDraw
+
+from browser_use.agent.message_manager.service import MessageManager
+from browser_use.agent.message_manager.vision import ScreenshotOptimizer
+from browser_use.agent.views import MessageManagerState
+from browser_use.browser.views import BrowserStateSummary
+from browser_use.dom.views import SerializedDOMState
+from browser_use.filesystem.file_system import FileSystem
+from browser_use.llm import SystemMessage
+from browser_use.llm.anthropic.chat import ChatAnthropic
+from browser_use.llm.aws.chat_anthropic import ChatAnthropicBedrock
+from browser_use.llm.aws.chat_bedrock import ChatAWSBedrock
+from browser_use.llm.messages import ContentPartImageParam, ContentPartTextParam
+
+
+def _screenshot(size: tuple[int, int] = (1280, 1100), text: str = 'Hello') -> str:
+	image = Image.new('RGB', size, 'white')
+	draw = ImageDraw.Draw(image)
+	draw.rectangle((100, 100, 600, 400), fill='navy')
+	draw.text((700, 200), text, fill='black')
+	output = io.BytesIO()
+	image.save(output, format='PNG')
+	return base64.b64encode(output.getvalue()).decode()
+
+
+def _decode(data: str) -> Image.Image:
+	return Image.open(io.BytesIO(base64.b64decode(data)))
+
+
+@pytest.mark.parametrize(
+	'provider, detail_level, expected_size',
+	[
+		('openai', 'high', (893, 768)),  # shortest side capped at 768
+		('openai', 'low', (512, 440)),  # low detail is a single 512x512 tile
+		('anthropic', 'auto', (1156, 994)),  # ~1.15 megapixels
+		('google', 'auto', (1280, 1100)),  # already below the limit
+	],
+)
+def test_screenshot_is_downscaled_to_provider_resolution(provider, detail_level, expected_size):
+	optimizer = ScreenshotOptimizer(provider=provider, detail_level=detail_level)
+
+	prepared = optimizer.prepare(_screenshot())
+
+	assert prepared.media_type == 'image/jpeg'
+	with _decode(prepared.data) as image:
+		assert image.format == 'JPEG'
+		assert image.size == expected_size
+
+
+@pytest.mark.parametrize(
+	'llm, expected_size',
+	[
+		(ChatAnthropic(model='claude-sonnet-4-0'), (1156, 994)),
+		(ChatAnthropicBedrock(), (1156, 994)),  # same model as the Anthropic API, same resolution
+		(ChatAWSBedrock(), (1280, 1100)),  # any Bedrock model, re-encoded without downscaling
+	],
+)
+def test_profile_is_found_from_chat_model_provider(llm, expected_size):
+	prepared = ScreenshotOptimizer(provider=llm.provider).prepare(_screenshot())
+
+	assert prepared.media_type == 'image/jpeg'
+	with _decode(prepared.data) as image:
+		assert image.size == expected_size
+
+
+def test_unknown_provider_gets_original_screenshot():
+	screenshot = _screenshot()
+
+	prepared = ScreenshotOptimizer(provider='mock').prepare(screenshot)
+
+	assert prepared.data == screenshot
+	assert prepared.media_type == 'image/png'
+
+
+def test_unchanged_screenshots_are_detected():
+	optimizer = ScreenshotOptimizer(provider='openai', detect_unchanged=True)
+
+	assert not optimizer.prepare(_screenshot()).unchanged
+	assert optimizer.prepare(_screenshot()).unchanged
+	assert not optimizer.prepare(_screenshot(text='A completely different page ' * 5)).unchanged
+
+	optimizer.reset()
+	assert not optimizer.prepare(_screenshot()).unchanged
+
+
+def test_unchanged_detection_is_off_by_default():
+	optimizer = ScreenshotOptimizer(provider='openai')
+	optimizer.prepare(_screenshot())
+
+	assert not optimizer.prepare(_screenshot()).unchanged
+
+
+def _state_message_parts(message_manager: MessageManager, screenshot: str) -> list:
+	browser_state = BrowserStateSummary(
+		dom_state=SerializedDOMState(_root=None, selector_map={}),
+		url='https://example.com',
+		title='Example',
+		tabs=[],
+		screenshot=screenshot,
+	)
+	message_manager.create_state_messages(browser_state_summary=browser_state, use_vision=True)
+	content = message_manager.get_messages()[-1].content
+	return content if isinstance(content, list) else [ContentPartTextParam(text=content)]
+
+
+def test_state_message_uses_optimized_screenshot_and_unchanged_marker(tmp_path):
+	message_manager = MessageManager(
+		task='Test task',
+		system_message=SystemMessage(content='System message'),
+		state=MessageManagerState(),
+		file_system=FileSystem(tmp_path),
+		screenshot_optimizer=ScreenshotOptimizer(provider='anthropic', detect_unchanged=True),
+	)
+
+	parts = _state_message_parts(message_manager, _screenshot())
+	images = [part for part in parts if isinstance(part, ContentPartImageParam)]
+	assert len(images) == 1
+	assert images[0].image_url.media_type == 'image/jpeg'
+	assert images[0].image_url.url.startswith('data:image/jpeg;base64,')
+
+	parts = _state_message_parts(message_manager, _screenshot())
+	assert not any(isinstance(part, ContentPartImageParam) for part in parts)
+	assert 'Unchanged since the previous step' in parts[0].text
+
+
+async def test_screenshot_prepared_off_loop_is_used_for_state_message(tmp_path):
+	optimizer = ScreenshotOptimizer(provider='openai', detect_unchanged=True)
+	message_manager = MessageManager(
+		task='Test task',
+		system_message=SystemMessage(content='System message'),
+		state=MessageManagerState(),
+		file_system=FileSystem(tmp_path),
+		screenshot_optimizer=optimizer,
+	)
+	screenshot = _screenshot()
+
+	await message_manager.prepare_screenshot(screenshot)
+	parts = _state_message_parts(message_manager, screenshot)
+
+	# prepared exactly once, so it is not reported as unchanged against itself
+	images = [part for part in parts if isinstance(part, ContentPartImageParam)]
+	assert len(images) == 1
+	assert images[0].image_url.media_type == 'image/jpeg'
@@ -0,0 +1,81 @@
+"""Tests for the bounded, indexed browser event history."""
+
+from bubus import BaseEvent
+
+from browser_use.browser import BrowserProfile, BrowserSession
+from browser_use.browser.event_history import BrowserEventBus, EventHistoryBuffer, EventRecord
+
+
+class PingEvent(BaseEvent[None]):
+	url: str = ''
+
+
+class PongEvent(BaseEvent[None]):
+	error_message: str = ''
+
+
+def _urls(records: list[EventRecord]) -> list[str]:
+	return [record.fields.get('url') or record.fields['error_message'] for record in records]
+
+
+class TestEventHistoryBuffer:
+	"""Test the EventHistoryBuffer ring buffer."""
+
+	def test_recent_returns_newest_first(self):
+		buffer = EventHistoryBuffer(max_size=10)
+		for i in range(5):
+			buffer.append(PingEvent(url=f'page{i}'))
+
+		assert _urls(buffer.recent(3)) == ['page4', 'page3', 'page2']
+		assert len(buffer) == 5
+
+	def test_evicts_oldest_and_keeps_type_index_in_sync(self):
+		buffer = EventHistoryBuffer(max_size=4)
+		for i in range(6):
+			buffer.append(PingEvent(url=f'page{i}') if i % 2 == 0 else PongEvent(error_message=f'page{i}'))
+
+		assert len(buffer) == 4
+		assert _urls(buffer.recent()) == ['page5', 'page4', 'page3', 'page2']
+		assert _urls(buffer.recent(event_type='PingEvent')) == ['page4', 'page2']
+		assert buffer.count('PongEvent') == 2
+		assert buffer.last('PongEvent').fields == {'error_message': 'page5'}  # type: ignore[union-attr]
+
+		for i in range(6, 10):
+			buffer.append(PongEvent(error_message=f'page{i}'))
+		assert buffer.count('PingEvent') == 0
+		assert buffer.last('PingEvent') is None
+
+	def test_records_only_keep_a_summary_of_the_event(self):
+		event = PingEvent(url='https://example.com')
+		record = EventRecord.from_event(event)
+
+		assert record.event_id == event.event_id
+		assert record.to_dict() == {
+			'event_type': 'PingEvent',
+			'timestamp': event.event_created_at.isoformat(),
+			'url': 'https://example.com',
+		}
+
+
+class TestBrowserEventBus:
+	"""Test that BrowserSession records dispatched events in its bounded history."""
+
+	async def test_event_bus_records_dispatched_events(self):
+		event_bus = BrowserEventBus(event_history_size=3)
+		try:
+			for i in range(5):
+				await event_bus.dispatch(PingEvent(url=f'page{i}'))
+
+			assert _urls(event_bus.recent_events.recent()) == ['page4', 'page3', 'page2']
+			assert event_bus.max_history_size == 3
+			assert len(event_bus.event_history) <= 3
+			assert all(isinstance(record, EventRecord) for record in event_bus.recent_events.recent())
+			assert event_bus.name.startswith('EventBus_')
+		finally:
+			await event_bus.stop(clear=True)
+		assert len(event_bus.recent_events) == 0
+
+	def test_session_uses_profile_event_history_size(self):
+		browser_session = BrowserSession(browser_profile=BrowserProfile(event_history_size=42))
+		assert isinstance(browser_session.event_bus, BrowserEventBus)
+		assert browser_session.event_bus.recent_events.max_size == 42
@@ -15,6 +15,7 @@ from browser_use.browser.cloud import (
 )
 from browser_use.browser.profile import BrowserProfile
 from browser_use.browser.session import BrowserSession
+from browser_use.config import CONFIG
 from browser_use.sync.auth import CloudAuthConfig
 
 
@@ -27,6 +28,7 @@ def temp_config_dir(monkeypatch):
 
 		# Use monkeypatch to set the environment variable
 		monkeypatch.setenv('BROWSER_USE_CONFIG_DIR', str(temp_dir))
+		CONFIG.reload()
 
 		yield temp_dir
 
@@ -9,19 +9,22 @@ class TestLazyConfig:
 	"""Test lazy loading of environment variables through CONFIG object."""
 
 	def test_config_reads_env_vars_lazily(self):
-		"""Test that CONFIG reads environment variables each time they're accessed."""
+		"""Test that CONFIG picks up environment variable changes on reload()."""
 		# Set an env var
 		original_value = os.environ.get('BROWSER_USE_LOGGING_LEVEL', '')
 		try:
 			os.environ['BROWSER_USE_LOGGING_LEVEL'] = 'debug'
+			CONFIG.reload()
 			assert CONFIG.BROWSER_USE_LOGGING_LEVEL == 'debug'
 
 			# Change the env var
 			os.environ['BROWSER_USE_LOGGING_LEVEL'] = 'info'
+			CONFIG.reload()
 			assert CONFIG.BROWSER_USE_LOGGING_LEVEL == 'info'
 
 			# Delete the env var to test default
 			del os.environ['BROWSER_USE_LOGGING_LEVEL']
+			CONFIG.reload()
 			assert CONFIG.BROWSER_USE_LOGGING_LEVEL == 'info'  # default value
 		finally:
 			# Restore original value
@@ -37,11 +40,13 @@ class TestLazyConfig:
 			# Test true values
 			for true_val in ['true', 'True', 'TRUE', 'yes', 'Yes', '1']:
 				os.environ['ANONYMIZED_TELEMETRY'] = true_val
+				CONFIG.reload()
 				assert CONFIG.ANONYMIZED_TELEMETRY is True, f'Failed for value: {true_val}'
 
 			# Test false values
 			for false_val in ['false', 'False', 'FALSE', 'no', 'No', '0']:
 				os.environ['ANONYMIZED_TELEMETRY'] = false_val
+				CONFIG.reload()
 				assert CONFIG.ANONYMIZED_TELEMETRY is False, f'Failed for value: {false_val}'
 		finally:
 			if original_value:
@@ -55,14 +60,17 @@ class TestLazyConfig:
 		try:
 			# Test empty default
 			os.environ.pop('OPENAI_API_KEY', None)
+			CONFIG.reload()
 			assert CONFIG.OPENAI_API_KEY == ''
 
 			# Set a value
 			os.environ['OPENAI_API_KEY'] = 'test-key-123'
+			CONFIG.reload()
 			assert CONFIG.OPENAI_API_KEY == 'test-key-123'
 
 			# Change the value
 			os.environ['OPENAI_API_KEY'] = 'new-key-456'
+			CONFIG.reload()
 			assert CONFIG.OPENAI_API_KEY == 'new-key-456'
 		finally:
 			if original_value:
@@ -77,6 +85,7 @@ class TestLazyConfig:
 			# Test custom path
 			test_path = '/tmp/test-cache'
 			os.environ['XDG_CACHE_HOME'] = test_path
+			CONFIG.reload()
 			# Use Path().resolve() to handle symlinks (e.g., /tmp -> /private/tmp on macOS)
 			from pathlib import Path
 
@@ -84,6 +93,7 @@ class TestLazyConfig:
 
 			# Test default path expansion
 			os.environ.pop('XDG_CACHE_HOME', None)
+			CONFIG.reload()
 			assert '/.cache' in str(CONFIG.XDG_CACHE_HOME)
 		finally:
 			if original_value:
@@ -99,15 +109,18 @@ class TestLazyConfig:
 			# When BROWSER_USE_CLOUD_SYNC is not set, it should inherit from ANONYMIZED_TELEMETRY
 			os.environ['ANONYMIZED_TELEMETRY'] = 'true'
 			os.environ.pop('BROWSER_USE_CLOUD_SYNC', None)
+			CONFIG.reload()
 			assert CONFIG.BROWSER_USE_CLOUD_SYNC is True
 
 			os.environ['ANONYMIZED_TELEMETRY'] = 'false'
 			os.environ.pop('BROWSER_USE_CLOUD_SYNC', None)
+			CONFIG.reload()
 			assert CONFIG.BROWSER_USE_CLOUD_SYNC is False
 
 			# When explicitly set, it should use its own value
 			os.environ['ANONYMIZED_TELEMETRY'] = 'false'
 			os.environ['BROWSER_USE_CLOUD_SYNC'] = 'true'
+			CONFIG.reload()
 			assert CONFIG.BROWSER_USE_CLOUD_SYNC is True
 		finally:
 			if telemetry_original:
@@ -118,3 +131,100 @@ class TestLazyConfig:
 				os.environ['BROWSER_USE_CLOUD_SYNC'] = sync_original
 			else:
 				os.environ.pop('BROWSER_USE_CLOUD_SYNC', None)
+
+
+class TestConfigSnapshot:
+	"""Test that CONFIG serves values from a cached snapshot that tracks env changes."""
+
+	def test_snapshot_reused_until_reload(self, monkeypatch):
+		"""Test the snapshot (and its FlatEnvConfig) is reused across accesses and only rebuilt on reload()."""
+		import browser_use.config as config_module
+		from browser_use.config import FlatEnvConfig
+
+		monkeypatch.setenv('BROWSER_USE_LLM_MODEL', 'model-a')
+		CONFIG.reload()
+
+		constructions = 0
+		original_init = FlatEnvConfig.__init__
+
+		def counting_init(self, *args, **kwargs):
+			nonlocal constructions
+			constructions += 1
+			original_init(self, *args, **kwargs)
+
+		fingerprints = 0
+		original_fingerprint = config_module._env_fingerprint
+
+		def counting_fingerprint():
+			nonlocal fingerprints
+			fingerprints += 1
+			return original_fingerprint()
+
+		monkeypatch.setattr(FlatEnvConfig, '__init__', counting_init)
+		monkeypatch.setattr(config_module, '_env_fingerprint', counting_fingerprint)
+
+		for _ in range(100):
+			assert CONFIG.BROWSER_USE_LLM_MODEL == 'model-a'
+		assert constructions == 1
+		assert fingerprints <= 1
+
+		monkeypatch.setenv('BROWSER_USE_LLM_MODEL', 'model-b')
+		CONFIG.reload()
+		assert CONFIG.BROWSER_USE_LLM_MODEL == 'model-b'
+		assert constructions == 2
+
+	def test_env_changes_picked_up_by_throttled_check(self, monkeypatch):
+		"""Test env changes are picked up without reload() once the recheck interval has passed."""
+		import browser_use.config as config_module
+
+		monkeypatch.setenv('BROWSER_USE_LLM_MODEL', 'model-a')
+		CONFIG.reload()
+		assert CONFIG.BROWSER_USE_LLM_MODEL == 'model-a'
+
+		monkeypatch.setenv('BROWSER_USE_LLM_MODEL', 'model-b')
+		assert CONFIG.BROWSER_USE_LLM_MODEL == 'model-a'
+
+		now = config_module.time.monotonic()
+		monkeypatch.setattr(config_module.time, 'monotonic', lambda: now + config_module._RECHECK_INTERVAL + 1)
+		assert CONFIG.BROWSER_USE_LLM_MODEL == 'model-b'
+
+	def test_snapshot_is_immutable(self):
+		"""Test snapshots reject attribute assignment."""
+		import pytest
+
+		snapshot = CONFIG.snapshot()
+		with pytest.raises(AttributeError):
+			snapshot.fingerprint = ()
+
+	def test_db_config_cached_until_file_changes(self, tmp_path, monkeypatch):
+		"""Test config.json is only re-read from disk when it changes."""
+		import json
+
+		import browser_use.config as config_module
+
+		config_path = tmp_path / 'config.json'
+		monkeypatch.setenv('BROWSER_USE_CONFIG_PATH', str(config_path))
+		CONFIG.reload()
+
+		loads = 0
+		original_load = config_module.load_and_migrate_config
+
+		def counting_load(path):
+			nonlocal loads
+			loads += 1
+			return original_load(path)
+
+		monkeypatch.setattr(config_module, 'load_and_migrate_config', counting_load)
+
+		first = CONFIG.get_default_llm()
+		for _ in range(10):
+			assert CONFIG.get_default_llm() == first
+		assert loads == 1
+
+		data = json.loads(config_path.read_text())
+		for llm in data['llm'].values():
+			llm['model'] = 'gpt-changed-model'
+		config_path.write_text(json.dumps(data, indent=4))
+
+		assert CONFIG.get_default_llm()['model'] == 'gpt-changed-model'
+		assert loads == 2
@@ -0,0 +1,117 @@
+"""Tests for event-driven download completion: browser_use/filesystem/directory_watcher.py and the DownloadsWatchdog."""
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+from browser_use.browser import BrowserProfile, BrowserSession
+from browser_use.browser.events import FileDownloadedEvent
+from browser_use.browser.watchdogs.downloads_watchdog import DownloadsWatchdog
+from browser_use.filesystem.directory_watcher import DirectoryWatcher
+
+
+@pytest.mark.skipif(not sys.platform.startswith('linux'), reason='inotify is Linux only')
+async def test_inotify_wakes_up_when_a_file_is_renamed_in(tmp_path):
+	async with DirectoryWatcher(tmp_path, poll_interval=60) as watcher:
+		assert watcher.is_event_driven
+		partial = tmp_path / 'report.pdf.crdownload'
+		partial.write_bytes(b'%PDF')
+		await asyncio.wait_for(watcher.wait_for_change(), timeout=2)
+
+		waiter = asyncio.create_task(watcher.wait_for_change())
+		await asyncio.sleep(0.05)
+		assert not waiter.done()
+		os.rename(partial, tmp_path / 'report.pdf')
+		await asyncio.wait_for(waiter, timeout=2)
+
+
+async def test_polling_fallback(tmp_path):
+	async with DirectoryWatcher(tmp_path, poll_interval=0.01, use_inotify=False) as watcher:
+		assert not watcher.is_event_driven
+		await asyncio.wait_for(watcher.wait_for_change(timeout=10), timeout=1)
+
+	# a directory that doesn't exist yet can't be watched, so it's polled
+	async with DirectoryWatcher(tmp_path / 'missing', poll_interval=0.01) as watcher:
+		assert not watcher.is_event_driven
+
+
+@pytest.fixture
+async def watchdog(tmp_path):
+	session = BrowserSession(browser_profile=BrowserProfile(downloads_path=tmp_path, is_local=True))
+	yield DownloadsWatchdog(event_bus=session.event_bus, browser_session=session)
+	await session.event_bus.stop(clear=True, timeout=5)
+
+
+def _collect_downloads(watchdog: DownloadsWatchdog) -> list[FileDownloadedEvent]:
+	downloads: list[FileDownloadedEvent] = []
+
+	async def on_file_downloaded(event: FileDownloadedEvent) -> None:
+		downloads.append(event)
+
+	watchdog.event_bus.on(FileDownloadedEvent, on_file_downloaded)
+	return downloads
+
+
+async def _wait_for_tasks(watchdog: DownloadsWatchdog) -> None:
+	await asyncio.wait_for(asyncio.gather(*watchdog._cdp_event_tasks), timeout=5)
+	await watchdog.event_bus.wait_until_idle()
+
+
+async def test_download_completes_when_progress_event_arrives(watchdog, tmp_path):
+	downloads = _collect_downloads(watchdog)
+	watchdog._on_download_will_begin(
+		{'guid': 'guid-1', 'url': 'https://example.com/report.pdf', 'suggestedFilename': 'report.pdf', 'frameId': 'frame'},  # type: ignore[arg-type]
+		'target',  # type: ignore[arg-type]
+		None,
+	)
+	await asyncio.sleep(0.05)
+	partial = tmp_path / 'report.pdf.crdownload'
+	partial.write_bytes(b'%PDF-1.4 partial')
+	watchdog._on_download_progress({'guid': 'guid-1', 'state': 'inProgress', 'receivedBytes': 16, 'totalBytes': 32})  # type: ignore[arg-type]
+	await asyncio.sleep(0.05)
+	assert not downloads
+
+	final = tmp_path / 'report.pdf'
+	partial.write_bytes(b'%PDF-1.4 complete download file!')
+	os.rename(partial, final)
+	watchdog._on_download_progress(
+		{'guid': 'guid-1', 'state': 'completed', 'receivedBytes': 32, 'totalBytes': 32, 'filePath': str(final)}  # type: ignore[arg-type]
+	)
+	await _wait_for_tasks(watchdog)
+
+	assert [(d.path, d.file_size, d.url) for d in downloads] == [(str(final), 32, 'https://example.com/report.pdf')]
+	assert not watchdog._download_completions
+
+
+async def test_download_is_found_on_disk_without_progress_events(watchdog, tmp_path):
+	(tmp_path / 'data.csv').write_text('old download')
+	watchdog.browser_session._downloaded_files.append(str(tmp_path / 'data.csv'))
+	downloads = _collect_downloads(watchdog)
+	watchdog._on_download_will_begin(
+		{'guid': 'guid-2', 'url': 'https://example.com/data.csv', 'suggestedFilename': 'data.csv', 'frameId': 'frame'},  # type: ignore[arg-type]
+		'target',  # type: ignore[arg-type]
+		None,
+	)
+	await asyncio.sleep(0.05)
+	# the browser deduplicates the name of a file that already exists
+	(tmp_path / 'data (1).csv').write_text('a,b\n1,2\n')
+	await _wait_for_tasks(watchdog)
+
+	assert [d.file_name for d in downloads] == ['data (1).csv']
+
+
+async def test_canceled_download_stops_waiting(watchdog):
+	downloads = _collect_downloads(watchdog)
+	watchdog._on_download_will_begin(
+		{'guid': 'guid-3', 'url': 'https://example.com/big.zip', 'suggestedFilename': 'big.zip', 'frameId': 'frame'},  # type: ignore[arg-type]
+		'target',  # type: ignore[arg-type]
+		None,
+	)
+	await asyncio.sleep(0.05)
+	watchdog._on_download_progress({'guid': 'guid-3', 'state': 'canceled', 'receivedBytes': 0, 'totalBytes': 100})  # type: ignore[arg-type]
+	await _wait_for_tasks(watchdog)
+
+	assert not downloads
+	assert 'guid-3' not in watchdog._cdp_downloads_info
@@ -0,0 +1,91 @@
+"""Tests for page and byte range reads of external documents in browser_use/filesystem/document_reader.py."""
+
+import os
+
+import pytest
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+
+from browser_use.filesystem.document_reader import DocumentReader
+from browser_use.filesystem.file_system import FileSystem
+
+
+def _write_pdf(path, num_pages: int) -> None:
+	pdf = canvas.Canvas(str(path), pagesize=letter)
+	for page in range(1, num_pages + 1):
+		pdf.drawString(72, 720, f'Content of page {page}')
+		pdf.showPage()
+	pdf.save()
+
+
+@pytest.fixture
+def pdf_path(tmp_path):
+	path = tmp_path / 'report.pdf'
+	_write_pdf(path, 25)
+	return path
+
+
+def test_pdf_page_ranges(pdf_path):
+	reader = DocumentReader()
+
+	chunk = reader.read_pdf(pdf_path)
+	assert (chunk.start, chunk.end, chunk.total, chunk.remaining) == (1, 10, 25, 15)
+	assert 'Content of page 1' in chunk.text and 'Content of page 10' in chunk.text
+	assert 'Content of page 11' not in chunk.text
+
+	chunk = reader.read_pdf(pdf_path, start_page=21, end_page=40)
+	assert (chunk.start, chunk.end, chunk.remaining) == (21, 25, 0)
+	assert 'Content of page 25' in chunk.text
+
+	with pytest.raises(ValueError):
+		reader.read_pdf(pdf_path, start_page=26)
+
+
+def test_pdf_text_is_cached_until_the_file_changes(pdf_path):
+	reader = DocumentReader()
+	reader.read_pdf(pdf_path, start_page=1, end_page=2)
+	(document,) = reader._documents.values()
+	document.pages[0] = 'cached text'
+
+	assert reader.read_pdf(pdf_path, start_page=1, end_page=1).text == 'cached text'
+
+	_write_pdf(pdf_path, 3)
+	stat = pdf_path.stat()
+	os.utime(pdf_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+	chunk = reader.read_pdf(pdf_path, start_page=1, end_page=1)
+	assert 'Content of page 1' in chunk.text
+	assert chunk.total == 3
+	assert len(reader._documents) == 1
+
+
+def test_text_byte_ranges_do_not_split_characters(tmp_path):
+	path = tmp_path / 'notes.txt'
+	path.write_text('aé' * 10, encoding='utf-8')  # 3 bytes per pair
+	reader = DocumentReader()
+
+	first = reader.read_text(path, max_bytes=4)  # 'aé' + 'a' + half of 'é'
+	assert (first.text, first.end) == ('aéa', 4)
+	second = reader.read_text(path, start_byte=first.end, max_bytes=4)
+	assert second.text == 'éa'
+	# starting in the middle of a character skips to the next one
+	assert reader.read_text(path, start_byte=2, max_bytes=4).text == 'aé'
+
+	assert reader.read_text(path).text == 'aé' * 10
+
+
+async def test_read_file_pages_through_external_documents(tmp_path, pdf_path):
+	file_system = FileSystem(tmp_path / 'fs')
+
+	result = await file_system.read_file(str(pdf_path), external_file=True)
+	assert f'Read pages 1-10 of 25 from file {pdf_path}.' in result
+	assert '15 more pages, continue with start_page=11.' in result
+
+	result = await file_system.read_file(str(pdf_path), external_file=True, start_page=21)
+	assert 'Content of page 25' in result and 'more pages' not in result
+
+	text_path = tmp_path / 'small.txt'
+	text_path.write_text('hello')
+	assert await file_system.read_file(str(text_path), external_file=True) == (
+		f'Read from file {text_path}.\n<content>\nhello\n</content>'
+	)
+	assert 'start_byte must be between 0 and 5' in await file_system.read_file(str(text_path), external_file=True, start_byte=9)
@@ -0,0 +1,251 @@
+"""
+Tests for ClickableElementDetector.is_interactive in browser_use/dom/serializer/clickable_elements.py.
+
+Besides pinning the decision rules, the precompiled lookup tables are checked against the original implementation
+(kept below as `_reference_is_interactive`) on randomized nodes.
+"""
+
+import random
+
+import pytest
+
+from browser_use.dom.serializer.clickable_elements import ClickableElementDetector
+from browser_use.dom.views import (
+	DOMRect,
+	EnhancedAXNode,
+	EnhancedAXProperty,
+	EnhancedDOMTreeNode,
+	EnhancedSnapshotNode,
+	NodeType,
+)
+
+
+def _node(
+	node_name: str = 'DIV',
+	attributes: dict[str, str] | None = None,
+	ax_role: str | None = None,
+	ax_properties: list[tuple[str, str | bool | int | None]] | None = None,
+	bounds: tuple[float, float] | None = None,
+	cursor_style: str | None = None,
+	node_type: NodeType = NodeType.ELEMENT_NODE,
+) -> EnhancedDOMTreeNode:
+	ax_node = None
+	if ax_role is not None or ax_properties is not None:
+		ax_node = EnhancedAXNode(
+			ax_node_id='1',
+			ignored=False,
+			role=ax_role,
+			name=None,
+			description=None,
+			properties=[EnhancedAXProperty(name=name, value=value) for name, value in ax_properties] if ax_properties else None,  # type: ignore[arg-type]
+			child_ids=None,
+		)
+	snapshot_node = None
+	if bounds is not None or cursor_style is not None:
+		snapshot_node = EnhancedSnapshotNode(
+			is_clickable=None,
+			cursor_style=cursor_style,
+			bounds=DOMRect(x=0, y=0, width=bounds[0], height=bounds[1]) if bounds else None,
+			clientRects=None,
+			scrollRects=None,
+			computed_styles=None,
+			paint_order=None,
+			stacking_contexts=None,
+		)
+	return EnhancedDOMTreeNode(
+		node_id=1,
+		backend_node_id=1,
+		node_type=node_type,
+		node_name=node_name,
+		node_value='',
+		attributes=attributes or {},
+		is_scrollable=None,
+		is_visible=None,
+		absolute_position=None,
+		target_id='ABCD1234ABCD1234ABCD1234ABCD1234ABCD1234',
+		frame_id=None,
+		session_id=None,
+		content_document=None,
+		shadow_root_type=None,
+		shadow_roots=None,
+		parent_node=None,
+		children_nodes=None,
+		ax_node=ax_node,
+		snapshot_node=snapshot_node,
+	)
+
+
+@pytest.mark.parametrize(
+	'node, expected',
+	[
+		(_node('#text', node_type=NodeType.TEXT_NODE), False),
+		(_node('BODY', attributes={'onclick': 'go()'}), False),
+		(_node('DIV'), False),
+		(_node('BUTTON'), True),
+		(_node('LABEL', attributes={'for': 'email'}), False),
+		# frames only count when they are large enough to scroll
+		(_node('IFRAME', bounds=(300, 200)), True),
+		(_node('FRAME', bounds=(300, 200)), True),
+		(_node('IFRAME', bounds=(300, 100)), False),
+		# search indicators are matched case-insensitively anywhere in class, id and data-* values
+		(_node('DIV', attributes={'class': 'header Search-Btn'}), True),
+		(_node('DIV', attributes={'id': 'MagnifyingGlass'}), True),
+		(_node('DIV', attributes={'data-role': 'lookup-panel'}), True),
+		(_node('DIV', attributes={'title': 'search'}), False),
+		# the first decisive AX property wins
+		(_node('BUTTON', ax_properties=[('disabled', True), ('focusable', True)]), False),
+		(_node('DIV', ax_properties=[('focusable', True), ('disabled', True)]), True),
+		(_node('DIV', ax_properties=[('hidden', False), ('expanded', False)]), True),
+		(_node('DIV', ax_properties=[('focusable', False), ('required', '')]), False),
+		(_node('A', ax_properties=[('level', 2)]), True),
+		(_node('DIV', attributes={'tabindex': '0'}), True),
+		(_node('DIV', attributes={'role': 'tab'}), True),
+		(_node('DIV', attributes={'role': 'listbox'}), False),
+		(_node('DIV', ax_role='listbox'), True),
+		# icon-sized elements with a hint of interactivity
+		(_node('SPAN', attributes={'aria-label': 'close'}, bounds=(24, 24)), True),
+		(_node('SPAN', attributes={'aria-label': 'close'}, bounds=(60, 24)), False),
+		(_node('SPAN', cursor_style='pointer'), True),
+	],
+)
+def test_is_interactive(node: EnhancedDOMTreeNode, expected: bool):
+	assert ClickableElementDetector.is_interactive(node) is expected
+
+
+def _reference_is_interactive(node: EnhancedDOMTreeNode) -> bool:
+	"""is_interactive as it was before its lookup tables were precompiled (same checks, same order)."""
+	search_indicators = {
+		'search',
+		'magnify',
+		'glass',
+		'lookup',
+		'find',
+		'query',
+		'search-icon',
+		'search-btn',
+		'search-button',
+		'searchbox',
+	}
+	interactive_roles = {
+		'button',
+		'link',
+		'menuitem',
+		'option',
+		'radio',
+		'checkbox',
+		'tab',
+		'textbox',
+		'combobox',
+		'slider',
+		'spinbutton',
+		'search',
+		'searchbox',
+	}
+
+	if node.node_type != NodeType.ELEMENT_NODE:
+		return False
+	if node.tag_name in {'html', 'body'}:
+		return False
+	if node.tag_name and node.tag_name.upper() == 'IFRAME' or node.tag_name.upper() == 'FRAME':
+		if node.snapshot_node and node.snapshot_node.bounds:
+			if node.snapshot_node.bounds.width > 100 and node.snapshot_node.bounds.height > 100:
+				return True
+
+	if node.attributes:
+		class_list = node.attributes.get('class', '').lower().split()
+		if any(indicator in ' '.join(class_list) for indicator in search_indicators):
+			return True
+		element_id = node.attributes.get('id', '').lower()
+		if any(indicator in element_id for indicator in search_indicators):
+			return True
+		for attr_name, attr_value in node.attributes.items():
+			if attr_name.startswith('data-') and any(indicator in attr_value.lower() for indicator in search_indicators):
+				return True
+
+	if node.ax_node and node.ax_node.properties:
+		for prop in node.ax_node.properties:
+			if prop.name in ['disabled', 'hidden'] and prop.value:
+				return False
+			if prop.name in ['focusable', 'editable', 'settable'] and prop.value:
+				return True
+			if prop.name in ['checked', 'expanded', 'pressed', 'selected']:
+				return True
+			if prop.name in ['required', 'autocomplete', 'keyshortcuts'] and prop.value:
+				return True
+
+	if node.tag_name in {'button', 'input', 'select', 'textarea', 'a', 'details', 'summary', 'option', 'optgroup'}:
+		return True
+
+	if node.attributes:
+		if any(attr in node.attributes for attr in {'onclick', 'onmousedown', 'onmouseup', 'onkeydown', 'onkeyup', 'tabindex'}):
+			return True
+		if 'role' in node.attributes and node.attributes['role'] in interactive_roles:
+			return True
+
+	if node.ax_node and node.ax_node.role and node.ax_node.role in interactive_roles | {'listbox'}:
+		return True
+
+	if (
+		node.snapshot_node
+		and node.snapshot_node.bounds
+		and 10 <= node.snapshot_node.bounds.width <= 50
+		and 10 <= node.snapshot_node.bounds.height <= 50
+	):
+		if node.attributes and any(attr in node.attributes for attr in {'class', 'role', 'onclick', 'data-action', 'aria-label'}):
+			return True
+
+	if node.snapshot_node and node.snapshot_node.cursor_style and node.snapshot_node.cursor_style == 'pointer':
+		return True
+
+	return False
+
+
+def _random_node(rng: random.Random) -> EnhancedDOMTreeNode:
+	words = ['nav', 'Search', 'btn', 'magnify', 'glass-pane', 'Find', 'LookUp', 'query', 'item', 'se arch', 'close', '']
+	attribute_names = ['class', 'id', 'role', 'title', 'data-role', 'data-action', 'onclick', 'tabindex', 'aria-label', 'for']
+	roles = ['button', 'tab', 'listbox', 'searchbox', 'presentation', 'link', 'heading', 'none']
+	ax_property_names = [
+		'disabled',
+		'hidden',
+		'focusable',
+		'editable',
+		'settable',
+		'checked',
+		'expanded',
+		'pressed',
+		'selected',
+		'required',
+		'autocomplete',
+		'keyshortcuts',
+		'level',
+		'busy',
+	]
+
+	attributes = {
+		name: rng.choice(roles) if name == 'role' else ' '.join(rng.sample(words, rng.randint(0, 3)))
+		for name in rng.sample(attribute_names, rng.randint(0, 4))
+	}
+	ax_properties = [
+		(rng.choice(ax_property_names), rng.choice([True, False, None, '', 'yes', 0, 1])) for _ in range(rng.randint(0, 3))
+	]
+	return _node(
+		rng.choice(['DIV', 'SPAN', 'BUTTON', 'A', 'INPUT', 'IFRAME', 'FRAME', 'HTML', 'BODY', 'LABEL', 'svg', 'li']),
+		attributes=attributes,
+		ax_role=rng.choice([None, *roles]),
+		ax_properties=ax_properties if rng.random() < 0.6 else None,
+		bounds=rng.choice([None, (0, 0), (24, 24), (10, 50), (60, 24), (101, 101), (300, 100)]),
+		cursor_style=rng.choice([None, 'auto', 'pointer']),
+		node_type=rng.choice([NodeType.ELEMENT_NODE] * 9 + [NodeType.TEXT_NODE]),
+	)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_matches_reference_implementation(seed: int):
+	rng = random.Random(seed)
+	nodes = [_random_node(rng) for _ in range(2000)]
+	decisions = [ClickableElementDetector.is_interactive(node) for node in nodes]
+
+	mismatches = [index for index, node in enumerate(nodes) if decisions[index] != _reference_is_interactive(node)]
+	assert mismatches == []
+	# the random nodes exercise both outcomes
+	assert 0 < sum(decisions) < len(decisions)
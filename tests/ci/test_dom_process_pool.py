@@ -0,0 +1,261 @@
+"""Tests for building and serializing the DOM in worker processes: browser_use/dom/process_pool.py."""
+
+import random
+
+import pytest
+
+from browser_use.dom.enhanced_snapshot import REQUIRED_COMPUTED_STYLES
+from browser_use.dom.process_pool import (
+	_build_and_serialize,
+	build_and_serialize_in_process_pool,
+	pack_dom_state,
+	shutdown_dom_process_pools,
+	unpack_dom_state,
+)
+from browser_use.dom.serializer.serializer import DOMTreeSerializer
+from browser_use.dom.tree_builder import build_enhanced_dom_tree
+from browser_use.dom.views import EnhancedDOMTreeNode, SerializedDOMState, SimplifiedNode, TargetAllTrees
+
+TARGET_ID = 'ABCD1234ABCD1234ABCD1234ABCD1234ABCD1234'
+SESSION_ID = 'SESSION1234'
+
+STYLES = {
+	'display': 'block',
+	'visibility': 'visible',
+	'opacity': '1',
+	'overflow': 'visible',
+	'overflow-x': 'visible',
+	'overflow-y': 'visible',
+	'cursor': 'auto',
+	'pointer-events': 'auto',
+	'position': 'static',
+	'background-color': 'rgba(0, 0, 0, 0)',
+}
+
+
+class PayloadBuilder:
+	"""Builds deterministic CDP payloads (DOM.getDocument, DOMSnapshot.captureSnapshot, AX tree) of a random page"""
+
+	def __init__(self, seed: int, cross_origin_iframe: bool = False):
+		self.rng = random.Random(seed)
+		self.cross_origin_iframe = cross_origin_iframe
+		self.next_id = 1
+		self.strings: list[str] = []
+		self.snapshot_nodes: list[int] = []
+		self.layout: dict[str, list] = {'nodeIndex': [], 'bounds': [], 'styles': [], 'paintOrders': []}
+		self.clickable: list[int] = []
+		self.ax_nodes: list[dict] = []
+
+	def _string(self, value: str) -> int:
+		if value not in self.strings:
+			self.strings.append(value)
+		return self.strings.index(value)
+
+	def _node(self, node_type: int, name: str, parent_id: int | None, value: str = '', **extra) -> dict:
+		node_id = self.next_id
+		self.next_id += 1
+		node = {'nodeId': node_id, 'backendNodeId': node_id + 1000, 'nodeType': node_type, 'nodeName': name, 'nodeValue': value}
+		if parent_id is not None:
+			node['parentId'] = parent_id
+		node.update(extra)
+		return node
+
+	def _layout(self, node: dict, bounds: list[float], cursor: str = 'auto') -> None:
+		self.snapshot_nodes.append(node['backendNodeId'])
+		self.layout['nodeIndex'].append(len(self.snapshot_nodes) - 1)
+		self.layout['bounds'].append(bounds)
+		self.layout['styles'].append(
+			[self._string(cursor if name == 'cursor' else STYLES[name]) for name in REQUIRED_COMPUTED_STYLES]
+		)
+		self.layout['paintOrders'].append(len(self.layout['paintOrders']))
+
+	def _element(self, name: str, parent_id: int, depth: int, y: float) -> dict:
+		attributes = []
+		if name == 'INPUT':
+			attributes = ['type', self.rng.choice(['text', 'checkbox', 'email']), 'name', f'field{self.next_id}']
+		elif name == 'A':
+			attributes = ['href', f'/page/{self.next_id}']
+		elif self.rng.random() < 0.3:
+			attributes = ['id', f'el{self.next_id}', 'class', 'box']
+		node = self._node(1, name, parent_id, attributes=attributes)
+		width = self.rng.choice([0.0, 40.0, 120.0, 300.0])
+		self._layout(node, [self.rng.uniform(0, 800), y, width, 24.0], cursor='pointer' if name in ('A', 'BUTTON') else 'auto')
+		if name in ('A', 'BUTTON', 'INPUT'):
+			self.clickable.append(len(self.snapshot_nodes) - 1)
+			self.ax_nodes.append(
+				{
+					'nodeId': f'ax{node["nodeId"]}',
+					'ignored': False,
+					'role': {'value': {'A': 'link', 'BUTTON': 'button', 'INPUT': 'textbox'}[name]},
+					'name': {'value': f'{name.lower()} {node["nodeId"]}'},
+					'backendDOMNodeId': node['backendNodeId'],
+				}
+			)
+
+		children = []
+		if name in ('DIV', 'SPAN', 'FORM') and depth < 6:
+			for _ in range(self.rng.randint(1, 4)):
+				child_name = self.rng.choice(['DIV', 'DIV', 'SPAN', 'FORM', 'A', 'BUTTON', 'INPUT', '#text'])
+				if child_name == '#text':
+					text = self._node(3, '#text', node['nodeId'], value=self.rng.choice(['Home', 'Next page', 'Sign in', ' ']))
+					self._layout(text, [10.0, y, 60.0, 16.0])
+					children.append(text)
+				else:
+					children.append(self._element(child_name, node['nodeId'], depth + 1, y + 30.0 * len(children)))
+		if name == 'DIV' and self.rng.random() < 0.2:
+			shadow_root = self._node(11, '#document-fragment', None, shadowRootType='open')
+			shadow_root['children'] = [self._element('BUTTON', shadow_root['nodeId'], depth + 1, y)]
+			node['shadowRoots'] = [shadow_root]
+		if children:
+			node['children'] = children
+		return node
+
+	def build(self) -> TargetAllTrees:
+		document = self._node(9, '#document', None)
+		html = self._node(1, 'HTML', document['nodeId'], frameId='main-frame')
+		body = self._node(1, 'BODY', html['nodeId'])
+		self._layout(html, [0.0, 0.0, 1280.0, 4000.0])
+		self._layout(body, [0.0, 0.0, 1280.0, 4000.0])
+		body['children'] = [self._element('DIV', body['nodeId'], 1, 100.0 * i) for i in range(6)]
+
+		# a same-origin iframe, whose document is part of the payloads
+		iframe = self._node(1, 'IFRAME', body['nodeId'], frameId='main-frame')
+		self._layout(iframe, [50.0, 600.0, 400.0, 300.0])
+		iframe_document = self._node(9, '#document', None)
+		iframe_html = self._node(1, 'HTML', iframe_document['nodeId'], frameId='child-frame')
+		self._layout(iframe_html, [0.0, 0.0, 400.0, 300.0])
+		iframe_html['children'] = [self._element('FORM', iframe_html['nodeId'], 4, 20.0)]
+		iframe_document['children'] = [iframe_html]
+		iframe['contentDocument'] = iframe_document
+		body['children'].append(iframe)
+
+		if self.cross_origin_iframe:
+			oopif = self._node(1, 'IFRAME', body['nodeId'], frameId='oopif-frame')
+			self._layout(oopif, [500.0, 600.0, 400.0, 300.0])
+			body['children'].append(oopif)
+
+		html['children'] = [body]
+		document['children'] = [html]
+
+		snapshot = {
+			'documents': [
+				{
+					'nodes': {'backendNodeId': self.snapshot_nodes, 'isClickable': {'index': self.clickable}},
+					'layout': self.layout,
+				}
+			],
+			'strings': self.strings,
+		}
+		return TargetAllTrees(
+			snapshot=snapshot,  # type: ignore[arg-type]
+			dom_tree={'root': document},  # type: ignore[arg-type]
+			ax_tree={'nodes': self.ax_nodes},  # type: ignore[arg-type]
+			device_pixel_ratio=1.0,
+			cdp_timing={},
+		)
+
+
+def _build_in_process(trees: TargetAllTrees, previous: SerializedDOMState | None = None):
+	root, _ = build_enhanced_dom_tree(trees, TARGET_ID, SESSION_ID)
+	state, _ = DOMTreeSerializer(root, previous).serialize_accessible_elements()
+	return state, root
+
+
+def _walk_simplified(node: SimplifiedNode | None) -> list[tuple]:
+	if node is None:
+		return []
+	row = (
+		node.original_node.backend_node_id,
+		node.interactive_index,
+		node.is_new,
+		node.should_display,
+		node.ignored_by_paint_order,
+	)
+	return [row] + [row for child in node.children for row in _walk_simplified(child)]
+
+
+def _describe(state: SerializedDOMState, root: EnhancedDOMTreeNode) -> dict:
+	"""Everything the agent and the tools read from a DOM state"""
+	return {
+		'text': state.llm_representation(),
+		'simplified': _walk_simplified(state._root),
+		'elements': {
+			index: (
+				node.backend_node_id,
+				node.session_id,
+				node.xpath,
+				hash(node),
+				node.parent_branch_hash(),
+				node.is_visible,
+				node.absolute_position,
+				node.element_index,
+				node.ax_node,
+			)
+			for index, node in state.selector_map.items()
+		},
+		'root': (root.node_name, len(root.children), root.children[0].node_name),
+	}
+
+
+@pytest.mark.parametrize('seed', range(6))
+def test_pack_roundtrip(seed: int):
+	trees = PayloadBuilder(seed).build()
+	state, root = _build_in_process(trees)
+	assert state.selector_map
+
+	unpacked_state, unpacked_root = unpack_dom_state(pack_dom_state(state, root))
+
+	assert _describe(unpacked_state, unpacked_root) == _describe(state, root)
+	# links point into the rebuilt tree, not the original one
+	element = next(iter(unpacked_state.selector_map.values()))
+	ancestor = element
+	while ancestor.parent_node is not None:
+		ancestor = ancestor.parent_node
+	assert ancestor is unpacked_root
+
+
+def test_worker_marks_new_elements_like_the_event_loop():
+	previous_state, _ = _build_in_process(PayloadBuilder(seed=1).build())
+	trees = PayloadBuilder(seed=2).build()
+	state, root = _build_in_process(trees, previous_state)
+
+	result = _build_and_serialize(
+		PayloadBuilder(seed=2).build(),
+		TARGET_ID,
+		SESSION_ID,
+		previous_state.identity_index.backend_node_ids,
+		paint_order_filtering=True,
+		load_cross_origin_iframes=True,
+	)
+
+	assert result is not None
+	assert any(is_new for _, _, is_new, _, _ in _describe(state, root)['simplified'])
+	assert _describe(*unpack_dom_state(result.packed)) == _describe(state, root)
+
+
+def test_pages_with_cross_origin_iframes_stay_on_the_event_loop():
+	trees = PayloadBuilder(seed=3, cross_origin_iframe=True).build()
+	assert _build_and_serialize(trees, TARGET_ID, SESSION_ID, None, True, load_cross_origin_iframes=True) is None
+	assert _build_and_serialize(trees, TARGET_ID, SESSION_ID, None, True, load_cross_origin_iframes=False) is not None
+
+
+async def test_build_and_serialize_in_process_pool():
+	trees = PayloadBuilder(seed=4).build()
+	previous_state, _ = _build_in_process(PayloadBuilder(seed=5).build())
+	try:
+		result = await build_and_serialize_in_process_pool(
+			1,
+			trees,
+			TARGET_ID,
+			SESSION_ID,
+			previous_cached_state=previous_state,
+			paint_order_filtering=True,
+			load_cross_origin_iframes=True,
+		)
+	finally:
+		shutdown_dom_process_pools()
+
+	assert result is not None
+	state, root, timing = result
+	assert _describe(state, root) == _describe(*_build_in_process(trees, previous_state))
+	assert {'create_simplified_tree', 'serialize_dom_tree_total', 'unpack_dom_state'} <= set(timing)
@@ -0,0 +1,465 @@
+"""
+Golden-file tests for DOMTreeSerializer.
+
+The corpus is a set of seeded synthetic DOM trees that exercise shadow roots, iframes, compound controls,
+bounding-box propagation, paint order, scroll containers and new-element markers. The expected output of
+each tree is stored in tests/ci/dom_serializer_golden/ and compared byte-for-byte, so any change to the
+serializer pipeline that alters what the LLM sees shows up as a diff.
+
+Regenerate the golden files (only when an output change is intended) with:
+	UPDATE_DOM_SERIALIZER_GOLDEN=1 uv run pytest tests/ci/test_dom_serializer.py
+"""
+
+import os
+import random
+import re
+from pathlib import Path
+
+import pytest
+
+from browser_use.dom.serializer.serializer import DOMTreeSerializer
+from browser_use.dom.views import (
+	DEFAULT_INCLUDE_ATTRIBUTES,
+	DOMRect,
+	EnhancedAXNode,
+	EnhancedAXProperty,
+	EnhancedDOMTreeNode,
+	EnhancedSnapshotNode,
+	NodeType,
+	SerializedDOMState,
+)
+
+GOLDEN_DIR = Path(__file__).parent / 'dom_serializer_golden'
+UPDATE_GOLDEN = os.getenv('UPDATE_DOM_SERIALIZER_GOLDEN') == '1'
+
+SEEDS = list(range(12))
+
+TARGET_ID = 'ABCD1234ABCD1234ABCD1234ABCD1234ABCD1234'
+
+CONTAINER_TAGS = ['div', 'div', 'div', 'span', 'section', 'ul', 'li', 'form', 'nav', 'label', 'p']
+LEAF_TAGS = ['a', 'button', 'input', 'textarea', 'select', 'details', 'video', 'audio', 'img', 'span', 'div', 'svg']
+INPUT_TYPES = ['text', 'date', 'time', 'datetime-local', 'month', 'week', 'range', 'number', 'color', 'file', 'checkbox']
+WORDS = ['Home', 'Search', 'Submit', 'Sign in', 'Next page', 'x', 'Cart (3)', 'Settings', 'Read more', 'Close', '  ', 'OK']
+
+
+class SyntheticDOMBuilder:
+	"""Builds a deterministic, randomly shaped EnhancedDOMTreeNode tree from a seed."""
+
+	def __init__(self, seed: int):
+		self.rng = random.Random(seed)
+		self.next_id = 1
+
+	def _node(
+		self,
+		node_type: NodeType,
+		node_name: str,
+		parent: EnhancedDOMTreeNode | None,
+		attributes: dict[str, str] | None = None,
+		node_value: str = '',
+		snapshot: EnhancedSnapshotNode | None = None,
+		is_visible: bool | None = None,
+		is_scrollable: bool | None = None,
+		ax_node: EnhancedAXNode | None = None,
+		shadow_root_type: str | None = None,
+	) -> EnhancedDOMTreeNode:
+		node_id = self.next_id
+		self.next_id += 1
+		return EnhancedDOMTreeNode(
+			node_id=node_id,
+			backend_node_id=node_id + 10_000,
+			node_type=node_type,
+			node_name=node_name,
+			node_value=node_value,
+			attributes=attributes or {},
+			is_scrollable=is_scrollable,
+			is_visible=is_visible,
+			absolute_position=None,
+			target_id=TARGET_ID,
+			frame_id=None,
+			session_id=None,
+			content_document=None,
+			shadow_root_type=shadow_root_type,  # type: ignore[arg-type]
+			shadow_roots=None,
+			parent_node=parent,
+			children_nodes=None,
+			ax_node=ax_node,
+			snapshot_node=snapshot,
+		)
+
+	def _rect(self, parent_rect: DOMRect | None) -> DOMRect:
+		rng = self.rng
+		if parent_rect is not None and rng.random() < 0.6:
+			# mostly contained in the parent, which is what bbox filtering and paint order look at
+			width = max(0.0, parent_rect.width * rng.choice([1.0, 0.9, 0.5, 0.25]))
+			height = max(0.0, parent_rect.height * rng.choice([1.0, 0.9, 0.5, 0.25]))
+			return DOMRect(
+				x=parent_rect.x + rng.choice([0, 1, 5]), y=parent_rect.y + rng.choice([0, 1, 5]), width=width, height=height
+			)
+		return DOMRect(
+			x=float(rng.randint(0, 1200)),
+			y=float(rng.randint(0, 3000)),
+			width=float(rng.choice([0, 12, 30, 48, 120, 300, 800])),
+			height=float(rng.choice([0, 12, 30, 48, 120, 300, 800])),
+		)
+
+	def _snapshot(self, parent_rect: DOMRect | None, scrollable: bool = False) -> EnhancedSnapshotNode | None:
+		rng = self.rng
+		if rng.random() < 0.1:
+			return None
+		bounds = self._rect(parent_rect) if rng.random() < 0.9 else None
+		styles = {
+			'background-color': rng.choice(['rgba(0, 0, 0, 0)', 'rgb(255, 255, 255)', 'rgb(10, 20, 30)']),
+			'opacity': rng.choice(['1', '1', '0.5']),
+		}
+		client_rects = scroll_rects = None
+		if scrollable:
+			styles['overflow'] = rng.choice(['auto', 'scroll', 'visible', 'hidden'])
+			client_rects = DOMRect(x=0, y=0, width=400, height=300)
+			scroll_rects = DOMRect(
+				x=0, y=float(rng.choice([0, 150, 600])), width=400, height=float(rng.choice([300, 1200, 2400]))
+			)
+		return EnhancedSnapshotNode(
+			is_clickable=None,
+			cursor_style=rng.choice([None, None, 'pointer', 'auto']),
+			bounds=bounds,
+			clientRects=client_rects,
+			scrollRects=scroll_rects,
+			computed_styles=styles if rng.random() < 0.8 else None,
+			paint_order=rng.randint(0, 40) if rng.random() < 0.85 else None,
+			stacking_contexts=None,
+		)
+
+	def _ax_node(self, role: str | None) -> EnhancedAXNode | None:
+		rng = self.rng
+		if rng.random() < 0.5:
+			return None
+		properties = []
+		for name in rng.sample(
+			['focusable', 'editable', 'checked', 'expanded', 'required', 'disabled', 'hidden'], k=rng.randint(0, 2)
+		):
+			properties.append(EnhancedAXProperty(name=name, value=rng.choice([True, False, 'true', None])))  # type: ignore[arg-type]
+		return EnhancedAXNode(
+			ax_node_id=f'ax-{self.next_id}',
+			ignored=False,
+			role=role or rng.choice([None, 'button', 'link', 'generic', 'textbox', 'combobox']),
+			name=rng.choice([None, 'Label', 'Search the site']),
+			description=None,
+			properties=properties or None,
+			child_ids=['c1', 'c2'] if rng.random() < 0.5 else None,
+		)
+
+	def _attributes(self, tag: str) -> dict[str, str]:
+		rng = self.rng
+		attributes: dict[str, str] = {}
+		if rng.random() < 0.4:
+			attributes['id'] = rng.choice(['main', 'search-box', 'nav', 'item', 'submit-btn', 'x'])
+		if rng.random() < 0.25:
+			attributes['role'] = rng.choice(['button', 'combobox', 'link', 'tab', 'presentation', 'listbox'])
+		if rng.random() < 0.2:
+			attributes['aria-label'] = rng.choice(['Open menu', 'Close dialog', ' ', 'Search'])
+		if rng.random() < 0.1:
+			attributes['onclick'] = 'go()'
+		if rng.random() < 0.15:
+			attributes['title'] = rng.choice(['Open menu', 'Tooltip text here', 'Go'])
+		if rng.random() < 0.1:
+			attributes['class'] = rng.choice(['btn primary', 'search-icon', 'card'])
+		if tag == 'input':
+			attributes['type'] = rng.choice(INPUT_TYPES)
+			if attributes['type'] in ('range', 'number'):
+				attributes['min'] = rng.choice(['0', '-5', 'abc'])
+				attributes['max'] = rng.choice(['10', '100.5', ''])
+			if attributes['type'] == 'file' and rng.random() < 0.5:
+				attributes['multiple'] = ''
+			if rng.random() < 0.5:
+				attributes['placeholder'] = rng.choice(['Search', 'Email address', 'Open menu'])
+			if rng.random() < 0.3:
+				attributes['value'] = rng.choice(['hello', '42', ''])
+		if tag == 'a' and rng.random() < 0.7:
+			attributes['href'] = rng.choice(['/home', 'https://example.com/a/b', '#'])
+		return attributes
+
+	def _text(self, parent: EnhancedDOMTreeNode, parent_rect: DOMRect | None) -> EnhancedDOMTreeNode:
+		return self._node(
+			NodeType.TEXT_NODE,
+			'#text',
+			parent,
+			node_value=self.rng.choice(WORDS),
+			snapshot=self._snapshot(parent_rect),
+			is_visible=self.rng.random() < 0.8,
+		)
+
+	def _select(self, node: EnhancedDOMTreeNode, rect: DOMRect | None) -> None:
+		rng = self.rng
+		values = rng.choice([['1', '2', '3'], ['US', 'DE', 'FR', 'GB', 'IT'], ['a@x.com', 'b@y.com'], ['2024-01', '2024-02'], []])
+		options = []
+		for value in values:
+			option = self._node(NodeType.ELEMENT_NODE, 'OPTION', node, attributes={'value': value} if rng.random() < 0.7 else {})
+			option.snapshot_node = self._snapshot(rect)
+			option.is_visible = rng.random() < 0.5
+			text = self._text(option, rect)
+			text.node_value = f'Option {value}' if rng.random() < 0.8 else value
+			option.children_nodes = [text]
+			options.append(option)
+		node.children_nodes = options
+
+	def _iframe(self, node: EnhancedDOMTreeNode, depth: int, rect: DOMRect | None) -> None:
+		document = self._node(NodeType.DOCUMENT_NODE, '#document', node)
+		html = self._node(
+			NodeType.ELEMENT_NODE,
+			'HTML',
+			document,
+			snapshot=self._snapshot(None, scrollable=True),
+			is_visible=True,
+			is_scrollable=self.rng.random() < 0.3,
+		)
+		html.children_nodes = [self._element(html, depth + 1, rect) for _ in range(self.rng.randint(1, 3))]
+		document.children_nodes = [html]
+		node.content_document = document
+
+	def _shadow_root(self, host: EnhancedDOMTreeNode, depth: int, rect: DOMRect | None) -> EnhancedDOMTreeNode:
+		fragment = self._node(
+			NodeType.DOCUMENT_FRAGMENT_NODE,
+			'#document-fragment',
+			host,
+			shadow_root_type=self.rng.choice(['open', 'closed', 'user-agent']),
+		)
+		fragment.children_nodes = [self._element(fragment, depth + 1, rect) for _ in range(self.rng.randint(0, 3))]
+		return fragment
+
+	def _element(self, parent: EnhancedDOMTreeNode, depth: int, parent_rect: DOMRect | None) -> EnhancedDOMTreeNode:
+		rng = self.rng
+		is_leaf = depth >= 7 or rng.random() < 0.3
+		roll = rng.random()
+		if roll < 0.04:
+			tag = rng.choice(['script', 'style', 'meta', 'link'])
+		elif roll < 0.08:
+			tag = rng.choice(['iframe', 'frame'])
+		elif is_leaf:
+			tag = rng.choice(LEAF_TAGS)
+		else:
+			tag = rng.choice(CONTAINER_TAGS + ['a', 'button'])
+
+		scrollable = tag in ('div', 'section', 'ul') and rng.random() < 0.2
+		node = self._node(
+			NodeType.ELEMENT_NODE,
+			tag.upper(),
+			parent,
+			attributes=self._attributes(tag),
+			snapshot=self._snapshot(parent_rect, scrollable=scrollable),
+			is_visible=rng.random() < 0.8,
+			is_scrollable=scrollable and rng.random() < 0.3,
+			ax_node=self._ax_node('listbox' if tag == 'select' else None),
+		)
+		rect = node.snapshot_node.bounds if node.snapshot_node else None
+
+		if tag in ('iframe', 'frame'):
+			if rng.random() < 0.8:
+				self._iframe(node, depth, rect)
+			return node
+		if tag == 'select':
+			self._select(node, rect)
+			return node
+
+		children: list[EnhancedDOMTreeNode] = []
+		if not is_leaf:
+			for _ in range(rng.randint(1, 4)):
+				children.append(self._element(node, depth + 1, rect) if rng.random() < 0.7 else self._text(node, rect))
+		elif tag in ('a', 'button', 'span', 'div', 'details') and rng.random() < 0.7:
+			children.append(self._text(node, rect))
+		node.children_nodes = children or (None if rng.random() < 0.5 else [])
+
+		if rng.random() < 0.08:
+			node.shadow_roots = [self._shadow_root(node, depth, rect)]
+		return node
+
+	def build(self) -> EnhancedDOMTreeNode:
+		document = self._node(NodeType.DOCUMENT_NODE, '#document', None)
+		# the first child of the document renders nothing, so the serializer has to move on to <html>
+		comment = self._node(NodeType.COMMENT_NODE, '#comment', document, node_value='<!-- banner -->')
+		html = self._node(
+			NodeType.ELEMENT_NODE,
+			'HTML',
+			document,
+			snapshot=self._snapshot(None, scrollable=True),
+			is_visible=True,
+		)
+		body = self._node(
+			NodeType.ELEMENT_NODE,
+			'BODY',
+			html,
+			snapshot=EnhancedSnapshotNode(
+				is_clickable=None,
+				cursor_style=None,
+				bounds=DOMRect(x=0, y=0, width=1280, height=4000),
+				clientRects=None,
+				scrollRects=None,
+				computed_styles={'background-color': 'rgb(255, 255, 255)', 'opacity': '1'},
+				paint_order=0,
+				stacking_contexts=None,
+			),
+			is_visible=True,
+		)
+		body_rect = body.snapshot_node.bounds if body.snapshot_node else None
+		body.children_nodes = [self._element(body, 2, body_rect) for _ in range(self.rng.randint(4, 8))]
+		html.children_nodes = [body]
+		document.children_nodes = [comment, html]
+		return document
+
+
+def _previous_state(seed: int) -> SerializedDOMState | None:
+	"""A previous selector map holding every other node of the same tree, so some elements get the new-element marker."""
+	if seed % 3 == 0:
+		return None
+	previous_root = SyntheticDOMBuilder(seed).build()
+	previous_state, _ = DOMTreeSerializer(previous_root).serialize_accessible_elements()
+	selector_map = {index: node for index, node in previous_state.selector_map.items() if node.backend_node_id % 2 == 0}
+	return SerializedDOMState(_root=None, selector_map=selector_map)
+
+
+def _render(seed: int, **serializer_kwargs) -> str:
+	root = SyntheticDOMBuilder(seed).build()
+	state, timing = DOMTreeSerializer(
+		root, previous_cached_state=_previous_state(seed), **serializer_kwargs
+	).serialize_accessible_elements()
+	assert 'serialize_accessible_elements_total' in timing
+
+	selector_map_lines = [f'{index}: {node.backend_node_id} <{node.tag_name}>' for index, node in state.selector_map.items()]
+	return (
+		state.llm_representation(DEFAULT_INCLUDE_ATTRIBUTES) + '\n\n--- selector map ---\n' + '\n'.join(selector_map_lines) + '\n'
+	)
+
+
+def _assert_matches_golden(name: str, output: str) -> None:
+	golden_path = GOLDEN_DIR / f'{name}.txt'
+	if UPDATE_GOLDEN:
+		GOLDEN_DIR.mkdir(exist_ok=True)
+		golden_path.write_text(output, encoding='utf-8')
+	assert golden_path.exists(), f'Missing golden file {golden_path}, regenerate with UPDATE_DOM_SERIALIZER_GOLDEN=1'
+	assert output == golden_path.read_text(encoding='utf-8'), f'Serializer output for {name} differs from {golden_path}'
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_serializer_matches_golden(seed: int):
+	_assert_matches_golden(f'seed_{seed:02d}', _render(seed))
+
+
+@pytest.mark.parametrize('seed', [1, 5])
+def test_serializer_matches_golden_without_filtering(seed: int):
+	output = _render(seed, enable_bbox_filtering=False, paint_order_filtering=False)
+	_assert_matches_golden(f'seed_{seed:02d}_no_filtering', output)
+
+
+def test_serializer_handles_deeply_nested_dom():
+	"""Nesting far beyond the recursion limit must serialize without a RecursionError."""
+	depth = 5_000
+	builder = SyntheticDOMBuilder(seed=0)
+	document = builder._node(NodeType.DOCUMENT_NODE, '#document', None)
+	parent = document
+	for level in range(depth):
+		snapshot = EnhancedSnapshotNode(
+			is_clickable=None,
+			cursor_style=None,
+			bounds=DOMRect(x=0, y=0, width=100, height=20),
+			clientRects=None,
+			scrollRects=None,
+			computed_styles=None,
+			paint_order=level,
+			stacking_contexts=None,
+		)
+		attributes = {'onclick': 'go()'} if level % 1000 == 0 else {}
+		node = builder._node(NodeType.ELEMENT_NODE, 'DIV', parent, attributes=attributes, snapshot=snapshot, is_visible=True)
+		parent.children_nodes = [node]
+		parent = node
+	text = builder._node(NodeType.TEXT_NODE, '#text', parent, node_value='Deepest text', snapshot=snapshot, is_visible=True)
+	parent.children_nodes = [text]
+
+	state, _ = DOMTreeSerializer(document, paint_order_filtering=False).serialize_accessible_elements()
+
+	assert len(state.selector_map) == depth // 1000
+	lines = state.llm_representation().split('\n')
+	assert lines[0] == '[1]<div />'
+	assert lines[-1] == '\t' * (depth // 1000) + 'Deepest text'
+
+
+def test_identity_index_is_built_once_per_state():
+	"""New element detection, multi_act and history lookups share one index per serialized state."""
+	state, _ = DOMTreeSerializer(SyntheticDOMBuilder(seed=2).build()).serialize_accessible_elements()
+	index = state.identity_index
+
+	assert state.identity_index is index
+	assert index.backend_node_ids == {element.backend_node_id for element in state.selector_map.values()}
+	assert index.branch_hash_by_index == {i: element.parent_branch_hash() for i, element in state.selector_map.items()}
+	for highlight_index, element in state.selector_map.items():
+		first_match = next(i for i, e in state.selector_map.items() if e.element_hash == element.element_hash)
+		assert index.index_by_element_hash[element.element_hash] == first_match
+		assert highlight_index >= first_match
+
+	# the next step reuses the cached state's index instead of rebuilding the previous id set per element
+	next_root = SyntheticDOMBuilder(seed=2).build()
+	next_state, _ = DOMTreeSerializer(next_root, previous_cached_state=state).serialize_accessible_elements()
+	assert state.identity_index is index
+	assert not next_state.identity_index.has_new_elements_since(index)
+	assert next_state.identity_index.has_new_elements_since(SerializedDOMState(_root=None, selector_map={}).identity_index)
+
+
+def test_identity_index_follows_selector_map_changes():
+	"""Replacing an entry keeps the number of elements, the index must still be rebuilt."""
+	state, _ = DOMTreeSerializer(SyntheticDOMBuilder(seed=2).build()).serialize_accessible_elements()
+	first, second = list(state.selector_map)[:2]
+	index = state.identity_index
+
+	state.selector_map[first], state.selector_map[second] = state.selector_map[second], state.selector_map[first]
+	assert state.identity_index is not index
+	assert state.identity_index.branch_hash_by_index[first] == state.selector_map[first].parent_branch_hash()
+
+	swapped = state.identity_index
+	state.selector_map = {first: state.selector_map[second]}
+	assert state.identity_index is not swapped
+	assert state.identity_index.backend_node_ids == {state.selector_map[first].backend_node_id}
+
+
+def _interactive_indices(text: str) -> list[int]:
+	return [int(index) for index in re.findall(r'(?:\[|\|SCROLL\+)(\d+)\]<', text)]
+
+
+@pytest.mark.parametrize('seed', [0, 3, 7])
+def test_budgeted_serialization_stops_at_a_line_boundary(seed: int):
+	state, _ = DOMTreeSerializer(SyntheticDOMBuilder(seed).build()).serialize_accessible_elements()
+	full = state.llm_representation()
+
+	assert state.llm_representation_with_budget(len(full)).text == full
+
+	budget = len(full) // 3
+	budgeted = state.llm_representation_with_budget(budget)
+	assert budgeted.truncated and not budgeted.viewport_first
+	assert len(budgeted.text) <= budget
+	kept_lines = budgeted.text.split('\n')
+	full_lines = full.split('\n')
+	assert full_lines[: len(kept_lines)] == kept_lines
+	assert budgeted.omitted_elements == len(_interactive_indices('\n'.join(full_lines[len(kept_lines) :])))
+
+
+def test_budgeted_serialization_lists_viewport_elements_first():
+	root = SyntheticDOMBuilder(seed=4).build()
+	stack = [root]
+	while stack:
+		node = stack.pop()
+		if node.snapshot_node and node.snapshot_node.bounds:
+			node.absolute_position = node.snapshot_node.bounds
+		stack.extend(node.children_and_shadow_roots)
+	state, _ = DOMTreeSerializer(root).serialize_accessible_elements()
+	full = state.llm_representation()
+	viewport = (1500.0, 2300.0)
+
+	budgeted = state.llm_representation_with_budget(len(full) // 2, viewport=viewport)
+
+	assert budgeted.truncated and budgeted.viewport_first
+
+	shown = _interactive_indices(budgeted.text)
+	assert budgeted.omitted_elements == len(state.selector_map) - len(shown)
+
+	# elements in the viewport come first, then the rest of the page (elements without a position follow their parent)
+	positions = [state.selector_map[index].absolute_position for index in shown]
+	shown_in_viewport = [p.y < viewport[1] and p.y + p.height > viewport[0] for p in positions if p is not None]
+	assert any(shown_in_viewport) and not all(shown_in_viewport)
+	assert shown_in_viewport == sorted(shown_in_viewport, reverse=True)
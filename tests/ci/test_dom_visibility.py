@@ -0,0 +1,238 @@
+"""
+Tests for the DOM visibility check in browser_use/dom/tree_builder.py.
+
+It must give exactly the same result as the original per-node check (kept below as `_reference_is_visible`) applied
+node by node in construction order, including how it translates each node's snapshot bounds in place.
+"""
+
+import random
+
+import pytest
+
+from browser_use.dom.enhanced_snapshot import REQUIRED_COMPUTED_STYLES, build_snapshot_lookup
+from browser_use.dom.service import DomService
+from browser_use.dom.tree_builder import is_element_visible_according_to_all_parents
+from browser_use.dom.views import DOMRect, EnhancedDOMTreeNode, EnhancedSnapshotNode, NodeType
+
+TARGET_ID = 'ABCD1234ABCD1234ABCD1234ABCD1234ABCD1234'
+
+
+def _node(node_id: int, node_name: str, snapshot: EnhancedSnapshotNode | None) -> EnhancedDOMTreeNode:
+	return EnhancedDOMTreeNode(
+		node_id=node_id,
+		backend_node_id=node_id,
+		node_type=NodeType.ELEMENT_NODE,
+		node_name=node_name,
+		node_value='',
+		attributes={},
+		is_scrollable=None,
+		is_visible=None,
+		absolute_position=None,
+		target_id=TARGET_ID,
+		frame_id=None,
+		session_id=None,
+		content_document=None,
+		shadow_root_type=None,
+		shadow_roots=None,
+		parent_node=None,
+		children_nodes=None,
+		ax_node=None,
+		snapshot_node=snapshot,
+	)
+
+
+def _build_entries(seed: int) -> list[tuple[EnhancedDOMTreeNode, list[EnhancedDOMTreeNode]]]:
+	"""(node, html_frames) pairs in the post-order DomService computes visibility in, across nested iframes."""
+	rng = random.Random(seed)
+	entries: list[tuple[EnhancedDOMTreeNode, list[EnhancedDOMTreeNode]]] = []
+	next_id = iter(range(1, 1_000_000))
+	shared_snapshots: list[EnhancedSnapshotNode] = []
+
+	def snapshot(scroll: bool = False) -> EnhancedSnapshotNode | None:
+		if rng.random() < 0.05:
+			return None
+		if shared_snapshots and rng.random() < 0.03:
+			# the same backend node reached twice shares its snapshot data
+			return rng.choice(shared_snapshots)
+		styles = rng.choice(
+			[None, {}, {'display': 'NONE'}, {'visibility': 'hidden'}, {'opacity': '0'}, {'opacity': 'abc'}, {'opacity': '0.4'}]
+		)
+		bounds = None
+		if rng.random() < 0.95:
+			bounds = DOMRect(
+				x=rng.uniform(-500, 2500),
+				y=rng.uniform(-3000, 6000),
+				width=rng.choice([0.0, 10.5, 300.0, 1200.0]),
+				height=rng.choice([0.0, 20.25, 400.0, 2000.0]),
+			)
+		result = EnhancedSnapshotNode(
+			is_clickable=None,
+			cursor_style=None,
+			bounds=bounds,
+			clientRects=DOMRect(x=0, y=0, width=rng.choice([800, 1280]), height=rng.choice([600, 900])) if scroll else None,
+			scrollRects=DOMRect(x=rng.choice([0, 40]), y=rng.choice([0, 700, 2500]), width=1280, height=5000) if scroll else None,
+			computed_styles=styles,
+			paint_order=None,
+			stacking_contexts=None,
+		)
+		shared_snapshots.append(result)
+		return result
+
+	def build(html_frames: list[EnhancedDOMTreeNode], depth: int) -> None:
+		html = _node(next(next_id), 'HTML', snapshot(scroll=rng.random() < 0.9))
+		frames = html_frames + [html]
+		for _ in range(rng.randint(3, 30)):
+			tag = 'IFRAME' if depth < 3 and rng.random() < 0.1 else rng.choice(['DIV', 'SPAN', 'A', 'html'])
+			node = _node(next(next_id), tag, snapshot())
+			node_frames = frames
+			if tag == 'IFRAME' and node.snapshot_node and node.snapshot_node.bounds:
+				node_frames = frames + [node]
+				# the content document is built (and its visibility computed) before the iframe element itself
+				build(node_frames, depth + 1)
+			entries.append((node, node_frames))
+		entries.append((html, frames))
+
+	build([], 0)
+	return entries
+
+
+def _state(entries: list[tuple[EnhancedDOMTreeNode, list[EnhancedDOMTreeNode]]]) -> list[tuple]:
+	result = []
+	for node, _ in entries:
+		bounds = node.snapshot_node.bounds if node.snapshot_node else None
+		result.append((node.node_id, node.is_visible, (bounds.x, bounds.y, bounds.width, bounds.height) if bounds else None))
+	return result
+
+
+def _reference_is_visible(node: EnhancedDOMTreeNode, html_frames: list[EnhancedDOMTreeNode]) -> bool:
+	"""The per-node visibility check as it was before styles were pre-parsed into the snapshot."""
+	if not node.snapshot_node:
+		return False
+
+	computed_styles = node.snapshot_node.computed_styles or {}
+	if computed_styles.get('display', '').lower() == 'none' or computed_styles.get('visibility', '').lower() == 'hidden':
+		return False
+	try:
+		if float(computed_styles.get('opacity', '1')) <= 0:
+			return False
+	except (ValueError, TypeError):
+		pass
+
+	current_bounds = node.snapshot_node.bounds
+	if not current_bounds:
+		return False
+
+	for frame in reversed(html_frames):
+		if (
+			frame.node_type == NodeType.ELEMENT_NODE
+			and (frame.node_name.upper() == 'IFRAME' or frame.node_name.upper() == 'FRAME')
+			and frame.snapshot_node
+			and frame.snapshot_node.bounds
+		):
+			current_bounds.x += frame.snapshot_node.bounds.x
+			current_bounds.y += frame.snapshot_node.bounds.y
+
+		if (
+			frame.node_type == NodeType.ELEMENT_NODE
+			and frame.node_name == 'HTML'
+			and frame.snapshot_node
+			and frame.snapshot_node.scrollRects
+			and frame.snapshot_node.clientRects
+		):
+			adjusted_x = current_bounds.x - frame.snapshot_node.scrollRects.x
+			adjusted_y = current_bounds.y - frame.snapshot_node.scrollRects.y
+			if not (
+				adjusted_x < frame.snapshot_node.clientRects.width
+				and adjusted_x + current_bounds.width > 0
+				and adjusted_y < frame.snapshot_node.clientRects.height + 1000
+				and adjusted_y + current_bounds.height > 0 - 1000
+			):
+				return False
+			current_bounds.x -= frame.snapshot_node.scrollRects.x
+			current_bounds.y -= frame.snapshot_node.scrollRects.y
+
+	return True
+
+
+@pytest.mark.parametrize('seed', range(25))
+def test_matches_reference_visibility(seed: int):
+	expected_entries = _build_entries(seed)
+	for node, html_frames in expected_entries:
+		node.is_visible = _reference_is_visible(node, html_frames)
+
+	entries = _build_entries(seed)
+	for node, html_frames in entries:
+		node.is_visible = DomService.is_element_visible_according_to_all_parents(node, html_frames)
+
+	assert _state(entries) == _state(expected_entries)
+
+
+def test_snapshot_lookup_pre_parses_hidden_styles():
+	"""Styles are parsed once per distinct combination, and the hidden flag matches parsing each node's styles."""
+	values = {'display': ['block', 'none', 'NONE', 'inline'], 'visibility': ['visible', 'hidden'], 'opacity': ['1', '0', 'abc']}
+	strings = sorted({value for options in values.values() for value in options} | {'auto'})
+	rng = random.Random(0)
+	node_count = 200
+	styles = [
+		[
+			strings.index(rng.choice(values[name])) if name in values else strings.index('auto')
+			for name in REQUIRED_COMPUTED_STYLES
+		]
+		for _ in range(node_count)
+	]
+	snapshot = {
+		'strings': strings,
+		'documents': [
+			{
+				'nodes': {'backendNodeId': list(range(1, node_count + 1))},
+				'layout': {
+					'nodeIndex': list(range(node_count)),
+					'bounds': [[0, 0, 10, 10]] * node_count,
+					'styles': styles,
+				},
+			}
+		],
+	}
+
+	lookup = build_snapshot_lookup(snapshot)  # type: ignore[arg-type]
+
+	assert len(lookup) == node_count
+	assert len({id(snapshot_node.computed_styles) for snapshot_node in lookup.values()}) == len({tuple(row) for row in styles})
+	assert any(snapshot_node.is_hidden_by_styles for snapshot_node in lookup.values())
+	for snapshot_node in lookup.values():
+		assert snapshot_node.is_hidden_by_styles == EnhancedSnapshotNode.styles_hide_element(snapshot_node.computed_styles)
+
+
+def test_viewport_margin():
+	html = _node(1, 'HTML', None)
+	html.snapshot_node = EnhancedSnapshotNode(
+		is_clickable=None,
+		cursor_style=None,
+		bounds=None,
+		clientRects=DOMRect(x=0, y=0, width=1000, height=800),
+		scrollRects=DOMRect(x=0, y=0, width=1000, height=10_000),
+		computed_styles=None,
+		paint_order=None,
+		stacking_contexts=None,
+	)
+
+	def element(node_id: int, y: float) -> EnhancedDOMTreeNode:
+		snapshot = EnhancedSnapshotNode(
+			is_clickable=None,
+			cursor_style=None,
+			bounds=DOMRect(x=10, y=y, width=100, height=50),
+			clientRects=None,
+			scrollRects=None,
+			computed_styles=None,
+			paint_order=None,
+			stacking_contexts=None,
+		)
+		return _node(node_id, 'DIV', snapshot)
+
+	within_margin, beyond_margin, above_margin = element(2, 1799), element(3, 1800), element(4, -1050)
+	for node in (within_margin, beyond_margin, above_margin):
+		node.is_visible = is_element_visible_according_to_all_parents(node, [html])
+
+	assert within_margin.is_visible is True
+	assert beyond_margin.is_visible is False
+	assert above_margin.is_visible is False
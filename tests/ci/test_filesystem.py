@@ -476,6 +476,53 @@ class TestFileSystem:
 		expected_content = 'name,age,city\nJohn,30,New York\nJane,25,London\nBob,35,Paris'
 		assert file_obj.content == expected_content
 
+	async def test_append_only_writes_new_content(self, temp_filesystem, monkeypatch):
+		"""Test appends go to disk as O_APPEND writes instead of rewriting the whole file."""
+		fs = temp_filesystem
+		await fs.write_file('results.csv', 'id,value')
+
+		full_writes = 0
+		original_sync = CsvFile.sync_to_disk_sync
+
+		def counting_sync(self, path):
+			nonlocal full_writes
+			full_writes += 1
+			original_sync(self, path)
+
+		monkeypatch.setattr(CsvFile, 'sync_to_disk_sync', counting_sync)
+
+		for i in range(20):
+			await fs.append_file('results.csv', f'\n{i},row{i}')
+
+		assert full_writes == 0
+		expected_content = 'id,value' + ''.join(f'\n{i},row{i}' for i in range(20))
+		assert fs.get_file('results.csv').content == expected_content
+		assert (fs.get_dir() / 'results.csv').read_text() == expected_content
+
+		# An out-of-band content change makes the disk copy stale, so the next append rewrites the file
+		fs.get_file('results.csv').update_content('id,value')
+		await fs.append_file('results.csv', '\n0,row0')
+		assert full_writes == 1
+		assert (fs.get_dir() / 'results.csv').read_text() == 'id,value\n0,row0'
+
+	async def test_pdf_render_deferred_until_flush(self, temp_filesystem):
+		"""Test PDF files are only rendered on flush, not on every write/append."""
+		fs = temp_filesystem
+		pdf_path = fs.get_dir() / 'report.pdf'
+
+		await fs.write_file('report.pdf', '# Report')
+		await fs.append_file('report.pdf', '\nLine 1')
+		assert not pdf_path.exists()
+		assert fs.get_file('report.pdf').content == '# Report\nLine 1'
+
+		await fs.flush()
+		assert pdf_path.exists()
+		first_mtime = pdf_path.stat().st_mtime_ns
+
+		# Nothing changed, so flushing again must not re-render
+		await fs.flush()
+		assert pdf_path.stat().st_mtime_ns == first_mtime
+
 	async def test_save_extracted_content(self, temp_filesystem):
 		"""Test saving extracted content with auto-numbering."""
 		fs = temp_filesystem
@@ -531,6 +578,32 @@ class TestFileSystem:
 		assert 'Line 0' in description  # Start should be shown
 		assert 'Line 99' in description  # End should be shown
 
+	async def test_describe_only_rebuilds_changed_files(self, temp_filesystem, monkeypatch):
+		"""Test describe() reuses cached previews for files that were not written since the last call."""
+		fs = temp_filesystem
+		await fs.write_file('large.md', '\n'.join([f'Line {i}' for i in range(100)]))
+		await fs.write_file('notes.txt', 'Some notes')
+
+		first_description = fs.describe()
+
+		described = []
+		original_describe_file = FileSystem._describe_file
+
+		def counting_describe_file(file_obj):
+			described.append(file_obj.full_name)
+			return original_describe_file(file_obj)
+
+		monkeypatch.setattr(FileSystem, '_describe_file', staticmethod(counting_describe_file))
+
+		assert fs.describe() == first_description
+		assert described == []
+
+		await fs.append_file('notes.txt', '\nMore notes')
+		description = fs.describe()
+		assert described == ['notes.txt']
+		assert 'More notes' in description
+		assert 'Line 99' in description
+
 	def test_get_todo_contents(self, temp_filesystem):
 		"""Test getting todo file contents."""
 		fs = temp_filesystem
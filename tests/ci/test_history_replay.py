@@ -0,0 +1,120 @@
+"""Tests for fast history replay: browser_use/agent/replay.py."""
+
+import pytest
+
+from browser_use.agent.replay import ReplayCandidate, element_index_of, pick_candidate, resolve_historical_element
+from browser_use.browser import BrowserSession
+from browser_use.browser.events import NavigateToUrlEvent
+from browser_use.browser.profile import BrowserProfile
+from browser_use.dom.views import DOMInteractedElement, DOMRect, EnhancedDOMTreeNode, NodeType
+from browser_use.tools.service import Tools
+
+
+def _element(name: str, parent: EnhancedDOMTreeNode | None, **attributes: str) -> EnhancedDOMTreeNode:
+	node = EnhancedDOMTreeNode(
+		node_id=0,
+		backend_node_id=0,
+		node_type=NodeType.ELEMENT_NODE,
+		node_name=name,
+		node_value='',
+		attributes=attributes,
+		is_scrollable=None,
+		is_visible=True,
+		absolute_position=None,
+		target_id='target',
+		frame_id=None,
+		session_id=None,
+		content_document=None,
+		shadow_root_type=None,
+		shadow_roots=None,
+		parent_node=parent,
+		children_nodes=[],
+		ax_node=None,
+		snapshot_node=None,
+	)
+	if parent is not None:
+		assert parent.children_nodes is not None
+		parent.children_nodes.append(node)
+	return node
+
+
+def _candidate(node: EnhancedDOMTreeNode, xpath_match: bool = False, visible: bool = True) -> ReplayCandidate:
+	return ReplayCandidate(
+		branch=node._get_parent_branch_path(),
+		attributes=node.attributes,
+		xpath_match=xpath_match,
+		visible=visible,
+		rect=DOMRect(0, 0, 10, 10),
+	)
+
+
+@pytest.fixture
+def page() -> dict[str, EnhancedDOMTreeNode]:
+	html = _element('HTML', None)
+	body = _element('BODY', html)
+	form = _element('FORM', body, id='login')
+	return {
+		'submit': _element('BUTTON', form, type='submit', style='color: red'),
+		'other_submit': _element('BUTTON', body, type='submit'),
+		'cancel': _element('BUTTON', form, type='button'),
+	}
+
+
+def test_candidates_hash_like_dom_tree_nodes(page):
+	for node in page.values():
+		assert _candidate(node).element_hash == hash(node)
+	# only static attributes count, like for DOM tree nodes
+	assert _candidate(page['submit']).element_hash == hash(_element('BUTTON', page['submit'].parent_node, type='submit'))
+
+
+def test_pick_candidate(page):
+	recorded = DOMInteractedElement.load_from_enhanced_dom_tree(page['submit'])
+	twin = page['submit']
+
+	assert pick_candidate([_candidate(page['cancel']), _candidate(page['other_submit'])], recorded) is None
+	assert pick_candidate([_candidate(page['cancel']), _candidate(twin)], recorded) == 1
+	# an element at the recorded xpath doesn't match with a different hash
+	assert pick_candidate([_candidate(page['cancel'], xpath_match=True)], recorded) is None
+	# among elements with the recorded hash, the one at the recorded xpath wins, then visible ones
+	assert pick_candidate([_candidate(twin), _candidate(twin, xpath_match=True)], recorded) == 1
+	assert pick_candidate([_candidate(twin, xpath_match=True, visible=False), _candidate(twin, xpath_match=True)], recorded) == 1
+	assert pick_candidate([_candidate(twin, visible=False), _candidate(twin)], recorded) == 1
+	assert pick_candidate([_candidate(twin, visible=False), _candidate(twin, visible=False)], recorded) == 0
+
+
+def test_element_index_of():
+	ActionModel = Tools().registry.create_action_model()
+
+	assert element_index_of(ActionModel.model_validate({'click_element_by_index': {'index': 4}})) == 4
+	assert element_index_of(ActionModel.model_validate({'scroll': {'down': True, 'num_pages': 1, 'frame_element_index': 7}})) == 7
+	assert (
+		element_index_of(ActionModel.model_validate({'scroll': {'down': True, 'num_pages': 1, 'frame_element_index': 0}})) is None
+	)
+	assert element_index_of(ActionModel.model_validate({'go_back': {}})) is None
+
+
+async def test_resolve_recorded_element_in_browser(httpserver):
+	httpserver.expect_request('/').respond_with_data(
+		"""<html><body>
+			<form id="login"><button type="button">Cancel</button><button type="submit">Sign in</button></form>
+			<button type="submit">Subscribe</button>
+		</body></html>""",
+		content_type='text/html',
+	)
+	browser_session = BrowserSession(browser_profile=BrowserProfile(headless=True, user_data_dir=None))
+	await browser_session.start()
+	try:
+		event = browser_session.event_bus.dispatch(NavigateToUrlEvent(url=httpserver.url_for('/')))
+		await event
+		state = await browser_session.get_browser_state_summary(include_screenshot=False)
+		sign_in = next(node for node in state.dom_state.selector_map.values() if 'Sign in' in node.get_all_children_text())
+		recorded = DOMInteractedElement.load_from_enhanced_dom_tree(sign_in)
+
+		node = await resolve_historical_element(browser_session, recorded, element_index=3)
+
+		assert node is not None
+		assert node.backend_node_id == sign_in.backend_node_id
+		assert node.element_index == 3
+		assert node.get_all_children_text() == 'Sign in'
+	finally:
+		await browser_session.kill()
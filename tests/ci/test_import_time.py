@@ -0,0 +1,101 @@
+"""
+Import-time budget for the CLI and MCP server entry points.
+
+Each check runs in a fresh interpreter with `python -X importtime` and parses its report, so it sees exactly
+what `browser-use --help`, `browser-use -p ...` and `python -m browser_use.mcp` import before doing any work.
+The hard guarantee is which heavy modules are (not) imported; the time budget is deliberately generous and
+only catches large regressions.
+"""
+
+import os
+import re
+import subprocess
+import sys
+
+import pytest
+
+import browser_use
+
+# Cumulative import time budget per entry point, in seconds
+IMPORT_TIME_BUDGET = 1.0
+
+# Modules that are slow to import and only needed once a command actually runs
+HEAVY_MODULES = (
+	'textual',
+	'openai',
+	'anthropic',
+	'google.genai',
+	'groq',
+	'ollama',
+	'browser_use.agent.service',
+	'browser_use.browser.session',
+	'browser_use.tools.service',
+)
+
+_IMPORTTIME_LINE = re.compile(r'^import time:\s+\d+ \|\s+(\d+) \|( *)(\S+)$')
+
+
+def _run_with_importtime(code: str, tmp_path) -> tuple[dict[str, int], str]:
+	"""Run code in a fresh interpreter, returning {top-level module: cumulative import time in us} and stdout."""
+	# run from an empty directory so no .env is picked up, with this checkout importable
+	repo_root = os.path.dirname(os.path.dirname(os.path.abspath(browser_use.__file__)))
+	python_path = os.pathsep.join(filter(None, [repo_root, os.environ.get('PYTHONPATH')]))
+	env = {**os.environ, 'BROWSER_USE_SETUP_LOGGING': 'false', 'PYTHONPATH': python_path}
+	result = subprocess.run(
+		[sys.executable, '-X', 'importtime', '-c', code],
+		capture_output=True,
+		text=True,
+		env=env,
+		cwd=tmp_path,
+		timeout=120,
+	)
+	assert result.returncode == 0, result.stderr[-2000:]
+
+	imported: dict[str, int] = {}
+	for line in result.stderr.splitlines():
+		match = _IMPORTTIME_LINE.match(line)
+		if match:
+			cumulative_us, indent, module = match.groups()
+			imported[module] = int(cumulative_us) if not indent else imported.get(module, 0)
+	return imported, result.stdout
+
+
+def _heavy_modules(imported: dict[str, int]) -> list[str]:
+	return [module for module in HEAVY_MODULES if module in imported]
+
+
+@pytest.mark.parametrize('entry_point', ['browser_use.cli', 'browser_use.mcp.__main__'])
+def test_entry_point_import_is_light(entry_point: str, tmp_path):
+	imported, _ = _run_with_importtime(f'import {entry_point}', tmp_path)
+
+	assert _heavy_modules(imported) == []
+	import_seconds = sum(imported.values()) / 1_000_000
+	assert import_seconds < IMPORT_TIME_BUDGET, f'importing {entry_point} took {import_seconds:.2f}s'
+
+
+def test_cli_help_does_not_import_heavy_modules(tmp_path):
+	code = 'import sys; from browser_use.cli import main; sys.argv = ["browser-use", "--help"]; main()'
+	env_code = f'import sys\ntry:\n\t{code}\nexcept SystemExit:\n\tpass'
+	imported, stdout = _run_with_importtime(env_code, tmp_path)
+
+	assert 'Usage:' in stdout
+	assert _heavy_modules(imported) == []
+
+
+@pytest.mark.parametrize(
+	'model_name, provider_module, other_provider_modules',
+	[
+		('claude-4-sonnet', 'anthropic', ('google.genai',)),
+		('gemini-2.5-flash', 'google.genai', ('anthropic',)),
+	],
+)
+def test_cli_imports_only_the_chosen_provider(model_name, provider_module, other_provider_modules, tmp_path, monkeypatch):
+	monkeypatch.setenv('ANTHROPIC_API_KEY', 'test-key')
+	monkeypatch.setenv('GOOGLE_API_KEY', 'test-key')
+	code = f'from browser_use.cli import get_llm; get_llm({{"model": {{"name": "{model_name}"}}}})'
+	imported, _ = _run_with_importtime(code, tmp_path)
+
+	assert provider_module in imported
+	for module in other_provider_modules:
+		assert module not in imported
+	assert 'textual' not in imported
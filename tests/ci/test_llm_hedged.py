@@ -0,0 +1,174 @@
+"""Tests for hedged LLM calls across several models: browser_use/llm/hedged/chat.py."""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+
+import pytest
+from pydantic import BaseModel
+
+from browser_use.llm.base import BaseChatModel
+from browser_use.llm.exceptions import ModelProviderError
+from browser_use.llm.hedged.chat import ChatHedged
+from browser_use.llm.messages import UserMessage
+from browser_use.llm.views import ChatInvokeCompletion, ChatInvokeUsage
+from browser_use.tokens.service import TokenCost
+
+MESSAGES = [UserMessage(content='Which button submits the form?')]
+
+
+class Answer(BaseModel):
+	text: str
+
+
+@dataclass
+class FakeLLM(BaseChatModel):
+	model: str
+	delay: float = 0.0
+	fail: bool = False
+	calls: int = 0
+	cancelled: int = 0
+	delays: list[float] = field(default_factory=list)
+	"""Delays of the next calls, before falling back to `delay`"""
+
+	@property
+	def provider(self) -> str:
+		return 'fake'
+
+	@property
+	def name(self) -> str:
+		return self.model
+
+	async def ainvoke(self, messages, output_format=None):  # type: ignore[override]
+		self.calls += 1
+		try:
+			await asyncio.sleep(self.delays.pop(0) if self.delays else self.delay)
+		except asyncio.CancelledError:
+			self.cancelled += 1
+			raise
+		if self.fail:
+			raise ModelProviderError(message='overloaded', status_code=529, model=self.model)
+		text = f'from {self.model}'
+		usage = ChatInvokeUsage(
+			prompt_tokens=100,
+			prompt_cached_tokens=None,
+			prompt_cache_creation_tokens=None,
+			prompt_image_tokens=None,
+			completion_tokens=10,
+			total_tokens=110,
+		)
+		return ChatInvokeCompletion(completion=output_format(text=text) if output_format else text, usage=usage)
+
+
+async def test_fast_primary_is_not_hedged():
+	primary, fallback = FakeLLM('primary'), FakeLLM('fallback')
+	llm = ChatHedged(llms=[primary, fallback], hedge_after=0.5)
+
+	result = await llm.ainvoke(MESSAGES, output_format=Answer)
+
+	assert result.completion == Answer(text='from primary')
+	assert (primary.calls, fallback.calls) == (1, 0)
+	assert llm.model == 'primary'
+
+
+async def test_slow_primary_is_hedged_and_cancelled():
+	primary, fallback = FakeLLM('primary', delay=5.0), FakeLLM('fallback', delay=0.01)
+	llm = ChatHedged(llms=[primary, fallback], hedge_after=0.05)
+
+	start = time.monotonic()
+	result = await llm.ainvoke(MESSAGES)
+
+	assert result.completion == 'from fallback'
+	assert time.monotonic() - start < 1.0
+	assert (primary.calls, primary.cancelled, fallback.calls) == (1, 1, 1)
+
+
+async def test_failed_request_falls_back_without_waiting():
+	primary, fallback = FakeLLM('primary', fail=True), FakeLLM('fallback')
+	llm = ChatHedged(llms=[primary, fallback], hedge_after=5.0)
+
+	start = time.monotonic()
+	result = await llm.ainvoke(MESSAGES)
+
+	assert result.completion == 'from fallback'
+	assert time.monotonic() - start < 1.0
+
+
+async def test_raises_the_last_error_when_all_models_fail():
+	llm = ChatHedged(llms=[FakeLLM('primary', fail=True), FakeLLM('fallback', fail=True)], hedge_after=0.01)
+
+	with pytest.raises(ModelProviderError, match='overloaded'):
+		await llm.ainvoke(MESSAGES)
+
+
+async def test_hedge_delay_follows_the_latency_quantile():
+	primary, fallback = FakeLLM('primary', delays=[0.01] * 19 + [1.0]), FakeLLM('fallback', delay=0.3)
+	llm = ChatHedged(llms=[primary, fallback], initial_hedge_after=7.0, min_samples=5)
+
+	assert llm._hedge_delay(0) == 7.0
+	for _ in range(20):
+		await llm.ainvoke(MESSAGES)
+
+	# once the primary has enough calls it's hedged after its p95 latency, so the outlier was answered by the fallback
+	assert primary.calls == 20
+	assert [stats['wins'] for stats in llm.get_stats()] == [19, 1]
+	# the cancelled outlier still counts as slower than the fallback's answer
+	assert len(llm._stats[0].censored) == 1
+	assert 0.3 <= llm._hedge_delay(0) < 1.0
+
+	llm._stats[0].censored.clear()
+	llm._stats[0].latencies.clear()
+	llm._stats[0].latencies.extend([0.01] * 17 + [0.2, 0.3, 0.4])
+	assert llm._hedge_delay(0) == 0.4
+
+
+def test_cancelled_calls_count_as_censored_latencies():
+	llm = ChatHedged(llms=[FakeLLM('primary'), FakeLLM('fallback')], min_samples=5)
+	stats = llm._stats[0]
+	stats.latencies.extend([0.1] * 18)
+	assert llm._hedge_delay(0) == 0.1
+
+	# two calls cancelled after 2s: the p95 is at least that, not the latency of the calls that completed
+	stats.censored.extend([2.0, 2.0])
+	assert llm._hedge_delay(0) == 2.0
+	assert stats.quantile(0.5) == 0.1
+
+	# calls cancelled early, while completed calls take longer, only remove them from the estimate
+	stats.censored.clear()
+	stats.censored.extend([0.01] * 18)
+	stats.latencies.clear()
+	stats.latencies.extend([0.1, 0.2, 0.3, 0.4, 0.5])
+	assert stats.quantile(0.5) == 0.3
+
+
+async def test_routing_prefers_healthy_and_faster_models():
+	primary, fallback = FakeLLM('primary', fail=True), FakeLLM('fallback')
+	llm = ChatHedged(llms=[primary, fallback], hedge_after=5.0, min_samples=3)
+	assert llm._route() == [0, 1]
+
+	for _ in range(3):
+		await llm.ainvoke(MESSAGES)
+	# the primary failed every call, so the fallback goes first and the primary isn't called anymore
+	assert llm._route() == [1, 0]
+	await llm.ainvoke(MESSAGES)
+	assert (primary.calls, fallback.calls) == (3, 4)
+
+	# measured models go before models without enough calls, faster ones first
+	slow, fast = FakeLLM('slow', delay=0.03), FakeLLM('fast', delay=0.001)
+	llm = ChatHedged(llms=[slow, fast, FakeLLM('unused')], min_samples=2)
+	llm._stats[0].latencies.extend([0.03, 0.03])
+	llm._stats[1].latencies.extend([0.001, 0.001])
+	assert llm._route() == [1, 0, 2]
+
+
+async def test_usage_is_attributed_to_the_model_that_answered():
+	primary, fallback = FakeLLM('primary', delay=5.0), FakeLLM('fallback', delay=0.01)
+	token_cost = TokenCost()
+	llm = token_cost.register_llm(ChatHedged(llms=[primary, fallback], hedge_after=0.05))
+
+	result = await llm.ainvoke(MESSAGES)
+
+	assert result.model == 'fallback'
+	summary = await token_cost.get_usage_summary()
+	assert list(summary.by_model) == ['fallback']
+	assert summary.by_model['fallback'].total_tokens == 110
@@ -0,0 +1,133 @@
+"""Tests for the LLM response cache: browser_use/llm/cache."""
+
+import sqlite3
+from dataclasses import dataclass, field
+from datetime import timedelta
+
+from pydantic import BaseModel
+
+from browser_use.llm.base import BaseChatModel
+from browser_use.llm.cache.chat import ChatCache
+from browser_use.llm.cache.store import ResponseCacheStore
+from browser_use.llm.messages import SystemMessage, UserMessage
+from browser_use.llm.views import ChatInvokeCompletion, ChatInvokeUsage
+from browser_use.tokens.service import TokenCost
+
+USAGE = ChatInvokeUsage(
+	prompt_tokens=100,
+	prompt_cached_tokens=None,
+	prompt_cache_creation_tokens=None,
+	prompt_image_tokens=None,
+	completion_tokens=20,
+	total_tokens=120,
+)
+
+
+class Answer(BaseModel):
+	text: str
+	confidence: float
+
+
+@dataclass
+class CountingLLM(BaseChatModel):
+	model: str = 'counting-model'
+	calls: list = field(default_factory=list)
+
+	@property
+	def provider(self) -> str:
+		return 'test'
+
+	@property
+	def name(self) -> str:
+		return self.model
+
+	async def ainvoke(self, messages, output_format=None):  # type: ignore[override]
+		self.calls.append(messages)
+		completion = (
+			output_format(text=f'answer {len(self.calls)}', confidence=0.5) if output_format else f'answer {len(self.calls)}'
+		)
+		return ChatInvokeCompletion(completion=completion, usage=USAGE)
+
+
+def _messages(task: str = 'Find the price', date: str = '2025-01-01') -> list:
+	return [SystemMessage(content='You are a browser agent.', cache=True), UserMessage(content=f'{task}\nCurrent date: {date}')]
+
+
+async def test_repeated_calls_are_served_from_cache(tmp_path):
+	llm = CountingLLM()
+	cached = ChatCache(llm=llm, path=tmp_path / 'cache.sqlite')
+
+	first = await cached.ainvoke(_messages())
+	second = await cached.ainvoke(_messages())
+	structured = await cached.ainvoke(_messages(), output_format=Answer)
+	structured_again = await cached.ainvoke(_messages(), output_format=Answer)
+
+	assert len(llm.calls) == 2
+	assert (first.completion, first.cache_hit) == ('answer 1', False)
+	assert (second.completion, second.cache_hit, second.usage) == ('answer 1', True, USAGE)
+	assert structured.cache_hit is False and structured_again.cache_hit is True
+	assert structured_again.completion == Answer(text='answer 2', confidence=0.5)
+
+	# a new wrapper on the same file reads the stored responses
+	assert (await ChatCache(llm=CountingLLM(), path=tmp_path / 'cache.sqlite').ainvoke(_messages())).completion == 'answer 1'
+
+
+def test_cache_key_normalization(tmp_path):
+	cached = ChatCache(llm=CountingLLM(), path=tmp_path / 'cache.sqlite')
+	key = cached.cache_key(_messages())
+
+	assert cached.cache_key(_messages(task='Find   the\nprice ')) == key
+	assert cached.cache_key(_messages(date='2025-06-30')) == key
+	assert cached.cache_key([message.model_copy(update={'cache': False}) for message in _messages()]) == key
+
+	assert cached.cache_key(_messages(task='Find the name')) != key
+	assert cached.cache_key(_messages(), output_format=Answer) != key
+	assert ChatCache(llm=CountingLLM(model='other-model'), path=tmp_path / 'cache.sqlite').cache_key(_messages()) != key
+	keep_dates = ChatCache(llm=CountingLLM(), path=tmp_path / 'cache.sqlite', ignored_patterns=())
+	assert keep_dates.cache_key(_messages(date='2025-06-30')) != keep_dates.cache_key(_messages())
+
+
+def test_store_expires_entries(tmp_path):
+	store = ResponseCacheStore(tmp_path / 'cache.sqlite', ttl=timedelta(hours=1), max_size_bytes=1024 * 1024)
+	store.put('fresh', 'model', 'a')
+	store.put('stale', 'model', 'b')
+	with sqlite3.connect(tmp_path / 'cache.sqlite') as connection:
+		connection.execute("UPDATE responses SET created_at = created_at - 7200 WHERE key = 'stale'")
+
+	assert store.get('fresh') == 'a'
+	assert store.get('stale') is None
+	assert len(store) == 1
+
+
+def test_store_evicts_least_recently_used(tmp_path):
+	store = ResponseCacheStore(tmp_path / 'cache.sqlite', ttl=None, max_size_bytes=1000)
+	for i in range(4):
+		store.put(f'key{i}', 'model', str(i) * 200)
+	assert store.get('key0') == '0' * 200  # key0 is now the most recently used
+
+	store.put('key4', 'model', '4' * 200)
+	store.put('key5', 'model', '5' * 200)
+
+	assert [key for key in ('key0', 'key1', 'key2', 'key3', 'key4', 'key5') if store.get(key) is not None] == [
+		'key0',
+		'key3',
+		'key4',
+		'key5',
+	]
+
+
+async def test_token_cost_reports_response_cache_hits(tmp_path):
+	token_cost = TokenCost()
+	llm = token_cost.register_llm(ChatCache(llm=CountingLLM(), path=tmp_path / 'cache.sqlite'))
+
+	for _ in range(3):
+		await llm.ainvoke(_messages())
+	await llm.ainvoke(_messages(task='Something else'))
+
+	summary = await token_cost.get_usage_summary()
+	assert summary.entry_count == 2  # only the calls that went to the provider used tokens
+	assert summary.total_tokens == 240
+	assert (summary.response_cache_hits, summary.response_cache_misses) == (2, 2)
+	assert summary.response_cache_hit_ratio == 0.5
+	assert summary.response_cache_saved_tokens == 240
+	assert summary.by_model['counting-model'].response_cache_hit_ratio == 0.5
@@ -0,0 +1,204 @@
+"""
+Tests for the bounded MCP session pool in browser_use/mcp/session_pool.py.
+
+Sessions here are plain objects created by a factory coroutine, so no browser is launched.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from browser_use.mcp.session_pool import SessionPool, SessionPoolFullError
+
+
+class FakeSession:
+	def __init__(self, session_id: str):
+		self.session_id = session_id
+		self.closed = False
+
+
+class FakeSessions:
+	"""Factory and closer for the pool that record what happened."""
+
+	def __init__(self, start_delay: float = 0):
+		self.start_delay = start_delay
+		self.started: list[str] = []
+		self.closed: list[str] = []
+
+	async def start(self, session_id: str) -> FakeSession:
+		await asyncio.sleep(self.start_delay)
+		self.started.append(session_id)
+		return FakeSession(session_id)
+
+	async def close(self, session: FakeSession) -> None:
+		session.closed = True
+		self.closed.append(session.session_id)
+
+
+def _pool(fakes: FakeSessions, max_sessions: int = 3, idle_timeout: float = 600) -> SessionPool[FakeSession]:
+	return SessionPool(factory=fakes.start, closer=fakes.close, max_sessions=max_sessions, idle_timeout=idle_timeout)
+
+
+async def test_session_is_started_once_and_reused():
+	fakes = FakeSessions(start_delay=0.01)
+	pool = _pool(fakes)
+
+	async def use(session_id: str) -> FakeSession:
+		async with pool.session(session_id) as session:
+			return session
+
+	first, second = await asyncio.gather(use('a'), use('a'))
+
+	assert first is second
+	assert fakes.started == ['a']
+	assert len(pool) == 1
+
+
+async def test_calls_are_serialized_per_session_and_concurrent_across_sessions():
+	pool = _pool(FakeSessions())
+	running: dict[str, int] = {'a': 0, 'b': 0}
+	max_running: dict[str, int] = {'a': 0, 'b': 0}
+	max_total = 0
+
+	async def call(session_id: str) -> None:
+		nonlocal max_total
+		async with pool.session(session_id):
+			running[session_id] += 1
+			max_running[session_id] = max(max_running[session_id], running[session_id])
+			max_total = max(max_total, sum(running.values()))
+			await asyncio.sleep(0.02)
+			running[session_id] -= 1
+
+	await asyncio.gather(*(call(session_id) for session_id in ['a', 'b'] * 3))
+
+	assert max_running == {'a': 1, 'b': 1}
+	assert max_total == 2
+
+
+async def test_full_pool_evicts_least_recently_used_idle_session():
+	fakes = FakeSessions()
+	pool = _pool(fakes, max_sessions=2)
+
+	for session_id in ['a', 'b', 'a', 'c']:
+		async with pool.session(session_id):
+			pass
+
+	assert fakes.closed == ['b']
+	assert 'a' in pool and 'c' in pool and 'b' not in pool
+
+
+async def test_full_pool_of_busy_sessions_raises():
+	fakes = FakeSessions()
+	pool = _pool(fakes, max_sessions=1)
+	release = asyncio.Event()
+	entered = asyncio.Event()
+
+	async def hold() -> None:
+		async with pool.session('a'):
+			entered.set()
+			await release.wait()
+
+	holder = asyncio.create_task(hold())
+	await entered.wait()
+	with pytest.raises(SessionPoolFullError):
+		async with pool.session('b'):
+			pass
+	release.set()
+	await holder
+
+	assert fakes.started == ['a']
+
+
+async def test_evict_idle_skips_busy_sessions():
+	fakes = FakeSessions()
+	pool = _pool(fakes, idle_timeout=60)
+	for session_id in ['idle', 'busy', 'fresh']:
+		async with pool.session(session_id):
+			pass
+	for entry in pool.entries():
+		if entry.session_id != 'fresh':
+			entry.last_activity = time.time() - 120
+
+	release = asyncio.Event()
+	entered = asyncio.Event()
+
+	async def hold() -> None:
+		async with pool.session('busy'):
+			entered.set()
+			await release.wait()
+
+	holder = asyncio.create_task(hold())
+	await entered.wait()
+	# entering the session counts as activity, make it look stale again while it is still running
+	next(entry for entry in pool.entries() if entry.session_id == 'busy').last_activity = time.time() - 120
+
+	assert await pool.evict_idle() == ['idle']
+	release.set()
+	await holder
+
+	assert fakes.closed == ['idle']
+	assert 'busy' in pool and 'fresh' in pool
+
+
+async def test_close_waits_for_running_call_and_next_call_starts_fresh_session():
+	fakes = FakeSessions()
+	pool = _pool(fakes)
+	entered = asyncio.Event()
+	events: list[str] = []
+
+	async def call() -> FakeSession:
+		async with pool.session('a') as session:
+			entered.set()
+			await asyncio.sleep(0.02)
+			events.append('call finished')
+			return session
+
+	call_task = asyncio.create_task(call())
+	await entered.wait()
+	assert await pool.close('a') is True
+	events.append('closed')
+	first_session = await call_task
+
+	assert events == ['call finished', 'closed']
+	assert first_session.closed
+	assert await pool.close('a') is False
+
+	async with pool.session('a') as second_session:
+		assert second_session is not first_session
+	assert fakes.started == ['a', 'a']
+
+
+async def test_failed_start_is_not_pooled():
+	attempts = 0
+
+	async def flaky_start(session_id: str) -> FakeSession:
+		nonlocal attempts
+		attempts += 1
+		if attempts == 1:
+			raise RuntimeError('browser failed to launch')
+		return FakeSession(session_id)
+
+	pool: SessionPool[FakeSession] = SessionPool(factory=flaky_start, closer=FakeSessions().close)
+
+	with pytest.raises(RuntimeError, match='failed to launch'):
+		async with pool.session('a'):
+			pass
+	assert len(pool) == 0
+
+	async with pool.session('a') as session:
+		assert session.session_id == 'a'
+
+
+async def test_close_all_reports_failures():
+	async def failing_close(session: FakeSession) -> None:
+		if session.session_id == 'b':
+			raise RuntimeError('already gone')
+
+	pool: SessionPool[FakeSession] = SessionPool(factory=FakeSessions().start, closer=failing_close)
+	for session_id in ['a', 'b', 'c']:
+		async with pool.session(session_id):
+			pass
+
+	assert await pool.close_all() == ['b']
+	assert len(pool) == 0
@@ -0,0 +1,175 @@
+"""Tests for per-step latency profiling in browser_use/profiling.py."""
+
+import asyncio
+import contextvars
+
+import pytest
+
+from browser_use.agent.views import AgentHistory, AgentHistoryList, AgentOutput, StepMetadata
+from browser_use.browser.views import BrowserStateHistory
+from browser_use.profiling import (
+	ProfileSpan,
+	link_span,
+	linked_span,
+	profile_span,
+	profile_step,
+	record_span,
+	summarize_spans,
+	to_chrome_trace,
+	to_otlp_json,
+)
+from browser_use.utils import time_execution_async, time_execution_sync
+
+
+def _names(span: ProfileSpan) -> list[str]:
+	return [path for path, _ in span.walk()]
+
+
+async def test_spans_nest_across_tasks():
+	@time_execution_sync('--parse')
+	def parse() -> None:
+		pass
+
+	@time_execution_async('--fetch')
+	async def fetch() -> None:
+		await asyncio.sleep(0)
+		parse()
+
+	with profile_step('step', step=1) as root:
+		with profile_span('browser_state') as span:
+			assert span is not None
+			await asyncio.gather(fetch(), fetch())
+		record_span('serialize', 1.0, 1.5)
+
+	assert _names(root) == [
+		'step',
+		'step/browser_state',
+		'step/browser_state/fetch',
+		'step/browser_state/fetch/parse',
+		'step/browser_state/fetch',
+		'step/browser_state/fetch/parse',
+		'step/serialize',
+	]
+	assert root.attributes == {'step': 1}
+	assert all(span.end_time is not None for _, span in root.walk())
+	assert root.children[1].duration_seconds == 0.5
+
+
+async def test_spans_outside_of_a_step_are_not_recorded():
+	with profile_span('browser_state') as span:
+		assert span is None
+	record_span('serialize', 1.0, 2.0)
+
+	# a task started during a step that outlives it doesn't add to the finished step
+	started = asyncio.Event()
+	finish = asyncio.Event()
+
+	async def background() -> None:
+		started.set()
+		await finish.wait()
+		with profile_span('late'):
+			pass
+
+	with profile_step() as root:
+		task = asyncio.create_task(background())
+		await started.wait()
+	finish.set()
+	await task
+	assert _names(root) == ['step']
+
+
+async def test_linked_span_records_into_the_dispatching_step():
+	async def handler(event_id: str) -> None:
+		# runs in its own context, like an event bus handler
+		with linked_span(event_id, 'handle_request'):
+			with profile_span('build_tree'):
+				pass
+
+	with profile_step() as root:
+		with profile_span('browser_state'):
+			link_span('event-1')
+			await asyncio.create_task(handler('event-1'), context=contextvars.Context())
+
+	assert _names(root) == [
+		'step',
+		'step/browser_state',
+		'step/browser_state/handle_request',
+		'step/browser_state/handle_request/build_tree',
+	]
+
+	# a key that was never linked records nothing
+	with linked_span('event-2', 'handle_request') as span:
+		assert span is None
+
+
+def _step(start: float, browser_state: float, llm: float) -> ProfileSpan:
+	root = ProfileSpan(name='step', start_time=start, end_time=start + browser_state + llm)
+	root.children = [
+		ProfileSpan(name='browser_state', start_time=start, end_time=start + browser_state, attributes={'url': 'https://a.com'}),
+		ProfileSpan(name='llm', start_time=start + browser_state, end_time=start + browser_state + llm),
+	]
+	return root
+
+
+def test_summary_percentiles():
+	steps = [_step(100.0 * i, browser_state=float(i), llm=2.0) for i in range(1, 11)]
+
+	summary = summarize_spans(steps)
+
+	assert set(summary) == {'step', 'step/browser_state', 'step/llm'}
+	browser_state = summary['step/browser_state']
+	assert browser_state.count == 10
+	assert browser_state.p50_seconds == pytest.approx(5.5)
+	assert browser_state.p95_seconds == pytest.approx(9.55)
+	assert browser_state.max_seconds == 10.0
+	assert summary['step/llm'].p95_seconds == pytest.approx(2.0)
+	assert summary['step'].total_seconds == pytest.approx(sum(range(1, 11)) + 20.0)
+
+
+def test_chrome_trace_and_otlp_export():
+	steps = [_step(100.0, browser_state=1.0, llm=2.0), _step(200.0, browser_state=0.5, llm=1.0)]
+
+	trace = to_chrome_trace(steps)
+	complete_events = [event for event in trace['traceEvents'] if event['ph'] == 'X']
+	assert len(complete_events) == 6
+	assert complete_events[1] == {
+		'name': 'browser_state',
+		'cat': 'browser_use',
+		'ph': 'X',
+		'ts': 100_000_000.0,
+		'dur': 1_000_000.0,
+		'pid': 1,
+		'tid': 1,
+		'args': {'url': 'https://a.com'},
+	}
+
+	otlp = to_otlp_json(steps)
+	spans = otlp['resourceSpans'][0]['scopeSpans'][0]['spans']
+	assert len(spans) == 6
+	first_step, browser_state, llm = spans[:3]
+	assert first_step['parentSpanId'] == ''
+	assert browser_state['parentSpanId'] == first_step['spanId'] == llm['parentSpanId']
+	assert browser_state['traceId'] == first_step['traceId'] != spans[3]['traceId']
+	assert browser_state['startTimeUnixNano'] == '100000000000'
+	assert browser_state['endTimeUnixNano'] == '101000000000'
+	assert browser_state['attributes'] == [{'key': 'url', 'value': {'stringValue': 'https://a.com'}}]
+
+
+def test_profiles_are_kept_in_history_metadata(tmp_path):
+	history = AgentHistoryList(
+		history=[
+			AgentHistory(
+				model_output=None,
+				result=[],
+				state=BrowserStateHistory(url='', title='', tabs=[], interacted_element=[], screenshot_path=None),
+				metadata=StepMetadata(step_start_time=100.0, step_end_time=103.0, step_number=1, profile=_step(100.0, 1.0, 2.0)),
+			)
+		]
+	)
+	path = tmp_path / 'history.json'
+	history.save_to_file(path)
+
+	loaded = AgentHistoryList.load_from_file(path, AgentOutput)
+
+	assert loaded.step_profiles() == history.step_profiles()
+	assert loaded.profile_summary()['step/llm'].p50_seconds == 2.0
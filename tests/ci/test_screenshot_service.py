@@ -0,0 +1,97 @@
+"""Tests for the content-addressed screenshot store in browser_use/screenshots/service.py."""
+
+import base64
+import io
+
+import pytest
+from PIL import Image
+
+from browser_use.agent.views import ActionResult, AgentHistory, AgentHistoryList
+from browser_use.browser.views import BrowserStateHistory
+from browser_use.screenshots.service import ScreenshotService
+
+
+def _png_b64(color: str) -> str:
+	output = io.BytesIO()
+	Image.new('RGB', (64, 48), color).save(output, format='PNG')
+	return base64.b64encode(output.getvalue()).decode()
+
+
+async def test_identical_screenshots_share_one_file(tmp_path):
+	service = ScreenshotService(tmp_path)
+
+	paths = [await service.store_screenshot(_png_b64(color), step) for step, color in enumerate(['red', 'red', 'blue'], 1)]
+
+	assert paths[0] == paths[1] != paths[2]
+	assert service.blob_count() == 2
+	assert len(list(service.screenshots_dir.iterdir())) == 2
+	assert await service.get_screenshot(paths[0]) == _png_b64('red')
+
+
+async def test_retention_deletes_blobs_no_retained_step_refers_to(tmp_path):
+	service = ScreenshotService(tmp_path, max_screenshots=2)
+
+	red_1 = await service.store_screenshot(_png_b64('red'), 1)
+	await service.store_screenshot(_png_b64('blue'), 2)
+	red_3 = await service.store_screenshot(_png_b64('red'), 3)
+	assert red_1 == red_3
+	assert service.blob_count() == 2
+
+	# step 2 (blue) falls out of the window, red is still referenced by step 3
+	green_4 = await service.store_screenshot(_png_b64('green'), 4)
+	assert sorted(p.name for p in service.screenshots_dir.iterdir()) == sorted(p.rsplit('/', 1)[-1] for p in [red_3, green_4])
+
+	# step 3 falls out, now nothing refers to red
+	await service.store_screenshot(_png_b64('green'), 5)
+	assert [p.name for p in service.screenshots_dir.iterdir()] == [green_4.rsplit('/', 1)[-1]]
+	assert await service.get_screenshot_bytes(red_3) is None
+
+
+async def test_restoring_a_step_releases_its_previous_blob(tmp_path):
+	service = ScreenshotService(tmp_path)
+
+	await service.store_screenshot(_png_b64('red'), 1)
+	blue = await service.store_screenshot(_png_b64('blue'), 1)
+	assert service.blob_count() == 1
+
+	assert await service.store_screenshot(_png_b64('blue'), 1) == blue
+	assert await service.get_screenshot_bytes(blue) is not None
+
+
+@pytest.mark.parametrize('image_format, pil_format', [('webp', 'WEBP'), ('jpeg', 'JPEG')])
+async def test_transcoded_formats(tmp_path, image_format, pil_format):
+	service = ScreenshotService(tmp_path, image_format=image_format)
+
+	path = await service.store_screenshot(_png_b64('red'), 1)
+
+	data = await service.get_screenshot_bytes(path)
+	assert data is not None
+	with Image.open(io.BytesIO(data)) as image:
+		assert image.format == pil_format
+		assert image.size == (64, 48)
+
+
+def test_invalid_options_are_rejected(tmp_path):
+	with pytest.raises(ValueError):
+		ScreenshotService(tmp_path, image_format='gif')  # type: ignore[arg-type]
+	with pytest.raises(ValueError):
+		ScreenshotService(tmp_path, max_screenshots=0)
+
+
+async def test_history_streams_screenshot_bytes(tmp_path):
+	service = ScreenshotService(tmp_path)
+	paths = [await service.store_screenshot(_png_b64(color), step) for step, color in enumerate(['red', 'blue'], 1)]
+	history = AgentHistoryList(
+		history=[
+			AgentHistory(
+				model_output=None,
+				result=[ActionResult()],
+				state=BrowserStateHistory(url='', title='', tabs=[], interacted_element=[None], screenshot_path=path),
+			)
+			for path in [paths[0], None, paths[1]]
+		]
+	)
+
+	screenshots = list(history.iter_screenshot_bytes())
+	assert [base64.b64encode(s).decode() if s else None for s in screenshots] == history.screenshots()
+	assert list(history.iter_screenshot_bytes(n_last=2, return_none_if_not_screenshot=False)) == [screenshots[2]]
@@ -18,6 +18,7 @@ load_dotenv()
 
 
 from browser_use.agent.cloud_events import CreateAgentSessionEvent, CreateAgentTaskEvent
+from browser_use.config import CONFIG
 from browser_use.sync.auth import TEMP_USER_ID, DeviceAuthClient
 from browser_use.sync.service import CloudSync
 
@@ -33,6 +34,7 @@ def temp_config_dir(monkeypatch):
 
 		# Use monkeypatch to set the environment variable
 		monkeypatch.setenv('BROWSER_USE_CONFIG_DIR', str(temp_dir))
+		CONFIG.reload()
 
 		yield temp_dir
 
@@ -213,6 +213,7 @@ def test_telemetry_user_id_generation(tmp_path, monkeypatch, reset_telemetry_sin
 	config_dir = tmp_path / 'config' / 'browseruse'
 	config_dir.mkdir(parents=True)
 	monkeypatch.setenv('BROWSER_USE_CONFIG_DIR', str(config_dir))
+	CONFIG.reload()
 
 	# Enable telemetry
 	monkeypatch.setattr(CONFIG, 'ANONYMIZED_TELEMETRY', True)
@@ -0,0 +1,94 @@
+"""Tests for the running per-model totals of TokenCost: browser_use/tokens/service.py."""
+
+from datetime import datetime, timedelta
+
+from browser_use.llm.views import ChatInvokeUsage
+from browser_use.tokens.service import TokenCost
+
+PRICING = {
+	'model-a': {'input_cost_per_token': 1e-6, 'output_cost_per_token': 4e-6, 'cache_read_input_token_cost': 1e-7},
+	'model-b': {'input_cost_per_token': 2e-6, 'output_cost_per_token': 8e-6},
+}
+
+
+def _usage(prompt: int, completion: int, cached: int | None = None) -> ChatInvokeUsage:
+	return ChatInvokeUsage(
+		prompt_tokens=prompt,
+		prompt_cached_tokens=cached,
+		prompt_cache_creation_tokens=None,
+		prompt_image_tokens=None,
+		completion_tokens=completion,
+		total_tokens=prompt + completion,
+	)
+
+
+def _token_cost(history_size: int | None = 10_000) -> TokenCost:
+	token_cost = TokenCost(include_cost=True, history_size=history_size)
+	# pricing as if loaded from the LiteLLM file, without fetching it
+	token_cost._pricing_data = PRICING
+	token_cost._initialized = True
+	return token_cost
+
+
+async def test_summary_matches_per_entry_costs():
+	token_cost = _token_cost()
+	usages = [('model-a', _usage(1000, 100, cached=400)), ('model-b', _usage(500, 50)), ('model-a', _usage(2000, 300))]
+	for model, usage in usages:
+		token_cost.add_usage(model, usage)
+	token_cost.add_response_cache_lookup('model-b', hit=True, saved_usage=_usage(500, 50))
+	token_cost.add_response_cache_lookup('model-b', hit=False)
+
+	summary = await token_cost.get_usage_summary()
+
+	costs = [await token_cost.calculate_cost(model, usage) for model, usage in usages]
+	assert summary.entry_count == 3
+	assert (summary.total_prompt_tokens, summary.total_completion_tokens, summary.total_prompt_cached_tokens) == (3500, 450, 400)
+	assert abs(summary.total_prompt_cost - sum(cost.prompt_cost for cost in costs if cost)) < 1e-12
+	assert abs(summary.total_completion_cost - sum(cost.completion_cost for cost in costs if cost)) < 1e-12
+	assert abs(summary.by_model['model-a'].cost - sum(cost.total_cost for cost in costs[::2] if cost)) < 1e-12
+	assert summary.by_model['model-a'].average_tokens_per_invocation == 1700
+	assert (summary.response_cache_hits, summary.response_cache_misses, summary.response_cache_saved_tokens) == (1, 1, 550)
+	assert abs(summary.response_cache_saved_cost - 500 * 2e-6 - 50 * 8e-6) < 1e-12
+
+	only_b = await token_cost.get_usage_summary(model='model-b')
+	assert list(only_b.by_model) == ['model-b'] and only_b.total_tokens == 550
+
+	tokens = token_cost.get_usage_tokens_for_model('model-a')
+	assert (tokens.prompt_tokens, tokens.prompt_cached_tokens, tokens.total_tokens) == (3000, 400, 3400)
+	assert token_cost.get_usage_tokens_for_model('unknown').total_tokens == 0
+
+
+async def test_history_is_bounded_but_totals_cover_all_calls():
+	token_cost = _token_cost(history_size=5)
+	for _ in range(50):
+		token_cost.add_usage('model-a', _usage(100, 10))
+
+	assert len(token_cost.usage_history) == 5
+	summary = await token_cost.get_usage_summary()
+	assert (summary.entry_count, summary.total_tokens) == (50, 5500)
+
+	# `since` summaries are computed from the entries still in the history
+	recent = await token_cost.get_usage_summary(since=datetime.now() - timedelta(minutes=1))
+	assert recent.entry_count == 5
+	assert (await token_cost.get_usage_summary(since=datetime.now() + timedelta(minutes=1))).entry_count == 0
+
+	token_cost.clear_history()
+	assert (await token_cost.get_usage_summary()).entry_count == 0
+
+
+async def test_pricing_is_resolved_once_per_model(monkeypatch):
+	token_cost = _token_cost()
+	resolved: list[str] = []
+	resolve = token_cost._resolve_model_pricing
+	monkeypatch.setattr(token_cost, '_resolve_model_pricing', lambda model: resolved.append(model) or resolve(model))
+
+	for _ in range(20):
+		token_cost.add_usage('model-a', _usage(100, 10))
+		token_cost.add_usage('unpriced-model', _usage(100, 10))
+		await token_cost._log_usage('model-a', token_cost.usage_history[-2])
+	summary = await token_cost.get_usage_summary()
+	await token_cost.log_usage_summary()
+
+	assert sorted(resolved) == ['model-a', 'unpriced-model']
+	assert summary.by_model['unpriced-model'].cost == 0.0
+	assert abs(summary.by_model['model-a'].cost - 20 * (100 * 1e-6 + 10 * 4e-6)) < 1e-12